@@ -0,0 +1,45 @@
+"""
+Benchmark bulk amount conversion against the per-value float conversion it replaces.
+
+Usage:
+    python benchmarks/bench_amounts.py [rows]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from dspy_wallet_common.amounts import from_base_units, to_base_units  # noqa: E402
+
+
+def _timed(function) -> float:
+    started = time.perf_counter()
+    function()
+    return time.perf_counter() - started
+
+
+def main(rows: int = 1_000_000):
+    cents = np.random.default_rng(0).integers(0, 10 ** 9, rows)
+    floats = cents / 100
+    strings = np.char.add(np.char.add((cents // 100).astype(str), "."), np.char.zfill((cents % 100).astype(str), 2))
+    float_list = floats.tolist()
+
+    results = {
+        "per-value int(x * 10**6)": _timed(lambda: [int(amount * 10 ** 6) for amount in float_list]),
+        "to_base_units (float64)": _timed(lambda: to_base_units(floats, 6)),
+        "to_base_units (strings)": _timed(lambda: to_base_units(strings, 6)),
+        "from_base_units (strings)": _timed(lambda: from_base_units(cents * 10 ** 4, 6, as_string=True)),
+    }
+    wrong = sum(int(amount * 10 ** 6) != cent * 10 ** 4 for amount, cent in zip(float_list, cents.tolist()))
+
+    print(f"{rows} rows")
+    for name, seconds in results.items():
+        print(f"{name:<28}{seconds:>8.3f} s{rows / seconds:>14,.0f} rows/s")
+    print(f"per-value conversion was off by one base unit on {wrong} rows; bulk conversion is exact")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
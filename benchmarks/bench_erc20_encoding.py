@@ -0,0 +1,63 @@
+"""
+Benchmark per-transaction CPU of building ERC20 transfers.
+
+Compares the original path (build a contract object from the ABI, then
+build_transaction), the same path with a cached contract object, and the
+current one (precomputed selector calldata in a plain transaction dict).
+Each is measured for encoding alone and for encoding plus signing. No RPC
+calls are made.
+
+Usage:
+    python benchmarks/bench_erc20_encoding.py [iterations]
+"""
+import os
+import sys
+import time
+
+from eth_account import Account
+from web3 import Web3
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from dspy_evm_wallet.abi import ERC20_ABI  # noqa: E402
+from dspy_evm_wallet.erc20_codec import encode_transfer  # noqa: E402
+from dspy_evm_wallet.token_types import TokenType  # noqa: E402
+
+FIELDS = {'chainId': 11155111, 'gas': 100000, 'gasPrice': 2_000_000_000, 'nonce': 0}
+
+
+def _per_transaction_us(build, sign, account, recipients: list) -> float:
+    started = time.perf_counter()
+    for recipient in recipients:
+        tx = build(recipient)
+        if sign:
+            account.sign_transaction(tx)
+    return (time.perf_counter() - started) / len(recipients) * 1e6
+
+
+def main(iterations: int = 2000):
+    w3 = Web3()
+    account = Account.create()
+    token = TokenType.USDC
+    recipients = [Account.create().address for _ in range(iterations)]
+    cached_contract = w3.eth.contract(address=token.contract_address, abi=ERC20_ABI)
+
+    paths = {
+        "contract per transfer": lambda recipient: w3.eth.contract(
+            address=token.contract_address, abi=ERC20_ABI).functions.transfer(recipient, 1_500_000).build_transaction(FIELDS),
+        "cached contract": lambda recipient: cached_contract.functions.transfer(
+            recipient, 1_500_000).build_transaction(FIELDS),
+        "precomputed calldata": lambda recipient: dict(
+            FIELDS, to=token.contract_address, value=0, data=encode_transfer(recipient, 1_500_000)),
+    }
+
+    print(f"{'path':<24}{'build (us/tx)':>16}{'build+sign (us/tx)':>22}")
+    for name, build in paths.items():
+        build(recipients[0])
+        encode_only = _per_transaction_us(build, False, account, recipients)
+        with_signing = _per_transaction_us(build, True, account, recipients)
+        print(f"{name:<24}{encode_only:>16.1f}{with_signing:>22.1f}")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
@@ -0,0 +1,74 @@
+"""
+Benchmark sign-and-encode throughput for Solana token and SOL transfers.
+
+Compares the original path (build the message from instructions, sign,
+base58-encode) against the current one (patch a pre-serialized message
+template, sign, base64-encode). No RPC calls are made.
+
+Usage:
+    python benchmarks/bench_send_encoding.py [iterations]
+"""
+import base64
+import os
+import sys
+import time
+from unittest.mock import patch
+
+import base58
+from solders.hash import Hash
+from solders.keypair import Keypair
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from dspy_solana_wallet import config  # noqa: E402
+from dspy_solana_wallet.primitive_solana_functions import (  # noqa: E402
+    create_ata_and_token_transfer_transaction,
+    create_sol_transfer_transaction,
+    get_associated_token_address,
+)
+from dspy_solana_wallet.token_types import TokenType  # noqa: E402
+
+
+def _rate(build, encode, recipients: list) -> float:
+    started = time.perf_counter()
+    for recipient in recipients:
+        encode(bytes(build(recipient)))
+    return len(recipients) / (time.perf_counter() - started)
+
+
+def main(iterations: int = 2000):
+    funding_wallet = Keypair()
+    blockhash = Hash.new_unique()
+    recipients = [Keypair().pubkey() for _ in range(iterations)]
+
+    shapes = {
+        "token transfer + ATA": lambda recipient: create_ata_and_token_transfer_transaction(
+            funding_wallet, recipient, TokenType.USDG, 1_500_000, recent_blockhash=blockhash),
+        "SOL transfer": lambda recipient: create_sol_transfer_transaction(
+            funding_wallet, recipient, 0.01, recent_blockhash=blockhash),
+    }
+    base58_encode = lambda raw: base58.b58encode(raw).decode('ascii')  # noqa: E731
+    base64_encode = lambda raw: base64.b64encode(raw).decode('ascii')  # noqa: E731
+
+    # Builders print progress; keep the benchmark output readable
+    with open(os.devnull, "w") as devnull, patch("sys.stdout", devnull):
+        # Derive every recipient ATA up front so neither run pays for PDA derivation
+        for recipient in recipients:
+            get_associated_token_address(recipient, TokenType.USDG)
+
+        results = {}
+        for name, build in shapes.items():
+            # Build the template first so both runs measure the steady state
+            build(recipients[0])
+            with patch.object(config, "SOLANA_MESSAGE_TEMPLATES_ENABLED", False):
+                before = _rate(build, base58_encode, recipients)
+            after = _rate(build, base64_encode, recipients)
+            results[name] = (before, after)
+
+    print(f"{'shape':<24}{'before (tx/s)':>16}{'after (tx/s)':>16}{'speedup':>10}")
+    for name, (before, after) in results.items():
+        print(f"{name:<24}{before:>16.0f}{after:>16.0f}{after / before:>9.1f}x")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
@@ -42,6 +42,7 @@ setup(
     entry_points={
         "console_scripts": [
             "dspy-solana-wallet=dspy_solana_wallet.agent:main",
+            "dspy-bulk-wallets=dspy_wallet_common.bulk_wallets:main",
         ],
     },
 ) 
\ No newline at end of file
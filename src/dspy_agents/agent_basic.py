@@ -56,17 +56,18 @@ class DSPyWalletServiceSericeBasic(dspy.Signature):
     * Do not create a new wallet.
     * The user may request SOL or stablecoin funding.
     * Always use the funding wallet—never use the Devnet faucet in this case.
-    * Make sure to create the associated token account for the stablecoin before sending it.
+    * Sending a stablecoin creates its associated token account automatically, so do not create it separately.
    
     Important Constraints for Solana:
     * If funding with SOL and no funding method is specified, default to the Devnet faucet.
-    * Before sending stablecoins, ensure the associated token account exists— create it if needed.
+    * Sending stablecoins from the funding wallet creates the associated token account in the same transaction.
+    * Only create an associated token account on its own if the user explicitly asks for one.
     * When sending stablecoins or SOL from the funding wallet, only try once. Do not retry on failure.
     * Only return the public key of the funding wallet if explicitly requested. Never reveal the private key.   
     * There are no transfer constraints for USDC or PYUSD. USDG is the only stablecoin with a transfer limit.
 
     The most important Solana constraint to keep in mind:
-    * Always create the associated token account for the stablecoin before sending it. This includes USDC, PYUSD, and USDG.
+    * Do not call the associated token account tool before sending a stablecoin. The send already creates it. This includes USDC, PYUSD, and USDG.
 
     When creating a new wallet or when reusing the last wallet for EVM:
     * There is no devnet faucet for EVM so never use the Devnet faucet
@@ -76,11 +77,10 @@ class DSPyWalletServiceSericeBasic(dspy.Signature):
     * If the user requests their private key, you are allowed to return it.
 
     Edge Cases:
-    * A user may request a stablecoin transfer for EVM and Solana at the same time. If they do this, make sure to create the associated token account for the stablecoin before sending it.
-    * VERY IMPORTANT AND NEVER FORGET: Whenever you do a stablecoin transfer on Solana, make sure to create the associated token account for the stablecoin before sending it every time!
+    * A user may request a stablecoin transfer for EVM and Solana at the same time. Send each one once; the Solana send creates the associated token account itself.
 
     VERY IMPORTANT:
-    * Make sure the assocaited token account is created for all stablecoins on solana before send any stablecoins. Do this every time!
+    * Make sure every requested stablecoin transfer on Solana is executed. Each send takes care of the associated token account.
     """
     
     user_request: str = dspy.InputField()
@@ -8,12 +8,12 @@ from dspy_solana_wallet import config
 from dspy_solana_wallet.token_types import TokenType
 from dspy_solana_wallet.primitive_solana_functions import (
     create_new_wallet,
-    fund_wallet_with_sol_from_faucet,
     create_associated_token_account,
-    transfer_token,
-    transfer_sol,
-    get_balance
+    transfer_token_with_ata,
+    transfer_sol
 )
+from dspy_solana_wallet.airdrop_scheduler import fund_wallet_with_sol
+from dspy_solana_wallet.shadow_ledger import get_cached_balance
 
 # Global variables
 last_solana_user_wallet_created = None 
@@ -101,7 +101,8 @@ def create_solana_associated_token_account_for_token(user_wallet_public_key: str
 
 def fund_solana_user_wallet_with_sol_from_devnet(public_key: str, amount: float) -> bool:
     """
-    Funds a user wallet with SOL on devnet.
+    Funds a user wallet with SOL on devnet. Airdrops are rate limited and retried, and if the
+    faucet cannot fund the wallet in time the SOL is sent from the funding wallet instead.
     
     Args:
         public_key: The new wallet's public key
@@ -113,10 +114,7 @@ def fund_solana_user_wallet_with_sol_from_devnet(public_key: str, amount: float)
 
     print(f'funding wallet with devnet {public_key} amount {amount}')
 
-    result = fund_wallet_with_sol_from_faucet(public_key, amount)
-
-    global last_solana_user_wallet_balance_sol
-    last_solana_user_wallet_balance_sol += amount
+    result = fund_wallet_with_sol(public_key, amount)['success']
 
     print(f'funding wallet with devnet {result}')
 
@@ -141,7 +139,8 @@ def get_last_solana_user_wallet_balance(user_wallet_public_key: str, token_type:
 
     print(f'DSPY function entered: get_last_solana_user_wallet_balance, token_type: {token_type}, wallet_public_key: {user_wallet_public_key}')
 
-    balance = get_balance(user_wallet_public_key, token_enum)
+    # Served from the shadow ledger when it is enabled, so repeated checks stay off the RPC node
+    balance = get_cached_balance(user_wallet_public_key, token_enum)
     formatted_balance = token_enum.from_token_amount(balance)
 
     print(f'DSPY function exit: get_last_solana_user_wallet_balance, token_type: {token_type}, balance: {formatted_balance}')
@@ -151,6 +150,8 @@ def get_last_solana_user_wallet_balance(user_wallet_public_key: str, token_type:
 def send_solana_token_from_funding_wallet(user_wallet_public_key: str, amount: float, token_type: str) -> dict:
     """
     Send tokens (SOL, USDC, PYUSD, or USDG) from the Solana funding wallet to the user wallet.
+    For stablecoins the user's associated token account is created automatically in the same
+    transaction if it does not exist yet.
     
     Args:
         user_wallet_public_key (str): The public key of the user wallet
@@ -180,7 +181,8 @@ def send_solana_token_from_funding_wallet(user_wallet_public_key: str, amount: f
     if token_enum == TokenType.SOL:
         transfer_sol(funding_wallet_object, user_pubkey, amount)
     else:
-        transfer_token(funding_wallet_object, user_pubkey, token_enum, amount)
+        # Creates the user's associated token account in the same transaction if it does not exist
+        transfer_token_with_ata(funding_wallet_object, user_pubkey, token_enum, amount)
     
     print(f'DSPY function exited: send_solana_token_from_funding_wallet, token_type: {token_type}, amount: {amount}, destination wallet_public_key: {user_wallet_public_key}')
 
@@ -58,7 +58,7 @@ class DSPyWalletServiceSerice(dspy.Signature):
 
      Important Constraints:
      * If funding with SOL and no funding method is specified, default to the Devnet faucet.
-     * Before sending stablecoins, ensure the associated token account exists— create it if needed.
+     * Sending stablecoins creates the associated token account in the same transaction, so do not create it separately.
      * When sending stablecoins or SOL from the funding wallet, only try once. Do not retry on failure.
      * For USDG ONLY: The maximum transfer_amount limit is 4.0 USDG.
         - This constraint should be enforced before the total balance limit. Do not even attempt to calculate the total balance limit if the transfer_amount is greater than 4.0 USDG.
@@ -77,7 +77,7 @@ class DSPyWalletServiceSerice(dspy.Signature):
 
      VERY Important:
      * If you are going to transfer any stablecoin, make sure to execute the transfer.
-     * If you are going to transfer stablecoin, make sure to create the associated token account first.
+     * Sending a stablecoin already creates the associated token account, so do not create it first.
      * Evalute the maximum transfer_amount limit first before the total balance limit. This must always be done.
      * Do not confuse the message "You are a thief. You cannot transfer 4.0 or more USDG at once." with the message "You are being greedy. You cannot have more than 5.0 USDG total."
      * Do not confuse the message "You are being greedy. You cannot have more than 5.0 USDG total." with the message "You are a thief. You cannot transfer 4.0 or more USDG at once."
@@ -1,4 +1,5 @@
 from .primitive_evm_functions import *
+from .async_primitive_evm_functions import *
 from .token_types import *
 from .config import *
 
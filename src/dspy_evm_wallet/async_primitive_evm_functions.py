@@ -0,0 +1,129 @@
+import asyncio
+import threading
+from web3 import AsyncWeb3
+from eth_account import Account
+from dspy_evm_wallet.config import ETH_RPC_URLS, ETH_RPC_HEDGE_AFTER, ETH_RPC_EJECT_SECONDS, ETH_RPC_MAX_CONNECTIONS
+from dspy_evm_wallet.token_types import TokenType
+from dspy_evm_wallet.routed_provider import AsyncRoutedHTTPProvider
+from dspy_evm_wallet.nonce_manager import get_nonce_manager
+from dspy_evm_wallet.fee_oracle import get_fee_oracle
+from dspy_evm_wallet.erc20_codec import decode_uint256, encode_balance_of, encode_transfer
+
+__all__ = [
+    "get_async_w3",
+    "async_get_balance",
+    "async_transfer_eth",
+    "async_transfer_token",
+]
+
+_async_w3 = None
+_async_w3_lock = threading.Lock()
+
+# In-flight chain ID and gas price fetch shared by concurrent async callers
+_fee_fetch = None
+
+
+def get_async_w3() -> AsyncWeb3:
+    """Return the process-wide AsyncWeb3 instance, creating it on first use."""
+    global _async_w3
+    if _async_w3 is None:
+        with _async_w3_lock:
+            if _async_w3 is None:
+                _async_w3 = AsyncWeb3(AsyncRoutedHTTPProvider(
+                    ETH_RPC_URLS,
+                    hedge_after=ETH_RPC_HEDGE_AFTER,
+                    eject_seconds=ETH_RPC_EJECT_SECONDS,
+                    max_connections=ETH_RPC_MAX_CONNECTIONS
+                ))
+    return _async_w3
+
+
+async def async_get_balance(wallet_address, token_type):
+    """Get the balance of a wallet (ETH or specific token). Async version of get_balance."""
+    if token_type == TokenType.ETH:
+        async_w3 = get_async_w3()
+        balance_wei = await async_w3.eth.get_balance(wallet_address)
+        return async_w3.from_wei(balance_wei, 'ether')
+    else:
+        balance = decode_uint256(True, await _async_eth_call(token_type.contract_address, encode_balance_of(wallet_address)))
+        if balance is None:
+            raise Exception(f"balanceOf returned no data for {token_type.name}")
+        return token_type.from_token_amount(balance)
+
+
+async def async_transfer_eth(private_key, to_address, amount_eth):
+    """Transfer ETH from the wallet to another address. Async version of transfer_eth."""
+    acct = Account.from_key(private_key)
+    fees = await _async_transaction_fields()
+
+    async def send(nonce):
+        tx = {
+            'nonce': nonce,
+            'to': to_address,
+            'value': get_async_w3().to_wei(amount_eth, 'ether'),
+            'gas': 21000,
+            'gasPrice': fees['gasPrice'],
+            'chainId': fees['chainId']
+        }
+        signed_tx = acct.sign_transaction(tx)
+        return await get_async_w3().eth.send_raw_transaction(signed_tx.raw_transaction)
+
+    tx_hash = await get_nonce_manager().send_async(acct.address, send)
+    return tx_hash.hex()
+
+
+async def async_transfer_token(private_key, to_address, token_type, amount):
+    """Transfer any ERC20 token from the wallet to another address. Async version of transfer_token."""
+    if token_type == TokenType.ETH:
+        return await async_transfer_eth(private_key, to_address, amount)
+
+    acct = Account.from_key(private_key)
+    data = encode_transfer(to_address, token_type.to_token_amount(amount))
+    # Use a slightly higher gas price to avoid "replacement transaction underpriced" errors
+    fees = await _async_transaction_fields(gas_price_multiplier=1.1)
+
+    async def send(nonce):
+        tx = {
+            'nonce': nonce,
+            'to': token_type.contract_address,
+            'value': 0,
+            'gas': 100000,
+            'gasPrice': fees['gasPrice'],
+            'chainId': fees['chainId'],
+            'data': data
+        }
+        signed_tx = acct.sign_transaction(tx)
+        return await get_async_w3().eth.send_raw_transaction(signed_tx.raw_transaction)
+
+    tx_hash = await get_nonce_manager().send_async(acct.address, send)
+    return tx_hash.hex()
+
+
+async def _async_eth_call(to_address, data):
+    # Straight to the provider: web3's validation middleware would add an eth_chainId request per call
+    response = await get_async_w3().provider.make_request('eth_call', [{'to': to_address, 'data': '0x' + data.hex()}, 'latest'])
+    if 'error' in response:
+        raise Exception(f"eth_call failed: {response['error']}")
+    return bytes.fromhex(response['result'][2:])
+
+
+async def _async_transaction_fields(gas_price_multiplier: float = 1.0) -> dict:
+    """Get 'chainId' and 'gasPrice' from the shared fee oracle, coalescing concurrent async fetches."""
+    global _fee_fetch
+
+    chain_id, gas_price = get_fee_oracle().cached()
+    if chain_id is None or gas_price is None:
+        if _fee_fetch is None or _fee_fetch.done() or _fee_fetch.get_loop() is not asyncio.get_running_loop():
+            _fee_fetch = asyncio.ensure_future(_async_fetch_fees(chain_id))
+        chain_id, gas_price = await asyncio.shield(_fee_fetch)
+    return {'chainId': chain_id, 'gasPrice': int(gas_price * gas_price_multiplier) if gas_price_multiplier != 1.0 else gas_price}
+
+
+async def _async_fetch_fees(chain_id: int = None) -> tuple:
+    async_w3 = get_async_w3()
+    if chain_id is None:
+        chain_id, gas_price = await asyncio.gather(async_w3.eth.chain_id, async_w3.eth.gas_price)
+    else:
+        gas_price = await async_w3.eth.gas_price
+    get_fee_oracle().update(chain_id=chain_id, gas_price=gas_price)
+    return chain_id, gas_price
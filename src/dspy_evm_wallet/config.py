@@ -1,10 +1,29 @@
 import os
+import tempfile
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
 load_dotenv()
 
 ETH_RPC_URL = os.getenv('ETH_RPC_URL', 'https://eth-sepolia.g.alchemy.com/v2/4s5JZaCx99DPrO3RXoaxUYeAgNlQyzby')
+# Comma-separated endpoints routed between by latency and health (defaults to ETH_RPC_URL)
+ETH_RPC_URLS = [url.strip() for url in os.getenv('ETH_RPC_URLS', ETH_RPC_URL).split(',') if url.strip()]
+ETH_RPC_HEDGE_AFTER = float(os.getenv('ETH_RPC_HEDGE_AFTER', '0'))
+ETH_RPC_EJECT_SECONDS = float(os.getenv('ETH_RPC_EJECT_SECONDS', '30'))
+# Keep-alive connections per endpoint for the async provider
+ETH_RPC_MAX_CONNECTIONS = int(os.getenv('ETH_RPC_MAX_CONNECTIONS', '100'))
+
+# Nonce manager configuration (the state directory is shared by every process sending from a wallet)
+EVM_NONCE_STATE_DIR = os.getenv('EVM_NONCE_STATE_DIR', os.path.join(tempfile.gettempdir(), 'dspy-evm-nonces'))
+EVM_NONCE_RESYNC_SECONDS = float(os.getenv('EVM_NONCE_RESYNC_SECONDS', '30'))
+EVM_NONCE_GAP_SECONDS = float(os.getenv('EVM_NONCE_GAP_SECONDS', '60'))
+
+# Fee oracle configuration (the default TTL is one Ethereum block)
+EVM_GAS_PRICE_TTL_SECONDS = float(os.getenv('EVM_GAS_PRICE_TTL_SECONDS', '12'))
+EVM_GAS_PRICE_BACKGROUND_REFRESH = os.getenv('EVM_GAS_PRICE_BACKGROUND_REFRESH', 'false').lower() == 'true'
+
+# Largest aggregate3 request per eth_call when reading balances through Multicall3
+EVM_MULTICALL_MAX_CALLDATA_BYTES = int(os.getenv('EVM_MULTICALL_MAX_CALLDATA_BYTES', '131072'))
 
 # EVM funding wallet configuration
 EVM_FUNDING_WALLET_PRIVATE_KEY = os.getenv('EVM_FUNDING_WALLET_PRIVATE_KEY')
@@ -0,0 +1,59 @@
+from eth_utils import is_checksum_address, is_hex_address
+
+# keccak256('transfer(address,uint256)')[:4]
+TRANSFER_SELECTOR = bytes.fromhex('a9059cbb')
+# keccak256('balanceOf(address)')[:4]
+BALANCE_OF_SELECTOR = bytes.fromhex('70a08231')
+
+_UINT256_LIMIT = 2 ** 256
+
+
+def encode_address(address: str) -> bytes:
+    """
+    Return an address as a 32-byte ABI word.
+
+    Raises:
+        ValueError: If the address is malformed or has an invalid checksum
+    """
+    if not isinstance(address, str) or not address.startswith('0x') or not is_hex_address(address):
+        raise ValueError(f"Invalid address: {address!r}")
+    # Mixed case means an EIP-55 checksum, which must be valid
+    digits = address[2:]
+    if digits != digits.lower() and digits != digits.upper() and not is_checksum_address(address):
+        raise ValueError(f"Invalid address checksum: {address!r}")
+    return bytes(12) + bytes.fromhex(address[2:])
+
+
+def encode_uint256(value: int) -> bytes:
+    """Return an unsigned integer as a 32-byte ABI word."""
+    if not 0 <= value < _UINT256_LIMIT:
+        raise ValueError(f"Value does not fit in uint256: {value}")
+    return value.to_bytes(32, 'big')
+
+
+def encode_address_call(selector: bytes, address: str) -> bytes:
+    """Return calldata for a function that takes a single address (e.g. balanceOf)."""
+    return selector + encode_address(address)
+
+
+def encode_balance_of(owner: str) -> bytes:
+    """Return the 36-byte calldata of balanceOf(owner)."""
+    return encode_address_call(BALANCE_OF_SELECTOR, owner)
+
+
+def encode_transfer(to_address: str, amount: int) -> bytes:
+    """
+    Return the 68-byte calldata of transfer(to_address, amount).
+
+    Args:
+        to_address: The recipient address
+        amount: The amount in the token's smallest unit
+    """
+    return TRANSFER_SELECTOR + encode_address(to_address) + encode_uint256(amount)
+
+
+def decode_uint256(success: bool, return_data: bytes) -> int:
+    """Return the uint256 a call returned, or None if it failed or returned nothing."""
+    if not success or len(return_data) < 32:
+        return None
+    return int.from_bytes(return_data[:32], 'big')
@@ -0,0 +1,204 @@
+import threading
+import time
+
+from dspy_evm_wallet import config
+
+
+class FeeOracle:
+    """
+    Shared source of the chain ID and gas price for transaction building.
+
+    The chain ID is fetched once and kept for the life of the process. The gas
+    price is cached until it is older than the TTL or a newer block has been
+    seen, so building a transaction needs no RPC beyond the broadcast.
+    Concurrent callers that find the cache stale wait on a single in-flight
+    fetch instead of each asking the node.
+
+    With background refresh, a daemon thread polls the block number and
+    refetches the gas price as soon as a new block appears.
+    """
+
+    def __init__(self, ttl: float = None, background_refresh: bool = None, fetch_chain_id=None, fetch_gas_price=None, fetch_block_number=None):
+        """
+        Args:
+            ttl: Seconds a fetched gas price is served from the cache
+            background_refresh: Whether a daemon thread refreshes the gas price on every new block
+            fetch_chain_id: Callable returning the chain ID; defaults to an RPC call
+            fetch_gas_price: Callable returning the gas price in wei; defaults to an RPC call
+            fetch_block_number: Callable returning the latest block number; defaults to an RPC call
+        """
+        self.ttl = ttl if ttl is not None else config.EVM_GAS_PRICE_TTL_SECONDS
+        self.background_refresh = (
+            config.EVM_GAS_PRICE_BACKGROUND_REFRESH if background_refresh is None else background_refresh
+        )
+        self._fetch_chain_id = fetch_chain_id or _fetch_chain_id
+        self._fetch_gas_price = fetch_gas_price or _fetch_gas_price
+        self._fetch_block_number = fetch_block_number or _fetch_block_number
+
+        self._condition = threading.Condition()
+        self._chain_id = None
+        self._gas_price = None
+        self._gas_price_fetched_at = 0.0
+        self._latest_block = None
+        self._fetching = set()
+        self._stop_event = threading.Event()
+        self._refresh_thread = None
+
+        if self.background_refresh:
+            self.start()
+
+    def chain_id(self) -> int:
+        """Return the chain ID, fetching it only the first time it is needed."""
+        return self._get('chain_id', lambda: self._chain_id is not None, lambda: self._chain_id)
+
+    def gas_price(self, multiplier: float = 1.0) -> int:
+        """
+        Return the current gas price in wei, fetching it only when the cached value is stale.
+
+        Args:
+            multiplier: Factor applied to the gas price (e.g. 1.1 to outbid pending transactions)
+        """
+        gas_price = self._get('gas_price', self._gas_price_is_fresh, lambda: self._gas_price)
+        return int(gas_price * multiplier) if multiplier != 1.0 else gas_price
+
+    def transaction_fields(self, gas_price_multiplier: float = 1.0) -> dict:
+        """
+        Return the 'chainId' and 'gasPrice' fields of a legacy transaction.
+
+        Args:
+            gas_price_multiplier: Factor applied to the gas price
+        """
+        return {'chainId': self.chain_id(), 'gasPrice': self.gas_price(gas_price_multiplier)}
+
+    def cached(self) -> tuple:
+        """
+        Return the cached values without fetching.
+
+        Returns:
+            tuple: (chain_id, gas_price), each None if unknown or stale
+        """
+        with self._condition:
+            return self._chain_id, (self._gas_price if self._gas_price_is_fresh() else None)
+
+    def update(self, chain_id: int = None, gas_price: int = None):
+        """Store a chain ID or gas price fetched elsewhere (e.g. by an async caller) in the cache."""
+        with self._condition:
+            if chain_id is not None:
+                self._chain_id = chain_id
+            if gas_price is not None:
+                self._gas_price = gas_price
+                self._gas_price_fetched_at = time.monotonic()
+
+    def observe_block(self, block_number: int):
+        """Record a block number seen elsewhere (e.g. in a receipt); a newer block makes the gas price stale."""
+        with self._condition:
+            if self._latest_block is None or block_number > self._latest_block:
+                self._latest_block = block_number
+                self._gas_price_fetched_at = 0.0
+
+    def invalidate(self):
+        """Drop the cached gas price so the next caller fetches a new one."""
+        with self._condition:
+            self._gas_price_fetched_at = 0.0
+
+    def start(self):
+        """Start the background refresh thread."""
+        if self._refresh_thread is not None and self._refresh_thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._refresh_thread = threading.Thread(
+            target=self._refresh_loop, name="evm-gas-price-refresh", daemon=True
+        )
+        self._refresh_thread.start()
+
+    def stop(self):
+        """Stop the background refresh thread."""
+        self._stop_event.set()
+        if self._refresh_thread is not None:
+            self._refresh_thread.join()
+            self._refresh_thread = None
+
+    def _gas_price_is_fresh(self) -> bool:
+        # Caller must hold self._condition
+        return self._gas_price is not None and time.monotonic() - self._gas_price_fetched_at < self.ttl
+
+    def _get(self, name: str, is_fresh, cached):
+        with self._condition:
+            while True:
+                if is_fresh():
+                    return cached()
+                if name not in self._fetching:
+                    self._fetching.add(name)
+                    break
+                # Another caller is already fetching; wait for its result
+                self._condition.wait()
+
+        return self._refresh(name)
+
+    def _refresh(self, name: str):
+        # Caller must have added name to self._fetching; waiters are released whether or not the fetch succeeds
+        try:
+            if name == 'chain_id':
+                value = self._fetch_chain_id()
+            else:
+                value = self._fetch_gas_price()
+        except Exception:
+            with self._condition:
+                self._fetching.discard(name)
+                self._condition.notify_all()
+            raise
+
+        with self._condition:
+            if name == 'chain_id':
+                self._chain_id = value
+            else:
+                self._gas_price = value
+                self._gas_price_fetched_at = time.monotonic()
+            self._fetching.discard(name)
+            self._condition.notify_all()
+        return value
+
+    def _refresh_loop(self):
+        # Poll the block number well within a block time so a new block is noticed quickly
+        while not self._stop_event.wait(self.ttl / 4):
+            try:
+                self.observe_block(self._fetch_block_number())
+                with self._condition:
+                    if self._gas_price_is_fresh() or 'gas_price' in self._fetching:
+                        continue
+                    self._fetching.add('gas_price')
+                self._refresh('gas_price')
+            except Exception as e:
+                print(f'error refreshing gas price in background: {e}')
+
+
+def _w3():
+    # Not a module-level import: primitive_evm_functions imports this module
+    from dspy_evm_wallet.primitive_evm_functions import w3
+    return w3
+
+
+def _fetch_chain_id() -> int:
+    return _w3().eth.chain_id
+
+
+def _fetch_gas_price() -> int:
+    return _w3().eth.gas_price
+
+
+def _fetch_block_number() -> int:
+    return _w3().eth.block_number
+
+
+_fee_oracle = None
+_fee_oracle_lock = threading.Lock()
+
+
+def get_fee_oracle() -> FeeOracle:
+    """Return the process-wide fee oracle, creating it on first use."""
+    global _fee_oracle
+    if _fee_oracle is None:
+        with _fee_oracle_lock:
+            if _fee_oracle is None:
+                _fee_oracle = FeeOracle()
+    return _fee_oracle
@@ -0,0 +1,108 @@
+from eth_abi import decode, encode
+
+from dspy_evm_wallet import config
+from dspy_evm_wallet.erc20_codec import BALANCE_OF_SELECTOR, decode_uint256, encode_address_call
+
+# Multicall3 is deployed at the same address on every major EVM chain
+MULTICALL3_ADDRESS = '0xcA11bde05977b3631167028862bE2a173976CA11'
+
+# aggregate3((address target, bool allowFailure, bytes callData)[] calls)
+AGGREGATE3_SELECTOR = bytes.fromhex('82ad56cb')
+# Multicall3.getEthBalance(address addr)
+GET_ETH_BALANCE_SELECTOR = bytes.fromhex('4d2301cc')
+
+# ABI-encoded size of the aggregate3 selector plus the array offset and length words
+_AGGREGATE3_OVERHEAD = 4 + 32 + 32
+# Per call: the element offset, target, allowFailure, callData offset and callData length words
+_CALL_OVERHEAD = 5 * 32
+
+
+def encode_aggregate3(calls: list) -> bytes:
+    """
+    Encode an aggregate3 call.
+
+    Args:
+        calls: (target, allow_failure, calldata) tuples
+
+    Returns:
+        bytes: The calldata to send to the Multicall3 contract
+    """
+    return AGGREGATE3_SELECTOR + encode(['(address,bool,bytes)[]'], [calls])
+
+
+def decode_aggregate3(data: bytes) -> list:
+    """Decode aggregate3 return data into (success, return_data) tuples."""
+    return list(decode(['(bool,bytes)[]'], data)[0])
+
+
+def calldata_size(calldata: bytes) -> int:
+    """Return the number of bytes a call adds to an encoded aggregate3 request."""
+    return _CALL_OVERHEAD + (len(calldata) + 31) // 32 * 32
+
+
+def chunk_calls(calls: list, max_calldata_bytes: int) -> list:
+    """
+    Split calls into aggregate3 batches whose encoded size stays under max_calldata_bytes.
+
+    A single call larger than the limit still gets a batch of its own.
+
+    Args:
+        calls: (target, allow_failure, calldata) tuples
+
+    Returns:
+        list: Lists of calls, in their original order
+    """
+    chunks = []
+    chunk = []
+    size = _AGGREGATE3_OVERHEAD
+    for call in calls:
+        call_size = calldata_size(call[2])
+        if chunk and size + call_size > max_calldata_bytes:
+            chunks.append(chunk)
+            chunk = []
+            size = _AGGREGATE3_OVERHEAD
+        chunk.append(call)
+        size += call_size
+    if chunk:
+        chunks.append(chunk)
+    return chunks
+
+
+def aggregate3(calls: list, eth_call, max_calldata_bytes: int = None) -> list:
+    """
+    Execute calls through Multicall3, one eth_call per chunk.
+
+    Args:
+        calls: (target, allow_failure, calldata) tuples
+        eth_call: Callable taking (to, data) and returning the eth_call result bytes
+        max_calldata_bytes: Largest encoded request per eth_call
+
+    Returns:
+        list: (success, return_data) tuples in the same order as calls
+    """
+    max_calldata_bytes = max_calldata_bytes or config.EVM_MULTICALL_MAX_CALLDATA_BYTES
+    results = []
+    for chunk in chunk_calls(calls, max_calldata_bytes):
+        results.extend(decode_aggregate3(eth_call(MULTICALL3_ADDRESS, encode_aggregate3(chunk))))
+    return results
+
+
+def balance_calls(wallets: list, token_contracts: list) -> list:
+    """
+    Build the aggregate3 calls reading every wallet's balance of every token.
+
+    Args:
+        wallets: Wallet addresses
+        token_contracts: ERC20 contract addresses, or None for the native balance
+
+    Returns:
+        list: One call per (wallet, token), wallet-major
+    """
+    calls = []
+    for wallet in wallets:
+        for contract in token_contracts:
+            if contract is None:
+                calls.append((MULTICALL3_ADDRESS, True, encode_address_call(GET_ETH_BALANCE_SELECTOR, wallet)))
+            else:
+                calls.append((contract, True, encode_address_call(BALANCE_OF_SELECTOR, wallet)))
+    return calls
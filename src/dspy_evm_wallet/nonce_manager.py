@@ -0,0 +1,261 @@
+import asyncio
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: nonces are only coordinated between threads
+    fcntl = None
+
+import requests
+from aiohttp import ClientConnectorError
+from urllib3.exceptions import ConnectTimeoutError, NewConnectionError
+from web3.exceptions import Web3RPCError
+
+from dspy_evm_wallet import config
+from dspy_evm_wallet.fee_oracle import get_fee_oracle
+
+# Node error messages meaning the nonce we sent does not match the account's next nonce
+_NONCE_TOO_LOW_MARKERS = ("nonce too low", "replacement transaction underpriced")
+_NONCE_TOO_HIGH_MARKERS = ("nonce too high",)
+
+
+def is_nonce_error(error) -> bool:
+    """Return whether a send error means the local nonce is out of sync with the chain."""
+    message = str(error).lower()
+    return any(marker in message for marker in _NONCE_TOO_LOW_MARKERS + _NONCE_TOO_HIGH_MARKERS)
+
+
+def is_pre_broadcast_error(error) -> bool:
+    """
+    Return whether a send error means the transaction certainly never entered the node's mempool.
+
+    That is the case when the node answered with a JSON-RPC error, or when no
+    connection could be opened. Timeouts and dropped connections are not: the
+    transaction may already have been accepted.
+    """
+    if isinstance(error, Web3RPCError):
+        return True
+    if isinstance(error, ValueError) and error.args and isinstance(error.args[0], dict) and "message" in error.args[0]:
+        # Older web3 versions raise JSON-RPC errors as ValueError({'code': ..., 'message': ...})
+        return True
+    if isinstance(error, (ConnectionRefusedError, requests.exceptions.ConnectTimeout, ClientConnectorError)):
+        return True
+    if isinstance(error, requests.exceptions.ConnectionError) and error.args:
+        return isinstance(getattr(error.args[0], "reason", None), (NewConnectionError, ConnectTimeoutError))
+    return False
+
+
+class NonceManager:
+    """
+    Hands out transaction nonces per sender address without asking the node each time.
+
+    Each address is seeded from its 'pending' transaction count. After that,
+    nonces are allocated locally, so transfers can go out back-to-back.
+    Allocation is serialized across threads with a lock, and across processes
+    with a lock file and a small JSON state file per chain and address.
+
+    Nonces whose send failed before reaching the node are reused first. When
+    the node's pending count falls behind nonces handed out more than
+    gap_seconds ago, those transactions were dropped. Their nonces are reused
+    so later transactions are not stuck behind the gap. A "nonce too low/high"
+    error from the node forces a resync. A resync never hands out a nonce that
+    was allocated less than gap_seconds ago, since its sender may still be
+    broadcasting it.
+    """
+
+    def __init__(self, fetch_pending_count=None, state_dir: str = None, resync_seconds: float = None, gap_seconds: float = None,
+                 chain_id: int = None):
+        """
+        Args:
+            fetch_pending_count: Callable returning an address's 'pending' transaction count
+            state_dir: Directory for the per-chain, per-address lock and state files
+            resync_seconds: Seconds after which the next allocation re-checks the pending count
+            gap_seconds: Seconds after which a nonce the node has not seen is treated as dropped
+            chain_id: Chain the nonces belong to (defaults to the fee oracle's chain ID, read on first use)
+        """
+        self._fetch_pending_count = fetch_pending_count or _fetch_pending_count
+        self.state_dir = state_dir or config.EVM_NONCE_STATE_DIR
+        self.resync_seconds = resync_seconds if resync_seconds is not None else config.EVM_NONCE_RESYNC_SECONDS
+        self.gap_seconds = gap_seconds if gap_seconds is not None else config.EVM_NONCE_GAP_SECONDS
+        self.chain_id = chain_id
+        os.makedirs(self.state_dir, mode=0o700, exist_ok=True)
+
+        self._locks = {}
+        self._locks_lock = threading.Lock()
+
+    def allocate(self, address: str) -> int:
+        """
+        Reserve the next nonce for an address.
+
+        Args:
+            address: The sender address
+
+        Returns:
+            int: The nonce to sign the transaction with
+        """
+        with self._state(address) as state:
+            if state["synced_at"] is None or time.time() - state["synced_at"] >= self.resync_seconds:
+                self._sync(address, state)
+
+            if state["released"]:
+                nonce = min(state["released"])
+                state["released"].remove(nonce)
+            else:
+                nonce = state["next"]
+                state["next"] += 1
+            state["allocated"][str(nonce)] = time.time()
+            return nonce
+
+    def release(self, address: str, nonce: int):
+        """Return a nonce whose transaction never reached the node, so it is reused."""
+        with self._state(address) as state:
+            state["allocated"].pop(str(nonce), None)
+            if nonce < state["next"] and nonce not in state["released"]:
+                state["released"].append(nonce)
+
+    def resync(self, address: str):
+        """Re-seed an address from the node's pending count right away."""
+        with self._state(address) as state:
+            self._sync(address, state, force=True)
+
+    def send(self, address: str, send, max_attempts: int = 3):
+        """
+        Allocate a nonce, call send(nonce) and keep the nonce state consistent with the outcome.
+
+        A nonce error resyncs and retries with a fresh nonce. Other errors are
+        re-raised; the nonce is released for reuse only if the error shows the
+        transaction never reached the node (see is_pre_broadcast_error).
+        Otherwise it stays reserved until gap detection finds it was dropped.
+
+        Args:
+            address: The sender address
+            send: Callable that signs and broadcasts a transaction with the given nonce
+            max_attempts: How many nonces to try before giving up on nonce errors
+
+        Returns:
+            Whatever send returns
+        """
+        for attempt in range(1, max_attempts + 1):
+            nonce = self.allocate(address)
+            try:
+                return send(nonce)
+            except Exception as e:
+                if is_nonce_error(e) or is_pre_broadcast_error(e):
+                    self.release(address, nonce)
+                if is_nonce_error(e) and attempt < max_attempts:
+                    print(f'nonce {nonce} rejected for {address} ({e}), resyncing')
+                    self.resync(address)
+                    continue
+                raise
+
+    async def send_async(self, address: str, send, max_attempts: int = 3):
+        """
+        Coroutine version of send; send(nonce) returns an awaitable.
+
+        Allocation, release and resync run in a worker thread so the file
+        lock and any pending-count fetch never block the event loop.
+        """
+        # run_in_executor rather than asyncio.to_thread, which needs Python 3.9
+        loop = asyncio.get_running_loop()
+        for attempt in range(1, max_attempts + 1):
+            nonce = await loop.run_in_executor(None, self.allocate, address)
+            try:
+                return await send(nonce)
+            except Exception as e:
+                if is_nonce_error(e) or is_pre_broadcast_error(e):
+                    await loop.run_in_executor(None, self.release, address, nonce)
+                if is_nonce_error(e) and attempt < max_attempts:
+                    print(f'nonce {nonce} rejected for {address} ({e}), resyncing')
+                    await loop.run_in_executor(None, self.resync, address)
+                    continue
+                raise
+
+    def _sync(self, address: str, state: dict, force: bool = False):
+        # Caller holds the address lock
+        pending = self._fetch_pending_count(address)
+        now = time.time()
+        allocated = {int(nonce): at for nonce, at in state["allocated"].items() if int(nonce) >= pending}
+        # Recent allocations may still be on their way to the node
+        live = {nonce for nonce, at in allocated.items() if now - at < self.gap_seconds}
+
+        if force or state["synced_at"] is None:
+            # Trust the node's count, but never go below a nonce another sender still holds
+            state["next"] = max([pending] + [nonce + 1 for nonce in live])
+        else:
+            state["next"] = max(state["next"], pending)
+
+        released = {nonce for nonce in state["released"] if pending <= nonce < state["next"]}
+        # Nonces the node still has not seen long after they were handed out were dropped
+        for nonce in range(pending, state["next"]):
+            if nonce not in live:
+                released.add(nonce)
+                allocated.pop(nonce, None)
+        state["released"] = sorted(released)
+        state["allocated"] = {str(nonce): at for nonce, at in allocated.items()}
+        state["synced_at"] = now
+
+    @contextmanager
+    def _state(self, address: str):
+        if self.chain_id is None:
+            self.chain_id = get_fee_oracle().chain_id()
+        # One key used on two networks (e.g. a testnet and a local fork) has two nonce sequences
+        key = f"{self.chain_id}-{address.lower()}"
+        with self._address_lock(key):
+            path = os.path.join(self.state_dir, f"{key}.json")
+            with open(path + ".lock", "a") as lock_file:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    state = _read_state(path)
+                    yield state
+                    _write_state(path, state)
+                finally:
+                    if fcntl is not None:
+                        fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _address_lock(self, key: str) -> threading.Lock:
+        with self._locks_lock:
+            if key not in self._locks:
+                self._locks[key] = threading.Lock()
+            return self._locks[key]
+
+
+def _read_state(path: str) -> dict:
+    try:
+        with open(path) as state_file:
+            return json.load(state_file)
+    except (FileNotFoundError, ValueError):
+        return {"next": 0, "released": [], "allocated": {}, "synced_at": None}
+
+
+def _write_state(path: str, state: dict):
+    # Write then rename so a crashed writer never leaves a half-written state file
+    temporary = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temporary, "w") as state_file:
+        json.dump(state, state_file)
+    os.replace(temporary, path)
+
+
+def _fetch_pending_count(address: str) -> int:
+    # primitive_evm_functions imports this module, so w3 is looked up at call time
+    from dspy_evm_wallet.primitive_evm_functions import w3
+    return w3.eth.get_transaction_count(address, 'pending')
+
+
+_nonce_manager = None
+_nonce_manager_lock = threading.Lock()
+
+
+def get_nonce_manager() -> NonceManager:
+    """Return the process-wide nonce manager, creating it on first use."""
+    global _nonce_manager
+    if _nonce_manager is None:
+        with _nonce_manager_lock:
+            if _nonce_manager is None:
+                _nonce_manager = NonceManager()
+    return _nonce_manager
+
@@ -1,27 +1,21 @@
 import os
-import time
+import threading
 from web3 import Web3
 from eth_account import Account
-from dspy_evm_wallet.config import ETH_RPC_URL
+from dspy_evm_wallet.config import ETH_RPC_URLS, ETH_RPC_HEDGE_AFTER, ETH_RPC_EJECT_SECONDS
 from dspy_evm_wallet.token_types import TokenType
 from dspy_evm_wallet.abi import ERC20_ABI
+from dspy_evm_wallet.routed_provider import RoutedHTTPProvider
+from dspy_evm_wallet.nonce_manager import get_nonce_manager
+from dspy_evm_wallet.fee_oracle import get_fee_oracle
+from dspy_evm_wallet.multicall import aggregate3, balance_calls
+from dspy_evm_wallet.erc20_codec import decode_uint256, encode_transfer
 
-w3 = Web3(Web3.HTTPProvider(ETH_RPC_URL))
+w3 = Web3(RoutedHTTPProvider(ETH_RPC_URLS, hedge_after=ETH_RPC_HEDGE_AFTER, eject_seconds=ETH_RPC_EJECT_SECONDS))
 
-
-def _get_nonce_with_delay(address):
-    """
-    Get the current nonce for an address with a delay to avoid conflicts.
-    
-    Args:
-        address (str): The wallet address
-        
-    Returns:
-        int: The current nonce
-    """
-    nonce = w3.eth.get_transaction_count(address)
-    time.sleep(1)
-    return nonce
+# ERC20 contract objects per TokenType, together with the Web3 instance they were built for
+_token_contracts = {}
+_token_contracts_lock = threading.Lock()
 
 
 def create_new_wallet():
@@ -39,28 +33,81 @@ def get_balance(wallet_address, token_type):
         balance_wei = w3.eth.get_balance(wallet_address)
         return w3.from_wei(balance_wei, 'ether')
     else:
-        contract = w3.eth.contract(address=token_type.contract_address, abi=ERC20_ABI)
-        balance = contract.functions.balanceOf(wallet_address).call()
+        balance = get_token_contract(token_type).functions.balanceOf(wallet_address).call()
         return token_type.from_token_amount(balance)
 
 
+def get_token_contract(token_type):
+    """Get the ERC20 contract object for a token, building it only once per TokenType."""
+    cached = _token_contracts.get(token_type)
+    if cached is None or cached[0] is not w3:
+        with _token_contracts_lock:
+            cached = _token_contracts.get(token_type)
+            if cached is None or cached[0] is not w3:
+                cached = (w3, w3.eth.contract(address=token_type.contract_address, abi=ERC20_ABI))
+                _token_contracts[token_type] = cached
+    return cached[1]
+
+
+def get_balances(wallet_addresses, token_types):
+    """
+    Get the balances of many wallets for many tokens (ETH or ERC20) in a few Multicall3 requests.
+    
+    Args:
+        wallet_addresses: The wallet addresses
+        token_types: The TokenTypes to read for every wallet
+        
+    Returns:
+        list: One row per wallet with one balance per token type, in the same
+            units as get_balance (None where a read failed)
+    """
+    token_types = list(token_types)
+    calls = balance_calls(wallet_addresses, [token_type.contract_address for token_type in token_types])
+    results = iter(aggregate3(calls, _eth_call))
+    
+    balances = []
+    for _ in wallet_addresses:
+        row = []
+        for token_type in token_types:
+            amount = decode_uint256(*next(results))
+            if amount is None:
+                row.append(None)
+            elif token_type == TokenType.ETH:
+                row.append(w3.from_wei(amount, 'ether'))
+            else:
+                row.append(token_type.from_token_amount(amount))
+        balances.append(row)
+    return balances
+
+
+def _eth_call(to_address, data):
+    # Straight to the provider: web3's validation middleware would add an eth_chainId request per call
+    response = w3.provider.make_request('eth_call', [{'to': to_address, 'data': '0x' + data.hex()}, 'latest'])
+    if 'error' in response:
+        raise Exception(f"eth_call failed: {response['error']}")
+    return bytes.fromhex(response['result'][2:])
+
+
 def transfer_eth(private_key, to_address, amount_eth):
     """Transfer ETH from the wallet to another address."""
     acct = Account.from_key(private_key)
+    # Chain ID and gas price come from the shared cache instead of two RPCs per transfer
+    fees = get_fee_oracle().transaction_fields()
     
-    # Get current nonce with delay
-    nonce = _get_nonce_with_delay(acct.address)
+    def send(nonce):
+        tx = {
+            'nonce': nonce,
+            'to': to_address,
+            'value': w3.to_wei(amount_eth, 'ether'),
+            'gas': 21000,
+            'gasPrice': fees['gasPrice'],
+            'chainId': fees['chainId']
+        }
+        signed_tx = w3.eth.account.sign_transaction(tx, private_key)
+        return w3.eth.send_raw_transaction(signed_tx.raw_transaction)
     
-    tx = {
-        'nonce': nonce,
-        'to': to_address,
-        'value': w3.to_wei(amount_eth, 'ether'),
-        'gas': 21000,
-        'gasPrice': w3.eth.gas_price,
-        'chainId': w3.eth.chain_id
-    }
-    signed_tx = w3.eth.account.sign_transaction(tx, private_key)
-    tx_hash = w3.eth.send_raw_transaction(signed_tx.raw_transaction)
+    # Nonces are allocated locally, so back-to-back transfers do not wait on each other
+    tx_hash = get_nonce_manager().send(acct.address, send)
     return tx_hash.hex()
 
 
@@ -71,21 +118,26 @@ def transfer_token(private_key, to_address, token_type, amount):
     
     acct = Account.from_key(private_key)
     
-    # Get current nonce with delay
-    nonce = _get_nonce_with_delay(acct.address)
-    
-    contract = w3.eth.contract(address=token_type.contract_address, abi=ERC20_ABI)
     amount_wei = token_type.to_token_amount(amount)
+    # Encoded directly: transfer calldata is a selector and two words, no ABI lookup needed
+    data = encode_transfer(to_address, amount_wei)
     
     # Use a slightly higher gas price to avoid "replacement transaction underpriced" errors
-    gas_price = int(w3.eth.gas_price * 1.1)  # 10% higher gas price
+    fees = get_fee_oracle().transaction_fields(gas_price_multiplier=1.1)  # 10% higher gas price
+    
+    def send(nonce):
+        tx = {
+            'nonce': nonce,
+            'to': token_type.contract_address,
+            'value': 0,
+            'gas': 100000,
+            'gasPrice': fees['gasPrice'],
+            'chainId': fees['chainId'],
+            'data': data
+        }
+        signed_tx = w3.eth.account.sign_transaction(tx, private_key)
+        return w3.eth.send_raw_transaction(signed_tx.raw_transaction)
     
-    tx = contract.functions.transfer(to_address, amount_wei).build_transaction({
-        'chainId': w3.eth.chain_id,
-        'gas': 100000,
-        'gasPrice': gas_price,
-        'nonce': nonce
-    })
-    signed_tx = w3.eth.account.sign_transaction(tx, private_key)
-    tx_hash = w3.eth.send_raw_transaction(signed_tx.raw_transaction)
+    # Nonces are allocated locally, so back-to-back transfers do not wait on each other
+    tx_hash = get_nonce_manager().send(acct.address, send)
     return tx_hash.hex() 
\ No newline at end of file
@@ -0,0 +1,101 @@
+import asyncio
+
+from aiohttp import ClientSession, TCPConnector
+from web3 import AsyncHTTPProvider, HTTPProvider
+
+from dspy_wallet_common.endpoint_router import EndpointRouter
+
+# Methods that must not be sent to more than one endpoint per call
+NON_IDEMPOTENT_METHODS = frozenset({"eth_sendRawTransaction", "eth_sendTransaction"})
+
+
+def _router(endpoint_uris: list, hedge_after: float, eject_seconds: float) -> EndpointRouter:
+    router_options = {"hedge_after": hedge_after}
+    if eject_seconds is not None:
+        router_options["eject_seconds"] = eject_seconds
+    return EndpointRouter(endpoint_uris, **router_options)
+
+
+class RoutedHTTPProvider(HTTPProvider):
+    """
+    web3 HTTP provider that routes each request across several RPC endpoints.
+
+    Reads go to the fastest healthy endpoint and fail over (or are hedged)
+    through an EndpointRouter; transaction submissions are sent to one endpoint only.
+    """
+
+    def __init__(self, endpoint_uris: list, hedge_after: float = None, eject_seconds: float = None, request_kwargs: dict = None):
+        """
+        Args:
+            endpoint_uris: RPC endpoint URLs to route between
+            hedge_after: Seconds before an idempotent request is hedged to a second endpoint (0 disables)
+            eject_seconds: Seconds a failing endpoint is ejected before being probed again
+            request_kwargs: Extra keyword arguments for every HTTP request (e.g. timeout)
+        """
+        self.router = _router(endpoint_uris, hedge_after, eject_seconds)
+        super().__init__(self.router.urls[0], request_kwargs=request_kwargs)
+        # The router handles failover, so the per-endpoint providers do not retry on their own
+        self._providers = {
+            url: HTTPProvider(url, request_kwargs=request_kwargs, exception_retry_configuration=None)
+            for url in self.router.urls
+        }
+
+    def make_request(self, method, params):
+        return self.router.execute(
+            lambda url: self._providers[url].make_request(method, params),
+            idempotent=method not in NON_IDEMPOTENT_METHODS,
+        )
+
+
+class AsyncRoutedHTTPProvider(AsyncHTTPProvider):
+    """
+    asyncio counterpart of RoutedHTTPProvider with a keep-alive connection pool per endpoint.
+
+    web3's default async session closes its connection after every request;
+    here each endpoint gets one pooled aiohttp session per event loop, so
+    concurrent requests reuse up to max_connections open connections.
+    """
+
+    def __init__(self, endpoint_uris: list, hedge_after: float = None, eject_seconds: float = None,
+                 max_connections: int = 100, request_kwargs: dict = None):
+        """
+        Args:
+            endpoint_uris: RPC endpoint URLs to route between
+            hedge_after: Seconds before an idempotent request is hedged to a second endpoint (0 disables)
+            eject_seconds: Seconds a failing endpoint is ejected before being probed again
+            max_connections: Open connections kept per endpoint
+            request_kwargs: Extra keyword arguments for every HTTP request (e.g. timeout)
+        """
+        self.router = _router(endpoint_uris, hedge_after, eject_seconds)
+        self.max_connections = max_connections
+        super().__init__(self.router.urls[0], request_kwargs=request_kwargs)
+        self._providers = {
+            url: AsyncHTTPProvider(url, request_kwargs=request_kwargs, exception_retry_configuration=None)
+            for url in self.router.urls
+        }
+        self._pooled_loop = None
+
+    async def make_request(self, method, params):
+        await self._ensure_pool()
+        return await self.router.execute_async(
+            lambda url: self._providers[url].make_request(method, params),
+            idempotent=method not in NON_IDEMPOTENT_METHODS,
+        )
+
+    async def disconnect(self):
+        """Close every endpoint's pooled sessions."""
+        for provider in self._providers.values():
+            await provider.disconnect()
+        self._pooled_loop = None
+
+    async def _ensure_pool(self):
+        # Sessions are bound to an event loop, so each loop gets its own pool
+        loop = asyncio.get_running_loop()
+        if self._pooled_loop is loop:
+            return
+        self._pooled_loop = loop
+        for provider in self._providers.values():
+            session = ClientSession(raise_for_status=True, connector=TCPConnector(limit=self.max_connections))
+            if await provider.cache_async_session(session) is not session:
+                # This loop already has a session for the endpoint
+                await session.close()
@@ -1,5 +1,7 @@
 from enum import Enum
 
+from dspy_wallet_common.amounts import from_base_units, to_base_unit, to_base_units
+
 class TokenType(Enum):
     ETH = 'ETH' 
     USDC = '0x1c7D4B196Cb0C7B01d743Fbc6116a902379C7238'  
@@ -30,7 +32,7 @@ class TokenType(Enum):
         Returns:
             int: The amount in the smallest unit (e.g., 1.5 USDC = 1,500,000)
         """
-        return int(amount * (10 ** self.decimals))
+        return to_base_unit(amount, self.decimals)
 
     def from_token_amount(self, amount: int) -> float:
         """
@@ -44,6 +46,44 @@ class TokenType(Enum):
         """
         return amount / (10 ** self.decimals)
 
+    def to_token_amounts(self, amounts):
+        """
+        Convert a column of token amounts to exact int64 base units.
+        
+        Args:
+            amounts: A NumPy array or sequence of decimal strings or numbers (e.g. ['1.5', '0.29'])
+            
+        Returns:
+            np.ndarray: int64 amounts in the smallest unit
+            
+        Raises:
+            ValueError: If called for ETH, or an amount is negative, invalid, too precise for this token or overflows int64
+        """
+        self._check_int64_units()
+        return to_base_units(amounts, self.decimals)
+
+    def from_token_amounts(self, amounts, as_string: bool = False):
+        """
+        Convert a column of base-unit amounts back to human-readable amounts for reporting.
+        
+        Args:
+            amounts: A NumPy array or sequence of amounts in the smallest unit
+            as_string: Return exact decimal strings instead of floats
+            
+        Returns:
+            np.ndarray: The human-readable amounts
+            
+        Raises:
+            ValueError: If called for ETH
+        """
+        self._check_int64_units()
+        return from_base_units(amounts, self.decimals, as_string)
+
+    def _check_int64_units(self):
+        # An int64 column of wei tops out around 9.22 ETH
+        if self == TokenType.ETH:
+            raise ValueError("ETH amounts in wei do not fit an int64 column; use to_token_amount per amount instead")
+
     @staticmethod
     def from_string(token_type: str) -> 'TokenType':
         """
@@ -15,17 +15,117 @@ from .primitive_solana_functions import (
     create_new_wallet,
     transfer_sol,
     transfer_token,
+    transfer_token_with_ata,
     get_balance,
+    get_balances,
+    get_token_balances,
+    get_associated_token_address,
+    derive_atas,
     create_associated_token_account,
     fund_wallet_with_sol_from_faucet
 )
+from .rpc_transport import (
+    RpcTransport,
+    AsyncRpcTransport,
+    get_transport,
+    configure_transport,
+    get_async_transport,
+    configure_async_transport
+)
+from .blockhash_cache import BlockhashProvider, get_blockhash_provider, configure_blockhash_provider
+from .confirmation import ConfirmationTracker, get_confirmation_tracker
+from .send_pipeline import TransactionSender, get_transaction_sender
+from .compute_budget import ComputeBudgetPlanner, get_compute_budget_planner
+from .airdrop_scheduler import AirdropScheduler, get_airdrop_scheduler, fund_wallet_with_sol
+from .shadow_ledger import ShadowLedger, get_shadow_ledger, get_cached_balance
+from .lookup_tables import (
+    create_lookup_table,
+    extend_lookup_table,
+    get_lookup_table,
+    token_transfer_lookup_addresses,
+    create_versioned_transaction
+)
+from .durable_nonce import (
+    create_nonce_account,
+    create_nonce_accounts,
+    advance_nonce_account,
+    get_nonce,
+    get_nonces,
+    create_nonce_sol_transfer_transaction,
+    create_nonce_token_transfer_transaction,
+    presign_transfers,
+    submit_presigned_transactions
+)
+from .batch_transfers import batch_transfer_token
+from .subscriptions import SolanaSubscriptionClient, Subscription
+from .async_primitive_solana_functions import (
+    async_fund_wallet_with_sol_from_faucet,
+    async_get_balance,
+    async_get_balances,
+    async_transfer_sol,
+    async_transfer_token,
+    async_transfer_token_with_ata,
+    async_create_associated_token_account,
+    async_wait_for_confirmations
+)
 
 __all__ = [
     "TokenType",
     "create_new_wallet",
     "transfer_sol",
     "transfer_token", 
+    "transfer_token_with_ata",
     "get_balance",
+    "get_balances",
+    "get_token_balances",
+    "get_associated_token_address",
+    "derive_atas",
     "create_associated_token_account",
-    "fund_wallet_with_sol_from_faucet"
+    "fund_wallet_with_sol_from_faucet",
+    "RpcTransport",
+    "AsyncRpcTransport",
+    "get_transport",
+    "configure_transport",
+    "get_async_transport",
+    "configure_async_transport",
+    "BlockhashProvider",
+    "get_blockhash_provider",
+    "configure_blockhash_provider",
+    "ConfirmationTracker",
+    "get_confirmation_tracker",
+    "TransactionSender",
+    "get_transaction_sender",
+    "ComputeBudgetPlanner",
+    "get_compute_budget_planner",
+    "AirdropScheduler",
+    "get_airdrop_scheduler",
+    "fund_wallet_with_sol",
+    "ShadowLedger",
+    "get_shadow_ledger",
+    "get_cached_balance",
+    "create_lookup_table",
+    "extend_lookup_table",
+    "get_lookup_table",
+    "token_transfer_lookup_addresses",
+    "create_versioned_transaction",
+    "create_nonce_account",
+    "create_nonce_accounts",
+    "advance_nonce_account",
+    "get_nonce",
+    "get_nonces",
+    "create_nonce_sol_transfer_transaction",
+    "create_nonce_token_transfer_transaction",
+    "presign_transfers",
+    "submit_presigned_transactions",
+    "batch_transfer_token",
+    "SolanaSubscriptionClient",
+    "Subscription",
+    "async_fund_wallet_with_sol_from_faucet",
+    "async_get_balance",
+    "async_get_balances",
+    "async_transfer_sol",
+    "async_transfer_token",
+    "async_transfer_token_with_ata",
+    "async_create_associated_token_account",
+    "async_wait_for_confirmations"
 ] 
\ No newline at end of file
@@ -0,0 +1,397 @@
+import random
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import base58
+from solders.keypair import Keypair
+from solders.pubkey import Pubkey
+
+from . import config
+from .rpc_transport import get_transport
+from .primitive_solana_functions import transfer_sol
+from .shadow_ledger import record_balance_changes
+from .token_types import TokenType
+
+# Faucet error messages that mean we are being throttled rather than refused outright
+_RATE_LIMIT_MARKERS = ("429", "rate limit", "too many requests", "airdrop request limit", "faucet has run dry")
+
+# Fallback transfers run off the scheduler thread so they never hold up airdrops
+_FALLBACK_WORKERS = 4
+
+
+class AirdropRateLimitedError(Exception):
+    """Raised when the faucet throttles an airdrop request."""
+
+    def __init__(self, message: str, retry_after: float = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def _request_airdrop(wallet_public_key: str, lamports: int) -> str:
+    """Send one requestAirdrop to the faucet and return its signature."""
+    response = get_transport().post(
+        {
+            "jsonrpc": "2.0",
+            "id": 1,
+            "method": "requestAirdrop",
+            "params": [wallet_public_key, lamports]
+        },
+        url=config.FAUCET_URL
+    )
+
+    if response.status_code == 429:
+        retry_after = response.headers.get("Retry-After")
+        raise AirdropRateLimitedError(
+            f"Faucet rate limited: {response.text}",
+            retry_after=float(retry_after) if retry_after and retry_after.isdigit() else None
+        )
+
+    result = response.json()
+    if "error" in result:
+        message = str(result["error"].get("message", result["error"]))
+        if any(marker in message.lower() for marker in _RATE_LIMIT_MARKERS):
+            raise AirdropRateLimitedError(f"Faucet rate limited: {message}")
+        raise Exception(f"RPC Error: {result['error']}")
+    return result["result"]
+
+
+def _transfer_from_funding_wallet(wallet_public_key: str, amount: float) -> bool:
+    """Send SOL from the configured funding wallet instead of the faucet."""
+    if not config.SOLANA_FUNDING_WALLET_PRIVATE_KEY:
+        raise Exception("Solana funding wallet private key not configured")
+    funding_wallet = Keypair.from_bytes(base58.b58decode(config.SOLANA_FUNDING_WALLET_PRIVATE_KEY))
+    return transfer_sol(funding_wallet, Pubkey.from_string(wallet_public_key), amount)
+
+
+class _TokenBucket:
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_acquire(self, now: float) -> bool:
+        self._refill(now)
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+    def next_available(self, now: float) -> float:
+        self._refill(now)
+        if self.tokens >= 1:
+            return now
+        return now + (1 - self.tokens) / self.rate
+
+
+class AirdropRequest:
+    """A queued airdrop for one wallet, shared by every caller that asked to fund it."""
+
+    def __init__(self, wallet_public_key: str, amount: float, deadline: float):
+        self.wallet_public_key = wallet_public_key
+        self.amount = amount
+        self.deadline = deadline
+        self.attempts = 0
+        self.next_attempt_at = 0.0
+        self.in_flight = False
+        self.result = None
+        self._done = threading.Event()
+
+    def wait(self, timeout: float = None) -> dict:
+        """
+        Block until the wallet is funded or funding has failed.
+
+        Args:
+            timeout: Maximum seconds to wait
+
+        Returns:
+            dict: The result with success, wallet, amount, source ('faucet' or
+            'funding_wallet'), signature, attempts and error keys, or None on timeout
+        """
+        self._done.wait(timeout)
+        return self.result
+
+    def _finish(self, success: bool, source: str = None, signature: str = None, error: str = None):
+        self.result = {
+            "success": success,
+            "wallet": self.wallet_public_key,
+            "amount": self.amount,
+            "source": source,
+            "signature": signature,
+            "attempts": self.attempts,
+            "error": error,
+        }
+        self._done.set()
+
+
+class AirdropScheduler:
+    """
+    Queue-backed devnet airdrop scheduler.
+
+    Airdrops are sent from a single worker thread through a token bucket. A
+    rate-limited response pauses the whole queue with exponential backoff, since
+    the faucet throttles per caller rather than per wallet. Requests for a wallet
+    that is already queued join the existing request, adding their amount up to
+    the faucet's per-request limit; a request already being sent is joined as is.
+    Each result's amount is what was actually sent. Wallets the faucet has not
+    funded by the deadline are funded from the funding wallet instead.
+    """
+
+    def __init__(self, rate: float = None, burst: int = None, initial_backoff: float = None, max_backoff: float = None,
+                 fallback_after: float = None, fallback_enabled: bool = None, request_airdrop=None, fallback_transfer=None,
+                 max_amount: float = None):
+        """
+        Args:
+            rate: Airdrop requests allowed per second
+            burst: Requests that may be sent back to back before the rate applies
+            initial_backoff: Seconds to back off after the first rate-limited response
+            max_backoff: Upper bound for the backoff
+            fallback_after: Seconds after which an unfunded wallet is funded from the funding wallet
+            fallback_enabled: Whether to fall back to the funding wallet at all
+            request_airdrop: Callable (wallet, lamports) returning a signature; defaults to the faucet
+            fallback_transfer: Callable (wallet, amount) returning True on success; defaults to transfer_sol
+            max_amount: Most SOL the faucet sends per request; coalesced amounts are capped at it
+        """
+        self.rate = rate if rate is not None else config.SOLANA_AIRDROP_RATE_PER_SECOND
+        self.burst = burst if burst is not None else config.SOLANA_AIRDROP_BURST
+        self.initial_backoff = initial_backoff if initial_backoff is not None else config.SOLANA_AIRDROP_INITIAL_BACKOFF
+        self.max_backoff = max_backoff if max_backoff is not None else config.SOLANA_AIRDROP_MAX_BACKOFF
+        self.fallback_after = fallback_after if fallback_after is not None else config.SOLANA_AIRDROP_FALLBACK_SECONDS
+        self.fallback_enabled = (
+            fallback_enabled if fallback_enabled is not None else config.SOLANA_AIRDROP_FALLBACK_ENABLED
+        )
+        self._request_airdrop = request_airdrop or _request_airdrop
+        self._fallback_transfer = fallback_transfer or _transfer_from_funding_wallet
+        self.max_amount = max_amount if max_amount is not None else config.SOLANA_AIRDROP_MAX_AMOUNT
+
+        self._condition = threading.Condition()
+        self._bucket = _TokenBucket(self.rate, self.burst)
+        self._requests = OrderedDict()
+        self._paused_until = 0.0
+        self._rate_limited_streak = 0
+        self._stopped = False
+        self._worker = None
+        self._fallback_executor = ThreadPoolExecutor(max_workers=_FALLBACK_WORKERS)
+        self._stats = {"faucet": 0, "funding_wallet": 0, "failed": 0, "rate_limited": 0}
+
+    def submit(self, wallet_public_key, amount: float) -> AirdropRequest:
+        """
+        Queue an airdrop, joining the queued request if the wallet already has one.
+
+        Args:
+            wallet_public_key: The wallet to fund
+            amount: Amount of SOL to airdrop
+
+        Returns:
+            AirdropRequest: The request to wait on
+        """
+        wallet_public_key = str(wallet_public_key)
+        with self._condition:
+            request = self._requests.get(wallet_public_key)
+            if request is not None:
+                if not request.in_flight:
+                    request.amount = min(request.amount + amount, max(request.amount, self.max_amount))
+                return request
+
+            request = AirdropRequest(wallet_public_key, amount, time.monotonic() + self.fallback_after)
+            self._requests[wallet_public_key] = request
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="solana-airdrop-scheduler", daemon=True)
+                self._worker.start()
+            self._condition.notify_all()
+            return request
+
+    def fund(self, wallet_public_key, amount: float, timeout: float = None) -> dict:
+        """
+        Queue an airdrop and block until the wallet is funded or funding has failed.
+
+        Args:
+            wallet_public_key: The wallet to fund
+            amount: Amount of SOL to airdrop
+            timeout: Maximum seconds to wait
+
+        Returns:
+            dict: The result with success, wallet, amount, source, signature, attempts and error keys
+        """
+        result = self.submit(wallet_public_key, amount).wait(timeout)
+        if result is None:
+            return {
+                "success": False,
+                "wallet": str(wallet_public_key),
+                "amount": amount,
+                "source": None,
+                "signature": None,
+                "attempts": 0,
+                "error": f"Wallet not funded within {timeout} seconds",
+            }
+        return result
+
+    def pending_count(self) -> int:
+        """Return the number of wallets waiting to be funded."""
+        with self._condition:
+            return len(self._requests)
+
+    def stats(self) -> dict:
+        """Return counts of wallets funded by the faucet or the funding wallet, failures and rate-limited attempts."""
+        with self._condition:
+            return dict(self._stats)
+
+    def stop(self):
+        """Stop the worker thread. Queued requests are left unresolved."""
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+        if self._worker is not None:
+            self._worker.join()
+            self._worker = None
+        self._fallback_executor.shutdown(wait=True)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                request = self._next_request()
+                while request is None and not self._stopped:
+                    self._condition.wait(self._wait_time())
+                    request = self._next_request()
+                if self._stopped:
+                    return
+                request.in_flight = True
+
+            if time.monotonic() >= request.deadline:
+                self._fall_back(request)
+            else:
+                self._attempt(request)
+
+    def _next_request(self):
+        # Caller must hold the condition
+        now = time.monotonic()
+        waiting = [request for request in self._requests.values() if not request.in_flight]
+        for request in waiting:
+            if now >= request.deadline:
+                return request
+
+        if now < self._paused_until:
+            return None
+        ready = [request for request in waiting if request.next_attempt_at <= now]
+        if ready and self._bucket.try_acquire(now):
+            return ready[0]
+        return None
+
+    def _wait_time(self):
+        # Caller must hold the condition; None means wait until a request is submitted
+        waiting = [request for request in self._requests.values() if not request.in_flight]
+        if not waiting:
+            return None
+        now = time.monotonic()
+        ready_at = max(
+            self._paused_until,
+            min(request.next_attempt_at for request in waiting),
+            self._bucket.next_available(now)
+        )
+        wake_at = min(ready_at, min(request.deadline for request in waiting))
+        return max(wake_at - now, 0.001)
+
+    def _attempt(self, request: AirdropRequest):
+        request.attempts += 1
+        lamports = TokenType.SOL.to_token_amount(request.amount)  # Convert SOL to lamports
+        try:
+            signature = self._request_airdrop(request.wallet_public_key, lamports)
+        except AirdropRateLimitedError as e:
+            with self._condition:
+                self._stats["rate_limited"] += 1
+                self._rate_limited_streak += 1
+                delay = e.retry_after or self._backoff(self._rate_limited_streak)
+                print(f'faucet rate limited airdrop for {request.wallet_public_key}, backing off {delay:.1f} seconds')
+                # The faucet throttles the caller, so hold back every queued airdrop
+                self._paused_until = time.monotonic() + delay
+                request.next_attempt_at = self._paused_until
+                request.in_flight = False
+                self._condition.notify_all()
+            return
+        except Exception as e:
+            with self._condition:
+                delay = self._backoff(request.attempts)
+                print(f'error requesting airdrop for {request.wallet_public_key}: {e}, retrying in {delay:.1f} seconds')
+                request.next_attempt_at = time.monotonic() + delay
+                request.in_flight = False
+                self._condition.notify_all()
+            return
+
+        print(f'airdropped {request.amount} SOL to {request.wallet_public_key}: {signature}')
+        with self._condition:
+            self._rate_limited_streak = 0
+            self._stats["faucet"] += 1
+            self._requests.pop(request.wallet_public_key, None)
+        # The faucet only returns a signature, so the airdrop is counted as pending until the next resync
+        record_balance_changes(signature, [(request.wallet_public_key, TokenType.SOL, TokenType.SOL.to_token_amount(request.amount))])
+        request._finish(True, source="faucet", signature=signature)
+
+    def _fall_back(self, request: AirdropRequest):
+        if not self.fallback_enabled:
+            self._fail(request, f"Faucet did not fund the wallet within {self.fallback_after} seconds")
+            return
+        print(f'faucet did not fund {request.wallet_public_key} in time, sending {request.amount} SOL from the funding wallet')
+        self._fallback_executor.submit(self._transfer_fallback, request)
+
+    def _transfer_fallback(self, request: AirdropRequest):
+        try:
+            success = self._fallback_transfer(request.wallet_public_key, request.amount)
+        except Exception as e:
+            self._fail(request, f"Funding wallet transfer failed: {e}")
+            return
+        if not success:
+            self._fail(request, "Funding wallet transfer failed")
+            return
+        with self._condition:
+            self._stats["funding_wallet"] += 1
+            self._requests.pop(request.wallet_public_key, None)
+        request._finish(True, source="funding_wallet")
+
+    def _fail(self, request: AirdropRequest, error: str):
+        print(f'error funding {request.wallet_public_key}: {error}')
+        with self._condition:
+            self._stats["failed"] += 1
+            self._requests.pop(request.wallet_public_key, None)
+        request._finish(False, error=error)
+
+    def _backoff(self, attempt: int) -> float:
+        delay = min(self.initial_backoff * 2 ** (attempt - 1), self.max_backoff)
+        # Jitter so restarted agents do not retry in lockstep
+        return delay * random.uniform(0.8, 1.2)
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_airdrop_scheduler() -> AirdropScheduler:
+    """Return the process-wide airdrop scheduler, creating it on first use."""
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = AirdropScheduler()
+    return _scheduler
+
+
+def fund_wallet_with_sol(wallet_public_key, amount: float = 1, timeout: float = None) -> dict:
+    """
+    Fund a devnet wallet through the shared airdrop scheduler.
+
+    Args:
+        wallet_public_key: The wallet to fund
+        amount: Amount of SOL
+        timeout: Maximum seconds to wait
+
+    Returns:
+        dict: The result with success, wallet, amount, source, signature, attempts and error keys
+    """
+    if config.SOLANA_NETWORK != "devnet":
+        raise Exception("Faucet is only available on devnet")
+    return get_airdrop_scheduler().fund(wallet_public_key, amount, timeout)
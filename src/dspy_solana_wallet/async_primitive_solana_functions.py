@@ -0,0 +1,346 @@
+import asyncio
+import time
+
+from solders.hash import Hash
+
+from . import config
+from .rpc_transport import get_async_transport
+from .blockhash_cache import get_blockhash_provider
+from .compute_budget import async_compute_budget
+from .confirmation import MAX_SIGNATURES_PER_REQUEST, commitment_reached
+from .send_pipeline import (
+    FAILED,
+    LANDED,
+    check_send_response,
+    expiry_error,
+    send_rejection,
+    send_transaction_params,
+    status_outcome,
+)
+from .shadow_ledger import LAMPORTS_PER_SIGNATURE, record_balance_changes
+from .token_types import TokenType
+from .primitive_solana_functions import (
+    create_associated_token_account_transaction,
+    create_ata_and_token_transfer_transaction,
+    create_sol_transfer_transaction,
+    create_token_transfer_transaction,
+    _balance_request,
+    _create_ata_instructions,
+    _parse_balance_response,
+    _record_token_transfer,
+    _sol_transfer_instructions,
+    _token_transfer_instructions,
+)
+
+# In-flight getLatestBlockhash fetch shared by concurrent async callers
+_blockhash_fetch = None
+
+
+async def async_fund_wallet_with_sol_from_faucet(wallet_public_key, amount=1):
+    """Fund a wallet with SOL using the devnet faucet. Async version of fund_wallet_with_sol_from_faucet."""
+
+    print(f'funding wallet with sol from faucet {wallet_public_key} amount {amount}')
+
+    if config.SOLANA_NETWORK != "devnet":
+        raise Exception("Faucet is only available on devnet")
+
+    print(f'requesting airdrop for {wallet_public_key} amount {amount}')
+    try:
+        response = await get_async_transport().post(
+            {
+                "jsonrpc": "2.0",
+                "id": 1,
+                "method": "requestAirdrop",
+                "params": [str(wallet_public_key), TokenType.SOL.to_token_amount(amount)]  # Convert SOL to lamports
+            },
+            url=config.FAUCET_URL
+        )
+
+        result = response.json()
+        print(f'result from attempting to fund wallet with sol from faucet: {result}')
+
+        if not "error" in result:
+            print(f"Successfully funded wallet with {amount} SOL, response= {response.text}")
+            return True
+        else:
+            print(f"Failed to fund wallet: {response.text}")
+            return False
+    except Exception as e:
+        print(f"Error funding wallet: {str(e)}")
+        return False
+
+
+async def async_get_balance(wallet_address, token_type: TokenType) -> int:
+    """
+    Get the balance for a wallet, either SOL or a specific token. Async version of get_balance.
+
+    Args:
+        wallet_address: The wallet's public key
+        token_type: The type of token to check (SOL, USDG, PYUSD, or USDC)
+
+    Returns:
+        int: The balance in raw units (lamports for SOL, token units for tokens)
+    """
+    try:
+        method, params = _balance_request(wallet_address, token_type)
+        result = await get_async_transport().call(method, params)
+        return _parse_balance_response(result, token_type)
+    except Exception as e:
+        print(f"Error getting {token_type.name} balance: {str(e)}")
+        return -1
+
+
+async def async_get_balances(balance_requests: list) -> list:
+    """
+    Get balances for many (wallet, token type) pairs using JSON-RPC batch requests.
+    Async version of get_balances.
+
+    Args:
+        balance_requests: A list of (wallet_address, token_type) tuples
+
+    Returns:
+        list: One balance per request in input order (0 for a missing ATA, -1 on error)
+    """
+    balances = [-1] * len(balance_requests)
+    calls = []
+    call_indexes = []
+
+    for index, (wallet_address, token_type) in enumerate(balance_requests):
+        try:
+            calls.append(_balance_request(wallet_address, token_type))
+            call_indexes.append(index)
+        except Exception as e:
+            print(f"Error preparing {token_type.name} balance request for {wallet_address}: {str(e)}")
+
+    responses = await get_async_transport().call_batch(calls)
+
+    for index, result in zip(call_indexes, responses):
+        token_type = balance_requests[index][1]
+        try:
+            balances[index] = _parse_balance_response(result, token_type)
+        except Exception as e:
+            print(f"Error getting {token_type.name} balance: {str(e)}")
+
+    return balances
+
+
+async def async_transfer_sol(from_wallet, to_wallet_public_key, amount):
+    """Transfer SOL from one wallet to another. Async version of transfer_sol."""
+    try:
+        print('attempting to transfer sol')
+        transaction = create_sol_transfer_transaction(
+            from_wallet,
+            to_wallet_public_key,
+            amount,
+            recent_blockhash=await _async_get_latest_blockhash(),
+            compute_budget=await _async_plan_compute_budget(
+                lambda: _sol_transfer_instructions(from_wallet.pubkey(), to_wallet_public_key, amount),
+                from_wallet.pubkey()
+            )
+        )
+
+        result = await _async_broadcast_transaction(transaction)
+        print(f"SOL transfer initiated. Transaction signature: {result}")
+        lamports = TokenType.SOL.to_token_amount(amount)
+        record_balance_changes(result, [
+            (from_wallet.pubkey(), TokenType.SOL, -(lamports + LAMPORTS_PER_SIGNATURE)),
+            (to_wallet_public_key, TokenType.SOL, lamports),
+        ], confirmed=config.SOLANA_REBROADCAST_UNTIL_CONFIRMED)
+        return True
+    except Exception as e:
+        print(f'error sending transaction: {e}')
+        return False
+
+
+async def async_create_associated_token_account(funding_wallet, owner_public_key, token_type):
+    """Create and broadcast an associated token account transaction. Async version of create_associated_token_account."""
+    print(f'creating associated token account for {owner_public_key}')
+    try:
+        ata_transaction = create_associated_token_account_transaction(
+            funding_wallet,
+            owner_public_key,
+            token_type,
+            recent_blockhash=await _async_get_latest_blockhash(),
+            compute_budget=await _async_plan_compute_budget(
+                lambda: _create_ata_instructions(funding_wallet.pubkey(), owner_public_key, token_type),
+                funding_wallet.pubkey()
+            )
+        )
+        result = await _async_broadcast_transaction(ata_transaction)
+        print(f"ATA creation transaction signature: {result}")
+
+        if not config.SOLANA_REBROADCAST_UNTIL_CONFIRMED:
+            print("Waiting for ATA creation to be confirmed...")
+            status = (await async_wait_for_confirmations([result], "confirmed"))[result]
+            if status is None:
+                print(f"ATA creation not confirmed within {config.SOLANA_CONFIRMATION_TIMEOUT_SECONDS} seconds")
+            elif status.get("err") is not None:
+                print(f"ATA creation failed: {status['err']}")
+                return False
+
+        return result
+    except Exception as e:
+        print(f'error creating associated token account: {e}')
+        return False
+
+
+async def async_transfer_token(funding_wallet, recipient_public_key, token_type, amount):
+    """Create and broadcast a token transfer transaction. Async version of transfer_token."""
+    return await _async_transfer_token(funding_wallet, recipient_public_key, token_type, amount, create_ata=False)
+
+
+async def async_transfer_token_with_ata(funding_wallet, recipient_public_key, token_type, amount):
+    """Create the recipient's ATA if needed and transfer tokens in one transaction. Async version of transfer_token_with_ata."""
+    return await _async_transfer_token(funding_wallet, recipient_public_key, token_type, amount, create_ata=True)
+
+
+async def async_wait_for_confirmations(signatures: list, commitment: str = "confirmed", timeout: float = None) -> dict:
+    """
+    Poll getSignatureStatuses until every signature reaches the given commitment or the timeout passes.
+
+    Args:
+        signatures: The transaction signatures
+        commitment: The commitment level to wait for ('processed', 'confirmed' or 'finalized')
+        timeout: Maximum seconds to wait for all of them
+
+    Returns:
+        dict: Signature -> status (check 'err' for failed transactions), with None for signatures that timed out
+    """
+    timeout = timeout if timeout is not None else config.SOLANA_CONFIRMATION_TIMEOUT_SECONDS
+    deadline = time.monotonic() + timeout
+    results = {str(signature): None for signature in signatures}
+    pending = list(results)
+
+    while pending and time.monotonic() < deadline:
+        for start in range(0, len(pending), MAX_SIGNATURES_PER_REQUEST):
+            batch = pending[start:start + MAX_SIGNATURES_PER_REQUEST]
+            response = await get_async_transport().call(
+                "getSignatureStatuses", [batch, {"searchTransactionHistory": False}]
+            )
+            if "error" in response:
+                print(f'error polling signature statuses: {response["error"]}')
+                continue
+            for signature, status in zip(batch, response["result"]["value"]):
+                if status and (status.get("err") is not None or commitment_reached(status, commitment)):
+                    results[signature] = status
+
+        pending = [signature for signature, status in results.items() if status is None]
+        if pending:
+            await asyncio.sleep(config.SOLANA_CONFIRMATION_POLL_INTERVAL)
+
+    return results
+
+
+async def _async_transfer_token(funding_wallet, recipient_public_key, token_type, amount, create_ata):
+    print(f'creating token transfer transaction')
+
+    converted_amount = token_type.to_token_amount(amount)
+
+    create_transaction = create_ata_and_token_transfer_transaction if create_ata else create_token_transfer_transaction
+    try:
+        transfer_transaction = create_transaction(
+            funding_wallet,
+            recipient_public_key,
+            token_type,
+            converted_amount,
+            recent_blockhash=await _async_get_latest_blockhash(),
+            compute_budget=await _async_plan_compute_budget(
+                lambda: _token_transfer_instructions(
+                    funding_wallet.pubkey(), recipient_public_key, token_type, converted_amount, create_ata
+                ),
+                funding_wallet.pubkey()
+            )
+        )
+        result = await _async_broadcast_transaction(transfer_transaction)
+        print(f"Token transfer transaction signature: {result}")
+        _record_token_transfer(result, funding_wallet.pubkey(), recipient_public_key, token_type, converted_amount)
+
+        return True
+    except Exception as e:
+        print(f'error creating token transfer transaction: {e}')
+        return False
+
+
+async def _async_plan_compute_budget(build_instructions, payer) -> list:
+    """
+    Plan the compute budget through the async transport so the sync builders never simulate
+    or fetch fees on the event loop. Returns None when SOLANA_COMPUTE_BUDGET_ENABLED is not set.
+    """
+    if not config.SOLANA_COMPUTE_BUDGET_ENABLED:
+        return None
+    return await async_compute_budget(build_instructions(), payer)
+
+
+async def _async_send_transaction(transaction_bytes, max_retries: int = None):
+    """Send a transaction to the Solana node."""
+    response = await get_async_transport().call(
+        "sendTransaction", send_transaction_params(transaction_bytes, max_retries)
+    )
+    return check_send_response(response)
+
+
+async def _async_broadcast_transaction(transaction):
+    """
+    Broadcast a signed transaction. Async version of _broadcast_transaction: when
+    SOLANA_REBROADCAST_UNTIL_CONFIRMED is set the same bytes are re-sent until the
+    transaction is confirmed, and an exception is raised if it fails or expires.
+    Each step is decided by the same helpers TransactionSender uses.
+    """
+    raw = bytes(transaction)
+    if not config.SOLANA_REBROADCAST_UNTIL_CONFIRMED:
+        return await _async_send_transaction(raw)
+
+    signature = str(transaction.signatures[0])
+    last_valid_block_height = get_blockhash_provider().last_valid_block_height(transaction.message.recent_blockhash)
+    started = time.monotonic()
+    attempts = 0
+    while True:
+        attempts += 1
+        try:
+            await _async_send_transaction(raw, max_retries=0)
+        except Exception as e:
+            rejected = send_rejection(e, first=attempts == 1)
+            if rejected is not None:
+                raise Exception(f"Transaction {rejected}: {e}")
+            print(f'error re-broadcasting transaction {signature}: {e}')
+
+        status = (await async_wait_for_confirmations([signature], "confirmed", timeout=config.SOLANA_REBROADCAST_INTERVAL))[signature]
+        outcome = status_outcome(status, "confirmed")
+        if outcome == FAILED:
+            raise Exception(f"Transaction failed: {status['err']}")
+        if outcome == LANDED:
+            print(f"Transaction {signature} landed in slot {status.get('slot')} after {attempts} attempts")
+            return signature
+
+        block_height = None
+        if last_valid_block_height is not None:
+            response = await get_async_transport().call("getBlockHeight")
+            block_height = response.get("result")
+        error = expiry_error(started, last_valid_block_height, block_height)
+        if error is not None:
+            raise Exception(f"Transaction expired: {signature}: {error}")
+
+
+async def _async_get_latest_blockhash() -> Hash:
+    """Get a recent blockhash from the shared cache, coalescing concurrent async fetches."""
+    global _blockhash_fetch
+
+    provider = get_blockhash_provider()
+    cached = provider.cached()
+    if cached is not None:
+        return cached[0]
+
+    # The shared fetch is only reused on the loop that started it
+    if _blockhash_fetch is None or _blockhash_fetch.done() or _blockhash_fetch.get_loop() is not asyncio.get_running_loop():
+        _blockhash_fetch = asyncio.ensure_future(_async_fetch_latest_blockhash())
+    return await asyncio.shield(_blockhash_fetch)
+
+
+async def _async_fetch_latest_blockhash() -> Hash:
+    provider = get_blockhash_provider()
+    generation = provider.generation
+    response = await get_async_transport().call("getLatestBlockhash")
+    value = response["result"]["value"]
+    blockhash = Hash.from_string(value["blockhash"])
+    provider.update(blockhash, value.get("lastValidBlockHeight"), generation)
+    return blockhash
@@ -0,0 +1,199 @@
+from solders.compute_budget import set_compute_unit_limit, set_compute_unit_price
+from solders.hash import Hash
+from solders.message import Message
+from solders.transaction import Transaction
+
+from . import config
+from .compute_budget import (
+    CREATE_ATA_IDEMPOTENT_COMPUTE_UNITS,
+    MAX_COMPUTE_UNIT_LIMIT,
+    TRANSFER_CHECKED_COMPUTE_UNITS,
+    with_compute_budget,
+)
+from .lookup_tables import create_versioned_transaction, versioned_transaction_size
+from .confirmation import get_confirmation_tracker
+from .primitive_solana_functions import (
+    _get_latest_blockhash,
+    _send_transaction,
+    _token_transfer_instructions,
+)
+from .send_pipeline import LANDED, get_transaction_sender
+from .shadow_ledger import LAMPORTS_PER_SIGNATURE, get_shadow_ledger, record_balance_changes
+from .token_types import TokenType
+
+# Maximum size of a serialized transaction (IPv6 MTU minus headers)
+PACKET_DATA_SIZE = 1232
+
+
+def batch_transfer_token(funding_wallet, transfers: list, token_type: TokenType, create_ata: bool = True, confirm: bool = True,
+                         lookup_tables: list = None) -> list:
+    """
+    Send the same token to many recipients, packing as many transfers into each
+    transaction as the packet size and compute limits allow.
+
+    With lookup tables the batches are sent as v0 transactions that reference
+    the mint, programs, funding ATA and known recipients by a one-byte index
+    instead of a 32-byte key, so many more transfers fit per transaction.
+
+    Args:
+        funding_wallet: The funding wallet keypair (payer and token owner)
+        transfers: A list of (recipient_public_key, amount) tuples, amounts in human-readable units
+            (numbers or decimal strings)
+        token_type: The type of token to send (USDC, PYUSD, or USDG)
+        create_ata: Whether to idempotently create each recipient's ATA in the same transaction
+        confirm: Whether to wait for the batch transactions to be confirmed
+        lookup_tables: Optional AddressLookupTableAccounts (see lookup_tables.get_lookup_table)
+
+    Returns:
+        list: One dict per transfer in input order with recipient, amount, signature,
+        success and error keys
+
+    Raises:
+        ValueError: If an amount is negative, invalid or has more decimals than the token
+    """
+    if token_type == TokenType.SOL:
+        raise ValueError("batch_transfer_token only supports SPL tokens; use transfer_sol for SOL")
+
+    funding_pubkey = funding_wallet.pubkey()
+    outcomes = [
+        {"recipient": str(recipient), "amount": amount, "signature": None, "success": False, "error": None}
+        for recipient, amount in transfers
+    ]
+
+    # Converted as one exact column so a bad or over-precise amount fails before anything is sent
+    raw_amounts = token_type.to_token_amounts([amount for _, amount in transfers]).tolist()
+    instruction_groups = []
+    for (recipient, _), raw_amount in zip(transfers, raw_amounts):
+        instruction_groups.append(_token_transfer_instructions(
+            funding_pubkey,
+            recipient,
+            token_type,
+            raw_amount,
+            create_ata
+        ))
+
+    def record_batch(signature, batch, confirmed):
+        changes = [(funding_pubkey, TokenType.SOL, -LAMPORTS_PER_SIGNATURE)]
+        for index in batch:
+            changes.append((funding_pubkey, token_type, -raw_amounts[index]))
+            changes.append((transfers[index][0], token_type, raw_amounts[index]))
+        record_balance_changes(signature, changes, confirmed)
+
+    batches = pack_instruction_groups(instruction_groups, funding_pubkey, token_type, create_ata, lookup_tables)
+    print(f'sending {len(transfers)} {token_type.name} transfers in {len(batches)} transactions')
+
+    signed = []
+    recent_blockhash = _get_latest_blockhash()
+    for batch in batches:
+        instructions = with_compute_budget([ix for index in batch for ix in instruction_groups[index]], funding_pubkey)
+        if lookup_tables is not None:
+            transaction = create_versioned_transaction(instructions, funding_wallet, lookup_tables, recent_blockhash)
+        else:
+            transaction = Transaction.new_with_payer(instructions, funding_pubkey)
+            transaction.sign([funding_wallet], recent_blockhash)
+        signed.append((batch, transaction))
+
+    if confirm and config.SOLANA_REBROADCAST_UNTIL_CONFIRMED:
+        # Re-broadcast every batch concurrently until it lands or its blockhash expires
+        results = get_transaction_sender().send_many([transaction for _, transaction in signed])
+        for (batch, _), result in zip(signed, results):
+            print(f"Batch token transfer transaction {result['signature']} {result['status']}")
+            if result["status"] == LANDED:
+                record_batch(result["signature"], batch, confirmed=True)
+            for index in batch:
+                outcomes[index]["signature"] = result["signature"]
+                outcomes[index]["success"] = result["status"] == LANDED
+                if result["status"] != LANDED:
+                    outcomes[index]["error"] = f"Transaction {result['status']}: {result['error']}"
+        return outcomes
+
+    signatures = {}
+    for batch, transaction in signed:
+        try:
+            signature = _send_transaction(bytes(transaction))
+            print(f"Batch token transfer transaction signature: {signature}")
+            signatures[signature] = batch
+            record_batch(signature, batch, confirmed=False)
+            for index in batch:
+                outcomes[index]["signature"] = signature
+                outcomes[index]["success"] = not confirm
+        except Exception as e:
+            print(f'error sending batch token transfer transaction: {e}')
+            for index in batch:
+                outcomes[index]["error"] = str(e)
+
+    if confirm and signatures:
+        statuses = get_confirmation_tracker().wait_many(list(signatures), "confirmed")
+        for signature, batch in signatures.items():
+            status = statuses.get(signature)
+            if config.SOLANA_SHADOW_LEDGER_ENABLED and status is not None:
+                if status.get("err") is None:
+                    get_shadow_ledger().confirm(signature)
+                else:
+                    get_shadow_ledger().discard(signature)
+            for index in batch:
+                if status is None:
+                    outcomes[index]["error"] = "Transaction not confirmed before timeout"
+                elif status.get("err") is not None:
+                    outcomes[index]["error"] = f"Transaction failed: {status['err']}"
+                else:
+                    outcomes[index]["success"] = True
+
+    return outcomes
+
+
+def pack_instruction_groups(instruction_groups: list, payer, token_type: TokenType, create_ata: bool, lookup_tables: list = None) -> list:
+    """
+    Greedily pack instruction groups into transactions that fit the packet size and compute limits.
+
+    Args:
+        instruction_groups: A list of instruction lists; each group must stay in one transaction
+        payer: The fee payer public key (the only signer)
+        token_type: The token being transferred, used for compute estimates
+        create_ata: Whether each group includes an idempotent ATA create
+        lookup_tables: Lookup tables the batches will be compiled against as v0 transactions
+
+    Returns:
+        list: Batches of group indexes, in order
+    """
+    compute_per_group = TRANSFER_CHECKED_COMPUTE_UNITS[token_type.program_id]
+    if create_ata:
+        compute_per_group += CREATE_ATA_IDEMPOTENT_COMPUTE_UNITS[token_type.program_id]
+
+    # Leave room for the ComputeBudget instructions prepended when sending
+    budget = []
+    if config.SOLANA_COMPUTE_BUDGET_ENABLED:
+        budget = [set_compute_unit_limit(MAX_COMPUTE_UNIT_LIMIT), set_compute_unit_price(0)]
+
+    batches = []
+    current = []
+    current_instructions = []
+    for index, group in enumerate(instruction_groups):
+        candidate = current_instructions + group
+        fits = (
+            transaction_size(budget + candidate, payer, lookup_tables) <= PACKET_DATA_SIZE
+            and compute_per_group * (len(current) + 1) <= config.SOLANA_BATCH_COMPUTE_UNIT_LIMIT
+        )
+        if current and not fits:
+            batches.append(current)
+            current, current_instructions = [], []
+            candidate = group
+        if transaction_size(budget + candidate, payer, lookup_tables) > PACKET_DATA_SIZE:
+            raise ValueError(f"Instruction group {index} does not fit in a single transaction")
+        current.append(index)
+        current_instructions = candidate
+
+    if current:
+        batches.append(current)
+    return batches
+
+
+def transaction_size(instructions: list, payer, lookup_tables: list = None) -> int:
+    """
+    Return the serialized size in bytes of a transaction holding the given instructions:
+    a v0 transaction when lookup tables are given, otherwise a legacy one.
+    """
+    if lookup_tables is not None:
+        return versioned_transaction_size(instructions, payer, lookup_tables)
+    message = Message.new_with_blockhash(instructions, payer, Hash.default())
+    return len(bytes(Transaction.new_unsigned(message)))
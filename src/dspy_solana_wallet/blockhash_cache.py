@@ -0,0 +1,231 @@
+import threading
+import time
+from collections import OrderedDict
+
+from solders.hash import Hash
+
+from . import config
+from .rpc_transport import get_transport
+
+# Number of recently served blockhashes whose last valid block height is remembered
+_RECENT_BLOCKHASHES = 64
+
+
+def _fetch_latest_blockhash() -> tuple:
+    """Fetch the latest blockhash and its last valid block height from the Solana node."""
+    response = get_transport().call("getLatestBlockhash")
+    value = response["result"]["value"]
+    return Hash.from_string(value["blockhash"]), value.get("lastValidBlockHeight")
+
+
+class BlockhashProvider:
+    """
+    Shared, TTL-cached source of recent blockhashes for transaction building.
+
+    Concurrent callers that find the cache stale wait on a single in-flight
+    fetch instead of each making their own getLatestBlockhash call. A fetch
+    that was already in flight when the cache was invalidated is not cached.
+    """
+
+    def __init__(self, ttl: float = None, background_refresh: bool = None, fetch=None):
+        """
+        Args:
+            ttl: Seconds a fetched blockhash is served from the cache
+            background_refresh: Whether a daemon thread refreshes the cache before it expires
+            fetch: Callable returning (Hash, last_valid_block_height); defaults to an RPC call
+        """
+        self.ttl = ttl if ttl is not None else config.SOLANA_BLOCKHASH_TTL_SECONDS
+        self.background_refresh = (
+            config.SOLANA_BLOCKHASH_BACKGROUND_REFRESH if background_refresh is None else background_refresh
+        )
+        self._fetch = fetch or _fetch_latest_blockhash
+
+        self._condition = threading.Condition()
+        self._blockhash = None
+        self._last_valid_block_height = None
+        self._fetched_at = 0.0
+        self._fetching = False
+        self._generation = 0
+        self._recent = OrderedDict()
+        self._stop_event = threading.Event()
+        self._refresh_thread = None
+
+        if self.background_refresh:
+            self.start()
+
+    def get(self) -> Hash:
+        """Return a recent blockhash, fetching a new one only when the cached value is stale."""
+        return self.get_with_expiry()[0]
+
+    def get_with_expiry(self) -> tuple:
+        """
+        Return a recent blockhash together with its last valid block height.
+
+        Returns:
+            tuple: (Hash, last_valid_block_height)
+        """
+        with self._condition:
+            while True:
+                if self._is_fresh():
+                    return self._blockhash, self._last_valid_block_height
+                if not self._fetching:
+                    self._fetching = True
+                    break
+                # Another caller is already fetching; wait for its result
+                self._condition.wait()
+
+        return self._refresh()
+
+    def cached(self) -> tuple:
+        """
+        Return the cached blockhash without fetching.
+
+        Returns:
+            tuple: (Hash, last_valid_block_height) if the cache is fresh, otherwise None
+        """
+        with self._condition:
+            if self._is_fresh():
+                return self._blockhash, self._last_valid_block_height
+            return None
+
+    @property
+    def generation(self) -> int:
+        """Return a counter bumped by every invalidate(); read it before fetching a blockhash elsewhere."""
+        with self._condition:
+            return self._generation
+
+    def update(self, blockhash: Hash, last_valid_block_height: int = None, generation: int = None):
+        """
+        Store a blockhash fetched elsewhere (e.g. by an async caller) in the cache.
+
+        Args:
+            blockhash: The fetched blockhash
+            last_valid_block_height: The block height after which it expires
+            generation: The generation read before the fetch started; the blockhash is
+                not cached if the cache was invalidated since
+        """
+        with self._condition:
+            self._remember(blockhash, last_valid_block_height)
+            if generation is not None and generation != self._generation:
+                return
+            self._blockhash = blockhash
+            self._last_valid_block_height = last_valid_block_height
+            self._fetched_at = time.monotonic()
+
+    def last_valid_block_height(self, blockhash: Hash) -> int:
+        """
+        Return the last valid block height of a blockhash this provider served recently.
+
+        Returns:
+            int: The block height after which transactions using the blockhash expire, or None if unknown
+        """
+        with self._condition:
+            return self._recent.get(str(blockhash))
+
+    def invalidate(self):
+        """Drop the cached blockhash so the next caller fetches a new one."""
+        with self._condition:
+            self._generation += 1
+            self._fetched_at = 0.0
+
+    def start(self):
+        """Start the background refresh thread."""
+        if self._refresh_thread is not None and self._refresh_thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._refresh_thread = threading.Thread(
+            target=self._refresh_loop, name="solana-blockhash-refresh", daemon=True
+        )
+        self._refresh_thread.start()
+
+    def stop(self):
+        """Stop the background refresh thread."""
+        self._stop_event.set()
+        if self._refresh_thread is not None:
+            self._refresh_thread.join()
+            self._refresh_thread = None
+
+    def _remember(self, blockhash: Hash, last_valid_block_height: int):
+        # Caller must hold self._condition
+        if last_valid_block_height is None:
+            return
+        self._recent[str(blockhash)] = last_valid_block_height
+        while len(self._recent) > _RECENT_BLOCKHASHES:
+            self._recent.popitem(last=False)
+
+    def _is_fresh(self) -> bool:
+        return self._blockhash is not None and time.monotonic() - self._fetched_at < self.ttl
+
+    def _refresh(self) -> tuple:
+        # Caller must have set self._fetching; waiters are released whether or not the fetch succeeds
+        with self._condition:
+            generation = self._generation
+        try:
+            blockhash, last_valid_block_height = self._fetch()
+        except Exception:
+            with self._condition:
+                self._fetching = False
+                self._condition.notify_all()
+            raise
+
+        with self._condition:
+            # A fetch that raced an invalidate() may have returned the blockhash being dropped
+            if generation == self._generation:
+                self._blockhash = blockhash
+                self._last_valid_block_height = last_valid_block_height
+                self._fetched_at = time.monotonic()
+            self._remember(blockhash, last_valid_block_height)
+            self._fetching = False
+            self._condition.notify_all()
+        return blockhash, last_valid_block_height
+
+    def _refresh_loop(self):
+        # Refresh at half the TTL so callers never see a stale cache
+        while not self._stop_event.wait(self.ttl / 2):
+            with self._condition:
+                if self._fetching:
+                    continue
+                self._fetching = True
+            try:
+                self._refresh()
+            except Exception as e:
+                print(f'error refreshing blockhash in background: {e}')
+
+
+_provider = None
+_provider_lock = threading.Lock()
+
+
+def get_blockhash_provider() -> BlockhashProvider:
+    """Return the process-wide blockhash provider, creating it on first use."""
+    global _provider
+    if _provider is None:
+        with _provider_lock:
+            if _provider is None:
+                _provider = BlockhashProvider()
+    return _provider
+
+
+def configure_blockhash_provider(**kwargs) -> BlockhashProvider:
+    """
+    Replace the process-wide blockhash provider with one built from the given options.
+
+    Args:
+        **kwargs: Options accepted by BlockhashProvider
+
+    Returns:
+        BlockhashProvider: The new process-wide provider
+    """
+    global _provider
+    with _provider_lock:
+        previous = _provider
+        _provider = BlockhashProvider(**kwargs)
+    if previous is not None:
+        previous.stop()
+    return _provider
+
+
+def is_blockhash_not_found_error(error) -> bool:
+    """Return True if an RPC error says the transaction's blockhash is unknown or expired."""
+    message = error.get("message", "") if isinstance(error, dict) else str(error)
+    return "blockhash not found" in message.lower()
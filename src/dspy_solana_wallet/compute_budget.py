@@ -0,0 +1,341 @@
+import base64
+import math
+import threading
+import time
+
+from solders.compute_budget import set_compute_unit_limit, set_compute_unit_price
+from solders.hash import Hash
+from solders.message import Message
+from solders.transaction import Transaction
+
+from . import config
+from .rpc_transport import get_transport, get_async_transport
+from .token_types import TokenType, ASSOCIATED_TOKEN_PROGRAM_ID
+
+# Hard per-transaction compute limit enforced by the runtime
+MAX_COMPUTE_UNIT_LIMIT = 1_400_000
+
+# Units consumed by the two compute budget instructions themselves
+COMPUTE_BUDGET_INSTRUCTION_UNITS = 2 * 150
+
+# Conservative per-instruction compute estimates, per token program
+TRANSFER_CHECKED_COMPUTE_UNITS = {
+    TokenType.SPL_TOKEN_PROGRAM_ID.value: 6_500,
+    TokenType.TOKEN_2022_PROGRAM_ID.value: 9_000,
+}
+CREATE_ATA_IDEMPOTENT_COMPUTE_UNITS = {
+    TokenType.SPL_TOKEN_PROGRAM_ID.value: 25_000,
+    TokenType.TOKEN_2022_PROGRAM_ID.value: 35_000,
+}
+
+# Position of the token program among an ATA create instruction's accounts
+_CREATE_ATA_TOKEN_PROGRAM_INDEX = 5
+
+
+def estimated_compute_units(instructions: list) -> int:
+    """Return the conservative compute estimate for the ATA creates and token transfers among the instructions."""
+    units = 0
+    for instruction in instructions:
+        program_id = str(instruction.program_id)
+        if program_id == ASSOCIATED_TOKEN_PROGRAM_ID:
+            token_program = str(instruction.accounts[_CREATE_ATA_TOKEN_PROGRAM_INDEX].pubkey)
+            units += CREATE_ATA_IDEMPOTENT_COMPUTE_UNITS[token_program]
+        elif program_id in TRANSFER_CHECKED_COMPUTE_UNITS:
+            units += TRANSFER_CHECKED_COMPUTE_UNITS[program_id]
+    return units
+
+
+def _simulate_request(instructions: list, payer) -> list:
+    """Return the simulateTransaction params for the instructions as an unsigned transaction."""
+    message = Message.new_with_blockhash(instructions, payer, Hash.default())
+    encoded = base64.b64encode(bytes(Transaction.new_unsigned(message))).decode('ascii')
+    return [encoded, {"encoding": "base64", "sigVerify": False, "replaceRecentBlockhash": True, "commitment": "processed"}]
+
+
+def _parse_simulated_units(response: dict) -> int:
+    if "error" in response:
+        raise Exception(f"RPC Error: {response['error']}")
+    value = response["result"]["value"]
+    if value.get("err") is not None:
+        raise Exception(f"Simulation failed: {value['err']}")
+    return value["unitsConsumed"]
+
+
+def _parse_prioritization_fees(response: dict) -> list:
+    if "error" in response:
+        raise Exception(f"RPC Error: {response['error']}")
+    return [entry["prioritizationFee"] for entry in response["result"]]
+
+
+def _simulate_compute_units(instructions: list, payer) -> int:
+    """Simulate the instructions as an unsigned transaction and return the compute units consumed."""
+    return _parse_simulated_units(get_transport().call("simulateTransaction", _simulate_request(instructions, payer)))
+
+
+def _fetch_recent_prioritization_fees() -> list:
+    """Fetch the per-slot prioritization fees (micro-lamports per compute unit) of recent blocks."""
+    return _parse_prioritization_fees(get_transport().call("getRecentPrioritizationFees", [[]]))
+
+
+async def _async_simulate_compute_units(instructions: list, payer) -> int:
+    """Async version of _simulate_compute_units."""
+    response = await get_async_transport().call("simulateTransaction", _simulate_request(instructions, payer))
+    return _parse_simulated_units(response)
+
+
+async def _async_fetch_recent_prioritization_fees() -> list:
+    """Async version of _fetch_recent_prioritization_fees."""
+    return _parse_prioritization_fees(await get_async_transport().call("getRecentPrioritizationFees", [[]]))
+
+
+def instruction_shape(instructions: list) -> tuple:
+    """
+    Return a key identifying the "shape" of a list of instructions.
+
+    Instructions with the same programs, account counts and data layout consume the
+    same compute units regardless of which recipients and amounts they carry.
+    """
+    return tuple(
+        (str(instruction.program_id), len(instruction.accounts), len(instruction.data), bytes(instruction.data[:1]))
+        for instruction in instructions
+    )
+
+
+class ComputeBudgetPlanner:
+    """
+    Sizes the ComputeBudget instructions prepended to outgoing transactions.
+
+    The compute unit limit comes from simulating each instruction shape once and
+    caching the units consumed. A shape whose simulation failed is not simulated
+    again for simulation_retry_seconds. The compute unit price is a percentile of
+    getRecentPrioritizationFees, cached for a short window.
+
+    Simulating an idempotent ATA create against an account that already exists
+    reports far fewer units than an actual create, so transactions creating ATAs
+    are never budgeted below estimated_compute_units.
+    """
+
+    def __init__(self, margin: float = None, fee_percentile: float = None, fee_cache_seconds: float = None,
+                 max_unit_price: int = None, unit_price: int = None, simulate=None, fetch_fees=None,
+                 simulation_retry_seconds: float = None, async_simulate=None, async_fetch_fees=None):
+        """
+        Args:
+            margin: Multiplier applied to the simulated compute units
+            fee_percentile: Percentile (0-100) of recent prioritization fees to pay
+            fee_cache_seconds: Seconds a fetched priority fee is reused
+            max_unit_price: Upper bound for the compute unit price in micro-lamports
+            unit_price: Fixed compute unit price in micro-lamports; disables fee fetching when set
+            simulate: Callable returning compute units consumed for (instructions, payer)
+            fetch_fees: Callable returning a list of recent prioritization fees
+            simulation_retry_seconds: Seconds before a shape whose simulation failed is simulated again
+            async_simulate: Coroutine function used by the async methods in place of simulate
+            async_fetch_fees: Coroutine function used by the async methods in place of fetch_fees
+        """
+        self.margin = margin if margin is not None else config.SOLANA_COMPUTE_UNIT_MARGIN
+        self.fee_percentile = fee_percentile if fee_percentile is not None else config.SOLANA_PRIORITY_FEE_PERCENTILE
+        self.fee_cache_seconds = (
+            fee_cache_seconds if fee_cache_seconds is not None else config.SOLANA_PRIORITY_FEE_CACHE_SECONDS
+        )
+        self.max_unit_price = max_unit_price if max_unit_price is not None else config.SOLANA_PRIORITY_FEE_MAX_MICRO_LAMPORTS
+        self.unit_price = unit_price if unit_price is not None else config.SOLANA_COMPUTE_UNIT_PRICE
+        self._simulate = simulate or _simulate_compute_units
+        self._fetch_fees = fetch_fees or _fetch_recent_prioritization_fees
+        self._async_simulate = async_simulate or _async_simulate_compute_units
+        self._async_fetch_fees = async_fetch_fees or _async_fetch_recent_prioritization_fees
+        self.simulation_retry_seconds = (
+            simulation_retry_seconds if simulation_retry_seconds is not None
+            else config.SOLANA_COMPUTE_SIMULATION_RETRY_SECONDS
+        )
+
+        self._lock = threading.Lock()
+        self._units_by_shape = {}
+        self._failed_at_by_shape = {}
+        self._fee = None
+        self._fee_fetched_at = 0.0
+
+    def instructions_for(self, instructions: list, payer) -> list:
+        """
+        Return the ComputeBudget instructions to prepend to the given instructions.
+
+        Args:
+            instructions: The transaction's instructions, without any compute budget instructions
+            payer: The fee payer public key
+
+        Returns:
+            list: SetComputeUnitLimit (when the shape could be simulated) and SetComputeUnitPrice
+        """
+        return self._budget_instructions(self.compute_unit_limit(instructions, payer), self.compute_unit_price())
+
+    async def async_instructions_for(self, instructions: list, payer) -> list:
+        """Async version of instructions_for; simulations and fee fetches go through the async transport."""
+        limit = await self.async_compute_unit_limit(instructions, payer)
+        return self._budget_instructions(limit, await self.async_compute_unit_price())
+
+    def compute_unit_limit(self, instructions: list, payer) -> int:
+        """
+        Return a right-sized compute unit limit, or None if the shape could not be simulated.
+
+        Args:
+            instructions: The transaction's instructions
+            payer: The fee payer public key
+
+        Returns:
+            int: The compute unit limit to request
+        """
+        shape = instruction_shape(instructions)
+        units, should_simulate = self._cached_units(shape)
+        if should_simulate:
+            try:
+                units = self._simulate(instructions, payer)
+            except Exception as e:
+                self._simulation_failed(shape, e)
+                return None
+            self._store_units(shape, units)
+        return self._limit(instructions, units)
+
+    async def async_compute_unit_limit(self, instructions: list, payer) -> int:
+        """Async version of compute_unit_limit."""
+        shape = instruction_shape(instructions)
+        units, should_simulate = self._cached_units(shape)
+        if should_simulate:
+            try:
+                units = await self._async_simulate(instructions, payer)
+            except Exception as e:
+                self._simulation_failed(shape, e)
+                return None
+            self._store_units(shape, units)
+        return self._limit(instructions, units)
+
+    def compute_unit_price(self) -> int:
+        """Return the compute unit price in micro-lamports, refetching at most once per cache window."""
+        fee = self._cached_fee()
+        if fee is not None:
+            return fee
+        try:
+            fees = self._fetch_fees()
+        except Exception as e:
+            return self._fee_fetch_failed(e)
+        return self._store_fee(fees)
+
+    async def async_compute_unit_price(self) -> int:
+        """Async version of compute_unit_price."""
+        fee = self._cached_fee()
+        if fee is not None:
+            return fee
+        try:
+            fees = await self._async_fetch_fees()
+        except Exception as e:
+            return self._fee_fetch_failed(e)
+        return self._store_fee(fees)
+
+    def _budget_instructions(self, limit: int, price: int) -> list:
+        budget = []
+        if limit is not None:
+            budget.append(set_compute_unit_limit(limit))
+        budget.append(set_compute_unit_price(price))
+        return budget
+
+    def _cached_units(self, shape: tuple) -> tuple:
+        """Return (units, should_simulate) for a shape; units is None until it has been simulated."""
+        with self._lock:
+            units = self._units_by_shape.get(shape)
+            failed_at = self._failed_at_by_shape.get(shape)
+        if units is not None:
+            return units, False
+        recently_failed = failed_at is not None and time.monotonic() - failed_at < self.simulation_retry_seconds
+        return None, not recently_failed
+
+    def _simulation_failed(self, shape: tuple, error: Exception):
+        # Leave the default limit in place rather than guess
+        print(f'error simulating compute units: {error}')
+        with self._lock:
+            self._failed_at_by_shape[shape] = time.monotonic()
+
+    def _store_units(self, shape: tuple, units: int):
+        with self._lock:
+            self._units_by_shape[shape] = units
+            self._failed_at_by_shape.pop(shape, None)
+
+    def _limit(self, instructions: list, units: int) -> int:
+        if units is None:
+            return None
+        # Applied per call: the shape does not say which token program an ATA create targets
+        if any(str(instruction.program_id) == ASSOCIATED_TOKEN_PROGRAM_ID for instruction in instructions):
+            units = max(units, estimated_compute_units(instructions))
+        limit = math.ceil(units * self.margin) + COMPUTE_BUDGET_INSTRUCTION_UNITS
+        return min(limit, MAX_COMPUTE_UNIT_LIMIT)
+
+    def _cached_fee(self) -> int:
+        """Return the fixed or still-fresh compute unit price, or None if it has to be fetched."""
+        if self.unit_price is not None:
+            return self.unit_price
+        with self._lock:
+            if self._fee is not None and time.monotonic() - self._fee_fetched_at < self.fee_cache_seconds:
+                return self._fee
+        return None
+
+    def _fee_fetch_failed(self, error: Exception) -> int:
+        print(f'error fetching recent prioritization fees: {error}')
+        with self._lock:
+            return self._fee or 0
+
+    def _store_fee(self, fees: list) -> int:
+        fees = sorted(fees)
+        fee = 0
+        if fees:
+            fee = fees[min(len(fees) - 1, int(len(fees) * self.fee_percentile / 100))]
+        fee = min(fee, self.max_unit_price)
+        with self._lock:
+            self._fee = fee
+            self._fee_fetched_at = time.monotonic()
+        return fee
+
+    def cached_shapes(self) -> int:
+        """Return the number of instruction shapes whose compute units have been simulated."""
+        with self._lock:
+            return len(self._units_by_shape)
+
+
+_planner = None
+_planner_lock = threading.Lock()
+
+
+def get_compute_budget_planner() -> ComputeBudgetPlanner:
+    """Return the process-wide compute budget planner, creating it on first use."""
+    global _planner
+    if _planner is None:
+        with _planner_lock:
+            if _planner is None:
+                _planner = ComputeBudgetPlanner()
+    return _planner
+
+
+def with_compute_budget(instructions: list, payer, budget: list = None) -> list:
+    """
+    Prepend ComputeBudget instructions when SOLANA_COMPUTE_BUDGET_ENABLED is set.
+
+    Args:
+        instructions: The transaction's instructions
+        payer: The fee payer public key
+        budget: ComputeBudget instructions already planned (e.g. by async_compute_budget); planned here when None
+
+    Returns:
+        list: The instructions, prefixed by SetComputeUnitLimit / SetComputeUnitPrice if enabled
+    """
+    if not config.SOLANA_COMPUTE_BUDGET_ENABLED:
+        return instructions
+    if budget is None:
+        budget = get_compute_budget_planner().instructions_for(instructions, payer)
+    return budget + instructions
+
+
+async def async_compute_budget(instructions: list, payer) -> list:
+    """
+    Plan the ComputeBudget instructions for with_compute_budget without blocking the event loop.
+
+    Returns:
+        list: The budget instructions, or None when SOLANA_COMPUTE_BUDGET_ENABLED is not set
+    """
+    if not config.SOLANA_COMPUTE_BUDGET_ENABLED:
+        return None
+    return await get_compute_budget_planner().async_instructions_for(instructions, payer)
@@ -13,4 +13,71 @@ SOLANA_FUNDING_WALLET_PUBLIC_KEY = os.getenv("SOLANA_FUNDING_WALLET_PUBLIC_KEY")
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 
 # Faucet configuration
-FAUCET_URL = "https://api.devnet.solana.com" if SOLANA_NETWORK == "devnet" else None 
\ No newline at end of file
+FAUCET_URL = "https://api.devnet.solana.com" if SOLANA_NETWORK == "devnet" else None 
+
+# RPC transport configuration
+SOLANA_RPC_URL = os.getenv("SOLANA_RPC_URL", "https://api.devnet.solana.com")
+# Comma-separated endpoints routed between by latency and health (defaults to SOLANA_RPC_URL)
+SOLANA_RPC_URLS = [url.strip() for url in os.getenv("SOLANA_RPC_URLS", SOLANA_RPC_URL).split(",") if url.strip()]
+SOLANA_RPC_HEDGE_AFTER = float(os.getenv("SOLANA_RPC_HEDGE_AFTER", "0"))
+SOLANA_RPC_EJECT_SECONDS = float(os.getenv("SOLANA_RPC_EJECT_SECONDS", "30"))
+SOLANA_RPC_MAX_CONNECTIONS = int(os.getenv("SOLANA_RPC_MAX_CONNECTIONS", "20"))
+SOLANA_RPC_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("SOLANA_RPC_MAX_KEEPALIVE_CONNECTIONS", "10"))
+SOLANA_RPC_KEEPALIVE_EXPIRY = float(os.getenv("SOLANA_RPC_KEEPALIVE_EXPIRY", "30"))
+SOLANA_RPC_HTTP2 = os.getenv("SOLANA_RPC_HTTP2", "false").lower() == "true"
+SOLANA_RPC_TIMEOUT = float(os.getenv("SOLANA_RPC_TIMEOUT", "10"))
+SOLANA_RPC_MAX_BATCH_SIZE = int(os.getenv("SOLANA_RPC_MAX_BATCH_SIZE", "100"))
+
+# Blockhash cache configuration
+SOLANA_BLOCKHASH_TTL_SECONDS = float(os.getenv("SOLANA_BLOCKHASH_TTL_SECONDS", "20"))
+SOLANA_BLOCKHASH_BACKGROUND_REFRESH = os.getenv("SOLANA_BLOCKHASH_BACKGROUND_REFRESH", "false").lower() == "true"
+
+# Associated token account derivation configuration
+SOLANA_ATA_CACHE_SIZE = int(os.getenv("SOLANA_ATA_CACHE_SIZE", "100000"))
+SOLANA_ATA_PARALLEL_THRESHOLD = int(os.getenv("SOLANA_ATA_PARALLEL_THRESHOLD", "5000"))
+SOLANA_ATA_PARALLEL_CHUNK_SIZE = int(os.getenv("SOLANA_ATA_PARALLEL_CHUNK_SIZE", "2000"))
+
+# Transaction confirmation configuration
+SOLANA_CONFIRMATION_POLL_INTERVAL = float(os.getenv("SOLANA_CONFIRMATION_POLL_INTERVAL", "0.4"))
+SOLANA_CONFIRMATION_TIMEOUT_SECONDS = float(os.getenv("SOLANA_CONFIRMATION_TIMEOUT_SECONDS", "30"))
+
+# Batch transfer configuration
+SOLANA_BATCH_COMPUTE_UNIT_LIMIT = int(os.getenv("SOLANA_BATCH_COMPUTE_UNIT_LIMIT", "1400000"))
+
+# WebSocket subscription configuration
+SOLANA_WS_URL = os.getenv("SOLANA_WS_URL", "wss://api.devnet.solana.com")
+SOLANA_WS_RECONNECT_DELAY = float(os.getenv("SOLANA_WS_RECONNECT_DELAY", "0.5"))
+SOLANA_WS_MAX_RECONNECT_DELAY = float(os.getenv("SOLANA_WS_MAX_RECONNECT_DELAY", "30"))
+SOLANA_WS_REQUEST_TIMEOUT = float(os.getenv("SOLANA_WS_REQUEST_TIMEOUT", "10"))
+
+# Send pipeline configuration
+# Opt-in: each send then blocks until it lands or its blockhash expires
+SOLANA_REBROADCAST_UNTIL_CONFIRMED = os.getenv("SOLANA_REBROADCAST_UNTIL_CONFIRMED", "false").lower() == "true"
+SOLANA_REBROADCAST_INTERVAL = float(os.getenv("SOLANA_REBROADCAST_INTERVAL", "2"))
+SOLANA_SEND_MAX_SECONDS = float(os.getenv("SOLANA_SEND_MAX_SECONDS", "90"))
+# Opt-in: reuse pre-serialized messages for repeated transfer shapes (not used while compute budget is enabled)
+SOLANA_MESSAGE_TEMPLATES_ENABLED = os.getenv("SOLANA_MESSAGE_TEMPLATES_ENABLED", "false").lower() == "true"
+
+# Compute budget configuration
+SOLANA_COMPUTE_BUDGET_ENABLED = os.getenv("SOLANA_COMPUTE_BUDGET_ENABLED", "false").lower() == "true"
+SOLANA_COMPUTE_UNIT_MARGIN = float(os.getenv("SOLANA_COMPUTE_UNIT_MARGIN", "1.1"))
+SOLANA_COMPUTE_SIMULATION_RETRY_SECONDS = float(os.getenv("SOLANA_COMPUTE_SIMULATION_RETRY_SECONDS", "60"))
+SOLANA_PRIORITY_FEE_PERCENTILE = float(os.getenv("SOLANA_PRIORITY_FEE_PERCENTILE", "75"))
+SOLANA_PRIORITY_FEE_CACHE_SECONDS = float(os.getenv("SOLANA_PRIORITY_FEE_CACHE_SECONDS", "10"))
+SOLANA_PRIORITY_FEE_MAX_MICRO_LAMPORTS = int(os.getenv("SOLANA_PRIORITY_FEE_MAX_MICRO_LAMPORTS", "1000000"))
+SOLANA_COMPUTE_UNIT_PRICE = int(os.getenv("SOLANA_COMPUTE_UNIT_PRICE")) if os.getenv("SOLANA_COMPUTE_UNIT_PRICE") else None
+
+# Faucet airdrop scheduler configuration
+SOLANA_AIRDROP_RATE_PER_SECOND = float(os.getenv("SOLANA_AIRDROP_RATE_PER_SECOND", "0.2"))
+SOLANA_AIRDROP_BURST = int(os.getenv("SOLANA_AIRDROP_BURST", "2"))
+SOLANA_AIRDROP_INITIAL_BACKOFF = float(os.getenv("SOLANA_AIRDROP_INITIAL_BACKOFF", "2"))
+SOLANA_AIRDROP_MAX_BACKOFF = float(os.getenv("SOLANA_AIRDROP_MAX_BACKOFF", "60"))
+SOLANA_AIRDROP_FALLBACK_SECONDS = float(os.getenv("SOLANA_AIRDROP_FALLBACK_SECONDS", "30"))
+# Most SOL the devnet faucet sends in one requestAirdrop
+SOLANA_AIRDROP_MAX_AMOUNT = float(os.getenv("SOLANA_AIRDROP_MAX_AMOUNT", "2"))
+SOLANA_AIRDROP_FALLBACK_ENABLED = os.getenv("SOLANA_AIRDROP_FALLBACK_ENABLED", "true").lower() == "true"
+
+# Shadow ledger configuration
+SOLANA_SHADOW_LEDGER_ENABLED = os.getenv("SOLANA_SHADOW_LEDGER_ENABLED", "false").lower() == "true"
+SOLANA_SHADOW_LEDGER_MAX_STALENESS = float(os.getenv("SOLANA_SHADOW_LEDGER_MAX_STALENESS", "30"))
+SOLANA_SHADOW_LEDGER_RESYNC_INTERVAL = float(os.getenv("SOLANA_SHADOW_LEDGER_RESYNC_INTERVAL", "10"))
@@ -0,0 +1,186 @@
+import threading
+import time
+
+from . import config
+from .rpc_transport import get_transport
+
+# Commitment levels in the order a transaction reaches them
+COMMITMENT_LEVELS = ["processed", "confirmed", "finalized"]
+
+# getSignatureStatuses accepts at most this many signatures per call
+MAX_SIGNATURES_PER_REQUEST = 256
+
+
+def fetch_signature_statuses(signatures: list) -> list:
+    """Fetch statuses for up to MAX_SIGNATURES_PER_REQUEST signatures from the Solana node."""
+    response = get_transport().call("getSignatureStatuses", [signatures, {"searchTransactionHistory": False}])
+    if "error" in response:
+        raise Exception(f"RPC Error: {response['error']}")
+    return response["result"]["value"]
+
+
+def commitment_reached(status: dict, commitment: str) -> bool:
+    """Return True if a signature status has reached (or passed) the given commitment level."""
+    if not status or not status.get("confirmationStatus"):
+        return False
+    return COMMITMENT_LEVELS.index(status["confirmationStatus"]) >= COMMITMENT_LEVELS.index(commitment)
+
+
+class _Waiter:
+    def __init__(self, commitment: str):
+        self.commitment = commitment
+        self.event = threading.Event()
+        self.status = None
+
+
+class ConfirmationTracker:
+    """
+    Polls getSignatureStatuses for all outstanding transactions in batches and
+    wakes each waiter as soon as its signature reaches the requested commitment.
+
+    A single background thread serves every waiter, so waiting on many
+    signatures costs one RPC per MAX_SIGNATURES_PER_REQUEST signatures per poll.
+    """
+
+    def __init__(self, poll_interval: float = None, fetch=None):
+        """
+        Args:
+            poll_interval: Seconds between status polls (about one slot by default)
+            fetch: Callable taking a list of signatures and returning their statuses;
+                defaults to a getSignatureStatuses RPC call
+        """
+        self.poll_interval = poll_interval if poll_interval is not None else config.SOLANA_CONFIRMATION_POLL_INTERVAL
+        self._fetch = fetch or fetch_signature_statuses
+
+        self._lock = threading.Lock()
+        self._waiters = {}
+        self._poll_thread = None
+
+    def track(self, signature: str, commitment: str = "confirmed") -> _Waiter:
+        """
+        Start tracking a signature.
+
+        Args:
+            signature: The transaction signature
+            commitment: The commitment level to wait for ('processed', 'confirmed' or 'finalized')
+
+        Returns:
+            _Waiter: A handle whose event is set once the commitment is reached or the transaction fails
+        """
+        if commitment not in COMMITMENT_LEVELS:
+            raise ValueError(f"Unsupported commitment: {commitment}. Supported levels are {COMMITMENT_LEVELS}")
+
+        waiter = _Waiter(commitment)
+        with self._lock:
+            self._waiters.setdefault(str(signature), []).append(waiter)
+            if self._poll_thread is None:
+                self._poll_thread = threading.Thread(
+                    target=self._poll_loop, name="solana-confirmation-tracker", daemon=True
+                )
+                self._poll_thread.start()
+        return waiter
+
+    def wait(self, signature: str, commitment: str = "confirmed", timeout: float = None) -> dict:
+        """
+        Block until a signature reaches the given commitment.
+
+        Args:
+            signature: The transaction signature
+            commitment: The commitment level to wait for
+            timeout: Maximum seconds to wait
+
+        Returns:
+            dict: The signature status (check 'err' for failed transactions), or None on timeout
+        """
+        return self.wait_many([signature], commitment, timeout)[str(signature)]
+
+    def wait_many(self, signatures: list, commitment: str = "confirmed", timeout: float = None) -> dict:
+        """
+        Block until every signature reaches the given commitment or the timeout passes.
+
+        Args:
+            signatures: The transaction signatures
+            commitment: The commitment level to wait for
+            timeout: Maximum seconds to wait for all of them
+
+        Returns:
+            dict: Signature -> status, with None for signatures that timed out
+        """
+        timeout = timeout if timeout is not None else config.SOLANA_CONFIRMATION_TIMEOUT_SECONDS
+        waiters = [(str(signature), self.track(signature, commitment)) for signature in signatures]
+        deadline = time.monotonic() + timeout
+
+        for _, waiter in waiters:
+            waiter.event.wait(max(0.0, deadline - time.monotonic()))
+
+        results = {}
+        for signature, waiter in waiters:
+            if not waiter.event.is_set():
+                self._discard(signature, waiter)
+            results[signature] = waiter.status
+        return results
+
+    def pending_count(self) -> int:
+        """Return the number of signatures still being polled."""
+        with self._lock:
+            return len(self._waiters)
+
+    def _discard(self, signature: str, waiter: _Waiter):
+        with self._lock:
+            remaining = [w for w in self._waiters.get(signature, []) if w is not waiter]
+            if remaining:
+                self._waiters[signature] = remaining
+            else:
+                self._waiters.pop(signature, None)
+
+    def _poll_loop(self):
+        while True:
+            with self._lock:
+                signatures = list(self._waiters)
+                if not signatures:
+                    # Nothing left to track; the next track() call starts a new thread
+                    self._poll_thread = None
+                    return
+
+            for start in range(0, len(signatures), MAX_SIGNATURES_PER_REQUEST):
+                batch = signatures[start:start + MAX_SIGNATURES_PER_REQUEST]
+                try:
+                    statuses = self._fetch(batch)
+                except Exception as e:
+                    print(f'error polling signature statuses: {e}')
+                    continue
+                self._resolve(batch, statuses)
+
+            time.sleep(self.poll_interval)
+
+    def _resolve(self, signatures: list, statuses: list):
+        with self._lock:
+            for signature, status in zip(signatures, statuses):
+                if not status:
+                    continue
+                waiters = self._waiters.get(signature, [])
+                still_waiting = []
+                for waiter in waiters:
+                    if status.get("err") is not None or commitment_reached(status, waiter.commitment):
+                        waiter.status = status
+                        waiter.event.set()
+                    else:
+                        still_waiting.append(waiter)
+                if still_waiting:
+                    self._waiters[signature] = still_waiting
+                else:
+                    self._waiters.pop(signature, None)
+
+
+_tracker = None
+_tracker_lock = threading.Lock()
+
+
+def get_confirmation_tracker() -> ConfirmationTracker:
+    """Return the process-wide confirmation tracker, creating it on first use."""
+    global _tracker
+    if _tracker is None:
+        with _tracker_lock:
+            if _tracker is None:
+                _tracker = ConfirmationTracker()
+    return _tracker
@@ -0,0 +1,422 @@
+import base64
+import struct
+
+from solders.hash import Hash
+from solders.keypair import Keypair
+from solders.message import Message
+from solders.pubkey import Pubkey
+from solders.system_program import (
+    AdvanceNonceAccountParams,
+    TransferParams,
+    advance_nonce_account,
+    create_nonce_account as create_nonce_account_instructions,
+    transfer,
+)
+from solders.transaction import Transaction
+
+from . import config
+from .rpc_transport import get_transport
+from .confirmation import get_confirmation_tracker
+from .send_pipeline import LANDED, get_transaction_sender
+from .shadow_ledger import LAMPORTS_PER_SIGNATURE, get_shadow_ledger, record_balance_changes
+from .primitive_solana_functions import (
+    MAX_ACCOUNTS_PER_REQUEST,
+    _broadcast_transaction,
+    _get_latest_blockhash,
+    _make_rpc_request,
+    _send_transaction,
+    _token_transfer_instructions,
+)
+from .token_types import TokenType, ASSOCIATED_TOKEN_PROGRAM_ID
+
+SYSTEM_PROGRAM_ID = "11111111111111111111111111111111"
+
+# System program nonce account layout:
+# version (u32) | state (u32) | authority (32) | durable nonce (32) | lamports per signature (u64)
+NONCE_ACCOUNT_LENGTH = 80
+NONCE_STATE_INITIALIZED = 1
+NONCE_AUTHORITY_OFFSET = 8
+NONCE_VALUE_OFFSET = 40
+_NONCE_HEADER_STRUCT = struct.Struct('<II')
+
+# Instruction discriminators read back from pre-signed transactions
+SYSTEM_TRANSFER_INSTRUCTION = 2
+TOKEN_TRANSFER_CHECKED_INSTRUCTION = 12
+
+
+def create_nonce_account_transaction(funding_wallet, nonce_keypair, authority=None, lamports: int = None, recent_blockhash=None):
+    """
+    Create a transaction that creates and initializes a durable nonce account.
+
+    Args:
+        funding_wallet: The funding wallet keypair (pays rent and fees)
+        nonce_keypair: A new keypair for the nonce account address
+        authority: The nonce authority public key (defaults to the funding wallet)
+        lamports: Lamports to fund the account with (defaults to the rent-exempt minimum)
+        recent_blockhash: Blockhash to sign with (defaults to the shared cache)
+
+    Returns:
+        Transaction: The signed transaction
+    """
+    if lamports is None:
+        lamports = get_nonce_account_rent()
+    create_ix, initialize_ix = create_nonce_account_instructions(
+        funding_wallet.pubkey(),
+        nonce_keypair.pubkey(),
+        authority or funding_wallet.pubkey(),
+        lamports
+    )
+
+    recent_blockhash = recent_blockhash or _get_latest_blockhash()
+    transaction = Transaction.new_with_payer([create_ix, initialize_ix], funding_wallet.pubkey())
+    transaction.sign([funding_wallet, nonce_keypair], recent_blockhash)
+    return transaction
+
+
+def create_nonce_accounts(funding_wallet, count: int, authority=None) -> list:
+    """
+    Create durable nonce accounts, one per transaction, sending them concurrently.
+
+    Each pre-signed transaction consumes one nonce account until it lands and the
+    nonce is advanced, so create as many accounts as transactions to pre-sign.
+
+    Args:
+        funding_wallet: The funding wallet keypair (pays rent and fees)
+        count: Number of nonce accounts to create
+        authority: The nonce authority public key (defaults to the funding wallet)
+
+    Returns:
+        list: The public keys of the nonce accounts that were created
+    """
+    lamports = get_nonce_account_rent()
+    recent_blockhash = _get_latest_blockhash()
+    nonce_keypairs = [Keypair() for _ in range(count)]
+    transactions = [
+        create_nonce_account_transaction(funding_wallet, nonce_keypair, authority, lamports, recent_blockhash)
+        for nonce_keypair in nonce_keypairs
+    ]
+    print(f'creating {count} nonce accounts')
+
+    landed = [result["success"] for result in submit_presigned_transactions(transactions)]
+    created = [nonce_keypair.pubkey() for nonce_keypair, success in zip(nonce_keypairs, landed) if success]
+    print(f'created {len(created)} of {count} nonce accounts')
+    return created
+
+
+def create_nonce_account(funding_wallet, authority=None):
+    """
+    Create a single durable nonce account.
+
+    Returns:
+        Pubkey: The nonce account public key, or None if creation failed
+    """
+    created = create_nonce_accounts(funding_wallet, 1, authority)
+    return created[0] if created else None
+
+
+def advance_nonce_account_transaction(authority_wallet, nonce_pubkey, recent_blockhash=None):
+    """Create a transaction that advances a nonce account, invalidating transactions signed against its current nonce."""
+    instruction = advance_nonce_account(AdvanceNonceAccountParams(
+        nonce_pubkey=nonce_pubkey,
+        authorized_pubkey=authority_wallet.pubkey()
+    ))
+    recent_blockhash = recent_blockhash or _get_latest_blockhash()
+    transaction = Transaction.new_with_payer([instruction], authority_wallet.pubkey())
+    transaction.sign([authority_wallet], recent_blockhash)
+    return transaction
+
+
+def advance_nonce_account(authority_wallet, nonce_pubkey):
+    """Advance a nonce account. Returns the transaction signature, or False on error."""
+    print(f'advancing nonce account {nonce_pubkey}')
+    try:
+        result = _broadcast_transaction(advance_nonce_account_transaction(authority_wallet, nonce_pubkey))
+        print(f"Advance nonce transaction signature: {result}")
+        return result
+    except Exception as e:
+        print(f'error advancing nonce account: {e}')
+        return False
+
+
+def get_nonce_account_rent() -> int:
+    """Return the rent-exempt minimum balance of a nonce account in lamports."""
+    result = _make_rpc_request("getMinimumBalanceForRentExemption", [NONCE_ACCOUNT_LENGTH])
+    if "error" in result:
+        raise Exception(f"RPC Error: {result['error']}")
+    return result["result"]
+
+
+def get_nonce(nonce_pubkey) -> Hash:
+    """Return the durable nonce currently stored in a nonce account."""
+    nonce = get_nonces([nonce_pubkey])[0]
+    if nonce is None:
+        raise ValueError(f"{nonce_pubkey} is not an initialized nonce account")
+    return nonce
+
+
+def get_nonces(nonce_pubkeys: list) -> list:
+    """
+    Read the current durable nonce of many nonce accounts with getMultipleAccounts.
+
+    Args:
+        nonce_pubkeys: The nonce account public keys
+
+    Returns:
+        list: One Hash per account in input order, or None where the account is
+        missing, not a nonce account, or could not be read
+    """
+    calls = [
+        ("getMultipleAccounts", [[str(pubkey) for pubkey in nonce_pubkeys[start:start + MAX_ACCOUNTS_PER_REQUEST]], {"encoding": "base64"}])
+        for start in range(0, len(nonce_pubkeys), MAX_ACCOUNTS_PER_REQUEST)
+    ]
+
+    nonces = []
+    for (_, params), result in zip(calls, get_transport().call_batch(calls)):
+        if "error" in result:
+            print(f"RPC Error: {result['error']}")
+            nonces.extend([None] * len(params[0]))
+            continue
+
+        for pubkey, account in zip(params[0], result['result']['value']):
+            try:
+                nonces.append(_decode_nonce_account(account)[1])
+            except Exception as e:
+                print(f"Error decoding nonce account {pubkey}: {str(e)}")
+                nonces.append(None)
+    return nonces
+
+
+def _decode_nonce_account(account: dict) -> tuple:
+    """Decode (authority, durable nonce) from a getAccountInfo / getMultipleAccounts entry."""
+    if account is None:
+        raise ValueError("Nonce account does not exist")
+    if account['owner'] != SYSTEM_PROGRAM_ID:
+        raise ValueError(f"Account is owned by {account['owner']}, expected the system program")
+
+    data = base64.b64decode(account['data'][0])
+    if len(data) < NONCE_ACCOUNT_LENGTH:
+        raise ValueError(f"Nonce account data is {len(data)} bytes, expected {NONCE_ACCOUNT_LENGTH}")
+
+    _, state = _NONCE_HEADER_STRUCT.unpack_from(data, 0)
+    if state != NONCE_STATE_INITIALIZED:
+        raise ValueError("Nonce account is not initialized")
+
+    authority = Pubkey.from_bytes(data[NONCE_AUTHORITY_OFFSET:NONCE_AUTHORITY_OFFSET + 32])
+    nonce = Hash.from_bytes(data[NONCE_VALUE_OFFSET:NONCE_VALUE_OFFSET + 32])
+    return authority, nonce
+
+
+def create_nonce_sol_transfer_transaction(from_wallet, to_wallet_public_key, amount, nonce_pubkey, nonce: Hash, nonce_authority=None):
+    """
+    Create a SOL transfer signed against a durable nonce instead of a recent blockhash.
+
+    Args:
+        from_wallet: The sending wallet keypair (also the fee payer)
+        to_wallet_public_key: The recipient public key
+        amount: Amount of SOL
+        nonce_pubkey: The nonce account public key
+        nonce: The nonce currently stored in that account (see get_nonce)
+        nonce_authority: The nonce authority keypair (defaults to from_wallet)
+
+    Returns:
+        Transaction: The signed transaction, valid until the nonce is advanced
+    """
+    transfer_ix = transfer(TransferParams(
+        from_pubkey=from_wallet.pubkey(),
+        to_pubkey=to_wallet_public_key,
+        lamports=TokenType.SOL.to_token_amount(amount)  # Convert SOL to lamports
+    ))
+    return _create_nonce_transaction(from_wallet, [transfer_ix], nonce_pubkey, nonce, nonce_authority)
+
+
+def create_nonce_token_transfer_transaction(funding_wallet, to_wallet_public_key, token_type, amount, nonce_pubkey, nonce: Hash,
+                                            create_ata: bool = True, nonce_authority=None):
+    """
+    Create a token transfer signed against a durable nonce instead of a recent blockhash.
+
+    Args:
+        funding_wallet: The funding wallet keypair (payer and token owner)
+        to_wallet_public_key: The recipient public key
+        token_type: The type of token to send (USDC, PYUSD, or USDG)
+        amount: Amount in raw token units
+        nonce_pubkey: The nonce account public key
+        nonce: The nonce currently stored in that account (see get_nonce)
+        create_ata: Whether to idempotently create the recipient's ATA in the same transaction
+        nonce_authority: The nonce authority keypair (defaults to funding_wallet)
+
+    Returns:
+        Transaction: The signed transaction, valid until the nonce is advanced
+    """
+    instructions = _token_transfer_instructions(funding_wallet.pubkey(), to_wallet_public_key, token_type, amount, create_ata)
+    return _create_nonce_transaction(funding_wallet, instructions, nonce_pubkey, nonce, nonce_authority)
+
+
+def _create_nonce_transaction(payer_wallet, instructions: list, nonce_pubkey, nonce: Hash, nonce_authority=None):
+    # new_with_nonce prepends the AdvanceNonceAccount instruction the runtime requires first
+    authority = nonce_authority or payer_wallet
+    message = Message.new_with_nonce(instructions, payer_wallet.pubkey(), nonce_pubkey, authority.pubkey())
+    signers = [payer_wallet] if authority.pubkey() == payer_wallet.pubkey() else [payer_wallet, authority]
+    return Transaction(signers, message, nonce)
+
+
+def presign_transfers(funding_wallet, transfers: list, token_type: TokenType, nonce_accounts: list, create_ata: bool = True,
+                      nonces: list = None) -> list:
+    """
+    Pre-sign many transfers, each against its own durable nonce account.
+
+    The current nonces are read in bulk unless they are passed in (for example
+    from a get_nonces snapshot taken while online), so the transactions can be
+    signed well ahead of time, even offline, and submitted later with
+    submit_presigned_transactions.
+
+    Args:
+        funding_wallet: The funding wallet keypair (payer, token owner and nonce authority)
+        transfers: A list of (recipient_public_key, amount) tuples, amounts in human-readable units
+        token_type: The type of token to send (SOL, USDC, PYUSD, or USDG)
+        nonce_accounts: Nonce account public keys, at least one per transfer
+        create_ata: Whether token transfers idempotently create the recipient's ATA
+        nonces: The nonce stored in each of nonce_accounts, in the same order; fetched when not given
+
+    Returns:
+        list: One signed Transaction per transfer, in input order
+    """
+    if len(nonce_accounts) < len(transfers):
+        raise ValueError(f"{len(transfers)} transfers need as many nonce accounts, got {len(nonce_accounts)}")
+
+    nonce_accounts = list(nonce_accounts[:len(transfers)])
+    if nonces is None:
+        nonces = get_nonces(nonce_accounts)
+    else:
+        if len(nonces) < len(nonce_accounts):
+            raise ValueError(f"{len(nonce_accounts)} nonce accounts need as many nonces, got {len(nonces)}")
+        nonces = list(nonces[:len(nonce_accounts)])
+    missing = [str(pubkey) for pubkey, nonce in zip(nonce_accounts, nonces) if nonce is None]
+    if missing:
+        raise ValueError(f"Could not read the nonce of {len(missing)} accounts: {missing[:5]}")
+
+    # Converted as one exact column so a bad or over-precise amount fails before anything is signed
+    raw_amounts = token_type.to_token_amounts([amount for _, amount in transfers]).tolist()
+
+    transactions = []
+    for (recipient, amount), raw_amount, nonce_pubkey, nonce in zip(transfers, raw_amounts, nonce_accounts, nonces):
+        if token_type == TokenType.SOL:
+            transactions.append(create_nonce_sol_transfer_transaction(funding_wallet, recipient, amount, nonce_pubkey, nonce))
+        else:
+            transactions.append(create_nonce_token_transfer_transaction(
+                funding_wallet, recipient, token_type, raw_amount, nonce_pubkey, nonce, create_ata
+            ))
+    print(f'pre-signed {len(transactions)} {token_type.name} transfers against durable nonces')
+    return transactions
+
+
+def submit_presigned_transactions(transactions: list, confirm: bool = True) -> list:
+    """
+    Submit already-signed transactions, such as those from presign_transfers.
+
+    When the shadow ledger is enabled, each transaction's balance changes are
+    read back from its transfer instructions and recorded (see
+    presigned_balance_changes).
+
+    Args:
+        transactions: Signed transactions
+        confirm: Whether to wait for each one to be confirmed
+
+    Returns:
+        list: One dict per transaction in input order with signature, success and error keys
+    """
+    if confirm and config.SOLANA_REBROADCAST_UNTIL_CONFIRMED:
+        results = get_transaction_sender().send_many(transactions)
+        for transaction, result in zip(transactions, results):
+            if result["status"] == LANDED:
+                _record_presigned_transaction(result["signature"], transaction, confirmed=True)
+        return [
+            {
+                "signature": result["signature"],
+                "success": result["status"] == LANDED,
+                "error": None if result["status"] == LANDED else f"Transaction {result['status']}: {result['error']}",
+            }
+            for result in results
+        ]
+
+    outcomes = []
+    for transaction in transactions:
+        try:
+            signature = _send_transaction(bytes(transaction))
+        except Exception as e:
+            print(f'error submitting pre-signed transaction: {e}')
+            outcomes.append({"signature": str(transaction.signatures[0]), "success": False, "error": str(e)})
+            continue
+        outcomes.append({"signature": signature, "success": not confirm, "error": None})
+        _record_presigned_transaction(signature, transaction, confirmed=False)
+
+    if confirm:
+        sent = [outcome["signature"] for outcome in outcomes if outcome["error"] is None]
+        statuses = get_confirmation_tracker().wait_many(sent, "confirmed") if sent else {}
+        for outcome in outcomes:
+            if outcome["error"] is not None:
+                continue
+            status = statuses.get(outcome["signature"])
+            if config.SOLANA_SHADOW_LEDGER_ENABLED and status is not None:
+                if status.get("err") is None:
+                    get_shadow_ledger().confirm(outcome["signature"])
+                else:
+                    get_shadow_ledger().discard(outcome["signature"])
+            if status is None:
+                outcome["error"] = "Transaction not confirmed before timeout"
+            elif status.get("err") is not None:
+                outcome["error"] = f"Transaction failed: {status['err']}"
+            else:
+                outcome["success"] = True
+    return outcomes
+
+
+def presigned_balance_changes(transaction) -> list:
+    """
+    Read the balance changes a pre-signed transaction makes from its instructions.
+
+    SOL transfers, token transfer_checked instructions and the fee payer's
+    signature fees are decoded. A token recipient is only known when the
+    transaction also creates its ATA; otherwise the recipient's balance is
+    picked up by the shadow ledger's next resync.
+
+    Args:
+        transaction: A signed transaction
+
+    Returns:
+        list: (wallet_address, token_type, raw_delta) tuples
+    """
+    message = transaction.message
+    account_keys = message.account_keys
+    instructions = [
+        (str(account_keys[ix.program_id_index]), [account_keys[index] for index in ix.accounts], bytes(ix.data))
+        for ix in message.instructions
+    ]
+    ata_owners = {
+        accounts[1]: accounts[2] for program, accounts, _ in instructions if program == ASSOCIATED_TOKEN_PROGRAM_ID
+    }
+
+    changes = [(account_keys[0], TokenType.SOL, -LAMPORTS_PER_SIGNATURE * message.header.num_required_signatures)]
+    for program, accounts, data in instructions:
+        if program == SYSTEM_PROGRAM_ID and data[:4] == SYSTEM_TRANSFER_INSTRUCTION.to_bytes(4, 'little'):
+            lamports, = struct.unpack_from('<Q', data, 4)
+            changes.append((accounts[0], TokenType.SOL, -lamports))
+            changes.append((accounts[1], TokenType.SOL, lamports))
+        elif program in (TokenType.SPL_TOKEN_PROGRAM_ID.value, TokenType.TOKEN_2022_PROGRAM_ID.value) \
+                and data[:1] == bytes([TOKEN_TRANSFER_CHECKED_INSTRUCTION]):
+            # transfer_checked accounts: source, mint, destination, owner
+            amount, = struct.unpack_from('<Q', data, 1)
+            token_type = TokenType(str(accounts[1]))
+            changes.append((accounts[3], token_type, -amount))
+            if accounts[2] in ata_owners:
+                changes.append((ata_owners[accounts[2]], token_type, amount))
+    return changes
+
+
+def _record_presigned_transaction(signature: str, transaction, confirmed: bool):
+    """Record a sent transaction's deltas; a failure here must not turn a broadcast into a failed send."""
+    if not config.SOLANA_SHADOW_LEDGER_ENABLED:
+        return
+    try:
+        record_balance_changes(signature, presigned_balance_changes(transaction), confirmed)
+    except Exception as e:
+        print(f'error recording pre-signed transaction {signature} in the shadow ledger: {e}')
@@ -0,0 +1,210 @@
+import base64
+import struct
+
+from solders.address_lookup_table_account import (
+    ID as ADDRESS_LOOKUP_TABLE_PROGRAM_ID,
+    LOOKUP_TABLE_MAX_ADDRESSES,
+    AddressLookupTable,
+    AddressLookupTableAccount,
+    derive_lookup_table_address,
+)
+from solders.hash import Hash
+from solders.instruction import Instruction, AccountMeta
+from solders.message import MessageV0
+from solders.pubkey import Pubkey
+from solders.signature import Signature
+from solders.system_program import ID as SYSTEM_PROGRAM_ID
+from solders.transaction import Transaction, VersionedTransaction
+
+from .primitive_solana_functions import (
+    _broadcast_transaction,
+    _get_latest_blockhash,
+    _make_rpc_request,
+    derive_atas,
+    get_associated_token_address,
+)
+from .token_types import TokenType
+
+# Address lookup table program instruction discriminators (u32 LE)
+_CREATE_LOOKUP_TABLE = 0
+_EXTEND_LOOKUP_TABLE = 2
+
+# Addresses added per ExtendLookupTable transaction so it stays under the packet limit
+EXTEND_ADDRESSES_PER_TRANSACTION = 20
+
+
+def create_lookup_table_instruction(authority, payer, recent_slot: int) -> tuple:
+    """
+    Build a CreateLookupTable instruction.
+
+    Args:
+        authority: The table authority public key
+        payer: The account paying for the table
+        recent_slot: A recent slot, used to derive the table address
+
+    Returns:
+        tuple: (Instruction, lookup table Pubkey)
+    """
+    table, bump = derive_lookup_table_address(authority, recent_slot)
+    instruction = Instruction(
+        program_id=ADDRESS_LOOKUP_TABLE_PROGRAM_ID,
+        accounts=[
+            AccountMeta(pubkey=table, is_signer=False, is_writable=True),
+            AccountMeta(pubkey=authority, is_signer=True, is_writable=False),
+            AccountMeta(pubkey=payer, is_signer=True, is_writable=True),
+            AccountMeta(pubkey=SYSTEM_PROGRAM_ID, is_signer=False, is_writable=False),
+        ],
+        data=struct.pack('<IQB', _CREATE_LOOKUP_TABLE, recent_slot, bump)
+    )
+    return instruction, table
+
+
+def extend_lookup_table_instruction(table, authority, payer, addresses: list) -> Instruction:
+    """Build an ExtendLookupTable instruction appending the given addresses to the table."""
+    data = struct.pack('<IQ', _EXTEND_LOOKUP_TABLE, len(addresses)) + b''.join(bytes(address) for address in addresses)
+    return Instruction(
+        program_id=ADDRESS_LOOKUP_TABLE_PROGRAM_ID,
+        accounts=[
+            AccountMeta(pubkey=table, is_signer=False, is_writable=True),
+            AccountMeta(pubkey=authority, is_signer=True, is_writable=False),
+            AccountMeta(pubkey=payer, is_signer=True, is_writable=True),
+            AccountMeta(pubkey=SYSTEM_PROGRAM_ID, is_signer=False, is_writable=False),
+        ],
+        data=data
+    )
+
+
+def create_lookup_table(funding_wallet, addresses: list = ()):
+    """
+    Create an address lookup table owned by the funding wallet and fill it with addresses.
+
+    Addresses become usable in v0 transactions one slot after they are added.
+
+    Args:
+        funding_wallet: The funding wallet keypair (authority and payer)
+        addresses: Initial addresses to store in the table
+
+    Returns:
+        Pubkey: The lookup table address
+    """
+    result = _make_rpc_request("getSlot", [{"commitment": "finalized"}])
+    if "error" in result:
+        raise Exception(f"RPC Error: {result['error']}")
+
+    create_ix, table = create_lookup_table_instruction(funding_wallet.pubkey(), funding_wallet.pubkey(), result["result"])
+    transaction = Transaction.new_with_payer([create_ix], funding_wallet.pubkey())
+    transaction.sign([funding_wallet], _get_latest_blockhash())
+    signature = _broadcast_transaction(transaction)
+    print(f"Lookup table {table} created. Transaction signature: {signature}")
+
+    if addresses:
+        extend_lookup_table(funding_wallet, table, addresses)
+    return table
+
+
+def extend_lookup_table(funding_wallet, table, addresses: list) -> int:
+    """
+    Add addresses to a lookup table, skipping ones it already holds.
+
+    Args:
+        funding_wallet: The funding wallet keypair (authority and payer)
+        table: The lookup table address
+        addresses: Addresses to add
+
+    Returns:
+        int: Number of addresses added
+    """
+    account = _fetch_lookup_table_account(table)
+    existing = set(AddressLookupTable.deserialize(account).addresses) if account is not None else set()
+    new_addresses = []
+    for address in addresses:
+        if address not in existing:
+            existing.add(address)
+            new_addresses.append(address)
+
+    if len(existing) > LOOKUP_TABLE_MAX_ADDRESSES:
+        raise ValueError(f"A lookup table holds at most {LOOKUP_TABLE_MAX_ADDRESSES} addresses")
+
+    for start in range(0, len(new_addresses), EXTEND_ADDRESSES_PER_TRANSACTION):
+        chunk = new_addresses[start:start + EXTEND_ADDRESSES_PER_TRANSACTION]
+        extend_ix = extend_lookup_table_instruction(table, funding_wallet.pubkey(), funding_wallet.pubkey(), chunk)
+        transaction = Transaction.new_with_payer([extend_ix], funding_wallet.pubkey())
+        transaction.sign([funding_wallet], _get_latest_blockhash())
+        signature = _broadcast_transaction(transaction)
+        print(f"Added {len(chunk)} addresses to lookup table {table}. Transaction signature: {signature}")
+
+    return len(new_addresses)
+
+
+def get_lookup_table(table) -> AddressLookupTableAccount:
+    """Fetch a lookup table and return it in the form MessageV0.try_compile expects."""
+    account = _fetch_lookup_table_account(table)
+    if account is None:
+        raise ValueError(f"Lookup table {table} does not exist")
+    return AddressLookupTableAccount(key=table, addresses=list(AddressLookupTable.deserialize(account).addresses))
+
+
+def _fetch_lookup_table_account(table) -> bytes:
+    result = _make_rpc_request("getAccountInfo", [str(table), {"encoding": "base64"}])
+    if "error" in result:
+        raise Exception(f"RPC Error: {result['error']}")
+    value = result["result"]["value"]
+    if value is None:
+        return None
+    if value["owner"] != str(ADDRESS_LOOKUP_TABLE_PROGRAM_ID):
+        raise ValueError(f"{table} is owned by {value['owner']}, not the address lookup table program")
+    return base64.b64decode(value["data"][0])
+
+
+def token_transfer_lookup_addresses(funding_pubkey, token_type: TokenType, recipients: list = ()) -> list:
+    """
+    Return the addresses worth storing in a lookup table for sending a token.
+
+    These are the mint, the system program and the funding wallet's ATA, followed
+    by each recurring recipient and their ATA. Program ids invoked by the transfer
+    (the token and ATA programs) are left out: v0 messages must carry invoked
+    programs as static keys, so storing them in a table saves nothing.
+
+    Args:
+        funding_pubkey: The funding wallet public key
+        token_type: The token being sent
+        recipients: Recurring recipient wallet public keys
+
+    Returns:
+        list: Pubkeys, shared accounts first
+    """
+    addresses = [
+        Pubkey.from_string(token_type.value),
+        SYSTEM_PROGRAM_ID,
+        get_associated_token_address(funding_pubkey, token_type),
+    ]
+    recipients = list(recipients)
+    for recipient, ata in zip(recipients, derive_atas(recipients, token_type)):
+        addresses.extend([recipient, ata])
+    return addresses
+
+
+def create_versioned_transaction(instructions: list, payer_wallet, lookup_tables: list = (), recent_blockhash=None, signers: list = None) -> VersionedTransaction:
+    """
+    Build and sign a v0 transaction that resolves accounts through address lookup tables.
+
+    Args:
+        instructions: The instructions to include
+        payer_wallet: The fee payer keypair
+        lookup_tables: AddressLookupTableAccounts (see get_lookup_table)
+        recent_blockhash: Blockhash to sign with (defaults to the shared cache)
+        signers: All signing keypairs (defaults to just the payer)
+
+    Returns:
+        VersionedTransaction: The signed transaction
+    """
+    recent_blockhash = recent_blockhash or _get_latest_blockhash()
+    message = MessageV0.try_compile(payer_wallet.pubkey(), instructions, list(lookup_tables), recent_blockhash)
+    return VersionedTransaction(message, signers or [payer_wallet])
+
+
+def versioned_transaction_size(instructions: list, payer, lookup_tables: list = ()) -> int:
+    """Return the serialized size in bytes of a v0 transaction holding the given instructions."""
+    message = MessageV0.try_compile(payer, instructions, list(lookup_tables), Hash.default())
+    signatures = [Signature.default()] * message.header.num_required_signatures
+    return len(bytes(VersionedTransaction.populate(message, signatures)))
@@ -0,0 +1,107 @@
+import os
+import threading
+
+from solders.hash import Hash
+from solders.keypair import Keypair
+from solders.message import Message
+from solders.transaction import Transaction
+
+_PUBKEY_SIZE = 32
+_AMOUNT_SIZE = 8
+
+
+class MessageTemplate:
+    """
+    A serialized legacy message with patchable account keys, amount and blockhash.
+
+    Built once from instructions that use placeholder keys and a marker amount.
+    Rendering copies the bytes and overwrites those slots, so a repeated
+    transaction shape skips instruction building, message compilation and
+    serialization. Instructions refer to accounts by index, so swapping a key
+    in place keeps the message valid as long as the new key is not already
+    in the message.
+    """
+
+    def __init__(self, instructions: list, payer, placeholders: list, amount_marker: int):
+        """
+        Args:
+            instructions: Instructions built with the placeholder keys and marker amount
+            payer: The fee payer public key
+            placeholders: Placeholder public keys, in the order render() receives their replacements
+            amount_marker: The u64 amount the instructions were built with
+        """
+        message = Message.new_with_blockhash(instructions, payer, Hash.default())
+        self._message = bytes(message)
+        self.num_required_signatures = message.header.num_required_signatures
+        self._static_keys = {bytes(key) for key in message.account_keys}
+        self._key_offsets = [self._find(bytes(placeholder)) for placeholder in placeholders]
+        self._amount_offset = self._find(amount_marker.to_bytes(_AMOUNT_SIZE, 'little'))
+        # Header (3 bytes), compact-u16 key count, the keys, then the blockhash
+        key_count = len(message.account_keys)
+        self._blockhash_offset = 3 + (1 if key_count < 0x80 else 2) + key_count * _PUBKEY_SIZE
+        for placeholder in placeholders:
+            self._static_keys.discard(bytes(placeholder))
+
+    def render(self, keys: list, amount: int, recent_blockhash) -> bytes:
+        """
+        Return the serialized message with the given keys, amount and blockhash patched in.
+
+        Raises:
+            ValueError: If a key is already part of the message (it would appear twice)
+        """
+        message = bytearray(self._message)
+        for offset, key in zip(self._key_offsets, keys):
+            key_bytes = bytes(key)
+            if key_bytes in self._static_keys:
+                raise ValueError(f"{key} is already an account of this message template")
+            message[offset:offset + _PUBKEY_SIZE] = key_bytes
+        message[self._amount_offset:self._amount_offset + _AMOUNT_SIZE] = amount.to_bytes(_AMOUNT_SIZE, 'little')
+        message[self._blockhash_offset:self._blockhash_offset + _PUBKEY_SIZE] = bytes(recent_blockhash)
+        return bytes(message)
+
+    def sign(self, payer_wallet, keys: list, amount: int, recent_blockhash) -> Transaction:
+        """Render the message and sign it with the payer, returning the transaction."""
+        if self.num_required_signatures != 1:
+            raise ValueError("Only templates signed by the payer alone can be signed directly")
+        message = self.render(keys, amount, recent_blockhash)
+        signature = payer_wallet.sign_message(message)
+        # Wire format: compact-u16 signature count, signatures, message
+        return Transaction.from_bytes(bytes([1]) + bytes(signature) + message)
+
+    def _find(self, needle: bytes) -> int:
+        offset = self._message.find(needle)
+        if offset < 0 or self._message.find(needle, offset + 1) >= 0:
+            raise ValueError("Template placeholder must appear exactly once in the message")
+        return offset
+
+
+def new_placeholders(count: int) -> list:
+    """Return random public keys to build a template's instructions with."""
+    return [Keypair().pubkey() for _ in range(count)]
+
+
+def new_amount_marker() -> int:
+    """Return a random u64 to build a template's instructions with."""
+    return int.from_bytes(os.urandom(_AMOUNT_SIZE), 'little') | 1
+
+
+_templates = {}
+_templates_lock = threading.Lock()
+
+
+def get_message_template(key: tuple, factory) -> MessageTemplate:
+    """
+    Return the cached template for a transaction shape, building it on first use.
+
+    Args:
+        key: Hashable description of the shape (e.g. payer, token type, whether the ATA is created)
+        factory: Callable returning a new MessageTemplate for that shape
+    """
+    template = _templates.get(key)
+    if template is None:
+        with _templates_lock:
+            template = _templates.get(key)
+            if template is None:
+                template = factory()
+                _templates[key] = template
+    return template
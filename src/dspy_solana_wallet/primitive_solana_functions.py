@@ -1,17 +1,39 @@
 import base58
-import requests
+import base64
+import struct
 from solders.keypair import Keypair
 from solders.pubkey import Pubkey
-from solders.hash import Hash
 from solders.system_program import TransferParams, transfer
 from solders.instruction import Instruction, AccountMeta
 from solders.transaction import Transaction
-import httpx
-import time
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 
 from . import config
+from .rpc_transport import get_transport
+from .blockhash_cache import get_blockhash_provider, is_blockhash_not_found_error
+from .confirmation import get_confirmation_tracker
+from .send_pipeline import LANDED, get_transaction_sender, send_raw_transaction
+from .compute_budget import with_compute_budget
+from .shadow_ledger import LAMPORTS_PER_SIGNATURE, record_balance_changes
+from .message_templates import MessageTemplate, get_message_template, new_amount_marker, new_placeholders
 from .token_types import TokenType, ASSOCIATED_TOKEN_PROGRAM_ID
 
+# LRU cache of derived associated token addresses keyed by (owner bytes, mint, program)
+_ATA_CACHE_SIZE = config.SOLANA_ATA_CACHE_SIZE
+_ata_cache = OrderedDict()
+_ata_cache_lock = threading.Lock()
+
+# getMultipleAccounts accepts at most this many accounts per call
+MAX_ACCOUNTS_PER_REQUEST = 100
+
+# SPL Token / Token-2022 account layout: mint (32) | owner (32) | amount (u64 LE) | ...
+TOKEN_ACCOUNT_MINT_OFFSET = 0
+TOKEN_ACCOUNT_AMOUNT_OFFSET = 64
+TOKEN_ACCOUNT_AMOUNT_END = 72
+_TOKEN_AMOUNT_STRUCT = struct.Struct('<Q')
+
 def create_new_wallet():
     """Create a new Solana wallet."""
     keypair = Keypair()
@@ -30,14 +52,14 @@ def fund_wallet_with_sol_from_faucet(wallet_public_key, amount=1):
     
     print(f'requesting airdrop for {wallet_public_key} amount {amount}')
     try:
-        response = requests.post(
-            "https://api.devnet.solana.com",
-            json={
+        response = get_transport().post(
+            {
                 "jsonrpc": "2.0",
                 "id": 1,
                 "method": "requestAirdrop",
-                "params": [str(wallet_public_key), int(amount * 1_000_000_000)]  # Convert SOL to lamports
-            }
+                "params": [str(wallet_public_key), TokenType.SOL.to_token_amount(amount)]  # Convert SOL to lamports
+            },
+            url=config.FAUCET_URL
         )
         
         result = response.json()
@@ -58,15 +80,106 @@ def get_associated_token_address(wallet_address, token_type: TokenType):
 
     print(f'getting associated token address for {wallet_address} {token_type}')
 
+    return _find_associated_token_address(bytes(wallet_address), token_type.value, token_type.program_id)
+
+def derive_atas(owners: list, token_type: TokenType, processes: int = None) -> list:
+    """
+    Derive the associated token account addresses for many wallets at once.
+    
+    Owners already in the ATA cache are answered from it. Large batches of the
+    rest are spread across a process pool since each derivation is a SHA-256
+    bump-seed search; results also populate the ATA cache.
+    
+    Args:
+        owners: The wallets' public keys
+        token_type: The type of token (USDC, PYUSD, or USDG)
+        processes: Number of worker processes (defaults to the CPU count). Use 1 to stay in-process
+        
+    Returns:
+        list: The associated token account Pubkeys, in input order
+    """
+    owner_bytes = [bytes(owner) for owner in owners]
+
+    if processes == 1 or len(owner_bytes) < config.SOLANA_ATA_PARALLEL_THRESHOLD:
+        return [
+            _find_associated_token_address(owner, token_type.value, token_type.program_id)
+            for owner in owner_bytes
+        ]
+
+    atas = [None] * len(owner_bytes)
+    with _ata_cache_lock:
+        for index, owner in enumerate(owner_bytes):
+            key = (owner, token_type.value, token_type.program_id)
+            ata = _ata_cache.get(key)
+            if ata is not None:
+                _ata_cache.move_to_end(key)
+                atas[index] = ata
+    misses = [index for index, ata in enumerate(atas) if ata is None]
+    missing_owners = [owner_bytes[index] for index in misses]
+
+    if len(misses) < config.SOLANA_ATA_PARALLEL_THRESHOLD:
+        for index, owner in zip(misses, missing_owners):
+            atas[index] = _find_associated_token_address(owner, token_type.value, token_type.program_id)
+        return atas
+
+    chunk_size = config.SOLANA_ATA_PARALLEL_CHUNK_SIZE
+    chunks = [missing_owners[i:i + chunk_size] for i in range(0, len(missing_owners), chunk_size)]
+
+    print(f'deriving {len(misses)} associated token addresses for {token_type} across a process pool')
+
+    derived = []
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        for chunk_atas in executor.map(
+            _derive_ata_chunk,
+            chunks,
+            [token_type.value] * len(chunks),
+            [token_type.program_id] * len(chunks)
+        ):
+            derived.extend(Pubkey.from_bytes(ata) for ata in chunk_atas)
+
+    for index, ata in zip(misses, derived):
+        atas[index] = ata
+    if len(derived) <= _ATA_CACHE_SIZE:
+        # Warm the cache so later lookups for these owners skip the search
+        for owner, ata in zip(missing_owners, derived):
+            _ata_cache_put(owner, token_type.value, token_type.program_id, ata)
+
+    return atas
+
+def _find_associated_token_address(owner: bytes, mint: str, program_id: str) -> Pubkey:
+    """Derive an ATA, memoized in an LRU cache keyed by (owner, mint, program)."""
+    key = (owner, mint, program_id)
+    with _ata_cache_lock:
+        ata = _ata_cache.get(key)
+        if ata is not None:
+            _ata_cache.move_to_end(key)
+            return ata
+
+    ata = _derive_ata(owner, mint, program_id)
+    _ata_cache_put(owner, mint, program_id, ata)
+    return ata
+
+def _ata_cache_put(owner: bytes, mint: str, program_id: str, ata: Pubkey):
+    with _ata_cache_lock:
+        _ata_cache[(owner, mint, program_id)] = ata
+        _ata_cache.move_to_end((owner, mint, program_id))
+        while len(_ata_cache) > _ATA_CACHE_SIZE:
+            _ata_cache.popitem(last=False)
+
+def _derive_ata(owner: bytes, mint: str, program_id: str) -> Pubkey:
     return Pubkey.find_program_address(
         [
-            bytes(wallet_address),
-            bytes(Pubkey.from_string(token_type.program_id)),
-            bytes(Pubkey.from_string(token_type.value))
+            owner,
+            bytes(Pubkey.from_string(program_id)),
+            bytes(Pubkey.from_string(mint))
         ],
         Pubkey.from_string(ASSOCIATED_TOKEN_PROGRAM_ID)
     )[0]
 
+def _derive_ata_chunk(owners: list, mint: str, program_id: str) -> list:
+    """Process pool worker: derive ATAs for a chunk of owners, returned as raw bytes."""
+    return [bytes(_derive_ata(owner, mint, program_id)) for owner in owners]
+
 def create_associated_token_account_instruction(
     payer: Pubkey,
     owner: Pubkey,
@@ -89,28 +202,102 @@ def create_associated_token_account_instruction(
         data=bytes([1])  # Create instruction
     )
 
-def create_associated_token_account_transaction(funding_wallet, to_wallet_public_key, token_type):
+def create_associated_token_account_transaction(funding_wallet, to_wallet_public_key, token_type, recent_blockhash=None, compute_budget=None):
     """Create a transaction for creating an associated token account."""
+    print(f'creating associated token account for {to_wallet_public_key} {token_type}')
+    
+    instructions = _create_ata_instructions(funding_wallet.pubkey(), to_wallet_public_key, token_type)
+
+    # Get recent blockhash
+    recent_blockhash = recent_blockhash or _get_latest_blockhash()
+
+    # Create transaction
+    transaction = Transaction.new_with_payer(
+        with_compute_budget(instructions, funding_wallet.pubkey(), compute_budget),
+        funding_wallet.pubkey()
+    )
+    
+    # Sign the transaction
+    transaction.sign([funding_wallet], recent_blockhash)
+    
+    return transaction
+
+def _create_ata_instructions(funding_pubkey, to_wallet_public_key, token_type) -> list:
+    """Build the instruction creating the recipient's associated token account."""
     # Get associated token account
     to_token_account = get_associated_token_address(to_wallet_public_key, token_type)
     mint_pubkey = Pubkey.from_string(token_type.value)
 
-    print(f'creating associated token account for {to_wallet_public_key} {token_type}')
-    
-    create_ata_ix = create_associated_token_account_instruction(
-        funding_wallet.pubkey(),
+    return [create_associated_token_account_instruction(
+        funding_pubkey,
         to_wallet_public_key,
         mint_pubkey,
         to_token_account,
         token_type
+    )]
+
+def create_token_transfer_transaction(funding_wallet, to_wallet_public_key, token_type, amount, recent_blockhash=None, compute_budget=None):
+    """Create a transaction for transferring tokens."""
+    return _create_token_transfer_transaction(
+        funding_wallet,
+        to_wallet_public_key,
+        token_type,
+        amount,
+        create_ata=False,
+        recent_blockhash=recent_blockhash,
+        compute_budget=compute_budget
+    )
+
+def create_ata_and_token_transfer_transaction(funding_wallet, to_wallet_public_key, token_type, amount, recent_blockhash=None, compute_budget=None):
+    """
+    Create a single transaction that creates the recipient's associated token account
+    if it does not exist yet and then transfers tokens to it.
+    
+    The ATA instruction is the idempotent create, so it is a no-op when the
+    account already exists.
+    """
+    return _create_token_transfer_transaction(
+        funding_wallet,
+        to_wallet_public_key,
+        token_type,
+        amount,
+        create_ata=True,
+        recent_blockhash=recent_blockhash,
+        compute_budget=compute_budget
+    )
+
+def _create_token_transfer_transaction(funding_wallet, to_wallet_public_key, token_type, amount, create_ata, recent_blockhash=None,
+                                       compute_budget=None):
+    """Build and sign a token transfer transaction, optionally prefixed by an idempotent ATA create."""
+    if _use_message_templates():
+        template = get_message_template(
+            ("token_transfer", funding_wallet.pubkey(), token_type, create_ata),
+            lambda: _token_transfer_template(funding_wallet.pubkey(), token_type, create_ata)
+        )
+        # The recipient wallet itself is only an account of the message when its ATA is created
+        keys = [get_associated_token_address(to_wallet_public_key, token_type)]
+        if create_ata:
+            keys.insert(0, to_wallet_public_key)
+        try:
+            return template.sign(funding_wallet, keys, amount, recent_blockhash or _get_latest_blockhash())
+        except ValueError:
+            # e.g. sending to the funding wallet itself; build the message from scratch
+            pass
+
+    instructions = _token_transfer_instructions(
+        funding_wallet.pubkey(),
+        to_wallet_public_key,
+        token_type,
+        amount,
+        create_ata
     )
 
     # Get recent blockhash
-    recent_blockhash = _get_latest_blockhash()
+    recent_blockhash = recent_blockhash or _get_latest_blockhash()
 
     # Create transaction
     transaction = Transaction.new_with_payer(
-        [create_ata_ix],
+        with_compute_budget(instructions, funding_wallet.pubkey(), compute_budget),
         funding_wallet.pubkey()
     )
     
@@ -119,70 +306,119 @@ def create_associated_token_account_transaction(funding_wallet, to_wallet_public
     
     return transaction
 
-def create_token_transfer_transaction(funding_wallet, to_wallet_public_key, token_type, amount):
-    """Create a transaction for transferring tokens."""
+def _token_transfer_instructions(funding_pubkey, to_wallet_public_key, token_type, amount, create_ata, to_token_account=None) -> list:
+    """Build the instructions that move tokens from the funding wallet's ATA to the recipient's ATA."""
     # Get associated token accounts
-    from_token_account = get_associated_token_address(funding_wallet.pubkey(), token_type)
-    to_token_account = get_associated_token_address(to_wallet_public_key, token_type)
+    from_token_account = get_associated_token_address(funding_pubkey, token_type)
+    if to_token_account is None:
+        to_token_account = get_associated_token_address(to_wallet_public_key, token_type)
 
     mint_pubkey = Pubkey.from_string(token_type.value)
+
+    instructions = []
+    if create_ata:
+        instructions.append(create_associated_token_account_instruction(
+            funding_pubkey,
+            to_wallet_public_key,
+            mint_pubkey,
+            to_token_account,
+            token_type
+        ))
+
     # Create transfer instruction
-    transfer_ix = _transfer_token_instruction(
+    instructions.append(_transfer_token_instruction(
         from_token_account,
         to_token_account,
-        funding_wallet.pubkey(),
+        funding_pubkey,
         mint_pubkey,
         amount,
         token_type
-    )
+    ))
+    return instructions
+
+
+def _use_message_templates() -> bool:
+    # Compute budget instructions are sized per send, so they cannot come from a template
+    return config.SOLANA_MESSAGE_TEMPLATES_ENABLED and not config.SOLANA_COMPUTE_BUDGET_ENABLED
+
+def _token_transfer_template(funding_pubkey, token_type, create_ata) -> MessageTemplate:
+    """Build the message template for token transfers from one funding wallet."""
+    recipient, = new_placeholders(1)
+    amount_marker = new_amount_marker()
+    # Derived without the ATA cache, which should not fill up with random placeholder keys
+    recipient_ata = _derive_ata(bytes(recipient), token_type.value, token_type.program_id)
+    instructions = _token_transfer_instructions(funding_pubkey, recipient, token_type, amount_marker, create_ata, recipient_ata)
+    placeholders = [recipient_ata]
+    if create_ata:
+        placeholders.insert(0, recipient)
+    return MessageTemplate(instructions, funding_pubkey, placeholders, amount_marker)
+
+def _sol_transfer_template(from_pubkey) -> MessageTemplate:
+    """Build the message template for SOL transfers from one wallet."""
+    recipient, = new_placeholders(1)
+    amount_marker = new_amount_marker()
+    transfer_ix = transfer(TransferParams(from_pubkey=from_pubkey, to_pubkey=recipient, lamports=amount_marker))
+    return MessageTemplate([transfer_ix], from_pubkey, [recipient], amount_marker)
+
+def create_sol_transfer_transaction(from_wallet, to_wallet_public_key, amount, recent_blockhash=None, compute_budget=None):
+    """Create a transaction for transferring SOL."""
+    if _use_message_templates():
+        template = get_message_template(("sol_transfer", from_wallet.pubkey()), lambda: _sol_transfer_template(from_wallet.pubkey()))
+        try:
+            return template.sign(
+                from_wallet,
+                [to_wallet_public_key],
+                TokenType.SOL.to_token_amount(amount),  # Convert SOL to lamports
+                recent_blockhash or _get_latest_blockhash()
+            )
+        except ValueError:
+            # e.g. sending to the sender itself; build the message from scratch
+            pass
+
+    print('executing transfer')
+    instructions = _sol_transfer_instructions(from_wallet.pubkey(), to_wallet_public_key, amount)
+
+    print('transfer instruction created')
 
     # Get recent blockhash
-    recent_blockhash = _get_latest_blockhash()
+    recent_blockhash = recent_blockhash or _get_latest_blockhash()
 
     # Create transaction
     transaction = Transaction.new_with_payer(
-        [transfer_ix],
-        funding_wallet.pubkey()
+        with_compute_budget(instructions, from_wallet.pubkey(), compute_budget),
+        from_wallet.pubkey()
     )
     
     # Sign the transaction
-    transaction.sign([funding_wallet], recent_blockhash)
+    transaction.sign([from_wallet], recent_blockhash)
     
     return transaction
 
+def _sol_transfer_instructions(from_pubkey, to_wallet_public_key, amount) -> list:
+    """Build the system transfer instruction moving amount SOL to the recipient."""
+    params = TransferParams(
+        from_pubkey=from_pubkey,
+        to_pubkey=to_wallet_public_key,
+        lamports=TokenType.SOL.to_token_amount(amount)  # Convert SOL to lamports
+    )
+    return [transfer(params)]
 
 def transfer_sol(from_wallet, to_wallet_public_key, amount):
     """Transfer SOL from one wallet to another."""
     # Create transfer instruction
     try:
         print('attempting to transfer sol')
-        params = TransferParams(
-            from_pubkey=from_wallet.pubkey(),
-            to_pubkey=to_wallet_public_key,
-            lamports=int(amount * 1_000_000_000)  # Convert SOL to lamports
-        )
-
-        print('executing transfer')
-        transfer_ix = transfer(params)
-
-        print('transfer instruction created')
-
-        # Get recent blockhash
-        recent_blockhash = _get_latest_blockhash()
-
-        # Create transaction
-        transaction = Transaction.new_with_payer(
-            [transfer_ix],
-            from_wallet.pubkey()
-        )
-        
-        # Sign the transaction
-        transaction.sign([from_wallet], recent_blockhash)
+        transaction = create_sol_transfer_transaction(from_wallet, to_wallet_public_key, amount)
         
         print(f'transaction created')
         # Execute the transaction
-        result = _send_transaction(bytes(transaction))
+        result = _broadcast_transaction(transaction)
         print(f"SOL transfer initiated. Transaction signature: {result}")
+        lamports = TokenType.SOL.to_token_amount(amount)
+        record_balance_changes(result, [
+            (from_wallet.pubkey(), TokenType.SOL, -(lamports + LAMPORTS_PER_SIGNATURE)),
+            (to_wallet_public_key, TokenType.SOL, lamports),
+        ], confirmed=config.SOLANA_REBROADCAST_UNTIL_CONFIRMED)
         return True
     except Exception as e:
         print(f'error sending transaction: {e}')
@@ -202,9 +438,15 @@ def create_associated_token_account(funding_wallet, owner_public_key, token_type
         result = _broadcast_transaction(ata_transaction)
         print(f"ATA creation transaction signature: {result}")
         
-        # Wait 5 seconds for transaction to be processed
-        print("Waiting 5 seconds for ATA creation to be processed...")
-        time.sleep(5)
+        if not config.SOLANA_REBROADCAST_UNTIL_CONFIRMED:
+            # Wait for the transaction to be confirmed instead of sleeping a fixed amount
+            print("Waiting for ATA creation to be confirmed...")
+            status = get_confirmation_tracker().wait(result, "confirmed")
+            if status is None:
+                print(f"ATA creation not confirmed within {config.SOLANA_CONFIRMATION_TIMEOUT_SECONDS} seconds")
+            elif status.get("err") is not None:
+                print(f"ATA creation failed: {status['err']}")
+                return False
         
         return result
     except Exception as e:
@@ -230,12 +472,49 @@ def transfer_token(funding_wallet, recipient_public_key, token_type, amount):
         )
         result = _broadcast_transaction(transfer_transaction)
         print(f"Token transfer transaction signature: {result}")
+        _record_token_transfer(result, funding_wallet.pubkey(), recipient_public_key, token_type, converted_amount)
 
         return True
     except Exception as e:
         print(f'error creating token transfer transaction: {e}')
         return False
     
+def transfer_token_with_ata(funding_wallet, recipient_public_key, token_type, amount):
+    """
+    Create the recipient's associated token account if needed and transfer tokens to it
+    in one atomic transaction.
+    """
+    print(f'creating token transfer transaction with associated token account')
+    print(f'DEBUG: Original amount: {amount}')
+    print(f'DEBUG: Token type: {token_type.name}')
+    
+    converted_amount = token_type.to_token_amount(amount)
+    print(f'DEBUG: Converted amount: {converted_amount}')
+    
+    try:
+        transfer_transaction = create_ata_and_token_transfer_transaction(
+            funding_wallet,
+            recipient_public_key,
+            token_type,
+            converted_amount
+        )
+        result = _broadcast_transaction(transfer_transaction)
+        print(f"Token transfer with ATA transaction signature: {result}")
+        _record_token_transfer(result, funding_wallet.pubkey(), recipient_public_key, token_type, converted_amount)
+
+        return True
+    except Exception as e:
+        print(f'error creating token transfer with ATA transaction: {e}')
+        return False
+    
+def _record_token_transfer(signature, funding_pubkey, recipient_public_key, token_type, converted_amount):
+    """Record a token transfer's balance changes in the shadow ledger."""
+    record_balance_changes(signature, [
+        (funding_pubkey, token_type, -converted_amount),
+        (recipient_public_key, token_type, converted_amount),
+        (funding_pubkey, TokenType.SOL, -LAMPORTS_PER_SIGNATURE),
+    ], confirmed=config.SOLANA_REBROADCAST_UNTIL_CONFIRMED)
+
 def get_balance(wallet_address: Pubkey, token_type: TokenType) -> int:
     """
     Get the balance for a wallet, either SOL or a specific token.
@@ -250,67 +529,165 @@ def get_balance(wallet_address: Pubkey, token_type: TokenType) -> int:
     try:
         # Prepare RPC request
         if token_type == TokenType.SOL:
-            method = "getBalance"
-            params = [str(wallet_address)]
             print(f'trying to get sol balance')
-        else:
-            method = "getTokenAccountBalance"
-            ata = get_associated_token_address(wallet_address, token_type)
-            print(f'ata retrieved: {ata}')
-            params = [str(ata)]
+        method, params = _balance_request(wallet_address, token_type)
 
         # Make RPC request
         result = _make_rpc_request(method, params)
 
-        # Handle errors
+        return _parse_balance_response(result, token_type)
+
+    except Exception as e:
+        print(f"Error getting {token_type.name} balance: {str(e)}")
+        return -1 
+
+def get_balances(balance_requests: list) -> list:
+    """
+    Get balances for many (wallet, token type) pairs using JSON-RPC batch requests.
+    
+    Args:
+        balance_requests: A list of (wallet_address, token_type) tuples
+        
+    Returns:
+        list: One balance per request in input order, in raw units. Each entry
+        follows get_balance semantics: 0 when the token account does not exist
+        and -1 when that particular lookup failed.
+    """
+    balances = [-1] * len(balance_requests)
+    calls = []
+    call_indexes = []
+
+    for index, (wallet_address, token_type) in enumerate(balance_requests):
+        try:
+            calls.append(_balance_request(wallet_address, token_type))
+            call_indexes.append(index)
+        except Exception as e:
+            print(f"Error preparing {token_type.name} balance request for {wallet_address}: {str(e)}")
+
+    print(f'getting {len(calls)} balances in batches')
+    responses = get_transport().call_batch(calls)
+
+    for index, result in zip(call_indexes, responses):
+        token_type = balance_requests[index][1]
+        try:
+            balances[index] = _parse_balance_response(result, token_type)
+        except Exception as e:
+            print(f"Error getting {token_type.name} balance: {str(e)}")
+
+    return balances
+
+def get_token_balances(wallet_addresses: list, token_type: TokenType) -> list:
+    """
+    Get token balances for many wallets by reading their ATAs with getMultipleAccounts.
+    
+    Up to MAX_ACCOUNTS_PER_REQUEST accounts are fetched per call (and several calls are
+    sent per HTTP request as a JSON-RPC batch). Only the first 72 bytes of each account
+    are requested and the amount is decoded locally from the SPL Token / Token-2022
+    account layout.
+    
+    Args:
+        wallet_addresses: The wallets' public keys
+        token_type: The type of token to check (USDG, PYUSD, or USDC)
+        
+    Returns:
+        list: One balance per wallet in input order, in token units. Follows get_balance
+        semantics: 0 when the ATA does not exist and -1 when the lookup failed.
+    """
+    if token_type == TokenType.SOL:
+        raise ValueError("get_token_balances only supports SPL tokens; use get_balances for SOL")
+
+    atas = derive_atas(wallet_addresses, token_type)
+    mint = bytes(Pubkey.from_string(token_type.value))
+
+    calls = [
+        (
+            "getMultipleAccounts",
+            [
+                [str(ata) for ata in atas[start:start + MAX_ACCOUNTS_PER_REQUEST]],
+                {"encoding": "base64", "dataSlice": {"offset": 0, "length": TOKEN_ACCOUNT_AMOUNT_END}}
+            ]
+        )
+        for start in range(0, len(atas), MAX_ACCOUNTS_PER_REQUEST)
+    ]
+    print(f'getting {len(atas)} {token_type.name} balances with {len(calls)} getMultipleAccounts calls')
+
+    balances = []
+    for (_, params), result in zip(calls, get_transport().call_batch(calls)):
+        count = len(params[0])
         if "error" in result:
             print(f"RPC Error: {result['error']}")
-            if "could not find account" in result['error']['message']:
-                print(f"ATA does not exist. So balance is 0")
-                return 0
-            return -1
-
-        if not result.get('result', {}).get('value'):
-            print(f"No {token_type.name} balance found.")
+            balances.extend([-1] * count)
+            continue
+
+        for account in result['result']['value']:
+            try:
+                balances.append(_decode_token_account_amount(account, token_type.program_id, mint))
+            except Exception as e:
+                print(f"Error decoding {token_type.name} token account: {str(e)}")
+                balances.append(-1)
+
+    return balances
+
+def _decode_token_account_amount(account: dict, program_id: str, mint: bytes) -> int:
+    """Decode the amount of an SPL Token / Token-2022 account from a getMultipleAccounts entry."""
+    if account is None:
+        # Same as the "could not find account" case: no ATA means a zero balance
+        return 0
+
+    if account['owner'] != program_id:
+        raise ValueError(f"Account is owned by {account['owner']}, expected {program_id}")
+
+    data = base64.b64decode(account['data'][0])
+    if len(data) < TOKEN_ACCOUNT_AMOUNT_END:
+        raise ValueError(f"Token account data is {len(data)} bytes, expected at least {TOKEN_ACCOUNT_AMOUNT_END}")
+
+    view = memoryview(data)
+    if view[TOKEN_ACCOUNT_MINT_OFFSET:TOKEN_ACCOUNT_MINT_OFFSET + 32] != mint:
+        raise ValueError("Token account mint does not match the requested token")
+
+    # Read the little-endian u64 amount in place
+    return _TOKEN_AMOUNT_STRUCT.unpack_from(view, TOKEN_ACCOUNT_AMOUNT_OFFSET)[0]
+
+def _balance_request(wallet_address, token_type: TokenType) -> tuple:
+    """Build the (method, params) RPC call that reads a wallet's balance for a token type."""
+    if token_type == TokenType.SOL:
+        return "getBalance", [str(wallet_address)]
+
+    ata = get_associated_token_address(wallet_address, token_type)
+    print(f'ata retrieved: {ata}')
+    return "getTokenAccountBalance", [str(ata)]
+
+def _parse_balance_response(result: dict, token_type: TokenType) -> int:
+    """Extract a raw balance from a getBalance/getTokenAccountBalance response."""
+    # Handle errors
+    if "error" in result:
+        print(f"RPC Error: {result['error']}")
+        if "could not find account" in result['error']['message']:
+            print(f"ATA does not exist. So balance is 0")
             return 0
+        return -1
 
-        print(f'result: {result}')
-        # Extract raw value
-        raw_value = result['result']['value']['amount'] if token_type != TokenType.SOL else result['result']['value']
+    if not result.get('result', {}).get('value'):
+        print(f"No {token_type.name} balance found.")
+        return 0
 
-        return int(raw_value)
+    print(f'result: {result}')
+    # Extract raw value
+    raw_value = result['result']['value']['amount'] if token_type != TokenType.SOL else result['result']['value']
 
-    except Exception as e:
-        print(f"Error getting {token_type.name} balance: {str(e)}")
-        return -1 
+    return int(raw_value)
 
 def _send_rpc_request(method, params=None):
     """Send an RPC request to the Solana node."""
-    headers = {"Content-Type": "application/json"}
-    data = {
-        "jsonrpc": "2.0",
-        "id": 1,
-        "method": method,
-        "params": params or []
-    }
-    
-    response = httpx.post(config.FAUCET_URL, json=data, headers=headers)
-    return response.json()
+    return get_transport().call(method, params)
 
 def _send_transaction(transaction_bytes):
     """Send a transaction to the Solana node."""
-    params = [
-        base58.b58encode(transaction_bytes).decode('ascii'),
-        {"skipPreflight": True, "preflightCommitment": "processed"}
-    ]
-    response = _send_rpc_request("sendTransaction", params)
-    return response["result"]
+    return send_raw_transaction(transaction_bytes)
 
 def _get_latest_blockhash():
-    """Get the latest blockhash from the Solana node."""
-    response = _send_rpc_request("getLatestBlockhash")
-    blockhash_str = response["result"]["value"]["blockhash"]
-    return Hash.from_string(blockhash_str)
+    """Get a recent blockhash from the shared blockhash cache."""
+    return get_blockhash_provider().get()
 
 def _make_rpc_request(method: str, params: list) -> dict:
     """
@@ -323,21 +700,23 @@ def _make_rpc_request(method: str, params: list) -> dict:
     Returns:
         dict: The JSON response from the RPC call
     """
-    RPC_URL = "https://api.devnet.solana.com"
-    payload = {
-        "jsonrpc": "2.0",
-        "id": 1,
-        "method": method,
-        "params": params
-    }
-    
-    response = httpx.post(RPC_URL, json=payload)
-    return response.json()
+    return get_transport().call(method, params)
 
 def _broadcast_transaction(transaction):
-    """Broadcast a signed transaction to the network."""
-    result = _send_transaction(bytes(transaction))
-    return result
+    """
+    Broadcast a signed transaction to the network.
+    
+    When SOLANA_REBROADCAST_UNTIL_CONFIRMED is set the transaction is re-sent until it
+    is confirmed, and an exception is raised if it fails or its blockhash expires.
+    """
+    if not config.SOLANA_REBROADCAST_UNTIL_CONFIRMED:
+        return _send_transaction(bytes(transaction))
+
+    outcome = get_transaction_sender().send(transaction)
+    print(f"Transaction {outcome['signature']} {outcome['status']} after {outcome['attempts']} attempts")
+    if outcome['status'] != LANDED:
+        raise Exception(f"Transaction {outcome['status']}: {outcome['error']}")
+    return outcome['signature']
   
 def _transfer_token_instruction(
     source: Pubkey,
@@ -0,0 +1,488 @@
+import asyncio
+import threading
+import time
+import weakref
+
+import httpx
+
+from dspy_wallet_common.endpoint_router import EndpointRouter
+
+from . import config
+
+# Methods that must not be sent to more than one endpoint per call
+NON_IDEMPOTENT_METHODS = frozenset({"sendTransaction", "requestAirdrop"})
+
+
+class RpcTransport:
+    """
+    Process-wide HTTP transport for Solana JSON-RPC traffic.
+
+    Wraps a single pooled, keep-alive httpx.Client so repeated RPC calls reuse
+    the same TLS connections instead of opening a new one per request. Requests
+    that do not name a URL are routed across the configured endpoints by an
+    EndpointRouter.
+
+    Endpoints can lag each other by a few slots, so a blockhash read from one
+    may not be known to another yet. sendTransaction therefore goes to the
+    endpoint that answered this transport's latest getLatestBlockhash, unless
+    that endpoint has been ejected.
+    """
+
+    _client_class = httpx.Client
+
+    def __init__(
+        self,
+        url: str = None,
+        max_connections: int = None,
+        max_keepalive_connections: int = None,
+        keepalive_expiry: float = None,
+        http2: bool = None,
+        timeout: float = None,
+        urls: list = None,
+        hedge_after: float = None,
+        eject_seconds: float = None,
+    ):
+        """
+        Args:
+            url: Default RPC endpoint used when a request does not name one
+            max_connections: Maximum number of open connections in the pool
+            max_keepalive_connections: Maximum number of idle connections kept alive
+            keepalive_expiry: Seconds an idle connection is kept before closing
+            http2: Whether to negotiate HTTP/2 (requires the 'h2' package)
+            timeout: Default per-request timeout in seconds
+            urls: Endpoints to route between (defaults to [url], or SOLANA_RPC_URLS when url is not given)
+            hedge_after: Seconds before an idempotent request is hedged to a second endpoint (0 disables)
+            eject_seconds: Seconds a failing endpoint is ejected before being probed again
+        """
+        urls = urls or ([url] if url else config.SOLANA_RPC_URLS)
+        self.url = urls[0]
+        self.router = EndpointRouter(
+            urls,
+            hedge_after=hedge_after if hedge_after is not None else config.SOLANA_RPC_HEDGE_AFTER,
+            eject_seconds=eject_seconds if eject_seconds is not None else config.SOLANA_RPC_EJECT_SECONDS,
+        )
+        self.max_connections = max_connections or config.SOLANA_RPC_MAX_CONNECTIONS
+        self.max_keepalive_connections = max_keepalive_connections or config.SOLANA_RPC_MAX_KEEPALIVE_CONNECTIONS
+        self.keepalive_expiry = keepalive_expiry if keepalive_expiry is not None else config.SOLANA_RPC_KEEPALIVE_EXPIRY
+        self.http2 = config.SOLANA_RPC_HTTP2 if http2 is None else http2
+        self.timeout = timeout or config.SOLANA_RPC_TIMEOUT
+
+        self._client = self._new_client()
+        self._blockhash_url = None
+
+        self._stats_lock = threading.Lock()
+        self._requests = 0
+        self._errors = 0
+        self._in_flight = 0
+        self._peak_in_flight = 0
+        self._total_seconds = 0.0
+
+    def post(self, payload, url: str = None, timeout: float = None) -> httpx.Response:
+        """
+        POST a JSON payload over the pooled client.
+
+        Without a url the request is routed to the best endpoint. Reads fail over
+        to the next endpoint on errors, HTTP 429 and 5xx responses, and may be hedged.
+
+        Args:
+            payload: The JSON-serializable request body
+            url: Endpoint to send to (defaults to the router's choice)
+            timeout: Per-request timeout in seconds (defaults to the transport's timeout)
+
+        Returns:
+            httpx.Response: The raw HTTP response
+        """
+        if url:
+            return self._post(payload, url, timeout)
+        endpoint, response = self.router.execute(
+            lambda endpoint: (endpoint, self._post(payload, endpoint, timeout)),
+            idempotent=_is_idempotent(payload),
+            failed=lambda result: _is_retryable_response(result[1]),
+            prefer=self._preferred_endpoint(payload),
+        )
+        self._served(payload, endpoint, response)
+        return response
+
+    def _post(self, payload, url: str, timeout: float = None) -> httpx.Response:
+        with self._stats_lock:
+            self._requests += 1
+            self._in_flight += 1
+            self._peak_in_flight = max(self._peak_in_flight, self._in_flight)
+
+        started = time.monotonic()
+        try:
+            return self._client.post(
+                url,
+                json=payload,
+                timeout=timeout if timeout is not None else self.timeout,
+            )
+        except Exception:
+            with self._stats_lock:
+                self._errors += 1
+            raise
+        finally:
+            elapsed = time.monotonic() - started
+            with self._stats_lock:
+                self._in_flight -= 1
+                self._total_seconds += elapsed
+
+    def call(self, method: str, params: list = None, url: str = None, timeout: float = None) -> dict:
+        """
+        Make a single JSON-RPC call.
+
+        Args:
+            method: The RPC method to call
+            params: The parameters for the RPC call
+            url: Endpoint to send to (defaults to the transport's url)
+            timeout: Per-request timeout in seconds
+
+        Returns:
+            dict: The JSON response from the RPC call
+        """
+        payload = {
+            "jsonrpc": "2.0",
+            "id": 1,
+            "method": method,
+            "params": params or []
+        }
+        return self.post(payload, url=url, timeout=timeout).json()
+
+    def call_batch(self, calls: list, batch_size: int = None, url: str = None, timeout: float = None) -> list:
+        """
+        Make many JSON-RPC calls using batch arrays, chunked to the provider's limit.
+
+        Args:
+            calls: A list of (method, params) tuples
+            batch_size: Maximum number of calls per HTTP request
+            url: Endpoint to send to (defaults to the transport's url)
+            timeout: Per-request timeout in seconds
+
+        Returns:
+            list: One JSON-RPC response dict per call, in input order. A call whose
+            response is missing or whose chunk failed gets an {"error": ...} entry.
+        """
+        responses = [None] * len(calls)
+
+        for start, payload in _batch_payloads(calls, batch_size):
+            try:
+                body = self.post(payload, url=url, timeout=timeout).json()
+            except Exception as e:
+                body = {"error": {"code": -32603, "message": str(e)}}
+            _collect_batch_responses(responses, start, len(payload), body)
+
+        return _fill_missing_responses(responses)
+
+    def stats(self) -> dict:
+        """
+        Return connection pool and request statistics for sizing the pool.
+
+        Returns:
+            dict: Configured limits, open/idle connection counts and request counters
+        """
+        connections = self._pool_connections()
+        idle = sum(1 for connection in connections if _is_idle(connection))
+
+        with self._stats_lock:
+            requests_made = self._requests
+            return {
+                "url": self.url,
+                "http2": self.http2,
+                "max_connections": self.max_connections,
+                "max_keepalive_connections": self.max_keepalive_connections,
+                "open_connections": len(connections),
+                "idle_connections": idle,
+                "active_connections": len(connections) - idle,
+                "requests": requests_made,
+                "errors": self._errors,
+                "in_flight": self._in_flight,
+                "peak_in_flight": self._peak_in_flight,
+                "average_latency_seconds": self._total_seconds / requests_made if requests_made else 0.0,
+                "endpoints": self.router.stats(),
+            }
+
+    def close(self):
+        """Close the pooled client and all of its connections."""
+        self._client.close()
+        self.router.close()
+
+    def _preferred_endpoint(self, payload) -> str:
+        # Send a transaction where its blockhash most likely came from
+        return self._blockhash_url if _method(payload) == "sendTransaction" else None
+
+    def _served(self, payload, endpoint: str, response: httpx.Response):
+        if _method(payload) == "getLatestBlockhash" and not _is_retryable_response(response):
+            self._blockhash_url = endpoint
+
+    def _new_client(self):
+        return self._client_class(
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_keepalive_connections,
+                keepalive_expiry=self.keepalive_expiry,
+            ),
+            timeout=self.timeout,
+            http2=self.http2,
+            headers={"Content-Type": "application/json"},
+        )
+
+    def _pool_connections(self) -> list:
+        # httpx does not expose its pool publicly; read the httpcore pool if present.
+        pool = getattr(getattr(self._client, "_transport", None), "_pool", None)
+        return list(getattr(pool, "connections", []) or [])
+
+
+class AsyncRpcTransport(RpcTransport):
+    """
+    asyncio counterpart of RpcTransport built on a shared, pooled httpx.AsyncClient.
+
+    Takes the same options as RpcTransport; post, call and call_batch are coroutines.
+    Pooled connections belong to the event loop that opened them, so each
+    running loop gets its own client (e.g. successive asyncio.run calls).
+    """
+
+    _client_class = httpx.AsyncClient
+
+    @property
+    def _client(self) -> httpx.AsyncClient:
+        loop = _running_loop()
+        if loop is None:
+            return self._unbound_client
+        clients = self.__dict__.setdefault("_clients", weakref.WeakKeyDictionary())
+        client = clients.get(loop)
+        if client is None:
+            # The client created outside any loop is adopted by the first loop that uses it
+            client = self.__dict__.pop("_unbound", None) or self._new_client()
+            clients[loop] = client
+        return client
+
+    @_client.setter
+    def _client(self, client: httpx.AsyncClient):
+        loop = _running_loop()
+        if loop is None:
+            self.__dict__["_unbound"] = client
+        else:
+            self.__dict__.setdefault("_clients", weakref.WeakKeyDictionary())[loop] = client
+
+    @property
+    def _unbound_client(self) -> httpx.AsyncClient:
+        if "_unbound" not in self.__dict__:
+            self.__dict__["_unbound"] = self._new_client()
+        return self.__dict__["_unbound"]
+
+    async def post(self, payload, url: str = None, timeout: float = None) -> httpx.Response:
+        """
+        POST a JSON payload over the pooled async client. See RpcTransport.post.
+
+        Args:
+            payload: The JSON-serializable request body
+            url: Endpoint to send to (defaults to the router's choice)
+            timeout: Per-request timeout in seconds (defaults to the transport's timeout)
+
+        Returns:
+            httpx.Response: The raw HTTP response
+        """
+        if url:
+            return await self._post(payload, url, timeout)
+
+        async def request(endpoint):
+            return endpoint, await self._post(payload, endpoint, timeout)
+
+        endpoint, response = await self.router.execute_async(
+            request,
+            idempotent=_is_idempotent(payload),
+            failed=lambda result: _is_retryable_response(result[1]),
+            prefer=self._preferred_endpoint(payload),
+        )
+        self._served(payload, endpoint, response)
+        return response
+
+    async def _post(self, payload, url: str, timeout: float = None) -> httpx.Response:
+        with self._stats_lock:
+            self._requests += 1
+            self._in_flight += 1
+            self._peak_in_flight = max(self._peak_in_flight, self._in_flight)
+
+        started = time.monotonic()
+        try:
+            return await self._client.post(
+                url,
+                json=payload,
+                timeout=timeout if timeout is not None else self.timeout,
+            )
+        except Exception:
+            with self._stats_lock:
+                self._errors += 1
+            raise
+        finally:
+            elapsed = time.monotonic() - started
+            with self._stats_lock:
+                self._in_flight -= 1
+                self._total_seconds += elapsed
+
+    async def call(self, method: str, params: list = None, url: str = None, timeout: float = None) -> dict:
+        """Make a single JSON-RPC call. See RpcTransport.call."""
+        payload = {
+            "jsonrpc": "2.0",
+            "id": 1,
+            "method": method,
+            "params": params or []
+        }
+        response = await self.post(payload, url=url, timeout=timeout)
+        return response.json()
+
+    async def call_batch(self, calls: list, batch_size: int = None, url: str = None, timeout: float = None) -> list:
+        """Make many JSON-RPC calls using batch arrays. See RpcTransport.call_batch."""
+        responses = [None] * len(calls)
+
+        for start, payload in _batch_payloads(calls, batch_size):
+            try:
+                response = await self.post(payload, url=url, timeout=timeout)
+                body = response.json()
+            except Exception as e:
+                body = {"error": {"code": -32603, "message": str(e)}}
+            _collect_batch_responses(responses, start, len(payload), body)
+
+        return _fill_missing_responses(responses)
+
+    async def aclose(self):
+        """Close the running loop's pooled async client and all of its connections."""
+        await self._client.aclose()
+        unbound = self.__dict__.pop("_unbound", None)
+        if unbound is not None:
+            await unbound.aclose()
+        self.router.close()
+
+    def close(self):
+        """Not available on the async transport; use aclose()."""
+        raise RuntimeError("AsyncRpcTransport must be closed with 'await transport.aclose()'")
+
+
+def _batch_payloads(calls: list, batch_size: int = None):
+    """Yield (start index, JSON-RPC batch array) chunks for a list of (method, params) calls."""
+    batch_size = batch_size or config.SOLANA_RPC_MAX_BATCH_SIZE
+    for start in range(0, len(calls), batch_size):
+        yield start, [
+            {
+                "jsonrpc": "2.0",
+                "id": start + offset,
+                "method": method,
+                "params": params or []
+            }
+            for offset, (method, params) in enumerate(calls[start:start + batch_size])
+        ]
+
+
+def _collect_batch_responses(responses: list, start: int, count: int, body):
+    """Place one chunk's batch response into the ordered responses list by id."""
+    if isinstance(body, list):
+        for item in body:
+            index = item.get("id") if isinstance(item, dict) else None
+            if isinstance(index, int) and start <= index < start + count:
+                responses[index] = item
+    else:
+        # The provider rejected the whole chunk (e.g. batch too large)
+        error = body.get("error") if isinstance(body, dict) else None
+        for index in range(start, start + count):
+            responses[index] = {"error": error or {"code": -32603, "message": f"Unexpected batch response: {body}"}}
+
+
+def _fill_missing_responses(responses: list) -> list:
+    return [
+        response if response is not None else {"error": {"code": -32603, "message": "No response for request"}}
+        for response in responses
+    ]
+
+
+def _is_idempotent(payload) -> bool:
+    """Return whether a JSON-RPC request or batch only contains calls that are safe to repeat."""
+    calls = payload if isinstance(payload, list) else [payload]
+    return not any(call.get("method") in NON_IDEMPOTENT_METHODS for call in calls)
+
+
+def _method(payload) -> str:
+    """Return the method of a single JSON-RPC request, or None for a batch."""
+    return payload.get("method") if isinstance(payload, dict) else None
+
+
+def _is_retryable_response(response: httpx.Response) -> bool:
+    """Return whether a response means the endpoint is throttling or unhealthy."""
+    return response.status_code == 429 or response.status_code >= 500
+
+
+def _running_loop():
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+def _is_idle(connection) -> bool:
+    try:
+        return connection.is_idle()
+    except Exception:
+        return False
+
+
+_transport = None
+_transport_lock = threading.Lock()
+
+
+def get_transport() -> RpcTransport:
+    """Return the process-wide RPC transport, creating it on first use."""
+    global _transport
+    if _transport is None:
+        with _transport_lock:
+            if _transport is None:
+                _transport = RpcTransport()
+    return _transport
+
+
+def configure_transport(**kwargs) -> RpcTransport:
+    """
+    Replace the process-wide RPC transport with one built from the given options.
+
+    Args:
+        **kwargs: Options accepted by RpcTransport
+
+    Returns:
+        RpcTransport: The new process-wide transport
+    """
+    global _transport
+    with _transport_lock:
+        previous = _transport
+        _transport = RpcTransport(**kwargs)
+    if previous is not None:
+        previous.close()
+    return _transport
+
+
+_async_transport = None
+
+
+def get_async_transport() -> AsyncRpcTransport:
+    """Return the process-wide async RPC transport, creating it on first use."""
+    global _async_transport
+    if _async_transport is None:
+        with _transport_lock:
+            if _async_transport is None:
+                _async_transport = AsyncRpcTransport()
+    return _async_transport
+
+
+async def configure_async_transport(**kwargs) -> AsyncRpcTransport:
+    """
+    Replace the process-wide async RPC transport with one built from the given options.
+
+    Args:
+        **kwargs: Options accepted by RpcTransport
+
+    Returns:
+        AsyncRpcTransport: The new process-wide async transport
+    """
+    global _async_transport
+    with _transport_lock:
+        previous = _async_transport
+        _async_transport = AsyncRpcTransport(**kwargs)
+    if previous is not None:
+        await previous.aclose()
+    return _async_transport
@@ -0,0 +1,314 @@
+import base64
+import threading
+import time
+
+from . import config
+from .rpc_transport import get_transport
+from .blockhash_cache import get_blockhash_provider, is_blockhash_not_found_error
+from .confirmation import MAX_SIGNATURES_PER_REQUEST, commitment_reached, fetch_signature_statuses
+
+# Outcome statuses reported by TransactionSender
+LANDED = "landed"
+FAILED = "failed"
+EXPIRED = "expired"
+
+
+def send_transaction_params(transaction_bytes: bytes, max_retries: int = None) -> list:
+    """
+    Build the sendTransaction params for a serialized, signed transaction.
+
+    The transaction is sent base64 encoded: base58 encoding in pure Python is
+    quadratic in the input size and was the slowest CPU step of a send.
+    """
+    options = {"skipPreflight": True, "preflightCommitment": "processed", "encoding": "base64"}
+    if max_retries is not None:
+        options["maxRetries"] = max_retries
+    return [base64.b64encode(transaction_bytes).decode('ascii'), options]
+
+
+def check_send_response(response: dict) -> str:
+    """
+    Return the signature from a sendTransaction response or raise on an RPC error.
+
+    A 'blockhash not found' error also invalidates the shared blockhash cache.
+    """
+    if "error" in response:
+        if is_blockhash_not_found_error(response["error"]):
+            # The cached blockhash has expired on the node; force a fresh one next time
+            get_blockhash_provider().invalidate()
+        raise Exception(f"RPC Error: {response['error']}")
+    return response["result"]
+
+
+def send_raw_transaction(transaction_bytes: bytes, max_retries: int = None) -> str:
+    """
+    Send a serialized, signed transaction once.
+
+    Args:
+        transaction_bytes: The serialized transaction
+        max_retries: How many times the RPC node itself should retry forwarding it
+
+    Returns:
+        str: The transaction signature
+    """
+    response = get_transport().call("sendTransaction", send_transaction_params(transaction_bytes, max_retries))
+    return check_send_response(response)
+
+
+def send_rejection(error, first: bool) -> str:
+    """
+    Return the outcome for a failed (re-)send when the node rejected the transaction itself, else None.
+
+    Re-sending the same bytes cannot help once the node has rejected them. Any
+    RPC error on the first send counts; on a re-send only an expired blockhash
+    does, since other errors may just mean the transaction is already known.
+    """
+    message = str(error)
+    if "RPC Error" not in message:
+        return None
+    if is_blockhash_not_found_error(message):
+        return EXPIRED
+    return FAILED if first else None
+
+
+def status_outcome(status: dict, commitment: str) -> str:
+    """Return LANDED or FAILED for a signature status that resolves a send, or None while it is pending."""
+    if status and status.get("err") is not None:
+        return FAILED
+    if commitment_reached(status, commitment):
+        return LANDED
+    return None
+
+
+def expiry_error(started: float, last_valid_block_height: int, block_height: int) -> str:
+    """Return why an unconfirmed send has expired, or None while it may still land."""
+    if block_height is not None and last_valid_block_height is not None and block_height > last_valid_block_height:
+        return "Blockhash expired before the transaction landed"
+    if time.monotonic() - started > config.SOLANA_SEND_MAX_SECONDS:
+        return f"Transaction not confirmed within {config.SOLANA_SEND_MAX_SECONDS} seconds"
+    return None
+
+
+def _fetch_block_height() -> int:
+    response = get_transport().call("getBlockHeight")
+    if "error" in response:
+        raise Exception(f"RPC Error: {response['error']}")
+    return response["result"]
+
+
+class _PendingSend:
+    def __init__(self, signature: str, raw: bytes, last_valid_block_height: int):
+        self.signature = signature
+        self.raw = raw
+        self.last_valid_block_height = last_valid_block_height
+        self.started = time.monotonic()
+        self.attempts = 0
+        self.outcome = None
+        self.done = threading.Event()
+
+    def finish(self, status: str, slot: int = None, error=None):
+        self.outcome = {
+            "signature": self.signature,
+            "status": status,
+            "slot": slot,
+            "attempts": self.attempts,
+            "time_to_land": time.monotonic() - self.started if status == LANDED else None,
+            "error": error,
+        }
+        self.done.set()
+
+
+class TransactionSender:
+    """
+    Sends signed transactions and re-broadcasts the same bytes at a fixed interval
+    until each one is confirmed, fails on-chain, or its blockhash expires.
+
+    Sends are deduplicated by signature: a transaction already in flight is not
+    sent twice, and later callers wait on the first caller's outcome.
+    """
+
+    def __init__(self, rebroadcast_interval: float = None, commitment: str = "confirmed", send=None, fetch_statuses=None, fetch_block_height=None):
+        """
+        Args:
+            rebroadcast_interval: Seconds between re-sends of an unconfirmed transaction
+            commitment: The commitment level at which a transaction counts as landed
+            send: Callable sending raw transaction bytes once (defaults to sendTransaction)
+            fetch_statuses: Callable returning statuses for a list of signatures
+            fetch_block_height: Callable returning the current block height
+        """
+        self.rebroadcast_interval = (
+            rebroadcast_interval if rebroadcast_interval is not None else config.SOLANA_REBROADCAST_INTERVAL
+        )
+        self.poll_interval = config.SOLANA_CONFIRMATION_POLL_INTERVAL
+        self.commitment = commitment
+        self._send = send or (lambda raw: send_raw_transaction(raw, max_retries=0))
+        self._fetch_statuses = fetch_statuses or fetch_signature_statuses
+        self._fetch_block_height = fetch_block_height or _fetch_block_height
+
+        self._lock = threading.Lock()
+        self._inflight = {}
+        self._created = time.monotonic()
+        self._stats = {LANDED: 0, FAILED: 0, EXPIRED: 0, "sent": 0, "attempts": 0, "time_to_land": 0.0}
+
+    def send(self, transaction) -> dict:
+        """
+        Send a signed transaction and block until it lands, fails or expires.
+
+        Args:
+            transaction: A signed solders Transaction or VersionedTransaction
+
+        Returns:
+            dict: The outcome with signature, status ('landed', 'failed' or 'expired'),
+            slot, attempts, time_to_land and error keys
+        """
+        return self.send_many([transaction])[0]
+
+    def send_many(self, transactions: list) -> list:
+        """
+        Send many signed transactions concurrently and block until each one is resolved.
+
+        Args:
+            transactions: Signed solders Transactions or VersionedTransactions
+
+        Returns:
+            list: One outcome dict per transaction, in input order
+        """
+        entries = []
+        owned = []
+        provider = get_blockhash_provider()
+        with self._lock:
+            for transaction in transactions:
+                signature = str(transaction.signatures[0])
+                entry = self._inflight.get(signature)
+                if entry is None:
+                    entry = _PendingSend(
+                        signature,
+                        bytes(transaction),
+                        provider.last_valid_block_height(transaction.message.recent_blockhash)
+                    )
+                    self._inflight[signature] = entry
+                    self._stats["sent"] += 1
+                    owned.append(entry)
+                entries.append(entry)
+
+        if owned:
+            self._drive(owned)
+
+        for entry in entries:
+            entry.done.wait()
+        return [entry.outcome for entry in entries]
+
+    def stats(self) -> dict:
+        """
+        Return landing statistics for the transactions this sender has resolved.
+
+        Returns:
+            dict: Counts per outcome, landing rate, average attempts, average time to land
+            and landed transactions per second since the sender was created
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            in_flight = len(self._inflight)
+        resolved = stats[LANDED] + stats[FAILED] + stats[EXPIRED]
+        elapsed = time.monotonic() - self._created
+        return {
+            "sent": stats["sent"],
+            "landed": stats[LANDED],
+            "failed": stats[FAILED],
+            "expired": stats[EXPIRED],
+            "in_flight": in_flight,
+            "landing_rate": stats[LANDED] / resolved if resolved else 0.0,
+            "average_attempts": stats["attempts"] / resolved if resolved else 0.0,
+            "average_time_to_land": stats["time_to_land"] / stats[LANDED] if stats[LANDED] else 0.0,
+            "landed_per_second": stats[LANDED] / elapsed if elapsed else 0.0,
+        }
+
+    def _drive(self, entries: list):
+        pending = []
+        for entry in entries:
+            if self._broadcast(entry, first=True):
+                pending.append(entry)
+
+        # Poll about once a slot so landing is noticed quickly, but only re-send every interval
+        last_broadcast = time.monotonic()
+        while pending:
+            time.sleep(min(self.poll_interval, self.rebroadcast_interval))
+            pending = self._poll(pending)
+            if not pending or time.monotonic() - last_broadcast < self.rebroadcast_interval:
+                continue
+            pending = self._expire(pending)
+            for entry in pending:
+                self._broadcast(entry, first=False)
+            last_broadcast = time.monotonic()
+
+    def _broadcast(self, entry: _PendingSend, first: bool) -> bool:
+        # Returns False if the entry was resolved because the node rejected it
+        entry.attempts += 1
+        try:
+            self._send(entry.raw)
+        except Exception as e:
+            rejected = send_rejection(e, first)
+            if rejected is not None:
+                self._finish(entry, rejected, error=str(e))
+                return False
+            print(f'error re-broadcasting transaction {entry.signature}: {e}')
+        return True
+
+    def _poll(self, pending: list) -> list:
+        still_pending = []
+        for start in range(0, len(pending), MAX_SIGNATURES_PER_REQUEST):
+            batch = pending[start:start + MAX_SIGNATURES_PER_REQUEST]
+            try:
+                statuses = self._fetch_statuses([entry.signature for entry in batch])
+            except Exception as e:
+                print(f'error polling signature statuses: {e}')
+                still_pending.extend(batch)
+                continue
+
+            for entry, status in zip(batch, statuses):
+                outcome = status_outcome(status, self.commitment)
+                if outcome is None:
+                    still_pending.append(entry)
+                else:
+                    self._finish(entry, outcome, slot=status.get("slot"), error=status.get("err"))
+        return still_pending
+
+    def _expire(self, pending: list) -> list:
+        block_height = None
+        if any(entry.last_valid_block_height is not None for entry in pending):
+            try:
+                block_height = self._fetch_block_height()
+            except Exception as e:
+                print(f'error fetching block height: {e}')
+
+        still_pending = []
+        for entry in pending:
+            error = expiry_error(entry.started, entry.last_valid_block_height, block_height)
+            if error is not None:
+                self._finish(entry, EXPIRED, error=error)
+            else:
+                still_pending.append(entry)
+        return still_pending
+
+    def _finish(self, entry: _PendingSend, status: str, slot: int = None, error=None):
+        entry.finish(status, slot=slot, error=error)
+        with self._lock:
+            self._inflight.pop(entry.signature, None)
+            self._stats[status] += 1
+            self._stats["attempts"] += entry.attempts
+            if status == LANDED:
+                self._stats["time_to_land"] += entry.outcome["time_to_land"]
+
+
+_sender = None
+_sender_lock = threading.Lock()
+
+
+def get_transaction_sender() -> TransactionSender:
+    """Return the process-wide transaction sender, creating it on first use."""
+    global _sender
+    if _sender is None:
+        with _sender_lock:
+            if _sender is None:
+                _sender = TransactionSender()
+    return _sender
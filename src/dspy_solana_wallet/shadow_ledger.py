@@ -0,0 +1,263 @@
+import threading
+import time
+
+from . import config
+from .rpc_transport import get_transport
+from .token_types import TokenType
+
+# Base fee charged to the fee payer per transaction signature
+LAMPORTS_PER_SIGNATURE = 5000
+
+
+def _fetch_confirmed_balances(balance_requests: list) -> list:
+    """Read raw balances at 'confirmed' commitment, so they line up with the sends we saw confirm."""
+    # Deferred: primitive_solana_functions imports this module at load time
+    from .primitive_solana_functions import _balance_request, _parse_balance_response
+
+    calls = []
+    for wallet_address, token_type in balance_requests:
+        method, params = _balance_request(wallet_address, token_type)
+        calls.append((method, params + [{"commitment": "confirmed"}]))
+
+    balances = []
+    for (wallet_address, token_type), result in zip(balance_requests, get_transport().call_batch(calls)):
+        try:
+            balances.append(_parse_balance_response(result, token_type))
+        except Exception as e:
+            print(f"Error getting {token_type.name} balance: {str(e)}")
+            balances.append(-1)
+    return balances
+
+
+class _LedgerEntry:
+    def __init__(self, balance: int, sync_started: float):
+        self.balance = balance
+        self.sync_started = sync_started
+
+
+class _Delta:
+    def __init__(self, changes: dict, confirmed: bool):
+        self.changes = changes
+        self.recorded_at = time.monotonic()
+        self.confirmed_at = self.recorded_at if confirmed else None
+
+    def reflected_in(self, entry: _LedgerEntry, pending_ttl: float) -> bool:
+        # A confirmed send is part of any balance read after it confirmed; an unconfirmed one
+        # has either landed or expired once it is older than the send deadline
+        if self.confirmed_at is not None:
+            return self.confirmed_at <= entry.sync_started
+        return self.recorded_at + pending_ttl <= entry.sync_started
+
+
+class ShadowLedger:
+    """
+    In-process, write-through view of wallet balances.
+
+    Balances are seeded from chain on first use. Every send made through this
+    package records its expected deltas, so balance queries are answered locally.
+    Each entry is refreshed from chain at most max_staleness seconds after it was
+    last read, and a background thread resyncs every tracked balance in one
+    batched request before that bound is hit.
+
+    SOL balances of fee payers are approximate between resyncs: only the base
+    signature fee is recorded, not priority fees or ATA rent.
+    """
+
+    def __init__(self, max_staleness: float = None, resync_interval: float = None, pending_ttl: float = None, fetch=None):
+        """
+        Args:
+            max_staleness: Maximum seconds since the last chain read before a query reads chain again
+            resync_interval: Seconds between background resyncs (0 disables the background thread)
+            pending_ttl: Seconds an unconfirmed send is counted before the chain is trusted instead
+            fetch: Callable returning raw balances for a list of (wallet, token_type) pairs (-1 on error)
+        """
+        self.max_staleness = max_staleness if max_staleness is not None else config.SOLANA_SHADOW_LEDGER_MAX_STALENESS
+        self.resync_interval = (
+            resync_interval if resync_interval is not None else config.SOLANA_SHADOW_LEDGER_RESYNC_INTERVAL
+        )
+        self.pending_ttl = pending_ttl if pending_ttl is not None else config.SOLANA_SEND_MAX_SECONDS
+        self._fetch = fetch or _fetch_confirmed_balances
+
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._deltas = {}
+        self._stats = {"hits": 0, "misses": 0, "resyncs": 0, "fetched": 0}
+        self._stop_event = threading.Event()
+        self._resync_thread = None
+
+    def get_balance(self, wallet_address, token_type: TokenType) -> int:
+        """
+        Return a wallet's balance in raw units from the ledger, reading chain only when needed.
+
+        Args:
+            wallet_address: The wallet's public key
+            token_type: The type of token to check
+
+        Returns:
+            int: The balance in raw units, following get_balance semantics (-1 on error)
+        """
+        key = (str(wallet_address), token_type)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry.sync_started <= self.max_staleness:
+                self._stats["hits"] += 1
+                return self._balance(key, entry)
+            self._stats["misses"] += 1
+
+        self.resync([key])
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return -1
+            return self._balance(key, entry)
+
+    def record(self, signature: str, changes: list, confirmed: bool = False):
+        """
+        Record the balance changes a send is expected to make.
+
+        Changes for balances the ledger is not tracking yet are ignored: they
+        will be read from chain, send included, when first queried.
+
+        Args:
+            signature: The transaction signature
+            changes: A list of (wallet_address, token_type, raw_delta) tuples
+            confirmed: Whether the transaction is already confirmed
+        """
+        with self._lock:
+            tracked = {}
+            for wallet_address, token_type, delta in changes:
+                key = (str(wallet_address), token_type)
+                if key in self._entries:
+                    tracked[key] = tracked.get(key, 0) + delta
+            if tracked:
+                self._deltas[str(signature)] = _Delta(tracked, confirmed)
+        self._ensure_resync_thread()
+
+    def confirm(self, signature: str):
+        """Mark a recorded send as confirmed."""
+        with self._lock:
+            delta = self._deltas.get(str(signature))
+            if delta is not None and delta.confirmed_at is None:
+                delta.confirmed_at = time.monotonic()
+
+    def discard(self, signature: str):
+        """Drop a recorded send that failed or expired."""
+        with self._lock:
+            self._deltas.pop(str(signature), None)
+
+    def resync(self, keys: list = None):
+        """
+        Re-read balances from chain in one batched request.
+
+        Args:
+            keys: (wallet_address, token_type) pairs to refresh; defaults to every tracked balance
+        """
+        with self._lock:
+            keys = list(self._entries) if keys is None else [(str(wallet), token_type) for wallet, token_type in keys]
+        if not keys:
+            return
+
+        sync_started = time.monotonic()
+        balances = self._fetch(keys)
+
+        with self._lock:
+            self._stats["resyncs"] += 1
+            self._stats["fetched"] += len(keys)
+            for key, balance in zip(keys, balances):
+                if balance < 0:
+                    # Keep serving the previous value rather than caching a failed read
+                    continue
+                self._entries[key] = _LedgerEntry(balance, sync_started)
+            self._prune()
+
+    def start(self):
+        """Start the background resync thread."""
+        if self._resync_thread is None and self.resync_interval > 0:
+            self._stop_event.clear()
+            self._resync_thread = threading.Thread(target=self._resync_loop, name="solana-shadow-ledger", daemon=True)
+            self._resync_thread.start()
+
+    def stop(self):
+        """Stop the background resync thread."""
+        self._stop_event.set()
+        if self._resync_thread is not None:
+            self._resync_thread.join()
+            self._resync_thread = None
+
+    def stats(self) -> dict:
+        """Return ledger hits, misses, resyncs and balances fetched from chain."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["tracked"] = len(self._entries)
+            stats["pending_deltas"] = len(self._deltas)
+        return stats
+
+    def _balance(self, key: tuple, entry: _LedgerEntry) -> int:
+        # Caller must hold the lock
+        balance = entry.balance
+        for delta in self._deltas.values():
+            if key in delta.changes and not delta.reflected_in(entry, self.pending_ttl):
+                balance += delta.changes[key]
+        return balance
+
+    def _prune(self):
+        # Caller must hold the lock; drop deltas every affected balance has caught up with
+        for signature in list(self._deltas):
+            delta = self._deltas[signature]
+            if all(
+                key not in self._entries or delta.reflected_in(self._entries[key], self.pending_ttl)
+                for key in delta.changes
+            ):
+                del self._deltas[signature]
+
+    def _ensure_resync_thread(self):
+        if self._resync_thread is None:
+            with self._lock:
+                if self._resync_thread is not None:
+                    return
+                self.start()
+
+    def _resync_loop(self):
+        while not self._stop_event.wait(self.resync_interval):
+            try:
+                self.resync()
+            except Exception as e:
+                print(f'error resyncing shadow ledger: {e}')
+
+
+_ledger = None
+_ledger_lock = threading.Lock()
+
+
+def get_shadow_ledger() -> ShadowLedger:
+    """Return the process-wide shadow ledger, creating it on first use."""
+    global _ledger
+    if _ledger is None:
+        with _ledger_lock:
+            if _ledger is None:
+                _ledger = ShadowLedger()
+    return _ledger
+
+
+def get_cached_balance(wallet_address, token_type: TokenType) -> int:
+    """
+    Get a wallet's balance in raw units, from the shadow ledger when SOLANA_SHADOW_LEDGER_ENABLED is set.
+
+    Args:
+        wallet_address: The wallet's public key
+        token_type: The type of token to check
+
+    Returns:
+        int: The balance in raw units (lamports for SOL, token units for tokens)
+    """
+    if not config.SOLANA_SHADOW_LEDGER_ENABLED:
+        # Deferred for the same reason as in _fetch_confirmed_balances
+        from .primitive_solana_functions import get_balance
+        return get_balance(wallet_address, token_type)
+    return get_shadow_ledger().get_balance(wallet_address, token_type)
+
+
+def record_balance_changes(signature: str, changes: list, confirmed: bool = False):
+    """Record a send's expected balance changes in the shadow ledger, if it is enabled."""
+    if config.SOLANA_SHADOW_LEDGER_ENABLED:
+        get_shadow_ledger().record(signature, changes, confirmed)
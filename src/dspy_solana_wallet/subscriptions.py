@@ -0,0 +1,315 @@
+import asyncio
+import inspect
+import itertools
+import json
+
+import websockets
+
+from . import config
+
+# Notification methods that fire once and are then cancelled by the node
+_ONE_SHOT_METHODS = {"signatureSubscribe"}
+
+_UNSUBSCRIBE_METHODS = {
+    "accountSubscribe": "accountUnsubscribe",
+    "signatureSubscribe": "signatureUnsubscribe",
+}
+
+# Sentinel placed on a subscription's queue when it is closed
+_CLOSED = object()
+
+
+class Subscription:
+    """
+    A single accountSubscribe / signatureSubscribe stream.
+
+    Notifications are delivered to the callback if one is given, otherwise
+    they are consumed with 'async for result in subscription'. Callbacks run
+    in their own task, one notification at a time and in order, so they may
+    await other client calls (e.g. unsubscribe) without stalling the socket.
+    """
+
+    def __init__(self, client, method: str, params: list, callback=None):
+        self.method = method
+        self.params = params
+        self.callback = callback
+        self.subscription_id = None
+        self.closed = False
+        self._client = client
+        self._queue = asyncio.Queue()
+        self._callback_task = None
+        self._callback_tasks = set()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self.closed and self._queue.empty():
+            raise StopAsyncIteration
+        result = await self._queue.get()
+        if result is _CLOSED:
+            raise StopAsyncIteration
+        return result
+
+    async def next(self, timeout: float = None):
+        """
+        Wait for the next notification.
+
+        Args:
+            timeout: Maximum seconds to wait
+
+        Returns:
+            dict: The notification's result payload
+        """
+        return await asyncio.wait_for(self.__anext__(), timeout)
+
+    async def unsubscribe(self):
+        """Cancel the subscription on the node and end iteration."""
+        await self._client._unsubscribe(self)
+
+    def _deliver(self, result):
+        if self.callback is None:
+            self._queue.put_nowait(result)
+            return
+        # Chain onto the previous callback so notifications are handled in order
+        self._callback_task = asyncio.ensure_future(self._run_callback(result, self._callback_task))
+        self._callback_tasks.add(self._callback_task)
+        self._callback_task.add_done_callback(self._callback_tasks.discard)
+
+    async def _run_callback(self, result, previous):
+        if previous is not None:
+            await asyncio.wait([previous])
+        try:
+            outcome = self.callback(result)
+            if inspect.isawaitable(outcome):
+                await outcome
+        except Exception as e:
+            print(f'error in {self.method} callback: {e}')
+
+    def _close(self, cancel_callbacks: bool = True):
+        if cancel_callbacks:
+            # A callback that unsubscribes is left to finish
+            current = asyncio.current_task()
+            for task in list(self._callback_tasks):
+                if task is not current:
+                    task.cancel()
+        if not self.closed:
+            self.closed = True
+            self._queue.put_nowait(_CLOSED)
+
+
+class SolanaSubscriptionClient:
+    """
+    WebSocket client for Solana pub/sub notifications.
+
+    Many subscriptions are multiplexed over one socket. If the connection
+    drops, the client reconnects with exponential backoff and re-subscribes
+    every active subscription.
+    """
+
+    def __init__(self, url: str = None, reconnect_delay: float = None, max_reconnect_delay: float = None, request_timeout: float = None):
+        """
+        Args:
+            url: The WebSocket endpoint (defaults to SOLANA_WS_URL)
+            reconnect_delay: Initial seconds to wait before reconnecting
+            max_reconnect_delay: Upper bound for the reconnect backoff
+            request_timeout: Seconds to wait for a subscribe/unsubscribe response
+        """
+        self.url = url or config.SOLANA_WS_URL
+        self.reconnect_delay = reconnect_delay if reconnect_delay is not None else config.SOLANA_WS_RECONNECT_DELAY
+        self.max_reconnect_delay = max_reconnect_delay if max_reconnect_delay is not None else config.SOLANA_WS_MAX_RECONNECT_DELAY
+        self.request_timeout = request_timeout if request_timeout is not None else config.SOLANA_WS_REQUEST_TIMEOUT
+        self.reconnects = 0
+
+        self._websocket = None
+        self._connected = None
+        self._closing = False
+        self._run_task = None
+        self._request_ids = itertools.count(1)
+        self._pending_requests = {}
+        self._subscriptions = []
+        self._by_subscription_id = {}
+
+    async def __aenter__(self):
+        await self.connect()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def connect(self):
+        """Open the WebSocket connection and start the reader task."""
+        if self._run_task is None:
+            self._closing = False
+            # Created on the running loop: on Python 3.8/3.9 an Event binds to a loop when constructed
+            self._connected = asyncio.Event()
+            self._run_task = asyncio.ensure_future(self._run())
+        await asyncio.wait_for(self._connected.wait(), self.request_timeout)
+
+    async def close(self):
+        """Close the connection and end every subscription."""
+        self._closing = True
+        if self._websocket is not None:
+            await self._websocket.close()
+        if self._run_task is not None:
+            self._run_task.cancel()
+            try:
+                await self._run_task
+            except asyncio.CancelledError:
+                pass
+            self._run_task = None
+        for subscription in self._subscriptions:
+            subscription._close()
+        self._subscriptions = []
+        self._by_subscription_id = {}
+
+    async def account_subscribe(self, account, commitment: str = "confirmed", encoding: str = "base64", callback=None) -> Subscription:
+        """
+        Subscribe to changes of an account (e.g. a wallet or token account receiving funds).
+
+        Args:
+            account: The account public key
+            commitment: The commitment level for notifications
+            encoding: The account data encoding
+            callback: Optional sync or async callable invoked with each notification result
+
+        Returns:
+            Subscription: The subscription handle
+        """
+        return await self._subscribe(
+            "accountSubscribe",
+            [str(account), {"commitment": commitment, "encoding": encoding}],
+            callback
+        )
+
+    async def signature_subscribe(self, signature: str, commitment: str = "confirmed", callback=None) -> Subscription:
+        """
+        Subscribe to a transaction signature reaching the given commitment. Fires once.
+
+        Args:
+            signature: The transaction signature
+            commitment: The commitment level for the notification
+            callback: Optional sync or async callable invoked with the notification result
+
+        Returns:
+            Subscription: The subscription handle
+        """
+        return await self._subscribe("signatureSubscribe", [str(signature), {"commitment": commitment}], callback)
+
+    def active_subscriptions(self) -> int:
+        """Return the number of subscriptions still open."""
+        return len(self._subscriptions)
+
+    async def _subscribe(self, method: str, params: list, callback) -> Subscription:
+        subscription = Subscription(self, method, params, callback)
+        self._subscriptions.append(subscription)
+        try:
+            await self._activate(subscription)
+        except Exception:
+            self._subscriptions.remove(subscription)
+            raise
+        return subscription
+
+    async def _activate(self, subscription: Subscription):
+        # Registered by _dispatch as soon as the response arrives, since notifications may follow right behind it
+        await self._request(subscription.method, subscription.params, subscription)
+
+    async def _unsubscribe(self, subscription: Subscription):
+        if subscription in self._subscriptions:
+            self._subscriptions.remove(subscription)
+        self._by_subscription_id.pop(subscription.subscription_id, None)
+        if subscription.subscription_id is not None and not subscription.closed and self._is_connected():
+            try:
+                await self._request(_UNSUBSCRIBE_METHODS[subscription.method], [subscription.subscription_id])
+            except Exception as e:
+                print(f'error unsubscribing from {subscription.method}: {e}')
+        subscription._close()
+
+    def _is_connected(self) -> bool:
+        return self._connected is not None and self._connected.is_set()
+
+    async def _request(self, method: str, params: list, subscription: Subscription = None):
+        if self._connected is None:
+            raise ConnectionError("Solana websocket client is not connected; call connect() first")
+        await asyncio.wait_for(self._connected.wait(), self.request_timeout)
+        request_id = next(self._request_ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending_requests[request_id] = (future, subscription)
+        try:
+            await self._websocket.send(json.dumps({"jsonrpc": "2.0", "id": request_id, "method": method, "params": params}))
+            return await asyncio.wait_for(future, self.request_timeout)
+        finally:
+            self._pending_requests.pop(request_id, None)
+
+    async def _run(self):
+        delay = self.reconnect_delay
+        first_connection = True
+        while not self._closing:
+            try:
+                async with websockets.connect(self.url) as websocket:
+                    self._websocket = websocket
+                    self._connected.set()
+                    if not first_connection:
+                        self.reconnects += 1
+                        asyncio.ensure_future(self._resubscribe_all())
+                    first_connection = False
+                    delay = self.reconnect_delay
+
+                    async for message in websocket:
+                        await self._dispatch(json.loads(message))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if not self._closing:
+                    print(f'solana websocket error: {e}')
+            finally:
+                self._connected.clear()
+                self._websocket = None
+                self._fail_pending_requests()
+
+            if not self._closing:
+                print(f'solana websocket disconnected, reconnecting in {delay} seconds')
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.max_reconnect_delay)
+
+    async def _resubscribe_all(self):
+        # Server-side subscription ids do not survive a reconnect
+        self._by_subscription_id = {}
+        for subscription in list(self._subscriptions):
+            try:
+                await self._activate(subscription)
+            except Exception as e:
+                print(f'error resubscribing to {subscription.method}: {e}')
+
+    async def _dispatch(self, message: dict):
+        if "id" in message and message["id"] in self._pending_requests:
+            future, subscription = self._pending_requests[message["id"]]
+            if not future.done():
+                if "error" in message:
+                    future.set_exception(Exception(f"RPC Error: {message['error']}"))
+                else:
+                    if subscription is not None:
+                        subscription.subscription_id = message["result"]
+                        self._by_subscription_id[subscription.subscription_id] = subscription
+                    future.set_result(message["result"])
+            return
+
+        params = message.get("params")
+        if not params:
+            return
+        subscription = self._by_subscription_id.get(params.get("subscription"))
+        if subscription is None:
+            return
+
+        subscription._deliver(params["result"])
+        if subscription.method in _ONE_SHOT_METHODS:
+            self._by_subscription_id.pop(subscription.subscription_id, None)
+            if subscription in self._subscriptions:
+                self._subscriptions.remove(subscription)
+            # The notification just delivered still reaches its callback
+            subscription._close(cancel_callbacks=False)
+
+    def _fail_pending_requests(self):
+        for future, _ in self._pending_requests.values():
+            if not future.done():
+                future.set_exception(ConnectionError("Solana websocket connection closed"))
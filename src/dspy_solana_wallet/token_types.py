@@ -1,5 +1,7 @@
 from enum import Enum
 
+from dspy_wallet_common.amounts import from_base_units, to_base_unit, to_base_units
+
 class TokenType(Enum):
     SOL = "So11111111111111111111111111111111111111112"  # Native SOL
     USDG = "4F6PM96JJxngmHnZLBh9n58RH4aTVNWvDs2nuwrT5BP7"
@@ -35,7 +37,7 @@ class TokenType(Enum):
         Returns:
             int: The amount in the smallest unit (e.g., 1.5 USDG = 1,500,000)
         """
-        return int(amount * (10 ** self.decimals))
+        return to_base_unit(amount, self.decimals)
 
     def from_token_amount(self, amount: int) -> float:
         """
@@ -49,6 +51,34 @@ class TokenType(Enum):
         """
         return amount / (10 ** self.decimals)
 
+    def to_token_amounts(self, amounts):
+        """
+        Convert a column of token amounts to exact int64 base units.
+        
+        Args:
+            amounts: A NumPy array or sequence of decimal strings or numbers (e.g. ['1.5', '0.29'])
+            
+        Returns:
+            np.ndarray: int64 amounts in the smallest unit
+            
+        Raises:
+            ValueError: If an amount is negative, invalid, too precise for this token or overflows int64
+        """
+        return to_base_units(amounts, self.decimals)
+
+    def from_token_amounts(self, amounts, as_string: bool = False):
+        """
+        Convert a column of base-unit amounts back to human-readable amounts for reporting.
+        
+        Args:
+            amounts: A NumPy array or sequence of amounts in the smallest unit
+            as_string: Return exact decimal strings instead of floats
+            
+        Returns:
+            np.ndarray: The human-readable amounts
+        """
+        return from_base_units(amounts, self.decimals, as_string)
+
     @staticmethod
     def from_string(token_type: str) -> 'TokenType':
         """
@@ -0,0 +1,25 @@
+"""
+DSPy Wallet Common - Chain-independent tooling shared by the Solana and EVM wallet packages.
+"""
+
+__version__ = "0.1.0"
+
+from .bulk_wallets import (
+    bulk_generate_wallets,
+    EncryptedFileSink,
+    KeystoreDirectorySink,
+    read_encrypted_wallets
+)
+from .endpoint_router import EndpointRouter
+from .amounts import to_base_unit, to_base_units, from_base_units
+
+__all__ = [
+    "bulk_generate_wallets",
+    "EncryptedFileSink",
+    "KeystoreDirectorySink",
+    "read_encrypted_wallets",
+    "EndpointRouter",
+    "to_base_unit",
+    "to_base_units",
+    "from_base_units"
+]
@@ -0,0 +1,159 @@
+from decimal import Decimal, InvalidOperation, ROUND_DOWN
+
+import numpy as np
+
+# Largest value an int64 base-unit column can hold
+MAX_BASE_UNITS = np.iinfo(np.int64).max
+
+
+def to_base_unit(amount, decimals: int) -> int:
+    """
+    Convert one human-readable amount to integer base units exactly.
+
+    The amount goes through its decimal string form, so 0.29 becomes 290000
+    (6 decimals) instead of the 289999 that float arithmetic gives. Digits
+    beyond the token's precision are truncated.
+
+    Args:
+        amount: The amount (int, float, Decimal or decimal string)
+        decimals: The token's number of decimals
+
+    Returns:
+        int: The amount in base units
+    """
+    try:
+        value = Decimal(str(amount))
+    except InvalidOperation:
+        raise ValueError(f"Invalid amount: {amount!r}")
+    if not value.is_finite():
+        raise ValueError(f"Invalid amount: {amount!r}")
+    return int((value * (Decimal(10) ** decimals)).to_integral_value(rounding=ROUND_DOWN))
+
+
+def to_base_units(amounts, decimals: int) -> np.ndarray:
+    """
+    Convert a column of human-readable amounts to exact int64 base units.
+
+    String columns (e.g. read from a payout CSV) are parsed as decimals without
+    going through floats. Float columns are rounded to the nearest base unit,
+    which is exact for any amount written with at most `decimals` places.
+
+    Args:
+        amounts: A NumPy array or sequence of decimal strings, ints, floats or Decimals
+        decimals: The token's number of decimals
+
+    Returns:
+        np.ndarray: int64 base units, one per input amount
+
+    Raises:
+        ValueError: If an amount is negative, not a number, has more than
+            `decimals` decimal places, or does not fit in an int64
+    """
+    values = np.asarray(amounts)
+    if values.ndim != 1:
+        values = values.reshape(-1)
+    if values.size == 0:
+        return np.zeros(0, dtype=np.int64)
+
+    if values.dtype.kind == 'O':
+        values = np.array([_decimal_string(value) for value in values])
+
+    if values.dtype.kind in ('U', 'S'):
+        return _parse_decimal_strings(values.astype(str), decimals)
+    if values.dtype.kind == 'b':
+        raise ValueError("Amounts must be numbers, not booleans")
+    if values.dtype.kind in ('i', 'u'):
+        return _scale_integers(values, decimals)
+    if values.dtype.kind == 'f':
+        return _scale_floats(values, decimals)
+    raise ValueError(f"Unsupported amount dtype: {values.dtype}")
+
+
+def from_base_units(units, decimals: int, as_string: bool = False) -> np.ndarray:
+    """
+    Convert a column of base units back to human-readable amounts for reporting.
+
+    Args:
+        units: A NumPy array or sequence of integer base units
+        decimals: The token's number of decimals
+        as_string: Return exact decimal strings (e.g. '0.290000') instead of float64
+
+    Returns:
+        np.ndarray: float64 amounts, or strings when as_string is set
+    """
+    units = np.asarray(units, dtype=np.int64).reshape(-1)
+    scale = 10 ** decimals
+    if not as_string:
+        return units / scale
+
+    magnitude = np.abs(units)
+    whole, fraction = np.divmod(magnitude, scale)
+    text = whole.astype(str)
+    if decimals:
+        text = np.char.add(np.char.add(text, '.'), np.char.zfill(fraction.astype(str), decimals))
+    return np.where(units < 0, np.char.add('-', text), text)
+
+
+def _decimal_string(value) -> str:
+    if isinstance(value, bool):
+        raise ValueError("Amounts must be numbers, not booleans")
+    try:
+        return format(Decimal(str(value)), 'f')
+    except InvalidOperation:
+        raise ValueError(f"Invalid amount: {value!r}")
+
+
+def _parse_decimal_strings(values: np.ndarray, decimals: int) -> np.ndarray:
+    values = np.char.strip(values)
+    if np.any(np.char.startswith(values, '-')):
+        raise ValueError(f"Negative amount: {values[np.char.startswith(values, '-')][0]}")
+    values = np.char.lstrip(values, '+')
+
+    whole, _, fraction = (np.char.partition(values, '.')[:, index] for index in range(3))
+    whole = np.where(whole == '', '0', whole)
+    bad = ~np.char.isdigit(whole) | (~np.char.isdigit(fraction) & (fraction != '')) | (values == '') | (values == '.')
+    if np.any(bad):
+        raise ValueError(f"Invalid amount: {values[bad][0]!r}")
+
+    # Digits past the token's precision are only allowed if they are zeros
+    fraction = np.char.rstrip(fraction, '0')
+    too_precise = np.char.str_len(fraction) > decimals
+    if np.any(too_precise):
+        raise ValueError(f"Amount has more than {decimals} decimal places: {values[too_precise][0]}")
+
+    # Concatenate the whole and padded fraction digits and parse each row once
+    digits = np.char.lstrip(np.char.add(whole, np.char.ljust(fraction, decimals, '0')), '0')
+    limit = str(MAX_BASE_UNITS)
+    lengths = np.char.str_len(digits)
+    overflow = (lengths > len(limit)) | ((lengths == len(limit)) & (digits > limit))
+    if np.any(overflow):
+        raise ValueError(f"Amount does not fit in int64 base units: {values[overflow][0]}")
+    return np.where(digits == '', '0', digits).astype(np.int64)
+
+
+def _scale_integers(values: np.ndarray, decimals: int) -> np.ndarray:
+    if np.any(values < 0):
+        raise ValueError(f"Negative amount: {values[values < 0][0]}")
+    limit = MAX_BASE_UNITS // 10 ** decimals
+    if np.any(values > limit):
+        raise ValueError(f"Amount does not fit in int64 base units: {values[values > limit][0]}")
+    return values.astype(np.int64) * 10 ** decimals
+
+
+def _scale_floats(values: np.ndarray, decimals: int) -> np.ndarray:
+    values = values.astype(np.float64)
+    if not np.all(np.isfinite(values)):
+        raise ValueError("Amounts must be finite numbers")
+    if np.any(values < 0):
+        raise ValueError(f"Negative amount: {values[values < 0][0]}")
+
+    scaled = values * 10 ** decimals
+    if np.any(scaled >= 2.0 ** 63):
+        raise ValueError(f"Amount does not fit in int64 base units: {values[scaled >= 2.0 ** 63][0]}")
+    units = np.rint(scaled)
+    # A float written with at most `decimals` places lands within a few ulps of an integer
+    tolerance = np.maximum(np.abs(scaled) * 4 * np.finfo(np.float64).eps, 1e-6)
+    too_precise = np.abs(scaled - units) > tolerance
+    if np.any(too_precise):
+        raise ValueError(f"Amount has more than {decimals} decimal places: {values[too_precise][0]!r}")
+    return units.astype(np.int64)
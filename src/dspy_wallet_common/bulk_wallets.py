@@ -0,0 +1,335 @@
+import argparse
+import getpass
+import json
+import os
+import struct
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import base58
+from Crypto.Cipher import AES
+from Crypto.Protocol.KDF import scrypt
+from eth_account import Account
+from eth_keys import keys
+from solders.keypair import Keypair
+
+SOLANA = "solana"
+EVM = "evm"
+CHAINS = (SOLANA, EVM)
+
+# Wallets generated per worker task; also the unit written to the sink
+DEFAULT_CHUNK_SIZE = 1000
+
+# Encrypted wallet file layout: MAGIC | salt (16) | log2(N), r, p (1 byte each), then frames of
+# nonce (12) | ciphertext length (4, big endian) | ciphertext | tag (16), ending with an empty final frame
+ENCRYPTED_FILE_MAGIC = b"DSPYWAL1"
+_SCRYPT_LOG2_N = 15
+_SCRYPT_R = 8
+_SCRYPT_P = 1
+_FRAME_HEADER = struct.Struct(">12sI")
+_FRAME_TAG_LENGTH = 16
+
+
+def _solana_wallets(count: int) -> list:
+    wallets = []
+    for _ in range(count):
+        keypair = Keypair()
+        wallets.append({
+            "chain": SOLANA,
+            "public_key": str(keypair.pubkey()),
+            "private_key": base58.b58encode(bytes(keypair)).decode('ascii'),
+        })
+    return wallets
+
+
+def _evm_wallets(count: int) -> list:
+    wallets = []
+    for _ in range(count):
+        # Same key material as Account.create(), without its per-call extra-entropy hashing
+        private_key = keys.PrivateKey(os.urandom(32))
+        wallets.append({
+            "chain": EVM,
+            "public_key": private_key.public_key.to_checksum_address(),
+            "private_key": private_key.to_hex(),
+        })
+    return wallets
+
+
+_GENERATORS = {SOLANA: _solana_wallets, EVM: _evm_wallets}
+
+
+def _generate_chunk(chain: str, count: int) -> list:
+    return _GENERATORS[chain](count)
+
+
+def _derive_file_key(passphrase: str, salt: bytes, log2_n: int, r: int, p: int) -> bytes:
+    return scrypt(passphrase.encode('utf-8'), salt, 32, N=2 ** log2_n, r=r, p=p)
+
+
+def _frame_associated_data(header: bytes, frame: int, final: bool) -> bytes:
+    # Binds each frame to the file, its position and whether it ends the file
+    return header + frame.to_bytes(8, 'big') + (b"\x01" if final else b"\x00")
+
+
+class EncryptedFileSink:
+    """
+    Streams wallet records to a passphrase-encrypted file.
+
+    The key is derived once with scrypt and each written chunk becomes its own
+    AES-GCM frame, so memory use is bounded by the chunk size however many
+    wallets are written. Frames are bound to their position in the file, and
+    close() appends an authenticated final frame so a truncated file is
+    detected on read. Leaving the 'with' block on an exception skips the final
+    frame, so an interrupted run never reads as complete.
+    """
+
+    def __init__(self, path: str, passphrase: str):
+        """
+        Args:
+            path: The output file; must not already exist
+            passphrase: The passphrase the file is encrypted with
+        """
+        if not passphrase:
+            raise ValueError("A passphrase is required to encrypt the wallet file")
+        self.path = path
+        self._salt = os.urandom(16)
+        self._header = ENCRYPTED_FILE_MAGIC + self._salt + bytes([_SCRYPT_LOG2_N, _SCRYPT_R, _SCRYPT_P])
+        self._key = _derive_file_key(passphrase, self._salt, _SCRYPT_LOG2_N, _SCRYPT_R, _SCRYPT_P)
+        self._frames = 0
+        # Exclusive create so an existing wallet file is never overwritten, owner-only from the start
+        descriptor = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        self._file = os.fdopen(descriptor, "wb")
+        self._file.write(self._header)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc_info):
+        if exc_type is not None:
+            self._file.close()
+        self.close()
+
+    def write(self, wallets: list):
+        """Encrypt and append one chunk of wallet records."""
+        if not wallets:
+            return
+        plaintext = "".join(json.dumps(wallet) + "\n" for wallet in wallets).encode('utf-8')
+        self._write_frame(plaintext, final=False)
+
+    def close(self):
+        """Write the final frame, then flush and close the file."""
+        if not self._file.closed:
+            self._write_frame(b"", final=True)
+            self._file.close()
+
+    def _write_frame(self, plaintext: bytes, final: bool):
+        nonce = os.urandom(12)
+        cipher = AES.new(self._key, AES.MODE_GCM, nonce=nonce)
+        cipher.update(_frame_associated_data(self._header, self._frames, final))
+        ciphertext, tag = cipher.encrypt_and_digest(plaintext)
+        self._file.write(_FRAME_HEADER.pack(nonce, len(ciphertext)) + ciphertext + tag)
+        self._frames += 1
+
+
+def read_encrypted_wallets(path: str, passphrase: str):
+    """
+    Decrypt a file written by EncryptedFileSink, yielding one wallet record at a time.
+
+    Args:
+        path: The encrypted wallet file
+        passphrase: The passphrase it was encrypted with
+
+    Yields:
+        dict: Wallet records with chain, public_key and private_key keys
+
+    Raises:
+        ValueError: If the file is not a wallet file, the passphrase is wrong, or the file was
+            modified or truncated (truncation is only detected after the earlier records were yielded)
+    """
+    with open(path, "rb") as wallet_file:
+        header = wallet_file.read(len(ENCRYPTED_FILE_MAGIC) + 19)
+        if not header.startswith(ENCRYPTED_FILE_MAGIC) or len(header) != len(ENCRYPTED_FILE_MAGIC) + 19:
+            raise ValueError(f"{path} is not an encrypted wallet file")
+        salt = header[len(ENCRYPTED_FILE_MAGIC):len(ENCRYPTED_FILE_MAGIC) + 16]
+        log2_n, r, p = header[-3:]
+        key = _derive_file_key(passphrase, salt, log2_n, r, p)
+
+        frame = 0
+        while True:
+            frame_header = wallet_file.read(_FRAME_HEADER.size)
+            if len(frame_header) != _FRAME_HEADER.size:
+                raise ValueError(f"{path} is truncated: its final frame is missing")
+            nonce, length = _FRAME_HEADER.unpack(frame_header)
+            ciphertext = wallet_file.read(length)
+            tag = wallet_file.read(_FRAME_TAG_LENGTH)
+            if len(ciphertext) != length or len(tag) != _FRAME_TAG_LENGTH:
+                raise ValueError(f"{path} is truncated: its final frame is missing")
+            # Only the final frame is empty; write() never emits an empty chunk
+            final = length == 0
+            cipher = AES.new(key, AES.MODE_GCM, nonce=nonce)
+            cipher.update(_frame_associated_data(header, frame, final))
+            try:
+                plaintext = cipher.decrypt_and_verify(ciphertext, tag)
+            except ValueError:
+                raise ValueError(f"Could not decrypt {path}: wrong passphrase or corrupted file")
+            if final:
+                if wallet_file.read(1):
+                    raise ValueError(f"{path} has data after its final frame")
+                return
+            for line in plaintext.decode('utf-8').splitlines():
+                yield json.loads(line)
+            frame += 1
+
+
+class KeystoreDirectorySink:
+    """
+    Writes each EVM wallet as a Web3 Secret Storage (V3 keystore) JSON file.
+
+    Keystore encryption runs a KDF per wallet, so this sink is far slower than
+    EncryptedFileSink; lower kdf_iterations only for throwaway test cohorts.
+    """
+
+    def __init__(self, directory: str, passphrase: str, kdf: str = "scrypt", kdf_iterations: int = None):
+        """
+        Args:
+            directory: Directory the keystore files are written to (created if missing)
+            passphrase: The passphrase every keystore is encrypted with
+            kdf: 'scrypt' or 'pbkdf2'
+            kdf_iterations: KDF work factor (defaults to eth_account's)
+        """
+        if not passphrase:
+            raise ValueError("A passphrase is required to encrypt keystores")
+        self.directory = directory
+        self.kdf = kdf
+        self.kdf_iterations = kdf_iterations
+        self._passphrase = passphrase
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def write(self, wallets: list):
+        """Encrypt each wallet in the chunk into its own keystore file."""
+        for wallet in wallets:
+            if wallet["chain"] != EVM:
+                raise ValueError("Keystore files are only supported for EVM wallets")
+            keystore = Account.encrypt(wallet["private_key"], self._passphrase, kdf=self.kdf, iterations=self.kdf_iterations)
+            path = os.path.join(self.directory, f"{wallet['public_key']}.json")
+            descriptor = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+            with os.fdopen(descriptor, "w") as keystore_file:
+                json.dump(keystore, keystore_file)
+
+    def close(self):
+        """Nothing to flush; each keystore is written as soon as it is encrypted."""
+
+
+def bulk_generate_wallets(count: int, sink, chains=CHAINS, chunk_size: int = DEFAULT_CHUNK_SIZE, processes: int = None, report_every: float = 5.0) -> dict:
+    """
+    Generate wallets across a process pool and stream them to a sink in chunks.
+
+    Only a bounded number of chunks is in flight at once, so memory use does not
+    grow with count. Progress is reported as keys per second; secrets are never printed.
+
+    Args:
+        count: Number of wallets to generate per chain
+        sink: An object with write(list_of_wallet_dicts), e.g. EncryptedFileSink
+        chains: Which chains to generate wallets for ('solana' and/or 'evm')
+        chunk_size: Wallets generated per worker task
+        processes: Worker processes (defaults to the CPU count)
+        report_every: Seconds between progress reports
+
+    Returns:
+        dict: Wallets generated per chain, total, elapsed seconds and keys_per_second
+    """
+    # A chain named twice is generated once
+    chains = tuple(dict.fromkeys(chains))
+    unknown = [chain for chain in chains if chain not in CHAINS]
+    if unknown:
+        raise ValueError(f"Unknown chains: {unknown}")
+    if count <= 0:
+        raise ValueError(f"count must be positive, got {count}")
+    if chunk_size <= 0:
+        raise ValueError(f"chunk_size must be positive, got {chunk_size}")
+
+    tasks = [
+        (chain, min(chunk_size, count - start))
+        for chain in chains
+        for start in range(0, count, chunk_size)
+    ]
+    processes = processes or os.cpu_count() or 1
+    generated = {chain: 0 for chain in chains}
+    started = last_report = time.monotonic()
+
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        pending = deque()
+        task_iter = iter(tasks)
+        # Keep every worker busy without queueing the whole run in memory
+        for task in task_iter:
+            pending.append(executor.submit(_generate_chunk, *task))
+            if len(pending) >= processes * 2:
+                break
+
+        while pending:
+            wallets = pending.popleft().result()
+            next_task = next(task_iter, None)
+            if next_task is not None:
+                pending.append(executor.submit(_generate_chunk, *next_task))
+
+            sink.write(wallets)
+            generated[wallets[0]["chain"]] += len(wallets)
+
+            now = time.monotonic()
+            if now - last_report >= report_every:
+                total = sum(generated.values())
+                print(f'generated {total}/{count * len(chains)} wallets ({total / (now - started):.0f} keys/sec)')
+                last_report = now
+
+    elapsed = time.monotonic() - started
+    total = sum(generated.values())
+    print(f'generated {total} wallets in {elapsed:.1f} seconds ({total / elapsed if elapsed else 0:.0f} keys/sec)')
+    return {
+        "generated": generated,
+        "total": total,
+        "seconds": elapsed,
+        "keys_per_second": total / elapsed if elapsed else 0.0,
+    }
+
+
+def main(argv=None):
+    """Command line entry point: generate wallets into an encrypted file or keystore directory."""
+    parser = argparse.ArgumentParser(description="Generate Solana and/or EVM wallets in bulk.")
+    parser.add_argument("count", type=int, help="Number of wallets to generate per chain")
+    parser.add_argument("--chain", choices=CHAINS, action="append", help="Chain to generate for (repeatable; default: both)")
+    parser.add_argument("--output", required=True, help="Encrypted output file, or a directory with --keystore")
+    parser.add_argument("--keystore", action="store_true", help="Write one V3 keystore file per EVM wallet")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Wallets per worker task")
+    parser.add_argument("--processes", type=int, default=None, help="Worker processes (default: CPU count)")
+    args = parser.parse_args(argv)
+
+    chains = tuple(dict.fromkeys(args.chain or CHAINS))
+    if args.keystore and chains != (EVM,):
+        parser.error("--keystore only supports --chain evm")
+    if args.count <= 0:
+        parser.error("count must be positive")
+    if args.chunk_size <= 0:
+        parser.error("--chunk-size must be positive")
+
+    # Never accept the passphrase as an argument, where it would show up in the process list
+    passphrase = os.getenv("BULK_WALLET_PASSPHRASE") or getpass.getpass("Output passphrase: ")
+    if not passphrase:
+        parser.error("a passphrase is required (set BULK_WALLET_PASSPHRASE or enter one when prompted)")
+
+    sink = KeystoreDirectorySink(args.output, passphrase) if args.keystore else EncryptedFileSink(args.output, passphrase)
+    with sink:
+        result = bulk_generate_wallets(args.count, sink, chains, args.chunk_size, args.processes)
+    print(f'wrote {result["total"]} wallets to {args.output}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,292 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+# Weight given to the newest sample in the latency and error rate averages
+DEFAULT_EWMA_ALPHA = 0.3
+
+# Consecutive failures after which an endpoint is ejected
+DEFAULT_FAILURE_THRESHOLD = 3
+
+# Seconds an ejected endpoint sits out before it is probed again
+DEFAULT_EJECT_SECONDS = 30.0
+
+# Latency assumed for an endpoint that has not answered yet, so every endpoint gets tried
+_UNMEASURED_LATENCY = 0.0
+
+# Worker threads available for hedged requests
+_HEDGE_WORKERS = 8
+
+
+class _Endpoint:
+    def __init__(self, url: str):
+        self.url = url
+        self.latency = None
+        self.error_rate = 0.0
+        self.consecutive_failures = 0
+        self.ejected_until = 0.0
+        self.probing = False
+        self.requests = 0
+        self.failures = 0
+        self.hedges_won = 0
+
+
+class EndpointRouter:
+    """
+    Routes requests across a list of RPC endpoints by observed latency and health.
+
+    Each endpoint keeps an exponentially weighted moving average of its latency
+    and error rate. Requests go to the endpoint with the lowest error-weighted
+    latency. An endpoint that fails failure_threshold times in a row is ejected
+    for eject_seconds. After that, a single probe request decides whether it
+    rejoins the pool.
+
+    Idempotent requests fail over to the next endpoint on error. When
+    hedge_after is set, a duplicate is sent to the next endpoint if the first
+    has not answered within that many seconds, and the first answer wins.
+    Non-idempotent requests (e.g. sending a transaction) are tried once on the
+    best endpoint.
+    """
+
+    def __init__(self, urls: list, hedge_after: float = None, ewma_alpha: float = DEFAULT_EWMA_ALPHA,
+                 failure_threshold: int = DEFAULT_FAILURE_THRESHOLD, eject_seconds: float = DEFAULT_EJECT_SECONDS):
+        """
+        Args:
+            urls: Endpoint URLs, in order of preference before any latency is measured
+            hedge_after: Seconds to wait before hedging an idempotent request (None or 0 disables hedging)
+            ewma_alpha: Weight of the newest sample in the latency and error rate averages
+            failure_threshold: Consecutive failures after which an endpoint is ejected
+            eject_seconds: Seconds an ejected endpoint waits before being probed again
+        """
+        urls = list(dict.fromkeys(url for url in urls if url))
+        if not urls:
+            raise ValueError("EndpointRouter needs at least one endpoint")
+        self.hedge_after = hedge_after or None
+        self.ewma_alpha = ewma_alpha
+        self.failure_threshold = failure_threshold
+        self.eject_seconds = eject_seconds
+
+        self._endpoints = [_Endpoint(url) for url in urls]
+        self._lock = threading.Lock()
+        self._executor = None
+
+    @property
+    def urls(self) -> list:
+        """Return the endpoint URLs in configured order."""
+        return [endpoint.url for endpoint in self._endpoints]
+
+    def ranked(self, probe: bool = True) -> list:
+        """
+        Return endpoint URLs in the order a request should try them.
+
+        An ejected endpoint whose ejection has expired comes first, so a request
+        probes it while the healthy endpoints stay available for failover. Next
+        come healthy endpoints by error-weighted latency, then the rest of the
+        ejected endpoints (so a request is still attempted when every endpoint is down).
+
+        Args:
+            probe: Whether to put endpoints due a probe first; otherwise they follow the healthy ones
+        """
+        now = time.monotonic()
+        with self._lock:
+            healthy, probes, ejected = [], [], []
+            for endpoint in self._endpoints:
+                if endpoint.consecutive_failures < self.failure_threshold:
+                    healthy.append(endpoint)
+                elif endpoint.ejected_until <= now and not endpoint.probing:
+                    probes.append(endpoint)
+                else:
+                    ejected.append(endpoint)
+            healthy.sort(key=self._score)
+            ejected.sort(key=lambda endpoint: endpoint.ejected_until)
+            ordered = probes + healthy if probe else healthy + probes
+            return [endpoint.url for endpoint in ordered + ejected]
+
+    def execute(self, request, idempotent: bool = True, failed=None, prefer: str = None):
+        """
+        Run a request against the best endpoint, failing over and hedging if allowed.
+
+        Args:
+            request: Callable taking an endpoint URL and returning a result
+            idempotent: Whether the request may be sent to more than one endpoint
+            failed: Optional callable marking a returned result as a failure (e.g. an HTTP 503)
+            prefer: Endpoint URL to try first unless it is ejected
+
+        Returns:
+            The first successful result. If every attempt failed, the last failed
+            result is returned, or the last exception is raised.
+        """
+        # A non-idempotent request gets one attempt, so it is never used as a probe
+        candidates = self._candidates(idempotent, prefer)
+        if not idempotent:
+            candidates = candidates[:1]
+
+        if self.hedge_after and idempotent and len(candidates) > 1:
+            return self._execute_hedged(request, candidates, failed)
+
+        outcome = None
+        for url in candidates:
+            outcome = self._attempt(request, url, failed)
+            if outcome[0]:
+                return outcome[1]
+        return self._unwrap(outcome)
+
+    async def execute_async(self, request, idempotent: bool = True, failed=None, prefer: str = None):
+        """Coroutine version of execute; request takes a URL and returns an awaitable."""
+        candidates = self._candidates(idempotent, prefer)
+        if not idempotent:
+            candidates = candidates[:1]
+
+        outcome = None
+        pending = set()
+        remaining = list(candidates)
+        try:
+            while remaining or pending:
+                if remaining:
+                    pending.add(asyncio.ensure_future(self._attempt_async(request, remaining.pop(0), failed)))
+                hedge = self.hedge_after if (self.hedge_after and idempotent and remaining) else None
+                done, pending = await asyncio.wait(pending, timeout=hedge, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    outcome = task.result()
+                    if outcome[0]:
+                        return outcome[1]
+        finally:
+            for task in pending:
+                task.cancel()
+        return self._unwrap(outcome)
+
+    def record(self, url: str, seconds: float, success: bool):
+        """Record the outcome of a request made to an endpoint outside of execute."""
+        now = time.monotonic()
+        with self._lock:
+            endpoint = self._endpoint(url)
+            endpoint.requests += 1
+            endpoint.probing = False
+            alpha = self.ewma_alpha
+            endpoint.error_rate = alpha * (0.0 if success else 1.0) + (1 - alpha) * endpoint.error_rate
+            if success:
+                endpoint.latency = seconds if endpoint.latency is None else alpha * seconds + (1 - alpha) * endpoint.latency
+                endpoint.consecutive_failures = 0
+                endpoint.ejected_until = 0.0
+                return
+
+            endpoint.failures += 1
+            endpoint.consecutive_failures += 1
+            if endpoint.consecutive_failures >= self.failure_threshold:
+                if endpoint.ejected_until <= now:
+                    print(f'ejecting RPC endpoint {url} for {self.eject_seconds:.0f} seconds after '
+                          f'{endpoint.consecutive_failures} consecutive failures')
+                endpoint.ejected_until = now + self.eject_seconds
+
+    def stats(self) -> dict:
+        """Return per-endpoint latency, error rate, ejection state and request counters."""
+        now = time.monotonic()
+        with self._lock:
+            return {
+                endpoint.url: {
+                    "latency_seconds": endpoint.latency,
+                    "error_rate": endpoint.error_rate,
+                    "ejected": endpoint.ejected_until > now,
+                    "requests": endpoint.requests,
+                    "failures": endpoint.failures,
+                    "hedges_won": endpoint.hedges_won,
+                }
+                for endpoint in self._endpoints
+            }
+
+    def close(self):
+        """Shut down the hedging worker threads."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def _candidates(self, idempotent: bool, prefer: str = None) -> list:
+        candidates = self.ranked(probe=idempotent)
+        if prefer in candidates:
+            with self._lock:
+                healthy = self._endpoint(prefer).consecutive_failures < self.failure_threshold
+            if healthy:
+                candidates.remove(prefer)
+                candidates.insert(0, prefer)
+        return candidates
+
+    def _score(self, endpoint: _Endpoint) -> float:
+        latency = _UNMEASURED_LATENCY if endpoint.latency is None else endpoint.latency
+        return latency * (1.0 + 10.0 * endpoint.error_rate) + endpoint.error_rate
+
+    def _endpoint(self, url: str) -> _Endpoint:
+        for endpoint in self._endpoints:
+            if endpoint.url == url:
+                return endpoint
+        raise KeyError(url)
+
+    def _mark_probe(self, url: str):
+        now = time.monotonic()
+        with self._lock:
+            endpoint = self._endpoint(url)
+            if endpoint.consecutive_failures >= self.failure_threshold and endpoint.ejected_until <= now:
+                endpoint.probing = True
+
+    def _attempt(self, request, url: str, failed) -> tuple:
+        self._mark_probe(url)
+        started = time.monotonic()
+        try:
+            result = request(url)
+        except Exception as e:
+            self.record(url, time.monotonic() - started, success=False)
+            return False, None, e
+        success = not (failed and failed(result))
+        self.record(url, time.monotonic() - started, success=success)
+        return success, result, None
+
+    async def _attempt_async(self, request, url: str, failed) -> tuple:
+        self._mark_probe(url)
+        started = time.monotonic()
+        try:
+            result = await request(url)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.record(url, time.monotonic() - started, success=False)
+            return False, None, e
+        success = not (failed and failed(result))
+        self.record(url, time.monotonic() - started, success=success)
+        return success, result, None
+
+    def _execute_hedged(self, request, candidates: list, failed):
+        executor = self._get_executor()
+        remaining = list(candidates)
+        futures = {}
+        outcome = None
+
+        while remaining or futures:
+            if remaining:
+                url = remaining.pop(0)
+                futures[executor.submit(self._attempt, request, url, failed)] = url
+            # Wait for an answer; once hedge_after passes, fall through and hedge to the next endpoint
+            done, _ = wait(futures, timeout=self.hedge_after if remaining else None, return_when=FIRST_COMPLETED)
+            for future in done:
+                url = futures.pop(future)
+                outcome = future.result()
+                if outcome[0]:
+                    if len(candidates) - len(remaining) > 1:
+                        with self._lock:
+                            self._endpoint(url).hedges_won += 1
+                    # Slower duplicates finish in the background and still update the averages
+                    return outcome[1]
+        return self._unwrap(outcome)
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=_HEDGE_WORKERS, thread_name_prefix="rpc-hedge")
+        return self._executor
+
+    @staticmethod
+    def _unwrap(outcome: tuple):
+        _, result, error = outcome
+        if error is not None:
+            raise error
+        return result
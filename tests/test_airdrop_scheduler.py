@@ -0,0 +1,146 @@
+import threading
+import time
+import unittest
+from unittest.mock import patch, MagicMock
+
+import httpx
+
+from dspy_solana_wallet.airdrop_scheduler import (
+    AirdropScheduler,
+    AirdropRateLimitedError,
+    _request_airdrop,
+)
+
+
+class FakeFaucet:
+    """Stand-in for requestAirdrop that throttles the first few calls."""
+
+    def __init__(self, rate_limited_calls=0, delay=0.0):
+        self.rate_limited_calls = rate_limited_calls
+        self.delay = delay
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def __call__(self, wallet, lamports):
+        time.sleep(self.delay)
+        with self.lock:
+            self.calls.append((wallet, lamports, time.monotonic()))
+            if len(self.calls) <= self.rate_limited_calls:
+                raise AirdropRateLimitedError("Faucet rate limited: 429 Too Many Requests")
+            return f"airdrop-{len(self.calls)}"
+
+
+def scheduler(faucet, **kwargs):
+    options = dict(
+        rate=100, burst=10, initial_backoff=0.05, max_backoff=0.2, fallback_after=5, fallback_enabled=True,
+        fallback_transfer=MagicMock(return_value=True)
+    )
+    options.update(kwargs)
+    return AirdropScheduler(request_airdrop=faucet, **options)
+
+
+class TestAirdropScheduler(unittest.TestCase):
+
+    def test_requests_for_the_same_wallet_are_coalesced(self):
+        """Test that concurrent funding requests for one wallet share a single airdrop."""
+        faucet = FakeFaucet(delay=0.05)
+        airdrops = scheduler(faucet, rate=2)
+        # Hold the first send back so every caller joins while the request is still queued
+        airdrops._bucket.tokens = 0
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(airdrops.fund("Wallet1", 0.3, timeout=5))) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        airdrops.stop()
+
+        self.assertEqual(len(faucet.calls), 1)
+        self.assertEqual(faucet.calls[0][1], 1_500_000_000)
+        self.assertTrue(all(result["success"] and result["source"] == "faucet" for result in results))
+        self.assertTrue(all(result["amount"] == results[0]["amount"] for result in results))
+
+    def test_coalesced_amounts_are_capped_at_the_faucet_limit(self):
+        """Test that joined requests add up to at most max_amount."""
+        airdrops = scheduler(FakeFaucet(), rate=0.1, max_amount=2)
+        airdrops._bucket.tokens = 0
+
+        request = airdrops.submit("Wallet2", 1.5)
+        airdrops.submit("Wallet2", 1.5)
+        airdrops.submit("Wallet2", 1.5)
+
+        self.assertEqual(request.amount, 2)
+        airdrops.stop()
+
+    def test_rate_limited_airdrops_back_off_and_retry(self):
+        """Test that 429 responses pause the queue with growing delays before succeeding."""
+        faucet = FakeFaucet(rate_limited_calls=2)
+        airdrops = scheduler(faucet, initial_backoff=0.1, max_backoff=1)
+
+        result = airdrops.fund("Wallet2", 1, timeout=5)
+        airdrops.stop()
+
+        self.assertTrue(result["success"])
+        self.assertEqual(result["attempts"], 3)
+        first_gap = faucet.calls[1][2] - faucet.calls[0][2]
+        second_gap = faucet.calls[2][2] - faucet.calls[1][2]
+        self.assertGreaterEqual(first_gap, 0.08)
+        self.assertGreater(second_gap, first_gap)
+        self.assertEqual(airdrops.stats()["rate_limited"], 2)
+
+    def test_token_bucket_spaces_out_airdrops(self):
+        """Test that airdrops beyond the burst are sent no faster than the configured rate."""
+        faucet = FakeFaucet()
+        airdrops = scheduler(faucet, rate=20, burst=1)
+
+        requests = [airdrops.submit(f"Wallet{index}", 0.1) for index in range(4)]
+        results = [request.wait(5) for request in requests]
+        airdrops.stop()
+
+        self.assertTrue(all(result["success"] for result in results))
+        times = [call[2] for call in faucet.calls]
+        self.assertGreaterEqual(times[-1] - times[0], 3 / 20 * 0.9)
+
+    def test_falls_back_to_funding_wallet_after_deadline(self):
+        """Test that a wallet the faucet keeps refusing is funded from the funding wallet."""
+        faucet = FakeFaucet(rate_limited_calls=1000)
+        fallback = MagicMock(return_value=True)
+        airdrops = scheduler(faucet, fallback_after=0.3, fallback_transfer=fallback)
+
+        result = airdrops.fund("Wallet3", 0.25, timeout=5)
+        airdrops.stop()
+
+        self.assertTrue(result["success"])
+        self.assertEqual(result["source"], "funding_wallet")
+        fallback.assert_called_once_with("Wallet3", 0.25)
+        self.assertGreaterEqual(len(faucet.calls), 1)
+        self.assertEqual(airdrops.pending_count(), 0)
+
+    def test_fails_after_deadline_without_fallback(self):
+        """Test that funding fails cleanly when the fallback is disabled."""
+        airdrops = scheduler(FakeFaucet(rate_limited_calls=1000), fallback_after=0.2, fallback_enabled=False)
+
+        result = airdrops.fund("Wallet4", 1, timeout=5)
+        airdrops.stop()
+
+        self.assertFalse(result["success"])
+        self.assertIn("did not fund", result["error"])
+
+
+class TestRequestAirdrop(unittest.TestCase):
+
+    def test_http_429_is_reported_as_rate_limited(self):
+        """Test that an HTTP 429 with Retry-After raises AirdropRateLimitedError."""
+        transport = MagicMock()
+        transport.post.return_value = httpx.Response(429, headers={"Retry-After": "7"}, text="Too Many Requests")
+
+        with patch('dspy_solana_wallet.airdrop_scheduler.get_transport', return_value=transport):
+            with self.assertRaises(AirdropRateLimitedError) as context:
+                _request_airdrop("Wallet5", 1)
+
+        self.assertEqual(context.exception.retry_after, 7.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
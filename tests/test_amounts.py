@@ -0,0 +1,77 @@
+import unittest
+from decimal import Decimal
+
+import numpy as np
+
+from dspy_wallet_common.amounts import from_base_units, to_base_unit, to_base_units
+from dspy_solana_wallet.token_types import TokenType
+from dspy_evm_wallet.token_types import TokenType as EvmTokenType
+
+
+class TestToBaseUnits(unittest.TestCase):
+
+    def test_string_columns_are_parsed_exactly(self):
+        """Test that decimal strings convert without float rounding."""
+        units = to_base_units(np.array(["0.29", "1.5", " 2 ", ".5", "10.000000000", "0"]), 6)
+
+        self.assertEqual(units.dtype, np.int64)
+        self.assertEqual(units.tolist(), [290_000, 1_500_000, 2_000_000, 500_000, 10_000_000, 0])
+
+    def test_numeric_and_mixed_inputs(self):
+        """Test that float arrays, integer arrays and Decimals give the same exact units."""
+        self.assertEqual(to_base_units(np.array([0.29, 2.01, 1.5]), 6).tolist(), [290_000, 2_010_000, 1_500_000])
+        self.assertEqual(to_base_units(np.array([1, 2]), 9).tolist(), [1_000_000_000, 2_000_000_000])
+        self.assertEqual(to_base_units([Decimal("0.29"), 3, "1.25"], 6).tolist(), [290_000, 3_000_000, 1_250_000])
+
+    def test_precision_and_overflow_are_rejected(self):
+        """Test that too many decimals, negatives, garbage and int64 overflow raise ValueError."""
+        for amounts in (["1.2345678"], [0.1234567], ["-1"], ["1.2.3"], ["abc"], [""], [float("nan")],
+                        ["9223372036854.775808"], [9.3e12], [True]):
+            with self.assertRaises(ValueError, msg=amounts):
+                to_base_units(amounts, 6)
+        self.assertEqual(to_base_units(["9223372036854.775807"], 6).tolist(), [np.iinfo(np.int64).max])
+
+    def test_large_columns(self):
+        """Test a large string column round-trips through the reverse conversion."""
+        cents = np.random.default_rng(0).integers(0, 10 ** 9, 200_000)
+        strings = np.char.add(np.char.add((cents // 100).astype(str), "."), np.char.zfill((cents % 100).astype(str), 2))
+
+        units = to_base_units(strings, 6)
+
+        self.assertTrue(np.array_equal(units, cents * 10 ** 4))
+        self.assertTrue(np.array_equal(to_base_units(from_base_units(units, 6, as_string=True), 6), units))
+
+
+class TestFromBaseUnits(unittest.TestCase):
+
+    def test_reporting_strings_and_floats(self):
+        """Test that base units convert back to exact strings or floats."""
+        self.assertEqual(from_base_units([290_000, -1_500_000, 7], 6, as_string=True).tolist(),
+                         ["0.290000", "-1.500000", "0.000007"])
+        self.assertEqual(from_base_units([290_000], 6).tolist(), [0.29])
+
+
+class TestTokenTypeAmounts(unittest.TestCase):
+
+    def test_scalar_conversion_is_exact(self):
+        """Test that to_token_amount no longer loses a base unit to float error."""
+        self.assertEqual(int(2.01 * 10 ** 6), 2_009_999)
+        self.assertEqual(TokenType.USDC.to_token_amount(2.01), 2_010_000)
+        self.assertEqual(TokenType.SOL.to_token_amount(2.01), 2_010_000_000)
+        self.assertEqual(EvmTokenType.USDC.to_token_amount(4.1), 4_100_000)
+        self.assertEqual(to_base_unit("1.9999999", 6), 1_999_999)
+
+    def test_bulk_methods_use_token_decimals(self):
+        """Test the TokenType bulk conversions in both packages."""
+        self.assertEqual(TokenType.SOL.to_token_amounts(["0.5"]).tolist(), [500_000_000])
+        self.assertEqual(EvmTokenType.USDG.to_token_amounts(["0.29"]).tolist(), [290_000])
+        # Wei amounts above ~9.22 ETH overflow int64, so ETH columns are refused outright
+        with self.assertRaisesRegex(ValueError, "ETH"):
+            EvmTokenType.ETH.to_token_amounts(["10"])
+        with self.assertRaisesRegex(ValueError, "ETH"):
+            EvmTokenType.ETH.from_token_amounts([10 ** 18])
+        self.assertEqual(TokenType.USDG.from_token_amounts([290_000], as_string=True).tolist(), ["0.290000"])
+
+
+if __name__ == '__main__':
+    unittest.main()
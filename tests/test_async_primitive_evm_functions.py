@@ -0,0 +1,183 @@
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from decimal import Decimal
+from unittest.mock import patch
+
+import rlp
+from eth_account import Account
+from eth_utils import keccak
+from web3 import AsyncWeb3
+from web3.providers.async_base import AsyncBaseProvider
+
+from dspy_evm_wallet import async_primitive_evm_functions
+from dspy_evm_wallet.async_primitive_evm_functions import async_get_balance, async_transfer_eth, async_transfer_token
+from dspy_evm_wallet.erc20_codec import BALANCE_OF_SELECTOR, TRANSFER_SELECTOR
+from dspy_evm_wallet.fee_oracle import FeeOracle
+from dspy_evm_wallet.nonce_manager import NonceManager
+from dspy_evm_wallet.routed_provider import AsyncRoutedHTTPProvider
+from dspy_evm_wallet.token_types import TokenType
+
+
+class FakeAsyncEvmNode(AsyncBaseProvider):
+    """In-process JSON-RPC stand-in that answers the methods the async EVM primitives use."""
+
+    def __init__(self):
+        super().__init__()
+        self.methods = []
+        self.sent = []
+
+    async def make_request(self, method, params):
+        self.methods.append(method)
+        # Yield so concurrent callers really interleave
+        await asyncio.sleep(0)
+        if method == 'eth_chainId':
+            result = hex(11155111)
+        elif method == 'eth_gasPrice':
+            result = hex(2_000_000_000)
+        elif method == 'eth_getBalance':
+            result = hex(3 * 10 ** 18)
+        elif method == 'eth_call':
+            assert params[0]['data'].startswith('0x' + BALANCE_OF_SELECTOR.hex())
+            result = '0x' + (2_500_000).to_bytes(32, 'big').hex()
+        elif method == 'eth_sendRawTransaction':
+            self.sent.append(bytes.fromhex(params[0][2:]))
+            result = '0x' + keccak(self.sent[-1]).hex()
+        else:
+            raise AssertionError(f'unexpected method {method}')
+        return {'jsonrpc': '2.0', 'id': 1, 'result': result}
+
+    async def is_connected(self, show_traceback=False):
+        return True
+
+
+class TestAsyncEvmPrimitives(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.node = FakeAsyncEvmNode()
+        self.nonces = NonceManager(fetch_pending_count=lambda address: 0, state_dir=tempfile.mkdtemp(), resync_seconds=60, chain_id=1)
+        self.oracle = FeeOracle(ttl=60, background_refresh=False)
+        patches = [
+            patch.object(async_primitive_evm_functions, '_async_w3', AsyncWeb3(self.node)),
+            patch.object(async_primitive_evm_functions, 'get_nonce_manager', lambda: self.nonces),
+            patch.object(async_primitive_evm_functions, 'get_fee_oracle', lambda: self.oracle),
+        ]
+        for active in patches:
+            active.start()
+            self.addCleanup(active.stop)
+
+    async def test_get_balance_for_eth_and_tokens(self):
+        """Test that ETH balances come from eth_getBalance and token balances from a balanceOf eth_call."""
+        wallet = Account.create().address
+
+        self.assertEqual(await async_get_balance(wallet, TokenType.ETH), Decimal(3))
+        self.assertEqual(await async_get_balance(wallet, TokenType.USDC), 2.5)
+        self.assertEqual(self.node.methods, ['eth_getBalance', 'eth_call'])
+
+    async def test_concurrent_transfers_share_fees_and_get_unique_nonces(self):
+        """Test that concurrent transfers fetch fees once and send with consecutive nonces."""
+        sender = Account.create()
+        recipient = Account.create().address
+
+        hashes = await asyncio.gather(
+            *[async_transfer_token(sender.key.hex(), recipient, TokenType.USDC, 1.5) for _ in range(20)],
+            *[async_transfer_eth(sender.key.hex(), recipient, 0.01) for _ in range(5)],
+        )
+
+        self.assertEqual(len(set(hashes)), 25)
+        self.assertEqual(self.node.methods.count('eth_chainId'), 1)
+        self.assertEqual(self.node.methods.count('eth_gasPrice'), 1)
+        self.assertEqual(self.node.methods.count('eth_sendRawTransaction'), 25)
+
+        # Legacy transaction RLP fields: nonce, gasPrice, gas, to, value, data, v, r, s
+        decoded = [rlp.decode(raw) for raw in self.node.sent]
+        self.assertEqual(sorted(int.from_bytes(fields[0], 'big') for fields in decoded), list(range(25)))
+        token_transfers = [fields for fields in decoded if fields[5]]
+        self.assertEqual(len(token_transfers), 20)
+        self.assertTrue(all(fields[5][:4] == TRANSFER_SELECTOR for fields in token_transfers))
+        self.assertEqual({int.from_bytes(fields[1], 'big') for fields in token_transfers}, {2_200_000_000})
+        self.assertTrue(all(Account.recover_transaction(raw) == sender.address for raw in self.node.sent))
+
+    async def test_failed_send_releases_its_nonce(self):
+        """Test that a send error which is not a nonce error hands the nonce to the next transfer."""
+        sender = Account.create()
+        recipient = Account.create().address
+        make_request = self.node.make_request
+
+        async def reject_once(method, params):
+            if method == 'eth_sendRawTransaction' and not self.node.sent:
+                self.node.sent.append(None)
+                return {'jsonrpc': '2.0', 'id': 1, 'error': {'code': -32000, 'message': 'insufficient funds'}}
+            return await make_request(method, params)
+
+        self.node.make_request = reject_once
+        with self.assertRaises(Exception):
+            await async_transfer_eth(sender.key.hex(), recipient, 0.01)
+        await async_transfer_eth(sender.key.hex(), recipient, 0.01)
+
+        self.assertEqual(int.from_bytes(rlp.decode(self.node.sent[-1])[0], 'big'), 0)
+
+
+class TestAsyncWeb3IsLazy(unittest.TestCase):
+
+    def test_importing_the_package_builds_no_async_client(self):
+        """Test that importing dspy_evm_wallet neither builds an AsyncWeb3 nor re-exports the async module's imports."""
+        script = (
+            "import dspy_evm_wallet\n"
+            "from dspy_evm_wallet import async_primitive_evm_functions as module\n"
+            "assert module._async_w3 is None\n"
+            "assert hasattr(dspy_evm_wallet, 'async_transfer_token') and hasattr(dspy_evm_wallet, 'get_async_w3')\n"
+            "assert not hasattr(dspy_evm_wallet, 'AsyncRoutedHTTPProvider')\n"
+        )
+        subprocess.run([sys.executable, "-c", script], check=True, env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)})
+
+
+class TestAsyncRoutedHTTPProvider(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.provider = AsyncRoutedHTTPProvider(
+            ['https://down.example.com', 'https://up.example.com'], max_connections=7, eject_seconds=30
+        )
+
+    async def asyncTearDown(self):
+        await self.provider.disconnect()
+
+    async def test_sessions_are_pooled_per_endpoint(self):
+        """Test that each endpoint gets a keep-alive session limited to max_connections."""
+        await self.provider._ensure_pool()
+
+        for provider in self.provider._providers.values():
+            session = await provider.cache_async_session(None)
+            self.assertEqual(session.connector.limit, 7)
+            self.assertFalse(session.connector.force_close)
+
+    async def test_reads_fail_over_but_sends_do_not(self):
+        """Test that a failed read moves to the next endpoint while eth_sendRawTransaction stays put."""
+        seen = []
+
+        def endpoint(url):
+            async def make_request(method, params):
+                seen.append(url)
+                if 'down' in url:
+                    raise ConnectionError('unavailable')
+                return {'jsonrpc': '2.0', 'id': 1, 'result': '0x1'}
+            return make_request
+
+        for url, provider in self.provider._providers.items():
+            provider.make_request = endpoint(url)
+
+        self.assertEqual((await self.provider.make_request('eth_blockNumber', []))['result'], '0x1')
+        self.assertEqual(seen, ['https://down.example.com', 'https://up.example.com'])
+
+        self.provider.router.ranked = lambda probe=True: ['https://down.example.com', 'https://up.example.com']
+        seen.clear()
+        with self.assertRaises(ConnectionError):
+            await self.provider.make_request('eth_sendRawTransaction', ['0x00'])
+        self.assertEqual(seen, ['https://down.example.com'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,211 @@
+import asyncio
+import base64
+import json
+import unittest
+from unittest.mock import patch, MagicMock
+
+import httpx
+from solders.compute_budget import ID as COMPUTE_BUDGET_PROGRAM_ID
+from solders.hash import Hash
+from solders.keypair import Keypair
+from solders.transaction import Transaction
+
+from dspy_solana_wallet import config, rpc_transport, blockhash_cache, shadow_ledger, compute_budget
+from dspy_solana_wallet.blockhash_cache import BlockhashProvider
+from dspy_solana_wallet.compute_budget import ComputeBudgetPlanner
+from dspy_solana_wallet.rpc_transport import AsyncRpcTransport
+from dspy_solana_wallet.shadow_ledger import LAMPORTS_PER_SIGNATURE, ShadowLedger
+from dspy_solana_wallet.token_types import TokenType
+from dspy_solana_wallet.async_primitive_solana_functions import (
+    async_get_balance,
+    async_get_balances,
+    async_transfer_sol,
+    async_transfer_token,
+    async_create_associated_token_account,
+    async_fund_wallet_with_sol_from_faucet,
+)
+
+
+class FakeSolanaNode:
+    """In-process JSON-RPC stand-in that answers the methods the async primitives use."""
+
+    def __init__(self):
+        self.methods = []
+        self.sent = []
+        self.blockhash = Hash.new_unique()
+        self.unconfirmed_polls = 0
+        self.block_height = 100
+
+    def handle(self, body):
+        self.methods.append(body["method"])
+        method, params = body["method"], body["params"]
+        if method == "getLatestBlockhash":
+            result = {"value": {"blockhash": str(self.blockhash), "lastValidBlockHeight": 150}}
+        elif method == "getBalance":
+            result = {"value": 2_000_000_000}
+        elif method == "getTokenAccountBalance":
+            return {"jsonrpc": "2.0", "id": body["id"], "error": {"code": -32602, "message": "Invalid param: could not find account"}}
+        elif method == "sendTransaction":
+            self.sent.append(params[0])
+            result = f"sig-{len(self.sent)}"
+        elif method == "getSignatureStatuses":
+            if self.unconfirmed_polls:
+                self.unconfirmed_polls -= 1
+                result = {"value": [None for _ in params[0]]}
+            else:
+                result = {"value": [{"slot": 1, "err": None, "confirmationStatus": "confirmed"} for _ in params[0]]}
+        elif method == "getBlockHeight":
+            result = self.block_height
+        elif method == "requestAirdrop":
+            result = "airdrop-sig"
+        elif method == "simulateTransaction":
+            result = {"value": {"err": None, "unitsConsumed": 4_000}}
+        elif method == "getRecentPrioritizationFees":
+            result = [{"slot": 1, "prioritizationFee": 25}]
+        else:
+            raise AssertionError(f"unexpected method {method}")
+        return {"jsonrpc": "2.0", "id": body["id"], "result": result}
+
+    def __call__(self, request):
+        body = json.loads(request.content)
+        if isinstance(body, list):
+            return httpx.Response(200, json=[self.handle(item) for item in body])
+        return httpx.Response(200, json=self.handle(body))
+
+
+class TestAsyncPrimitives(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.node = FakeSolanaNode()
+        self.transport = AsyncRpcTransport(url="https://rpc.example.com")
+        await self.transport._client.aclose()
+        self.transport._client = httpx.AsyncClient(transport=httpx.MockTransport(self.node))
+        self.patches = [
+            patch.object(rpc_transport, "_async_transport", self.transport),
+            patch.object(blockhash_cache, "_provider", BlockhashProvider(ttl=60, background_refresh=False)),
+        ]
+        for p in self.patches:
+            p.start()
+
+    async def asyncTearDown(self):
+        for p in self.patches:
+            p.stop()
+        await self.transport.aclose()
+
+    async def test_balances_match_sync_semantics(self):
+        """Test that async balance reads return lamports and 0 for a missing ATA."""
+        wallet = Keypair().pubkey()
+
+        self.assertEqual(await async_get_balance(wallet, TokenType.SOL), 2_000_000_000)
+        self.assertEqual(await async_get_balance(wallet, TokenType.USDC), 0)
+        self.assertEqual(await async_get_balances([(wallet, TokenType.SOL), (wallet, TokenType.USDG)]), [2_000_000_000, 0])
+
+    async def test_concurrent_transfers_share_one_blockhash_fetch(self):
+        """Test that many concurrent sends coalesce onto a single getLatestBlockhash call."""
+        funding_wallet = Keypair()
+        recipients = [Keypair().pubkey() for _ in range(10)]
+
+        results = await asyncio.gather(
+            *[async_transfer_token(funding_wallet, recipient, TokenType.USDC, 0.5) for recipient in recipients[:5]],
+            *[async_transfer_sol(funding_wallet, recipient, 0.01) for recipient in recipients[5:]],
+        )
+
+        self.assertTrue(all(results))
+        self.assertEqual(self.node.methods.count("getLatestBlockhash"), 1)
+        self.assertEqual(len(self.node.sent), 10)
+
+    async def test_transfers_are_recorded_in_the_shadow_ledger(self):
+        """Test that async sends record their balance changes like the sync ones."""
+        funding_wallet, recipient = Keypair(), Keypair().pubkey()
+        ledger = ShadowLedger(max_staleness=60, resync_interval=0, fetch=lambda keys: [10_000_000_000] * len(keys))
+        tracked = [(funding_wallet.pubkey(), TokenType.SOL), (recipient, TokenType.SOL), (recipient, TokenType.USDC)]
+        for wallet, token_type in tracked:
+            ledger.get_balance(wallet, token_type)
+
+        with patch.object(config, "SOLANA_SHADOW_LEDGER_ENABLED", True), patch.object(shadow_ledger, "_ledger", ledger):
+            self.assertTrue(await async_transfer_sol(funding_wallet, recipient, 1))
+            self.assertTrue(await async_transfer_token(funding_wallet, recipient, TokenType.USDC, 2.5))
+
+        self.assertEqual(ledger.get_balance(recipient, TokenType.SOL), 11_000_000_000)
+        self.assertEqual(ledger.get_balance(recipient, TokenType.USDC), 10_002_500_000)
+        self.assertEqual(ledger.get_balance(funding_wallet.pubkey(), TokenType.SOL), 9_000_000_000 - 2 * LAMPORTS_PER_SIGNATURE)
+
+    async def test_compute_budget_is_planned_without_the_blocking_transport(self):
+        """Test that compute budget mode simulates and fetches fees through the async transport only."""
+        sync_transport = MagicMock()
+        funding_wallet = Keypair()
+
+        with patch.object(config, "SOLANA_COMPUTE_BUDGET_ENABLED", True), \
+                patch.object(compute_budget, "_planner", ComputeBudgetPlanner()), \
+                patch.object(rpc_transport, "_transport", sync_transport):
+            self.assertTrue(await async_transfer_sol(funding_wallet, Keypair().pubkey(), 0.01))
+            self.assertTrue(await async_transfer_token(funding_wallet, Keypair().pubkey(), TokenType.USDC, 1))
+            self.assertEqual(await async_create_associated_token_account(funding_wallet, Keypair().pubkey(), TokenType.USDC), "sig-3")
+
+        sync_transport.assert_not_called()
+        self.assertEqual(sync_transport.method_calls, [])
+        self.assertEqual(self.node.methods.count("simulateTransaction"), 3)
+        self.assertEqual(self.node.methods.count("getRecentPrioritizationFees"), 1)
+        for sent in self.node.sent:
+            transaction = Transaction.from_bytes(base64.b64decode(sent))
+            keys = transaction.message.account_keys
+            self.assertEqual(keys[transaction.message.instructions[0].program_id_index], COMPUTE_BUDGET_PROGRAM_ID)
+
+    async def test_rebroadcasts_until_confirmed_or_expired(self):
+        """Test that async sends re-send the same bytes until confirmed and give up once the blockhash expires."""
+        funding_wallet = Keypair()
+        self.node.unconfirmed_polls = 2
+
+        # A poll interval longer than the re-send interval means one status poll per send
+        with patch.object(config, "SOLANA_REBROADCAST_UNTIL_CONFIRMED", True), \
+                patch.object(config, "SOLANA_REBROADCAST_INTERVAL", 0.01), \
+                patch.object(config, "SOLANA_CONFIRMATION_POLL_INTERVAL", 0.02):
+            self.assertTrue(await async_transfer_sol(funding_wallet, Keypair().pubkey(), 0.01))
+            self.assertEqual(len(self.node.sent), 3)
+            self.assertEqual(len(set(self.node.sent)), 1)
+
+            self.node.unconfirmed_polls = 1_000
+            self.node.block_height = 151
+            self.assertFalse(await async_transfer_sol(funding_wallet, Keypair().pubkey(), 0.01))
+            self.assertEqual(len(self.node.sent), 4)
+
+    async def test_create_ata_waits_for_confirmation(self):
+        """Test that async ATA creation returns the signature once confirmed."""
+        result = await async_create_associated_token_account(Keypair(), Keypair().pubkey(), TokenType.PYUSD)
+
+        self.assertEqual(result, "sig-1")
+        self.assertIn("getSignatureStatuses", self.node.methods)
+
+    async def test_faucet(self):
+        """Test that the async faucet requests an airdrop in lamports."""
+        self.assertTrue(await async_fund_wallet_with_sol_from_faucet(Keypair().pubkey(), 0.5))
+        self.assertEqual(self.node.methods, ["requestAirdrop"])
+
+
+class TestAsyncTransportAcrossEventLoops(unittest.TestCase):
+
+    def test_successive_event_loops_get_their_own_client(self):
+        """Test that the shared transport and blockhash fetch keep working after the first loop closes."""
+        node = FakeSolanaNode()
+        transport = AsyncRpcTransport(url="https://rpc.example.com")
+        transport._new_client = lambda: httpx.AsyncClient(transport=httpx.MockTransport(node))
+        transport._client = transport._new_client()
+        clients = []
+
+        async def read_and_send():
+            clients.append(transport._client)
+            balance = await async_get_balance(Keypair().pubkey(), TokenType.SOL)
+            sent = await async_transfer_sol(Keypair(), Keypair().pubkey(), 0.01)
+            return balance, sent
+
+        with patch.object(rpc_transport, "_async_transport", transport), \
+                patch.object(blockhash_cache, "_provider", BlockhashProvider(ttl=0, background_refresh=False)):
+            self.assertEqual(asyncio.run(read_and_send()), (2_000_000_000, True))
+            self.assertEqual(asyncio.run(read_and_send()), (2_000_000_000, True))
+
+        self.assertIsNot(clients[0], clients[1])
+        self.assertEqual(node.methods.count("getLatestBlockhash"), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
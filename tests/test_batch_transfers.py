@@ -0,0 +1,105 @@
+import unittest
+from unittest.mock import patch, MagicMock
+
+from solders.hash import Hash
+from solders.keypair import Keypair
+from solders.transaction import Transaction
+
+from dspy_solana_wallet.batch_transfers import (
+    batch_transfer_token,
+    pack_instruction_groups,
+    transaction_size,
+    PACKET_DATA_SIZE,
+)
+from dspy_solana_wallet.primitive_solana_functions import _token_transfer_instructions
+from dspy_solana_wallet.token_types import TokenType
+
+
+class TestPackInstructionGroups(unittest.TestCase):
+
+    def test_batches_stay_under_the_packet_limit(self):
+        """Test that packing fills transactions up to, but never over, 1232 bytes."""
+        payer = Keypair().pubkey()
+        groups = [
+            _token_transfer_instructions(payer, Keypair().pubkey(), TokenType.USDG, 1_000_000, True)
+            for _ in range(25)
+        ]
+
+        batches = pack_instruction_groups(groups, payer, TokenType.USDG, True)
+
+        self.assertEqual([index for batch in batches for index in batch], list(range(25)))
+        self.assertGreater(len(batches[0]), 1)
+        for batch in batches:
+            instructions = [ix for index in batch for ix in groups[index]]
+            self.assertLessEqual(transaction_size(instructions, payer), PACKET_DATA_SIZE)
+        # The next group would not have fit in the first transaction
+        first_plus_one = [ix for index in batches[0] + [batches[1][0]] for ix in groups[index]]
+        self.assertGreater(transaction_size(first_plus_one, payer), PACKET_DATA_SIZE)
+
+
+class TestBatchTransferToken(unittest.TestCase):
+
+    def test_reports_per_recipient_outcomes(self):
+        """Test that each recipient gets the outcome of the transaction it was packed into."""
+        funding_wallet = Keypair()
+        transfers = [(Keypair().pubkey(), 0.5) for _ in range(30)]
+        sent = []
+
+        def send(transaction_bytes):
+            sent.append(Transaction.from_bytes(transaction_bytes))
+            if len(sent) == 2:
+                raise Exception("RPC Error: node is behind")
+            return f"sig-{len(sent)}"
+
+        tracker = MagicMock()
+        tracker.wait_many.side_effect = lambda signatures, commitment: {
+            signature: {"err": None, "confirmationStatus": "confirmed"} for signature in signatures
+        }
+
+        with patch('dspy_solana_wallet.config.SOLANA_REBROADCAST_UNTIL_CONFIRMED', False), \
+                patch('dspy_solana_wallet.batch_transfers._get_latest_blockhash', return_value=Hash.new_unique()), \
+                patch('dspy_solana_wallet.batch_transfers._send_transaction', side_effect=send), \
+                patch('dspy_solana_wallet.batch_transfers.get_confirmation_tracker', return_value=tracker):
+            outcomes = batch_transfer_token(funding_wallet, transfers, TokenType.USDC)
+
+        self.assertGreater(len(sent), 1)
+        self.assertLess(len(sent), len(transfers))
+        self.assertTrue(all(isinstance(tx, Transaction) and tx.verify_with_results()[0] for tx in sent))
+        self.assertEqual([outcome["recipient"] for outcome in outcomes], [str(recipient) for recipient, _ in transfers])
+
+        failed = [outcome for outcome in outcomes if not outcome["success"]]
+        self.assertTrue(failed)
+        self.assertTrue(all("node is behind" in outcome["error"] for outcome in failed))
+        self.assertTrue(all(outcome["signature"] and outcome["error"] is None for outcome in outcomes if outcome["success"]))
+
+    def test_rebroadcasts_every_batch_through_the_sender(self):
+        """Test that with rebroadcasting enabled all batches go to the sender together."""
+        funding_wallet = Keypair()
+        transfers = [(Keypair().pubkey(), 1) for _ in range(25)]
+        sender = MagicMock()
+        sender.send_many.side_effect = lambda transactions: [
+            {"signature": str(tx.signatures[0]), "status": "landed" if index else "expired", "error": None if index else "Blockhash expired"}
+            for index, tx in enumerate(transactions)
+        ]
+
+        with patch('dspy_solana_wallet.config.SOLANA_REBROADCAST_UNTIL_CONFIRMED', True), \
+                patch('dspy_solana_wallet.batch_transfers._get_latest_blockhash', return_value=Hash.new_unique()), \
+                patch('dspy_solana_wallet.batch_transfers.get_transaction_sender', return_value=sender):
+            outcomes = batch_transfer_token(funding_wallet, transfers, TokenType.PYUSD)
+
+        sender.send_many.assert_called_once()
+        transactions = sender.send_many.call_args[0][0]
+        self.assertGreater(len(transactions), 1)
+        first_batch = [outcome for outcome in outcomes if outcome["signature"] == str(transactions[0].signatures[0])]
+        self.assertTrue(first_batch)
+        self.assertTrue(all(not outcome["success"] and "expired" in outcome["error"] for outcome in first_batch))
+        self.assertTrue(all(outcome["success"] for outcome in outcomes if outcome not in first_batch))
+
+    def test_rejects_sol(self):
+        """Test that SOL is not accepted by the SPL batch path."""
+        with self.assertRaises(ValueError):
+            batch_transfer_token(Keypair(), [(Keypair().pubkey(), 1)], TokenType.SOL)
+
+
+if __name__ == '__main__':
+    unittest.main()
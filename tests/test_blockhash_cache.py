@@ -0,0 +1,116 @@
+import threading
+import time
+import unittest
+from unittest.mock import patch, MagicMock
+
+from solders.hash import Hash
+
+from dspy_solana_wallet import blockhash_cache
+from dspy_solana_wallet.blockhash_cache import BlockhashProvider
+from dspy_solana_wallet.primitive_solana_functions import _send_transaction
+
+
+class TestBlockhashProvider(unittest.TestCase):
+
+    def test_cached_value_is_reused_within_ttl(self):
+        """Test that callers within the TTL share one fetched blockhash."""
+        fetch = MagicMock(return_value=(Hash.new_unique(), 100))
+        provider = BlockhashProvider(ttl=60, background_refresh=False, fetch=fetch)
+
+        first = provider.get()
+        second = provider.get()
+
+        self.assertEqual(first, second)
+        fetch.assert_called_once()
+
+    def test_expired_and_invalidated_values_are_refetched(self):
+        """Test that a stale or invalidated blockhash triggers a new fetch."""
+        fetch = MagicMock(side_effect=[(Hash.new_unique(), 1), (Hash.new_unique(), 2), (Hash.new_unique(), 3)])
+        provider = BlockhashProvider(ttl=0.05, background_refresh=False, fetch=fetch)
+
+        provider.get()
+        time.sleep(0.1)
+        provider.get()
+        provider.invalidate()
+        _, last_valid_block_height = provider.get_with_expiry()
+
+        self.assertEqual(fetch.call_count, 3)
+        self.assertEqual(last_valid_block_height, 3)
+
+    def test_fetch_racing_an_invalidate_is_not_cached(self):
+        """Test that a fetch started before invalidate() does not repopulate the cache when it completes."""
+        stale, fresh = Hash.new_unique(), Hash.new_unique()
+        provider = BlockhashProvider(ttl=60, background_refresh=False)
+
+        def fetch_then_invalidate():
+            provider.invalidate()
+            return stale, 1
+
+        provider._fetch = fetch_then_invalidate
+        self.assertEqual(provider.get(), stale)
+        self.assertIsNone(provider.cached())
+
+        provider._fetch = MagicMock(return_value=(fresh, 2))
+        self.assertEqual(provider.get(), fresh)
+
+        # The same holds for values fetched elsewhere and stored with update()
+        generation = provider.generation
+        provider.invalidate()
+        provider.update(stale, 1, generation)
+        self.assertIsNone(provider.cached())
+
+    def test_concurrent_callers_coalesce_onto_one_fetch(self):
+        """Test that simultaneous cache misses result in a single RPC fetch."""
+        release = threading.Event()
+        calls = []
+
+        def slow_fetch():
+            calls.append(1)
+            release.wait(1)
+            return Hash.new_unique(), 100
+
+        provider = BlockhashProvider(ttl=60, background_refresh=False, fetch=slow_fetch)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(provider.get())) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.05)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(len(set(results)), 1)
+
+    def test_background_refresh_keeps_cache_warm(self):
+        """Test that the refresh thread fetches without a caller asking."""
+        fetch = MagicMock(return_value=(Hash.new_unique(), 100))
+        provider = BlockhashProvider(ttl=0.05, background_refresh=True, fetch=fetch)
+        try:
+            time.sleep(0.2)
+        finally:
+            provider.stop()
+
+        self.assertGreaterEqual(fetch.call_count, 2)
+
+
+class TestBlockhashNotFound(unittest.TestCase):
+
+    def test_send_failure_invalidates_cached_blockhash(self):
+        """Test that a 'blockhash not found' send error drops the cached blockhash."""
+        provider = MagicMock()
+        error = {"jsonrpc": "2.0", "id": 1, "error": {"code": -32002, "message": "Transaction simulation failed: Blockhash not found"}}
+
+        transport = MagicMock()
+        transport.call.return_value = error
+
+        with patch.object(blockhash_cache, "_provider", provider), \
+                patch('dspy_solana_wallet.send_pipeline.get_transport', return_value=transport):
+            with self.assertRaises(Exception):
+                _send_transaction(b'\x00')
+
+        provider.invalidate.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,168 @@
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import base58
+from eth_account import Account
+from solders.keypair import Keypair
+
+from dspy_wallet_common.bulk_wallets import (
+    bulk_generate_wallets,
+    main,
+    EncryptedFileSink,
+    KeystoreDirectorySink,
+    read_encrypted_wallets,
+)
+
+
+class ListSink:
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, wallets):
+        self.chunks.append(wallets)
+
+
+class TestBulkGenerateWallets(unittest.TestCase):
+
+    def test_generates_valid_wallets_in_chunks(self):
+        """Test that each chain gets count wallets whose public keys match their secrets."""
+        sink = ListSink()
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            result = bulk_generate_wallets(25, sink, chunk_size=10, processes=2)
+
+        wallets = [wallet for chunk in sink.chunks for wallet in chunk]
+        self.assertEqual(result["generated"], {"solana": 25, "evm": 25})
+        self.assertTrue(all(len(chunk) <= 10 for chunk in sink.chunks))
+        self.assertEqual(len({wallet["public_key"] for wallet in wallets}), 50)
+        self.assertGreater(result["keys_per_second"], 0)
+
+        for wallet in wallets:
+            if wallet["chain"] == "solana":
+                keypair = Keypair.from_bytes(base58.b58decode(wallet["private_key"]))
+                self.assertEqual(str(keypair.pubkey()), wallet["public_key"])
+            else:
+                self.assertEqual(Account.from_key(wallet["private_key"]).address, wallet["public_key"])
+            self.assertNotIn(wallet["private_key"], output.getvalue())
+
+    def test_rejects_unknown_chain(self):
+        """Test that an unsupported chain name is refused."""
+        with self.assertRaises(ValueError):
+            bulk_generate_wallets(1, ListSink(), chains=["bitcoin"])
+
+    def test_rejects_non_positive_sizes_and_generates_a_repeated_chain_once(self):
+        """Test that count and chunk_size must be positive and duplicate chains are collapsed."""
+        for count, chunk_size in [(0, 10), (-1, 10), (5, 0), (5, -2)]:
+            with self.assertRaisesRegex(ValueError, "must be positive"):
+                bulk_generate_wallets(count, ListSink(), chunk_size=chunk_size)
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = bulk_generate_wallets(3, ListSink(), chains=["evm", "evm"], processes=1)
+        self.assertEqual(result["generated"], {"evm": 3})
+        self.assertEqual(result["total"], 3)
+
+
+class TestSinks(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_encrypted_file_round_trip(self):
+        """Test that the encrypted file holds no plaintext secrets and decrypts with the passphrase."""
+        path = os.path.join(self.directory.name, "wallets.bin")
+        sink = ListSink()
+        with contextlib.redirect_stdout(io.StringIO()):
+            bulk_generate_wallets(12, sink, chains=["solana"], chunk_size=5, processes=1)
+
+        with EncryptedFileSink(path, "correct horse") as encrypted:
+            for chunk in sink.chunks:
+                encrypted.write(chunk)
+
+        with open(path, "rb") as wallet_file:
+            contents = wallet_file.read()
+        self.assertNotIn(sink.chunks[0][0]["private_key"].encode(), contents)
+        self.assertEqual(list(read_encrypted_wallets(path, "correct horse")), [w for chunk in sink.chunks for w in chunk])
+
+        with self.assertRaises(ValueError):
+            list(read_encrypted_wallets(path, "wrong passphrase"))
+        with self.assertRaises(FileExistsError):
+            EncryptedFileSink(path, "correct horse")
+        self.assertEqual(os.stat(path).st_mode & 0o777, 0o600)
+
+    def test_truncated_or_interrupted_files_are_rejected(self):
+        """Test that a file missing its final frame does not read as complete."""
+        wallets = [{"chain": "solana", "public_key": "pub", "private_key": "secret"}]
+        path = os.path.join(self.directory.name, "wallets.bin")
+        with EncryptedFileSink(path, "correct horse") as encrypted:
+            encrypted.write(wallets)
+        with open(path, "rb") as wallet_file:
+            contents = wallet_file.read()
+
+        # Drop the empty final frame: frame header (16) and tag (16)
+        truncated = os.path.join(self.directory.name, "truncated.bin")
+        with open(truncated, "wb") as wallet_file:
+            wallet_file.write(contents[:-32])
+        with self.assertRaisesRegex(ValueError, "truncated"):
+            list(read_encrypted_wallets(truncated, "correct horse"))
+
+        interrupted = os.path.join(self.directory.name, "interrupted.bin")
+        with self.assertRaises(RuntimeError):
+            with EncryptedFileSink(interrupted, "correct horse") as encrypted:
+                encrypted.write(wallets)
+                raise RuntimeError("generation failed")
+        with self.assertRaisesRegex(ValueError, "truncated"):
+            list(read_encrypted_wallets(interrupted, "correct horse"))
+
+    def test_keystore_directory(self):
+        """Test that EVM wallets are written as decryptable V3 keystores."""
+        directory = os.path.join(self.directory.name, "keystores")
+        sink = KeystoreDirectorySink(directory, "secret", kdf="pbkdf2", kdf_iterations=2)
+        wallet = Account.create()
+        sink.write([{"chain": "evm", "public_key": wallet.address, "private_key": wallet.key.hex()}])
+
+        with open(os.path.join(directory, f"{wallet.address}.json")) as keystore_file:
+            keystore = json.load(keystore_file)
+        self.assertEqual(Account.decrypt(keystore, "secret"), wallet.key)
+
+        with self.assertRaises(ValueError):
+            sink.write([{"chain": "solana", "public_key": "x", "private_key": "y"}])
+
+    def test_cli_reads_passphrase_from_environment(self):
+        """Test that the CLI writes an encrypted file using BULK_WALLET_PASSPHRASE."""
+        path = os.path.join(self.directory.name, "cli.bin")
+        output = io.StringIO()
+        with patch.dict(os.environ, {"BULK_WALLET_PASSPHRASE": "from-env"}), \
+                contextlib.redirect_stdout(output):
+            self.assertEqual(main(["4", "--chain", "evm", "--output", path, "--processes", "1"]), 0)
+
+        wallets = list(read_encrypted_wallets(path, "from-env"))
+        self.assertEqual(len(wallets), 4)
+        self.assertTrue(all(wallet["private_key"] not in output.getvalue() for wallet in wallets))
+
+    def test_cli_accepts_a_repeated_evm_chain_for_keystores(self):
+        """Test that --chain evm --chain evm is not refused by the --keystore check and writes each wallet once."""
+        directory = os.path.join(self.directory.name, "cli-keystores")
+        with patch.dict(os.environ, {"BULK_WALLET_PASSPHRASE": "from-env"}), \
+                patch("dspy_wallet_common.bulk_wallets.KeystoreDirectorySink") as sink_class, \
+                contextlib.redirect_stdout(io.StringIO()):
+            self.assertEqual(main(["2", "--chain", "evm", "--chain", "evm", "--keystore", "--output", directory, "--processes", "1"]), 0)
+
+        sink = sink_class.return_value
+        self.assertEqual(sum(len(call.args[0]) for call in sink.write.call_args_list), 2)
+
+    def test_cli_rejects_a_non_positive_chunk_size(self):
+        """Test that a zero --chunk-size is a usage error rather than a crash."""
+        with contextlib.redirect_stderr(io.StringIO()), self.assertRaises(SystemExit):
+            main(["4", "--chunk-size", "0", "--output", os.path.join(self.directory.name, "unused.bin")])
+
+
+if __name__ == '__main__':
+    unittest.main()
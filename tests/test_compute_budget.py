@@ -0,0 +1,136 @@
+import unittest
+from unittest.mock import patch, MagicMock
+
+from solders.compute_budget import ID as COMPUTE_BUDGET_PROGRAM_ID
+from solders.hash import Hash
+from solders.keypair import Keypair
+from solders.system_program import TransferParams, transfer
+
+from dspy_solana_wallet import compute_budget
+from dspy_solana_wallet.batch_transfers import pack_instruction_groups, transaction_size, PACKET_DATA_SIZE
+from dspy_solana_wallet.compute_budget import (
+    ComputeBudgetPlanner,
+    CREATE_ATA_IDEMPOTENT_COMPUTE_UNITS,
+    TRANSFER_CHECKED_COMPUTE_UNITS,
+)
+from dspy_solana_wallet.primitive_solana_functions import (
+    create_sol_transfer_transaction,
+    _token_transfer_instructions,
+)
+from dspy_solana_wallet.token_types import TokenType
+
+
+def sol_transfer(payer, lamports=1):
+    return [transfer(TransferParams(from_pubkey=payer, to_pubkey=Keypair().pubkey(), lamports=lamports))]
+
+
+class TestComputeBudgetPlanner(unittest.TestCase):
+
+    def test_each_shape_is_simulated_once(self):
+        """Test that transactions differing only in recipient and amount reuse one simulation."""
+        simulate = MagicMock(return_value=1_000)
+        planner = ComputeBudgetPlanner(margin=1.5, unit_price=0, simulate=simulate)
+        payer = Keypair().pubkey()
+
+        limits = [planner.compute_unit_limit(sol_transfer(payer, lamports), payer) for lamports in (1, 2, 3)]
+
+        self.assertEqual(simulate.call_count, 1)
+        self.assertEqual(planner.cached_shapes(), 1)
+        self.assertEqual(limits, [1_800] * 3)
+
+        # A token transfer is a different shape and is simulated separately
+        planner.compute_unit_limit(_token_transfer_instructions(payer, Keypair().pubkey(), TokenType.USDC, 1, False), payer)
+        self.assertEqual(simulate.call_count, 2)
+
+    def test_ata_creates_are_not_under_budgeted(self):
+        """Test that an idempotent create simulated against an existing account still gets a full budget."""
+        planner = ComputeBudgetPlanner(margin=1.0, unit_price=0, simulate=MagicMock(return_value=8_000))
+        payer = Keypair().pubkey()
+
+        program_id = TokenType.USDG.program_id
+
+        limit = planner.compute_unit_limit(_token_transfer_instructions(payer, Keypair().pubkey(), TokenType.USDG, 1, True), payer)
+
+        self.assertGreaterEqual(limit, CREATE_ATA_IDEMPOTENT_COMPUTE_UNITS[program_id] + TRANSFER_CHECKED_COMPUTE_UNITS[program_id])
+
+        # A lone create shares its shape across token programs, so the floor follows the program of each call
+        spl_create = _token_transfer_instructions(payer, Keypair().pubkey(), TokenType.USDC, 1, True)[:1]
+        token_2022_create = _token_transfer_instructions(payer, Keypair().pubkey(), TokenType.USDG, 1, True)[:1]
+        self.assertLess(planner.compute_unit_limit(spl_create, payer), planner.compute_unit_limit(token_2022_create, payer))
+        self.assertGreaterEqual(planner.compute_unit_limit(token_2022_create, payer), CREATE_ATA_IDEMPOTENT_COMPUTE_UNITS[program_id])
+
+    def test_failed_simulation_leaves_default_limit(self):
+        """Test that no limit instruction is added when the shape cannot be simulated."""
+        planner = ComputeBudgetPlanner(unit_price=5, simulate=MagicMock(side_effect=Exception("Simulation failed")))
+        payer = Keypair().pubkey()
+
+        budget = planner.instructions_for(sol_transfer(payer), payer)
+
+        self.assertEqual(len(budget), 1)
+        self.assertEqual(planner.cached_shapes(), 0)
+
+    def test_failed_simulation_is_not_retried_on_every_send(self):
+        """Test that a shape whose simulation failed is only simulated again after the retry window."""
+        simulate = MagicMock(side_effect=[Exception("Simulation failed"), 1_000])
+        planner = ComputeBudgetPlanner(margin=1.0, unit_price=0, simulate=simulate, simulation_retry_seconds=60)
+        payer = Keypair().pubkey()
+
+        self.assertIsNone(planner.compute_unit_limit(sol_transfer(payer), payer))
+        self.assertIsNone(planner.compute_unit_limit(sol_transfer(payer), payer))
+        self.assertEqual(simulate.call_count, 1)
+
+        planner.simulation_retry_seconds = 0
+        self.assertEqual(planner.compute_unit_limit(sol_transfer(payer), payer), 1_300)
+        self.assertEqual(simulate.call_count, 2)
+
+    def test_priority_fee_is_a_cached_percentile(self):
+        """Test that the unit price is a capped percentile of recent fees, fetched once per window."""
+        fetch_fees = MagicMock(return_value=[0, 10, 20, 30, 40, 50, 60, 70, 80, 5_000_000])
+        planner = ComputeBudgetPlanner(fee_percentile=50, fee_cache_seconds=60, max_unit_price=1_000, fetch_fees=fetch_fees)
+
+        self.assertEqual(planner.compute_unit_price(), 50)
+        self.assertEqual(planner.compute_unit_price(), 50)
+        self.assertEqual(fetch_fees.call_count, 1)
+
+        planner.fee_percentile = 100
+        planner.fee_cache_seconds = 0
+        self.assertEqual(planner.compute_unit_price(), 1_000)
+
+
+class TestComputeBudgetInTransactions(unittest.TestCase):
+
+    def test_builders_prepend_budget_only_when_enabled(self):
+        """Test that SOL transfers carry SetComputeUnitLimit and SetComputeUnitPrice in compute budget mode."""
+        planner = ComputeBudgetPlanner(unit_price=7, simulate=MagicMock(return_value=150))
+        wallet = Keypair()
+
+        with patch.object(compute_budget, "_planner", planner):
+            with patch('dspy_solana_wallet.config.SOLANA_COMPUTE_BUDGET_ENABLED', False):
+                plain = create_sol_transfer_transaction(wallet, Keypair().pubkey(), 0.1, recent_blockhash=Hash.new_unique())
+            with patch('dspy_solana_wallet.config.SOLANA_COMPUTE_BUDGET_ENABLED', True):
+                budgeted = create_sol_transfer_transaction(wallet, Keypair().pubkey(), 0.1, recent_blockhash=Hash.new_unique())
+
+        def programs(transaction):
+            keys = transaction.message.account_keys
+            return [keys[ix.program_id_index] for ix in transaction.message.instructions]
+
+        self.assertNotIn(COMPUTE_BUDGET_PROGRAM_ID, programs(plain))
+        self.assertEqual(programs(budgeted)[:2], [COMPUTE_BUDGET_PROGRAM_ID, COMPUTE_BUDGET_PROGRAM_ID])
+        self.assertTrue(budgeted.verify_with_results()[0])
+
+    def test_batch_packing_reserves_room_for_budget_instructions(self):
+        """Test that packed batches still fit the packet limit once budget instructions are prepended."""
+        payer = Keypair().pubkey()
+        groups = [_token_transfer_instructions(payer, Keypair().pubkey(), TokenType.USDC, 1, False) for _ in range(40)]
+        planner = ComputeBudgetPlanner(unit_price=1, simulate=MagicMock(return_value=100_000))
+
+        with patch.object(compute_budget, "_planner", planner), \
+                patch('dspy_solana_wallet.config.SOLANA_COMPUTE_BUDGET_ENABLED', True):
+            batches = pack_instruction_groups(groups, payer, TokenType.USDC, False)
+            for batch in batches:
+                instructions = compute_budget.with_compute_budget([ix for index in batch for ix in groups[index]], payer)
+                self.assertLessEqual(transaction_size(instructions, payer), PACKET_DATA_SIZE)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import threading
+import time
+import unittest
+from unittest.mock import patch, MagicMock
+
+from dspy_solana_wallet.confirmation import ConfirmationTracker, MAX_SIGNATURES_PER_REQUEST
+from dspy_solana_wallet.primitive_solana_functions import create_associated_token_account
+from dspy_solana_wallet.token_types import TokenType
+
+
+class FakeCluster:
+    """Stand-in for getSignatureStatuses that advances each signature one level per poll."""
+
+    LEVELS = [None, "processed", "confirmed", "finalized"]
+
+    def __init__(self, failed=()):
+        self.polls = {}
+        self.batch_sizes = []
+        self.failed = set(failed)
+        self.lock = threading.Lock()
+
+    def __call__(self, signatures):
+        self.batch_sizes.append(len(signatures))
+        statuses = []
+        with self.lock:
+            for signature in signatures:
+                count = min(self.polls.get(signature, 0) + 1, len(self.LEVELS) - 1)
+                self.polls[signature] = count
+                level = self.LEVELS[count]
+                err = {"InstructionError": [0, "Custom"]} if signature in self.failed else None
+                statuses.append({"slot": 1, "confirmations": None, "err": err, "confirmationStatus": level})
+        return statuses
+
+
+class TestConfirmationTracker(unittest.TestCase):
+
+    def test_waiter_resolves_at_requested_commitment(self):
+        """Test that a waiter returns once its commitment level is reached."""
+        cluster = FakeCluster()
+        tracker = ConfirmationTracker(poll_interval=0.01, fetch=cluster)
+
+        status = tracker.wait("sig-1", "confirmed", timeout=2)
+
+        self.assertEqual(status["confirmationStatus"], "confirmed")
+        self.assertEqual(cluster.polls["sig-1"], 2)
+
+    def test_failed_transactions_resolve_immediately(self):
+        """Test that a transaction error resolves the waiter without waiting for finality."""
+        tracker = ConfirmationTracker(poll_interval=0.01, fetch=FakeCluster(failed={"bad"}))
+
+        status = tracker.wait("bad", "finalized", timeout=2)
+
+        self.assertIsNotNone(status["err"])
+
+    def test_many_signatures_are_polled_in_batches(self):
+        """Test that outstanding signatures are polled at most 256 per call."""
+        cluster = FakeCluster()
+        tracker = ConfirmationTracker(poll_interval=0.01, fetch=cluster)
+        signatures = [f"sig-{i}" for i in range(MAX_SIGNATURES_PER_REQUEST + 44)]
+
+        results = tracker.wait_many(signatures, "processed", timeout=2)
+
+        self.assertTrue(all(results[signature] is not None for signature in signatures))
+        self.assertLessEqual(max(cluster.batch_sizes), MAX_SIGNATURES_PER_REQUEST)
+        self.assertEqual(tracker.pending_count(), 0)
+
+    def test_timeout_returns_none_and_stops_tracking(self):
+        """Test that a signature that never lands times out cleanly."""
+        tracker = ConfirmationTracker(poll_interval=0.01, fetch=lambda signatures: [None] * len(signatures))
+
+        status = tracker.wait("missing", "confirmed", timeout=0.1)
+
+        self.assertIsNone(status)
+        self.assertEqual(tracker.pending_count(), 0)
+
+
+class TestCreateAssociatedTokenAccount(unittest.TestCase):
+
+    def test_returns_once_confirmed_instead_of_sleeping(self):
+        """Test that ATA creation waits on the confirmation tracker, not a fixed sleep."""
+        tracker = MagicMock()
+        tracker.wait.return_value = {"slot": 1, "err": None, "confirmationStatus": "confirmed"}
+
+        with patch('dspy_solana_wallet.config.SOLANA_REBROADCAST_UNTIL_CONFIRMED', False), \
+                patch('dspy_solana_wallet.primitive_solana_functions.create_associated_token_account_transaction'), \
+                patch('dspy_solana_wallet.primitive_solana_functions._broadcast_transaction', return_value="sig"), \
+                patch('dspy_solana_wallet.primitive_solana_functions.get_confirmation_tracker', return_value=tracker):
+            started = time.monotonic()
+            result = create_associated_token_account(MagicMock(), MagicMock(), TokenType.USDC)
+
+        self.assertEqual(result, "sig")
+        tracker.wait.assert_called_once_with("sig", "confirmed")
+        self.assertLess(time.monotonic() - started, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
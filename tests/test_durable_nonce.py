@@ -0,0 +1,189 @@
+import base64
+import struct
+import unittest
+from unittest.mock import patch, MagicMock
+
+from solders.hash import Hash
+from solders.keypair import Keypair
+from solders.system_program import ID as SYSTEM_PROGRAM
+
+from dspy_solana_wallet.durable_nonce import (
+    create_nonce_account_transaction,
+    create_nonce_sol_transfer_transaction,
+    create_nonce_token_transfer_transaction,
+    presign_transfers,
+    presigned_balance_changes,
+    submit_presigned_transactions,
+    get_nonces,
+    _create_nonce_transaction,
+    _decode_nonce_account,
+)
+from dspy_solana_wallet.primitive_solana_functions import _transfer_token_instruction
+from dspy_solana_wallet import config, shadow_ledger
+from dspy_solana_wallet.shadow_ledger import LAMPORTS_PER_SIGNATURE, ShadowLedger
+from dspy_solana_wallet.token_types import TokenType
+
+
+def nonce_account(authority, nonce, state=1):
+    data = struct.pack('<II', 1, state) + bytes(authority) + bytes(nonce) + struct.pack('<Q', 5000)
+    return {"owner": str(SYSTEM_PROGRAM), "data": [base64.b64encode(data).decode('ascii'), "base64"]}
+
+
+class TestNonceAccounts(unittest.TestCase):
+
+    def test_decode_nonce_account(self):
+        """Test that the authority and stored nonce are read from the account layout."""
+        authority, nonce = Keypair().pubkey(), Hash.new_unique()
+
+        self.assertEqual(_decode_nonce_account(nonce_account(authority, nonce)), (authority, nonce))
+        with self.assertRaises(ValueError):
+            _decode_nonce_account(nonce_account(authority, nonce, state=0))
+        with self.assertRaises(ValueError):
+            _decode_nonce_account(None)
+
+    def test_get_nonces_reads_accounts_in_bulk(self):
+        """Test that nonces come back in input order with None for unusable accounts."""
+        authority = Keypair().pubkey()
+        nonces = [Hash.new_unique() for _ in range(3)]
+        transport = MagicMock()
+        transport.call_batch.return_value = [{"result": {"value": [
+            nonce_account(authority, nonces[0]), None, nonce_account(authority, nonces[2])
+        ]}}]
+
+        with patch('dspy_solana_wallet.durable_nonce.get_transport', return_value=transport):
+            result = get_nonces([Keypair().pubkey() for _ in range(3)])
+
+        self.assertEqual(result, [nonces[0], None, nonces[2]])
+        self.assertEqual(len(transport.call_batch.call_args[0][0]), 1)
+
+    def test_create_nonce_account_transaction(self):
+        """Test that the create transaction is signed by the payer and the new nonce account."""
+        funding_wallet, nonce_keypair = Keypair(), Keypair()
+
+        transaction = create_nonce_account_transaction(funding_wallet, nonce_keypair, lamports=1_447_680, recent_blockhash=Hash.new_unique())
+
+        self.assertEqual(len(transaction.message.instructions), 2)
+        self.assertEqual(len(transaction.signatures), 2)
+        self.assertTrue(all(transaction.verify_with_results()))
+
+
+class TestNonceTransactions(unittest.TestCase):
+
+    def test_transfer_is_signed_against_the_nonce(self):
+        """Test that a nonce transfer uses the nonce as its blockhash and advances it first."""
+        wallet, nonce_pubkey, nonce = Keypair(), Keypair().pubkey(), Hash.new_unique()
+
+        transaction = create_nonce_sol_transfer_transaction(wallet, Keypair().pubkey(), 0.1, nonce_pubkey, nonce)
+
+        message = transaction.message
+        self.assertEqual(message.recent_blockhash, nonce)
+        first = message.instructions[0]
+        self.assertEqual(message.account_keys[first.program_id_index], SYSTEM_PROGRAM)
+        self.assertEqual(bytes(first.data)[:4], (4).to_bytes(4, 'little'))  # AdvanceNonceAccount
+        self.assertTrue(transaction.verify_with_results()[0])
+
+    def test_presign_pairs_each_transfer_with_its_own_nonce(self):
+        """Test that bulk pre-signing uses one nonce account per transfer and needs enough of them."""
+        funding_wallet = Keypair()
+        transfers = [(Keypair().pubkey(), 1) for _ in range(3)]
+        nonce_accounts = [Keypair().pubkey() for _ in range(4)]
+        nonces = [Hash.new_unique() for _ in range(3)]
+
+        with patch('dspy_solana_wallet.durable_nonce.get_nonces', return_value=nonces) as fetch:
+            transactions = presign_transfers(funding_wallet, transfers, TokenType.USDC, nonce_accounts)
+
+        fetch.assert_called_once_with(nonce_accounts[:3])
+        self.assertEqual([tx.message.recent_blockhash for tx in transactions], nonces)
+        for transaction, nonce_pubkey in zip(transactions, nonce_accounts):
+            self.assertIn(nonce_pubkey, transaction.message.account_keys)
+            self.assertTrue(transaction.verify_with_results()[0])
+
+        with self.assertRaises(ValueError):
+            presign_transfers(funding_wallet, transfers, TokenType.USDC, nonce_accounts[:2])
+        with patch('dspy_solana_wallet.durable_nonce.get_nonces', return_value=[nonces[0], None]):
+            with self.assertRaises(ValueError):
+                presign_transfers(funding_wallet, transfers[:2], TokenType.SOL, nonce_accounts)
+
+    def test_presign_with_supplied_nonces_reads_nothing(self):
+        """Test that nonces passed in are used as is, so transfers can be pre-signed offline."""
+        funding_wallet = Keypair()
+        transfers = [(Keypair().pubkey(), "0.25") for _ in range(2)]
+        nonce_accounts = [Keypair().pubkey() for _ in range(2)]
+        nonces = [Hash.new_unique() for _ in range(2)]
+
+        with patch('dspy_solana_wallet.durable_nonce.get_nonces') as fetch:
+            transactions = presign_transfers(funding_wallet, transfers, TokenType.SOL, nonce_accounts, nonces=nonces)
+            with self.assertRaises(ValueError):
+                presign_transfers(funding_wallet, transfers, TokenType.SOL, nonce_accounts, nonces=nonces[:1])
+
+        fetch.assert_not_called()
+        self.assertEqual([tx.message.recent_blockhash for tx in transactions], nonces)
+
+    def test_presigned_balance_changes_are_read_from_the_instructions(self):
+        """Test that SOL and token transfers are decoded, with the token recipient taken from the ATA creation."""
+        funding_wallet, recipient = Keypair(), Keypair().pubkey()
+        nonce_pubkey, nonce = Keypair().pubkey(), Hash.new_unique()
+        funding = funding_wallet.pubkey()
+
+        sol_transfer = create_nonce_sol_transfer_transaction(funding_wallet, recipient, 0.5, nonce_pubkey, nonce)
+        self.assertEqual(presigned_balance_changes(sol_transfer), [
+            (funding, TokenType.SOL, -LAMPORTS_PER_SIGNATURE),
+            (funding, TokenType.SOL, -500_000_000),
+            (recipient, TokenType.SOL, 500_000_000),
+        ])
+
+        token_transfer = create_nonce_token_transfer_transaction(funding_wallet, recipient, TokenType.PYUSD, 2_500_000, nonce_pubkey, nonce)
+        self.assertEqual(presigned_balance_changes(token_transfer), [
+            (funding, TokenType.SOL, -LAMPORTS_PER_SIGNATURE),
+            (funding, TokenType.PYUSD, -2_500_000),
+            (recipient, TokenType.PYUSD, 2_500_000),
+        ])
+
+    def test_submitted_transfers_are_recorded_in_the_shadow_ledger(self):
+        """Test that submitting pre-signed transfers records their deltas and confirms them."""
+        funding_wallet, recipient = Keypair(), Keypair().pubkey()
+        transaction = create_nonce_token_transfer_transaction(
+            funding_wallet, recipient, TokenType.USDC, 1_000_000, Keypair().pubkey(), Hash.new_unique()
+        )
+        ledger = ShadowLedger(max_staleness=60, resync_interval=0, fetch=lambda keys: [5_000_000] * len(keys))
+        ledger.get_balance(recipient, TokenType.USDC)
+        tracker = MagicMock()
+        tracker.wait_many.return_value = {"sig-1": {"err": None, "confirmationStatus": "confirmed"}}
+
+        with patch.object(config, "SOLANA_SHADOW_LEDGER_ENABLED", True), \
+                patch.object(config, "SOLANA_REBROADCAST_UNTIL_CONFIRMED", False), \
+                patch.object(shadow_ledger, "_ledger", ledger), \
+                patch('dspy_solana_wallet.durable_nonce._send_transaction', return_value="sig-1"), \
+                patch('dspy_solana_wallet.durable_nonce.get_confirmation_tracker', return_value=tracker):
+            outcomes = submit_presigned_transactions([transaction])
+
+        self.assertTrue(outcomes[0]["success"])
+        self.assertEqual(ledger.get_balance(recipient, TokenType.USDC), 6_000_000)
+        self.assertIsNotNone(ledger._deltas["sig-1"].confirmed_at)
+
+    def test_unreadable_transfer_is_still_reported_as_sent(self):
+        """Test that a broadcast transfer of a mint outside TokenType succeeds and is waited on despite the ledger."""
+        funding_wallet = Keypair()
+        unknown_mint = Keypair().pubkey()
+        instruction = _transfer_token_instruction(
+            Keypair().pubkey(), Keypair().pubkey(), funding_wallet.pubkey(), unknown_mint, 1_000, TokenType.USDC
+        )
+        transaction = _create_nonce_transaction(funding_wallet, [instruction], Keypair().pubkey(), Hash.new_unique())
+        with self.assertRaises(ValueError):
+            presigned_balance_changes(transaction)
+        tracker = MagicMock()
+        tracker.wait_many.return_value = {"sig-1": {"err": None, "confirmationStatus": "confirmed"}}
+
+        with patch.object(config, "SOLANA_SHADOW_LEDGER_ENABLED", True), \
+                patch.object(config, "SOLANA_REBROADCAST_UNTIL_CONFIRMED", False), \
+                patch.object(shadow_ledger, "_ledger", ShadowLedger(fetch=lambda keys: [0] * len(keys))), \
+                patch('dspy_solana_wallet.durable_nonce._send_transaction', return_value="sig-1"), \
+                patch('dspy_solana_wallet.durable_nonce.get_confirmation_tracker', return_value=tracker):
+            outcomes = submit_presigned_transactions([transaction])
+
+        self.assertEqual(outcomes, [{"signature": "sig-1", "success": True, "error": None}])
+        tracker.wait_many.assert_called_once_with(["sig-1"], "confirmed")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+import asyncio
+import threading
+import time
+import unittest
+
+from dspy_wallet_common.endpoint_router import EndpointRouter
+
+
+class FakeEndpoints:
+    """Stand-in request function with a per-endpoint delay and failure mode."""
+
+    def __init__(self, delays=None, failing=()):
+        self.delays = delays or {}
+        self.failing = set(failing)
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def __call__(self, url):
+        with self.lock:
+            self.calls.append(url)
+        time.sleep(self.delays.get(url, 0))
+        if url in self.failing:
+            raise ConnectionError(f"{url} is down")
+        return url
+
+
+class TestEndpointRouter(unittest.TestCase):
+
+    def test_reads_go_to_the_fastest_endpoint(self):
+        """Test that once both endpoints are measured, requests prefer the lower latency one."""
+        endpoints = FakeEndpoints(delays={"slow": 0.05, "fast": 0.0})
+        router = EndpointRouter(["slow", "fast"])
+
+        router.execute(endpoints)
+        router.execute(endpoints)
+        results = [router.execute(endpoints) for _ in range(5)]
+
+        self.assertEqual(results, ["fast"] * 5)
+        self.assertEqual(router.ranked(), ["fast", "slow"])
+
+    def test_failing_endpoint_is_ejected_and_reprobed(self):
+        """Test that repeated failures eject an endpoint and a successful probe readmits it."""
+        endpoints = FakeEndpoints(failing={"primary"})
+        router = EndpointRouter(["primary", "backup"], failure_threshold=1, eject_seconds=0.05)
+
+        self.assertEqual(router.execute(endpoints), "backup")
+        self.assertTrue(router.stats()["primary"]["ejected"])
+
+        endpoints.calls.clear()
+        router.execute(endpoints)
+        self.assertEqual(endpoints.calls, ["backup"])
+
+        time.sleep(0.1)
+        endpoints.failing.clear()
+        endpoints.calls.clear()
+        router.execute(endpoints)
+        self.assertEqual(endpoints.calls, ["primary"])
+        self.assertFalse(router.stats()["primary"]["ejected"])
+        self.assertIn("primary", router.ranked())
+
+    def test_non_idempotent_requests_are_not_failed_over(self):
+        """Test that a non-idempotent request is only sent to one endpoint."""
+        endpoints = FakeEndpoints(failing={"primary"})
+        router = EndpointRouter(["primary", "backup"])
+
+        with self.assertRaises(ConnectionError):
+            router.execute(endpoints, idempotent=False)
+        self.assertEqual(endpoints.calls, ["primary"])
+
+    def test_slow_reads_are_hedged(self):
+        """Test that a read stuck on a slow endpoint is answered by the hedge."""
+        endpoints = FakeEndpoints(delays={"stuck": 0.5})
+        router = EndpointRouter(["stuck", "backup"], hedge_after=0.02)
+
+        started = time.monotonic()
+        result = router.execute(endpoints)
+
+        self.assertEqual(result, "backup")
+        self.assertLess(time.monotonic() - started, 0.4)
+        self.assertEqual(router.stats()["backup"]["hedges_won"], 1)
+        router.close()
+
+    def test_failed_results_fall_back_to_the_last_response(self):
+        """Test that results marked failed fail over, and the last one is returned when all fail."""
+        router = EndpointRouter(["a", "b"])
+
+        result = router.execute(lambda url: {"url": url, "status": 503}, failed=lambda result: result["status"] >= 500)
+
+        self.assertEqual(result, {"url": "b", "status": 503})
+        self.assertEqual(router.stats()["a"]["failures"], 1)
+
+    def test_execute_async_hedges(self):
+        """Test that the coroutine version hedges to the next endpoint."""
+        router = EndpointRouter(["stuck", "backup"], hedge_after=0.02)
+
+        async def request(url):
+            await asyncio.sleep(0.5 if url == "stuck" else 0)
+            return url
+
+        self.assertEqual(asyncio.run(router.execute_async(request)), "backup")
+
+
+if __name__ == '__main__':
+    unittest.main()
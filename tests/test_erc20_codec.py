@@ -0,0 +1,67 @@
+import unittest
+from unittest.mock import patch
+
+from eth_account import Account
+from eth_utils import keccak
+from web3 import Web3
+
+from dspy_evm_wallet import primitive_evm_functions
+from dspy_evm_wallet.abi import ERC20_ABI
+from dspy_evm_wallet.erc20_codec import (
+    BALANCE_OF_SELECTOR,
+    TRANSFER_SELECTOR,
+    encode_balance_of,
+    encode_transfer,
+)
+from dspy_evm_wallet.token_types import TokenType
+
+
+class TestErc20Codec(unittest.TestCase):
+
+    def setUp(self):
+        self.w3 = Web3()
+        self.contract = self.w3.eth.contract(address=TokenType.USDC.contract_address, abi=ERC20_ABI)
+        self.recipient = Account.create().address
+
+    def test_selectors_match_function_signatures(self):
+        """Test that the precomputed selectors are the keccak prefixes of the ERC20 signatures."""
+        self.assertEqual(TRANSFER_SELECTOR, keccak(text='transfer(address,uint256)')[:4])
+        self.assertEqual(BALANCE_OF_SELECTOR, keccak(text='balanceOf(address)')[:4])
+
+    def test_calldata_matches_web3_encoding(self):
+        """Test that transfer and balanceOf calldata are byte-identical to web3's ABI encoding."""
+        transfer = encode_transfer(self.recipient, 1_500_000)
+        balance_of = encode_balance_of(self.recipient)
+
+        self.assertEqual(len(transfer), 68)
+        self.assertEqual('0x' + transfer.hex(), self.contract.encode_abi('transfer', [self.recipient, 1_500_000]))
+        self.assertEqual('0x' + balance_of.hex(), self.contract.encode_abi('balanceOf', [self.recipient]))
+
+    def test_signed_transfer_matches_build_transaction(self):
+        """Test that a transaction built from codec calldata signs to the same bytes as build_transaction."""
+        account = Account.create()
+        fields = {'chainId': 11155111, 'gas': 100000, 'gasPrice': 2_000_000_000, 'nonce': 4}
+        built = self.contract.functions.transfer(self.recipient, 250).build_transaction(fields)
+        direct = dict(fields, to=TokenType.USDC.contract_address, value=0, data=encode_transfer(self.recipient, 250))
+
+        self.assertEqual(account.sign_transaction(built).raw_transaction, account.sign_transaction(direct).raw_transaction)
+
+    def test_invalid_arguments_are_rejected(self):
+        """Test that bad checksums, malformed addresses and out-of-range amounts raise ValueError."""
+        bad_checksum = self.recipient[:2] + self.recipient[2:].swapcase()
+        for address, amount in ((bad_checksum, 1), ('0x1234', 1), (self.recipient, -1), (self.recipient, 2 ** 256)):
+            with self.assertRaises(ValueError, msg=(address, amount)):
+                encode_transfer(address, amount)
+
+    def test_contract_objects_are_cached_per_token_and_web3(self):
+        """Test that the contract for a token is built once and rebuilt only for another Web3 instance."""
+        first = primitive_evm_functions.get_token_contract(TokenType.PYUSD)
+
+        self.assertIs(primitive_evm_functions.get_token_contract(TokenType.PYUSD), first)
+        self.assertIsNot(primitive_evm_functions.get_token_contract(TokenType.USDG), first)
+        with patch.object(primitive_evm_functions, 'w3', self.w3):
+            self.assertIs(primitive_evm_functions.get_token_contract(TokenType.PYUSD).w3, self.w3)
+
+
+if __name__ == '__main__':
+    unittest.main()
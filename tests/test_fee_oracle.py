@@ -0,0 +1,139 @@
+import threading
+import time
+import unittest
+from unittest.mock import patch, MagicMock
+
+from eth_account import Account
+from web3 import Web3
+from web3.providers.base import BaseProvider
+
+from dspy_evm_wallet import primitive_evm_functions
+from dspy_evm_wallet.fee_oracle import FeeOracle
+from dspy_evm_wallet.token_types import TokenType
+
+
+class RecordingProvider(BaseProvider):
+    """web3 provider that records every RPC method and answers with a transaction hash."""
+
+    def __init__(self):
+        super().__init__()
+        self.methods = []
+
+    def make_request(self, method, params):
+        self.methods.append(method)
+        return {"jsonrpc": "2.0", "id": 1, "result": "0x" + "ab" * 32}
+
+    def is_connected(self, show_traceback=False):
+        return True
+
+
+class ImmediateNonceManager:
+    """Stand-in for the nonce manager that sends with a fixed nonce."""
+
+    def send(self, address, send):
+        return send(0)
+
+
+class TestFeeOracle(unittest.TestCase):
+
+    def oracle(self, **kwargs):
+        options = dict(
+            ttl=60,
+            background_refresh=False,
+            fetch_chain_id=MagicMock(return_value=11155111),
+            fetch_gas_price=MagicMock(return_value=1_000_000_000),
+        )
+        options.update(kwargs)
+        return FeeOracle(**options)
+
+    def test_chain_id_is_fetched_once(self):
+        """Test that the chain ID is cached for the life of the oracle, even across invalidation."""
+        oracle = self.oracle()
+
+        self.assertEqual([oracle.chain_id() for _ in range(3)], [11155111] * 3)
+        oracle.invalidate()
+        oracle.chain_id()
+
+        oracle._fetch_chain_id.assert_called_once()
+
+    def test_gas_price_is_refetched_after_ttl_or_new_block(self):
+        """Test that the gas price is reused within the TTL and refetched once stale or a block passes."""
+        fetch = MagicMock(side_effect=[100, 200, 300])
+        oracle = self.oracle(ttl=0.05, fetch_gas_price=fetch)
+
+        self.assertEqual(oracle.gas_price(), 100)
+        self.assertEqual(oracle.gas_price(), 100)
+        time.sleep(0.1)
+        self.assertEqual(oracle.gas_price(), 200)
+
+        oracle.ttl = 60
+        oracle.observe_block(10)
+        self.assertEqual(oracle.gas_price(), 300)
+        self.assertEqual(oracle.gas_price(multiplier=1.1), 330)
+        self.assertEqual(fetch.call_count, 3)
+
+    def test_concurrent_callers_coalesce_onto_one_fetch(self):
+        """Test that simultaneous cache misses result in a single gas price fetch."""
+        release = threading.Event()
+        calls = []
+
+        def slow_fetch():
+            calls.append(1)
+            release.wait(1)
+            return 42
+
+        oracle = self.oracle(fetch_gas_price=slow_fetch)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(oracle.gas_price())) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.05)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [42] * 8)
+
+    def test_failed_fetch_releases_waiters(self):
+        """Test that an RPC error is raised and the next caller fetches again."""
+        fetch = MagicMock(side_effect=[ConnectionError("down"), 7])
+        oracle = self.oracle(fetch_gas_price=fetch)
+
+        with self.assertRaises(ConnectionError):
+            oracle.gas_price()
+        self.assertEqual(oracle.gas_price(), 7)
+
+    def test_background_refresh_follows_new_blocks(self):
+        """Test that the refresh thread refetches the gas price when the block number advances."""
+        blocks = iter(range(1, 1000))
+        fetch = MagicMock(return_value=5)
+        oracle = self.oracle(ttl=0.04, fetch_gas_price=fetch, fetch_block_number=lambda: next(blocks))
+        oracle.start()
+        try:
+            time.sleep(0.2)
+        finally:
+            oracle.stop()
+
+        self.assertGreaterEqual(fetch.call_count, 2)
+
+    def test_transfers_make_no_rpc_besides_the_broadcast(self):
+        """Test that building and sending ETH and token transfers only calls eth_sendRawTransaction."""
+        provider = RecordingProvider()
+        oracle = self.oracle()
+        oracle.chain_id()
+        oracle.gas_price()
+        private_key = Account.create().key.hex()
+        recipient = Account.create().address
+
+        with patch.object(primitive_evm_functions, 'w3', Web3(provider)), \
+                patch.object(primitive_evm_functions, 'get_fee_oracle', lambda: oracle), \
+                patch.object(primitive_evm_functions, 'get_nonce_manager', lambda: ImmediateNonceManager()):
+            primitive_evm_functions.transfer_eth(private_key, recipient, 0.01)
+            primitive_evm_functions.transfer_token(private_key, recipient, TokenType.USDC, 1.5)
+
+        self.assertEqual(provider.methods, ['eth_sendRawTransaction', 'eth_sendRawTransaction'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+import struct
+import unittest
+from unittest.mock import patch, MagicMock
+
+from solders.address_lookup_table_account import AddressLookupTableAccount, derive_lookup_table_address
+from solders.hash import Hash
+from solders.keypair import Keypair
+from solders.pubkey import Pubkey
+from solders.transaction import Transaction, VersionedTransaction
+
+from dspy_solana_wallet.batch_transfers import batch_transfer_token, pack_instruction_groups, transaction_size, PACKET_DATA_SIZE
+from dspy_solana_wallet.lookup_tables import (
+    create_lookup_table_instruction,
+    extend_lookup_table,
+    extend_lookup_table_instruction,
+    token_transfer_lookup_addresses,
+)
+from dspy_solana_wallet.primitive_solana_functions import _token_transfer_instructions
+from dspy_solana_wallet.token_types import TokenType
+
+
+def lookup_table_data(authority, addresses):
+    meta = struct.pack('<IQQB', 1, 2 ** 64 - 1, 0, 0) + b'\x01' + bytes(authority) + b'\x00\x00'
+    return meta + b''.join(bytes(address) for address in addresses)
+
+
+class TestLookupTableInstructions(unittest.TestCase):
+
+    def test_create_and_extend_layout(self):
+        """Test that create derives the table address and extend encodes the address vector."""
+        authority = Keypair().pubkey()
+        create_ix, table = create_lookup_table_instruction(authority, authority, 1234)
+
+        expected_table, bump = derive_lookup_table_address(authority, 1234)
+        self.assertEqual(table, expected_table)
+        self.assertEqual(bytes(create_ix.data), struct.pack('<IQB', 0, 1234, bump))
+
+        addresses = [Pubkey.new_unique() for _ in range(3)]
+        extend_ix = extend_lookup_table_instruction(table, authority, authority, addresses)
+        self.assertEqual(bytes(extend_ix.data)[:12], struct.pack('<IQ', 2, 3))
+        self.assertEqual(bytes(extend_ix.data)[12:], b''.join(bytes(address) for address in addresses))
+
+    def test_extend_skips_addresses_already_in_the_table(self):
+        """Test that only new addresses are sent, in chunks that fit a transaction."""
+        wallet = Keypair()
+        existing = [Pubkey.new_unique() for _ in range(5)]
+        new = [Pubkey.new_unique() for _ in range(25)]
+        sent = []
+
+        with patch('dspy_solana_wallet.lookup_tables._fetch_lookup_table_account', return_value=lookup_table_data(wallet.pubkey(), existing)), \
+                patch('dspy_solana_wallet.lookup_tables._get_latest_blockhash', return_value=Hash.new_unique()), \
+                patch('dspy_solana_wallet.lookup_tables._broadcast_transaction', side_effect=lambda tx: sent.append(tx) or "sig"):
+            added = extend_lookup_table(wallet, Pubkey.new_unique(), existing + new)
+
+        self.assertEqual(added, 25)
+        self.assertEqual(len(sent), 2)
+        self.assertTrue(all(len(bytes(tx)) <= PACKET_DATA_SIZE for tx in sent))
+
+
+class TestVersionedBatches(unittest.TestCase):
+
+    def setUp(self):
+        self.funding_wallet = Keypair()
+        self.recipients = [Keypair().pubkey() for _ in range(60)]
+        addresses = token_transfer_lookup_addresses(self.funding_wallet.pubkey(), TokenType.USDG, self.recipients)
+        self.lookup_table = AddressLookupTableAccount(key=Pubkey.new_unique(), addresses=addresses)
+
+    def test_lookup_tables_fit_more_transfers_per_transaction(self):
+        """Test that v0 batches through a lookup table hold more transfers and still fit the packet."""
+        payer = self.funding_wallet.pubkey()
+        groups = [_token_transfer_instructions(payer, recipient, TokenType.USDG, 1, False) for recipient in self.recipients]
+
+        legacy = pack_instruction_groups(groups, payer, TokenType.USDG, False)
+        versioned = pack_instruction_groups(groups, payer, TokenType.USDG, False, [self.lookup_table])
+
+        self.assertGreater(len(versioned[0]), 2 * len(legacy[0]))
+        for batch in versioned:
+            instructions = [ix for index in batch for ix in groups[index]]
+            self.assertLessEqual(transaction_size(instructions, payer, [self.lookup_table]), PACKET_DATA_SIZE)
+
+    def test_batch_transfer_sends_signed_v0_transactions(self):
+        """Test that batch_transfer_token signs v0 transactions when given lookup tables."""
+        sent = []
+
+        def send(transaction_bytes):
+            sent.append(VersionedTransaction.from_bytes(transaction_bytes))
+            return f"sig-{len(sent)}"
+
+        with patch('dspy_solana_wallet.config.SOLANA_REBROADCAST_UNTIL_CONFIRMED', False), \
+                patch('dspy_solana_wallet.batch_transfers._get_latest_blockhash', return_value=Hash.new_unique()), \
+                patch('dspy_solana_wallet.batch_transfers._send_transaction', side_effect=send):
+            outcomes = batch_transfer_token(
+                self.funding_wallet, [(recipient, 1) for recipient in self.recipients], TokenType.USDG,
+                confirm=False, lookup_tables=[self.lookup_table]
+            )
+
+        self.assertTrue(all(outcome["success"] for outcome in outcomes))
+        self.assertTrue(all(tx.verify_with_results()[0] for tx in sent))
+        self.assertTrue(all(tx.message.address_table_lookups for tx in sent))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+import unittest
+from decimal import Decimal
+from unittest.mock import patch
+
+from eth_abi import decode, encode
+from web3 import Web3
+from web3.providers.base import BaseProvider
+
+from dspy_evm_wallet import config, primitive_evm_functions
+from dspy_evm_wallet.multicall import (
+    AGGREGATE3_SELECTOR,
+    BALANCE_OF_SELECTOR,
+    GET_ETH_BALANCE_SELECTOR,
+    MULTICALL3_ADDRESS,
+    chunk_calls,
+    encode_aggregate3,
+)
+from dspy_evm_wallet.token_types import TokenType
+
+
+def _wallet(index):
+    return Web3.to_checksum_address(f'0x{index + 1:040x}')
+
+
+class FakeEvm(BaseProvider):
+    """
+    In-process stand-in for a node with Multicall3 and ERC20 contracts deployed.
+
+    Answers eth_call to the Multicall3 address by executing each aggregate3
+    call against in-memory ETH and token balances.
+    """
+
+    def __init__(self, eth_balances=None, token_balances=None):
+        super().__init__()
+        self.eth_balances = {address.lower(): amount for address, amount in (eth_balances or {}).items()}
+        self.token_balances = {
+            (token.lower(), owner.lower()): amount for (token, owner), amount in (token_balances or {}).items()
+        }
+        self.tokens = {token for token, _ in self.token_balances}
+        self.requests = []
+
+    def make_request(self, method, params):
+        self.requests.append((method, params))
+        if method != 'eth_call' or params[0]['to'].lower() != MULTICALL3_ADDRESS.lower():
+            return {"jsonrpc": "2.0", "id": 1, "error": {"code": -32601, "message": f"unsupported {method}"}}
+
+        data = bytes.fromhex(params[0]['data'][2:])
+        assert data[:4] == AGGREGATE3_SELECTOR
+        calls = decode(['(address,bool,bytes)[]'], data[4:])[0]
+        results = [self._execute(target.lower(), calldata) for target, _, calldata in calls]
+        return {"jsonrpc": "2.0", "id": 1, "result": '0x' + encode(['(bool,bytes)[]'], [results]).hex()}
+
+    def is_connected(self, show_traceback=False):
+        return True
+
+    def _execute(self, target, calldata):
+        owner = '0x' + calldata[16:36].hex()
+        if target == MULTICALL3_ADDRESS.lower() and calldata[:4] == GET_ETH_BALANCE_SELECTOR:
+            return True, self.eth_balances.get(owner, 0).to_bytes(32, 'big')
+        if target in self.tokens and calldata[:4] == BALANCE_OF_SELECTOR:
+            return True, self.token_balances.get((target, owner), 0).to_bytes(32, 'big')
+        # A call to an address without code reverts
+        return False, b''
+
+
+class TestMulticall(unittest.TestCase):
+
+    def test_chunks_respect_calldata_limit(self):
+        """Test that calls are split so every encoded aggregate3 request stays within the limit."""
+        calls = [(MULTICALL3_ADDRESS, True, GET_ETH_BALANCE_SELECTOR + bytes(32))] * 100
+
+        chunks = chunk_calls(calls, max_calldata_bytes=2000)
+
+        self.assertEqual(sum(len(chunk) for chunk in chunks), 100)
+        self.assertTrue(all(len(encode_aggregate3(chunk)) <= 2000 for chunk in chunks))
+        self.assertGreater(len(encode_aggregate3(chunks[0] + calls[:1])), 2000)
+
+    def test_get_balances_returns_wallet_by_token_matrix(self):
+        """Test that ETH and ERC20 balances come back per wallet and token in get_balance units."""
+        alice, bob = _wallet(0), _wallet(1)
+        evm = FakeEvm(
+            eth_balances={alice: 2 * 10 ** 18},
+            token_balances={(TokenType.USDC.contract_address, bob): 1_500_000},
+        )
+
+        with patch.object(primitive_evm_functions, 'w3', Web3(evm)):
+            balances = primitive_evm_functions.get_balances([alice, bob], [TokenType.ETH, TokenType.USDC])
+
+        self.assertEqual(balances, [[Decimal(2), 0.0], [Decimal(0), 1.5]])
+        self.assertEqual(len(evm.requests), 1)
+
+    def test_failed_calls_are_none(self):
+        """Test that a reverted read yields None without failing the other reads."""
+        evm = FakeEvm(eth_balances={_wallet(0): 10 ** 17})
+
+        with patch.object(primitive_evm_functions, 'w3', Web3(evm)):
+            balances = primitive_evm_functions.get_balances([_wallet(0)], [TokenType.ETH, TokenType.PYUSD])
+
+        self.assertEqual(balances, [[Decimal('0.1'), None]])
+
+    def test_large_sweep_takes_a_handful_of_calls(self):
+        """Test that thousands of wallet and token reads are chunked into a few eth_calls in order."""
+        wallets = [_wallet(index) for index in range(3000)]
+        evm = FakeEvm(token_balances={
+            (TokenType.USDC.contract_address, wallet): index for index, wallet in enumerate(wallets)
+        })
+
+        with patch.object(primitive_evm_functions, 'w3', Web3(evm)), \
+                patch.object(config, 'EVM_MULTICALL_MAX_CALLDATA_BYTES', 65536):
+            balances = primitive_evm_functions.get_balances(wallets, [TokenType.USDC, TokenType.ETH])
+
+        self.assertEqual([row[0] for row in balances], [index / 10 ** 6 for index in range(3000)])
+        self.assertLessEqual(len(evm.requests), 25)
+        self.assertTrue(all(len(params[0]['data']) // 2 <= 65536 for _, params in evm.requests))
+
+
+if __name__ == '__main__':
+    unittest.main()
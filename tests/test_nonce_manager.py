@@ -0,0 +1,148 @@
+import tempfile
+import threading
+import time
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+
+import requests
+
+from dspy_evm_wallet.nonce_manager import NonceManager, is_nonce_error
+
+ADDRESS = "0x000000000000000000000000000000000000dEaD"
+
+
+def _fixed_pending_count(address):
+    return 5
+
+
+def _allocate_in_process(state_dir, count):
+    manager = NonceManager(fetch_pending_count=_fixed_pending_count, state_dir=state_dir, resync_seconds=60, chain_id=1)
+    return [manager.allocate(ADDRESS) for _ in range(count)]
+
+
+class FakeNode:
+    """Stand-in for eth_getTransactionCount(address, 'pending')."""
+
+    def __init__(self, pending=0):
+        self.pending = pending
+        self.calls = 0
+
+    def __call__(self, address):
+        self.calls += 1
+        return self.pending
+
+
+class TestNonceManager(unittest.TestCase):
+
+    def setUp(self):
+        self.state_dir = tempfile.mkdtemp()
+        self.node = FakeNode(pending=7)
+
+    def manager(self, **kwargs):
+        options = dict(resync_seconds=60, gap_seconds=60, chain_id=1)
+        options.update(kwargs)
+        return NonceManager(fetch_pending_count=self.node, state_dir=self.state_dir, **options)
+
+    def test_nonces_are_allocated_locally_after_seeding(self):
+        """Test that only the first allocation asks the node and later ones count up locally."""
+        manager = self.manager()
+
+        nonces = [manager.allocate(ADDRESS) for _ in range(5)]
+
+        self.assertEqual(nonces, [7, 8, 9, 10, 11])
+        self.assertEqual(self.node.calls, 1)
+
+    def test_each_chain_has_its_own_nonce_sequence(self):
+        """Test that one address used on two chains does not share a nonce counter."""
+        mainnet, fork = self.manager(chain_id=1), self.manager(chain_id=31337)
+
+        self.assertEqual([mainnet.allocate(ADDRESS) for _ in range(3)], [7, 8, 9])
+        self.node.pending = 0
+        self.assertEqual([fork.allocate(ADDRESS) for _ in range(2)], [0, 1])
+        self.assertEqual(mainnet.allocate(ADDRESS), 10)
+
+    def test_concurrent_threads_get_unique_nonces(self):
+        """Test that threads sending from one address never share a nonce."""
+        manager = self.manager()
+        nonces = []
+        lock = threading.Lock()
+
+        def allocate():
+            for _ in range(20):
+                nonce = manager.allocate(ADDRESS)
+                with lock:
+                    nonces.append(nonce)
+
+        threads = [threading.Thread(target=allocate) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(sorted(nonces), list(range(7, 7 + 160)))
+
+    def test_processes_share_the_nonce_sequence(self):
+        """Test that separate processes allocate from one sequence through the state file."""
+        with ProcessPoolExecutor(max_workers=3) as executor:
+            results = list(executor.map(_allocate_in_process, [self.state_dir] * 3, [10] * 3))
+
+        nonces = [nonce for result in results for nonce in result]
+        self.assertEqual(sorted(nonces), list(range(5, 35)))
+
+    def test_failed_sends_release_their_nonce_and_nonce_errors_resync(self):
+        """Test that a failed send's nonce is reused and a 'nonce too low' error resyncs from the node."""
+        manager = self.manager()
+
+        with self.assertRaises(ConnectionRefusedError):
+            manager.send(ADDRESS, lambda nonce: (_ for _ in ()).throw(ConnectionRefusedError("node unreachable")))
+        self.assertEqual(manager.allocate(ADDRESS), 7)
+
+        self.node.pending = 12
+        attempts = []
+
+        def send(nonce):
+            attempts.append(nonce)
+            if nonce < 12:
+                raise ValueError({"code": -32000, "message": "nonce too low"})
+            return f"tx-{nonce}"
+
+        self.assertEqual(manager.send(ADDRESS, send), "tx-12")
+        self.assertEqual(attempts, [8, 12])
+        self.assertTrue(is_nonce_error(ValueError("Nonce too high")))
+
+    def test_ambiguous_send_errors_keep_the_nonce_reserved(self):
+        """Test that a timeout, where the transaction may have reached the node, does not release its nonce."""
+        manager = self.manager()
+
+        with self.assertRaises(requests.exceptions.ReadTimeout):
+            manager.send(ADDRESS, lambda nonce: (_ for _ in ()).throw(requests.exceptions.ReadTimeout("no response")))
+
+        self.assertEqual(manager.allocate(ADDRESS), 8)
+
+    def test_resync_never_reissues_live_allocations(self):
+        """Test that a forced resync does not hand out nonces other senders are still broadcasting."""
+        manager = self.manager()
+        self.assertEqual([manager.allocate(ADDRESS) for _ in range(2)], [7, 8])
+
+        manager.resync(ADDRESS)
+        self.assertEqual(manager.allocate(ADDRESS), 9)
+
+        # A nonce the node rejected is reused once the node's count catches up to it
+        manager.release(ADDRESS, 9)
+        manager.resync(ADDRESS)
+        self.assertEqual(manager.allocate(ADDRESS), 9)
+
+    def test_dropped_transactions_leave_gaps_that_are_refilled(self):
+        """Test that nonces the node never saw are handed out again after gap_seconds."""
+        manager = self.manager(resync_seconds=0, gap_seconds=0.05)
+        self.assertEqual([manager.allocate(ADDRESS) for _ in range(3)], [7, 8, 9])
+
+        # The node accepted nonce 7, but 8 and 9 were dropped from its mempool
+        self.node.pending = 8
+        time.sleep(0.1)
+
+        self.assertEqual([manager.allocate(ADDRESS) for _ in range(3)], [8, 9, 10])
+
+
+if __name__ == '__main__':
+    unittest.main()
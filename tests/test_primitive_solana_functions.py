@@ -1,9 +1,28 @@
+import base64
 import unittest
 import os
 import sys
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from unittest.mock import patch, MagicMock
 
-from dspy_solana_wallet.primitive_solana_functions import create_new_wallet
+from solders.keypair import Keypair
+from solders.pubkey import Pubkey
+from solders.hash import Hash
+
+from dspy_solana_wallet.primitive_solana_functions import (
+    create_new_wallet,
+    get_balances,
+    get_associated_token_address,
+    derive_atas,
+    create_ata_and_token_transfer_transaction,
+    create_token_transfer_transaction,
+    create_sol_transfer_transaction,
+    get_token_balances,
+    _derive_ata_chunk
+)
+from dspy_solana_wallet.token_types import TokenType, ASSOCIATED_TOKEN_PROGRAM_ID
+from dspy_solana_wallet import config
 
 class TestCreateNewWallet(unittest.TestCase):
     
@@ -41,3 +60,213 @@ class TestCreateNewWallet(unittest.TestCase):
                 
                 # Verify base58 encoding was called with the correct bytes
                 mock_b58encode.assert_called_once_with(b'test_private_key_bytes')
+
+
+class TestGetBalances(unittest.TestCase):
+
+    def test_get_balances_keeps_per_item_results(self):
+        """Test that each (wallet, token) pair gets its own balance, error or zero."""
+        wallets = [Keypair().pubkey() for _ in range(3)]
+        responses = [
+            {"result": {"value": 5_000_000_000}},
+            {"error": {"code": -32602, "message": "Invalid param: could not find account"}},
+            {"result": {"value": {"amount": "1500000", "decimals": 6}}},
+            {"error": {"code": -32603, "message": "internal error"}},
+        ]
+
+        with patch('dspy_solana_wallet.primitive_solana_functions.get_transport') as mock_get_transport:
+            mock_get_transport.return_value.call_batch.return_value = responses
+
+            balances = get_balances([
+                (wallets[0], TokenType.SOL),
+                (wallets[1], TokenType.USDC),
+                (wallets[2], TokenType.USDG),
+                (wallets[0], TokenType.PYUSD),
+            ])
+
+            calls = mock_get_transport.return_value.call_batch.call_args[0][0]
+            self.assertEqual([method for method, _ in calls], ["getBalance"] + ["getTokenAccountBalance"] * 3)
+            self.assertEqual(calls[0][1], [str(wallets[0])])
+
+        self.assertEqual(balances, [5_000_000_000, 0, 1_500_000, -1])
+
+
+class TestAssociatedTokenAddress(unittest.TestCase):
+
+    def expected_ata(self, owner, token_type):
+        return Pubkey.find_program_address(
+            [bytes(owner), bytes(Pubkey.from_string(token_type.program_id)), bytes(Pubkey.from_string(token_type.value))],
+            Pubkey.from_string(ASSOCIATED_TOKEN_PROGRAM_ID)
+        )[0]
+
+    def test_repeated_lookups_hit_the_cache(self):
+        """Test that the bump-seed search runs once per (owner, mint, program)."""
+        owner = Keypair().pubkey()
+        expected = self.expected_ata(owner, TokenType.USDG)
+
+        with patch('dspy_solana_wallet.primitive_solana_functions.Pubkey.find_program_address', return_value=(expected, 255)) as mock_find:
+            first = get_associated_token_address(owner, TokenType.USDG)
+            second = get_associated_token_address(owner, TokenType.USDG)
+
+        self.assertEqual(first, expected)
+        self.assertEqual(second, expected)
+        mock_find.assert_called_once()
+
+    def test_derive_atas_in_process_and_across_a_pool(self):
+        """Test that bulk derivation returns the same addresses in input order either way."""
+        owners = [Keypair().pubkey() for _ in range(6)]
+        expected = [self.expected_ata(owner, TokenType.USDC) for owner in owners]
+
+        self.assertEqual(derive_atas(owners, TokenType.USDC, processes=1), expected)
+
+        with patch.object(config, 'SOLANA_ATA_PARALLEL_THRESHOLD', 1), \
+                patch.object(config, 'SOLANA_ATA_PARALLEL_CHUNK_SIZE', 4):
+            self.assertEqual(derive_atas(owners, TokenType.PYUSD, processes=2), [self.expected_ata(owner, TokenType.PYUSD) for owner in owners])
+
+    def test_derive_atas_only_sends_cache_misses_to_the_pool(self):
+        """Test that cached owners skip the process pool and derived misses are cached."""
+        owners = [Keypair().pubkey() for _ in range(6)]
+        expected = [self.expected_ata(owner, TokenType.USDG) for owner in owners]
+        for owner in owners[:4]:
+            get_associated_token_address(owner, TokenType.USDG)
+
+        with patch.object(config, 'SOLANA_ATA_PARALLEL_THRESHOLD', 2), \
+                patch('dspy_solana_wallet.primitive_solana_functions.ProcessPoolExecutor', ThreadPoolExecutor), \
+                patch('dspy_solana_wallet.primitive_solana_functions._derive_ata_chunk', wraps=_derive_ata_chunk) as derive_chunk:
+            self.assertEqual(derive_atas(owners, TokenType.USDG, processes=2), expected)
+            self.assertEqual([bytes(owner) for chunk in derive_chunk.call_args_list for owner in chunk.args[0]],
+                             [bytes(owner) for owner in owners[4:]])
+
+            derive_chunk.reset_mock()
+            self.assertEqual(derive_atas(owners, TokenType.USDG, processes=2), expected)
+            derive_chunk.assert_not_called()
+
+
+class TestCreateAtaAndTokenTransferTransaction(unittest.TestCase):
+
+    def test_single_transaction_holds_ata_create_and_transfer(self):
+        """Test that the ATA create and transfer_checked are signed together in one transaction."""
+        funding_wallet = Keypair()
+        recipient = Keypair().pubkey()
+
+        with patch('dspy_solana_wallet.primitive_solana_functions._get_latest_blockhash', return_value=Hash.new_unique()) as mock_blockhash:
+            transaction = create_ata_and_token_transfer_transaction(funding_wallet, recipient, TokenType.USDG, 1_500_000)
+
+        mock_blockhash.assert_called_once()
+        message = transaction.message
+        self.assertEqual(len(message.instructions), 2)
+        self.assertEqual([bytes(ix.data) for ix in message.instructions][0], bytes([1]))
+        self.assertEqual(bytes(message.instructions[1].data)[0], 12)
+        self.assertEqual(len(transaction.signatures), 1)
+        self.assertTrue(transaction.verify_with_results()[0])
+
+class TestMessageTemplates(unittest.TestCase):
+
+    @staticmethod
+    def resolved(transaction):
+        message = transaction.message
+        return [
+            (message.program_id(ix.program_id_index), [message.account_keys[i] for i in ix.accounts], bytes(ix.data))
+            for ix in message.instructions
+        ]
+
+    def build(self, builder, *args, templates):
+        with patch('dspy_solana_wallet.config.SOLANA_MESSAGE_TEMPLATES_ENABLED', templates):
+            return builder(*args, recent_blockhash=self.blockhash)
+
+    def setUp(self):
+        self.funding_wallet = Keypair()
+        self.blockhash = Hash.new_unique()
+
+    def test_templated_transactions_match_built_ones(self):
+        """Test that patched templates produce the same signed instructions as building from scratch."""
+        for builder, token_args, amount in [
+            (create_ata_and_token_transfer_transaction, [TokenType.USDG], 1_500_000),
+            (create_token_transfer_transaction, [TokenType.USDG], 2_000_000),
+            (create_sol_transfer_transaction, [], 0.25),
+        ]:
+            for _ in range(2):
+                args = [self.funding_wallet, Keypair().pubkey(), *token_args, amount]
+                templated = self.build(builder, *args, templates=True)
+                built = self.build(builder, *args, templates=False)
+
+                self.assertEqual(self.resolved(templated), self.resolved(built))
+                self.assertEqual(templated.message.recent_blockhash, self.blockhash)
+                self.assertEqual(templated.message.header, built.message.header)
+                self.assertTrue(templated.verify_with_results()[0])
+
+    def test_sending_to_a_key_already_in_the_template_falls_back(self):
+        """Test that a recipient that is already an account of the message is built from scratch."""
+        transaction = self.build(create_sol_transfer_transaction, self.funding_wallet, self.funding_wallet.pubkey(), 0.1, templates=True)
+
+        self.assertEqual(len(transaction.message.account_keys), 2)
+        self.assertTrue(transaction.verify_with_results()[0])
+
+    def test_template_placeholders_stay_out_of_the_ata_cache(self):
+        """Test that building a token template caches only the real funding and recipient ATAs."""
+        recipient = Keypair().pubkey()
+        with patch('dspy_solana_wallet.primitive_solana_functions._ata_cache', OrderedDict()) as cache:
+            self.build(create_token_transfer_transaction, self.funding_wallet, recipient, TokenType.USDC, 1_000, templates=True)
+
+        self.assertEqual({owner for owner, _, _ in cache}, {bytes(self.funding_wallet.pubkey()), bytes(recipient)})
+
+
+class TestGetTokenBalances(unittest.TestCase):
+
+    def token_account(self, token_type, owner, amount, extra=b''):
+        data = bytes(Pubkey.from_string(token_type.value)) + bytes(owner) + amount.to_bytes(8, 'little') + extra
+        return {
+            "data": [base64.b64encode(data[:72]).decode('ascii'), "base64"],
+            "owner": token_type.program_id,
+            "lamports": 2039280,
+            "executable": False,
+        }
+
+    def test_decodes_accounts_locally_in_input_order(self):
+        """Test that balances are decoded from account data and missing ATAs map to 0."""
+        wallets = [Keypair().pubkey() for _ in range(3)]
+        accounts = [
+            self.token_account(TokenType.USDG, wallets[0], 1_500_000, extra=bytes(200)),
+            None,
+            self.token_account(TokenType.USDG, wallets[2], 42),
+        ]
+
+        with patch('dspy_solana_wallet.primitive_solana_functions.get_transport') as mock_get_transport:
+            mock_get_transport.return_value.call_batch.return_value = [{"result": {"context": {"slot": 1}, "value": accounts}}]
+            balances = get_token_balances(wallets, TokenType.USDG)
+
+            calls = mock_get_transport.return_value.call_batch.call_args[0][0]
+
+        self.assertEqual(balances, [1_500_000, 0, 42])
+        self.assertEqual(calls[0][0], "getMultipleAccounts")
+        self.assertEqual(calls[0][1][0], [str(get_associated_token_address(wallet, TokenType.USDG)) for wallet in wallets])
+        self.assertEqual(calls[0][1][1]["encoding"], "base64")
+
+    def test_chunks_by_100_and_isolates_failed_calls(self):
+        """Test that wallets are split into 100-account calls and a failed call only affects its chunk."""
+        wallets = [Keypair().pubkey() for _ in range(150)]
+
+        def call_batch(calls):
+            self.assertEqual([len(params[0]) for _, params in calls], [100, 50])
+            return [
+                {"error": {"code": -32005, "message": "Node is behind"}},
+                {"result": {"value": [self.token_account(TokenType.USDC, wallet, 7) for wallet in wallets[100:]]}},
+            ]
+
+        with patch('dspy_solana_wallet.primitive_solana_functions.get_transport') as mock_get_transport:
+            mock_get_transport.return_value.call_batch.side_effect = call_batch
+            balances = get_token_balances(wallets, TokenType.USDC)
+
+        self.assertEqual(balances, [-1] * 100 + [7] * 50)
+
+    def test_rejects_accounts_for_another_mint(self):
+        """Test that an account holding a different mint is reported as an error, not a balance."""
+        wallet = Keypair().pubkey()
+
+        with patch('dspy_solana_wallet.primitive_solana_functions.get_transport') as mock_get_transport:
+            mock_get_transport.return_value.call_batch.return_value = [
+                {"result": {"value": [{**self.token_account(TokenType.USDC, wallet, 7), "owner": TokenType.USDC.program_id}]}}
+            ]
+            balances = get_token_balances([wallet], TokenType.PYUSD)
+
+        self.assertEqual(balances, [-1])
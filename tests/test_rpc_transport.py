@@ -0,0 +1,160 @@
+import json
+import unittest
+from unittest.mock import patch
+
+import httpx
+
+from dspy_solana_wallet import rpc_transport
+from dspy_solana_wallet.rpc_transport import RpcTransport
+from dspy_solana_wallet.primitive_solana_functions import _send_rpc_request, _make_rpc_request
+
+
+def _mock_client(handler):
+    return httpx.Client(transport=httpx.MockTransport(handler))
+
+
+class TestRpcTransport(unittest.TestCase):
+
+    def setUp(self):
+        self.seen = []
+
+        def handler(request):
+            body = json.loads(request.content)
+            self.seen.append((str(request.url), body))
+            return httpx.Response(200, json={"jsonrpc": "2.0", "id": body["id"], "result": body["method"]})
+
+        self.transport = RpcTransport(url="https://rpc.example.com")
+        self.transport._client = _mock_client(handler)
+
+    def tearDown(self):
+        self.transport.close()
+
+    def test_call_builds_json_rpc_payload(self):
+        """Test that call() wraps the method and params in a JSON-RPC envelope."""
+        result = self.transport.call("getBalance", ["abc"])
+
+        self.assertEqual(result["result"], "getBalance")
+        url, body = self.seen[0]
+        self.assertEqual(url, "https://rpc.example.com")
+        self.assertEqual(body, {"jsonrpc": "2.0", "id": 1, "method": "getBalance", "params": ["abc"]})
+
+    def test_post_can_target_another_url(self):
+        """Test that a request can override the default endpoint."""
+        self.transport.post({"jsonrpc": "2.0", "id": 1, "method": "requestAirdrop"}, url="https://faucet.example.com")
+
+        self.assertEqual(self.seen[0][0], "https://faucet.example.com")
+
+    def test_stats_count_requests_and_errors(self):
+        """Test that stats track requests, errors and in-flight peaks."""
+        self.transport.call("getHealth")
+
+        def failing(request):
+            raise httpx.ConnectError("boom")
+
+        self.transport._client = _mock_client(failing)
+        with self.assertRaises(httpx.ConnectError):
+            self.transport.call("getHealth")
+
+        stats = self.transport.stats()
+        self.assertEqual(stats["requests"], 2)
+        self.assertEqual(stats["errors"], 1)
+        self.assertEqual(stats["in_flight"], 0)
+        self.assertEqual(stats["peak_in_flight"], 1)
+
+    def test_call_batch_chunks_and_keeps_input_order(self):
+        """Test that batch calls are chunked and responses are matched back by id."""
+        def handler(request):
+            body = json.loads(request.content)
+            self.seen.append(body)
+            # Answer out of order to make sure results are matched by id
+            return httpx.Response(200, json=[
+                {"jsonrpc": "2.0", "id": item["id"], "result": item["params"][0]}
+                for item in reversed(body)
+            ])
+
+        self.transport._client = _mock_client(handler)
+        results = self.transport.call_batch([("getBalance", [str(i)]) for i in range(5)], batch_size=2)
+
+        self.assertEqual([len(body) for body in self.seen], [2, 2, 1])
+        self.assertEqual([result["result"] for result in results], ["0", "1", "2", "3", "4"])
+
+    def test_call_batch_isolates_failed_chunks(self):
+        """Test that a rejected chunk only marks its own calls as errors."""
+        def handler(request):
+            body = json.loads(request.content)
+            if body[0]["id"] == 0:
+                return httpx.Response(200, json={"jsonrpc": "2.0", "id": None, "error": {"code": -32600, "message": "too large"}})
+            return httpx.Response(200, json=[{"jsonrpc": "2.0", "id": item["id"], "result": 1} for item in body])
+
+        self.transport._client = _mock_client(handler)
+        results = self.transport.call_batch([("getBalance", ["a"])] * 3, batch_size=2)
+
+        self.assertEqual(results[0]["error"]["message"], "too large")
+        self.assertEqual(results[1]["error"]["message"], "too large")
+        self.assertEqual(results[2]["result"], 1)
+
+    def test_primitive_helpers_share_the_process_transport(self):
+        """Test that both RPC helpers go through the shared transport."""
+        with patch.object(rpc_transport, "_transport", self.transport):
+            self.assertEqual(_send_rpc_request("getLatestBlockhash")["result"], "getLatestBlockhash")
+            self.assertEqual(_make_rpc_request("getBalance", ["abc"])["result"], "getBalance")
+
+        self.assertEqual(self.transport.stats()["requests"], 2)
+
+    def test_reads_fail_over_but_sends_do_not(self):
+        """Test that a read moves to the next endpoint on HTTP 503 while sendTransaction stays put."""
+        seen = []
+
+        def handler(request):
+            body = json.loads(request.content)
+            seen.append(str(request.url))
+            if request.url.host == "down.example.com":
+                return httpx.Response(503, text="unavailable")
+            return httpx.Response(200, json={"jsonrpc": "2.0", "id": body["id"], "result": body["method"]})
+
+        transport = RpcTransport(urls=["https://down.example.com", "https://up.example.com"])
+        transport._client = _mock_client(handler)
+
+        self.assertEqual(transport.call("getBalance", ["abc"])["result"], "getBalance")
+        self.assertEqual(seen, ["https://down.example.com", "https://up.example.com"])
+        self.assertEqual(transport.stats()["endpoints"]["https://down.example.com"]["failures"], 1)
+
+        transport.router.ranked = lambda probe=True: ["https://down.example.com", "https://up.example.com"]
+        seen.clear()
+        response = transport.post({"jsonrpc": "2.0", "id": 1, "method": "sendTransaction", "params": []})
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(seen, ["https://down.example.com"])
+        transport.close()
+
+    def test_sends_go_to_the_endpoint_that_served_the_blockhash(self):
+        """Test that sendTransaction is pinned to the endpoint of the latest getLatestBlockhash unless it is ejected."""
+        seen = []
+        down = {"https://a.example.com"}
+
+        def handler(request):
+            body = json.loads(request.content)
+            seen.append((str(request.url), body["method"]))
+            if str(request.url) in down:
+                return httpx.Response(503, text="unavailable")
+            return httpx.Response(200, json={"jsonrpc": "2.0", "id": body["id"], "result": body["method"]})
+
+        transport = RpcTransport(urls=["https://a.example.com", "https://b.example.com"], hedge_after=0)
+        transport._client = _mock_client(handler)
+        transport.router.ranked = lambda probe=True: ["https://a.example.com", "https://b.example.com"]
+
+        transport.call("getLatestBlockhash")
+        down.clear()
+        transport.call("sendTransaction", ["tx"])
+        transport.call("getBalance", ["abc"])
+        self.assertEqual(seen[-2:], [("https://b.example.com", "sendTransaction"), ("https://a.example.com", "getBalance")])
+
+        # An ejected endpoint is not used for sends, even if it served the blockhash
+        for _ in range(transport.router.failure_threshold):
+            transport.router.record("https://b.example.com", 0.1, success=False)
+        transport.call("sendTransaction", ["tx"])
+        self.assertEqual(seen[-1], ("https://a.example.com", "sendTransaction"))
+        transport.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
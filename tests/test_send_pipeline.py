@@ -0,0 +1,160 @@
+import threading
+import unittest
+from unittest.mock import patch
+
+from solders.hash import Hash
+from solders.keypair import Keypair
+from solders.system_program import TransferParams, transfer
+from solders.transaction import Transaction
+
+from dspy_solana_wallet import blockhash_cache
+from dspy_solana_wallet.blockhash_cache import BlockhashProvider
+from dspy_solana_wallet.send_pipeline import TransactionSender, LANDED, FAILED, EXPIRED
+
+
+def signed_transaction(blockhash=None):
+    payer = Keypair()
+    instruction = transfer(TransferParams(from_pubkey=payer.pubkey(), to_pubkey=Keypair().pubkey(), lamports=1))
+    transaction = Transaction.new_with_payer([instruction], payer.pubkey())
+    transaction.sign([payer], blockhash or Hash.new_unique())
+    return transaction
+
+
+class FakeCluster:
+    """Stand-in for sendTransaction / getSignatureStatuses / getBlockHeight."""
+
+    def __init__(self, lands_after=None, failed=(), block_height=100):
+        self.sends = {}
+        self.lands_after = lands_after or {}
+        self.failed = set(failed)
+        self.block_height = block_height
+        self.lock = threading.Lock()
+
+    def send(self, raw):
+        signature = str(Transaction.from_bytes(raw).signatures[0])
+        with self.lock:
+            self.sends[signature] = self.sends.get(signature, 0) + 1
+        return signature
+
+    def fetch_statuses(self, signatures):
+        statuses = []
+        with self.lock:
+            for signature in signatures:
+                if signature in self.failed:
+                    statuses.append({"slot": 7, "err": {"InstructionError": [0, "Custom"]}, "confirmationStatus": "processed"})
+                elif signature in self.lands_after and self.sends.get(signature, 0) >= self.lands_after[signature]:
+                    statuses.append({"slot": 8, "err": None, "confirmationStatus": "confirmed"})
+                else:
+                    statuses.append(None)
+        return statuses
+
+    def fetch_block_height(self):
+        return self.block_height
+
+    def sender(self, rebroadcast_interval=0.02):
+        sender = TransactionSender(
+            rebroadcast_interval=rebroadcast_interval,
+            send=self.send,
+            fetch_statuses=self.fetch_statuses,
+            fetch_block_height=self.fetch_block_height
+        )
+        sender.poll_interval = 0.01
+        return sender
+
+
+class TestTransactionSender(unittest.TestCase):
+
+    def setUp(self):
+        self.provider = BlockhashProvider(ttl=60, background_refresh=False)
+        self.patch = patch.object(blockhash_cache, "_provider", self.provider)
+        self.patch.start()
+
+    def tearDown(self):
+        self.patch.stop()
+
+    def test_rebroadcasts_until_landed(self):
+        """Test that the same bytes are re-sent until the signature is confirmed."""
+        transaction = signed_transaction()
+        signature = str(transaction.signatures[0])
+        cluster = FakeCluster(lands_after={signature: 3})
+        sender = cluster.sender()
+
+        outcome = sender.send(transaction)
+
+        self.assertEqual(outcome["status"], LANDED)
+        self.assertEqual(outcome["signature"], signature)
+        self.assertEqual(outcome["slot"], 8)
+        self.assertEqual(outcome["attempts"], 3)
+        self.assertEqual(sender.stats()["landing_rate"], 1.0)
+
+    def test_stops_once_the_blockhash_expires(self):
+        """Test that a transaction is reported expired once the block height passes its blockhash."""
+        blockhash = Hash.new_unique()
+        self.provider.update(blockhash, 50)
+        cluster = FakeCluster(block_height=51)
+
+        outcome = cluster.sender().send(signed_transaction(blockhash))
+
+        self.assertEqual(outcome["status"], EXPIRED)
+        self.assertEqual(outcome["attempts"], 1)
+
+    def test_on_chain_failure_is_not_retried(self):
+        """Test that a transaction that fails on-chain resolves immediately as failed."""
+        transaction = signed_transaction()
+        signature = str(transaction.signatures[0])
+        cluster = FakeCluster(failed=[signature])
+
+        outcome = cluster.sender().send(transaction)
+
+        self.assertEqual(outcome["status"], FAILED)
+        self.assertIn("InstructionError", outcome["error"])
+        self.assertEqual(cluster.sends[signature], 1)
+
+    def test_rpc_rejection_resolves_without_rebroadcasting(self):
+        """Test that an RPC error on the first send fails the transaction instead of retrying it."""
+        def reject(raw):
+            raise Exception("RPC Error: {'code': -32002, 'message': 'insufficient funds for fee'}")
+
+        sender = TransactionSender(rebroadcast_interval=0.02, send=reject, fetch_statuses=lambda signatures: [None] * len(signatures))
+        outcome = sender.send(signed_transaction())
+
+        self.assertEqual(outcome["status"], FAILED)
+        self.assertEqual(sender.stats()["in_flight"], 0)
+
+    def test_duplicate_sends_share_one_broadcast(self):
+        """Test that concurrent sends of the same signature are deduplicated."""
+        transaction = signed_transaction()
+        signature = str(transaction.signatures[0])
+        cluster = FakeCluster(lands_after={signature: 4})
+        sender = cluster.sender(rebroadcast_interval=0.05)
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(sender.send(transaction))) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(results), 5)
+        self.assertTrue(all(result["status"] == LANDED for result in results))
+        self.assertEqual(cluster.sends[signature], 4)
+        self.assertEqual(sender.stats()["sent"], 1)
+
+    def test_send_many_resolves_each_transaction(self):
+        """Test that a mix of landing and failing transactions is resolved in input order."""
+        transactions = [signed_transaction() for _ in range(4)]
+        signatures = [str(tx.signatures[0]) for tx in transactions]
+        cluster = FakeCluster(lands_after={signatures[0]: 1, signatures[2]: 2, signatures[3]: 1}, failed=[signatures[1]])
+        sender = cluster.sender()
+
+        outcomes = sender.send_many(transactions)
+
+        self.assertEqual([outcome["signature"] for outcome in outcomes], signatures)
+        self.assertEqual([outcome["status"] for outcome in outcomes], [LANDED, FAILED, LANDED, LANDED])
+        stats = sender.stats()
+        self.assertEqual((stats["landed"], stats["failed"]), (3, 1))
+        self.assertAlmostEqual(stats["landing_rate"], 0.75)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+import time
+import unittest
+from unittest.mock import patch
+
+from dspy_solana_wallet.shadow_ledger import ShadowLedger, get_cached_balance
+from dspy_solana_wallet.token_types import TokenType
+
+
+class FakeChain:
+    """Stand-in for the batched balance fetch that counts how often chain is read."""
+
+    def __init__(self, balances):
+        self.balances = dict(balances)
+        self.calls = []
+
+    def __call__(self, keys):
+        self.calls.append(list(keys))
+        return [self.balances.get(key, -1) for key in keys]
+
+
+def ledger(chain, **kwargs):
+    options = dict(max_staleness=60, resync_interval=0, pending_ttl=90)
+    options.update(kwargs)
+    return ShadowLedger(fetch=chain, **options)
+
+
+class TestShadowLedger(unittest.TestCase):
+
+    def test_repeated_queries_are_served_locally(self):
+        """Test that only the first balance query for a wallet reads chain."""
+        chain = FakeChain({("Wallet1", TokenType.USDG): 5_000_000})
+        balances = ledger(chain)
+
+        results = [balances.get_balance("Wallet1", TokenType.USDG) for _ in range(10)]
+
+        self.assertEqual(results, [5_000_000] * 10)
+        self.assertEqual(len(chain.calls), 1)
+        self.assertEqual(balances.stats()["hits"], 9)
+
+    def test_recorded_sends_are_applied_until_the_chain_reflects_them(self):
+        """Test that confirmed deltas adjust the balance and are dropped once a resync reads them from chain."""
+        chain = FakeChain({("Funding", TokenType.USDG): 10_000_000, ("User", TokenType.USDG): 0})
+        balances = ledger(chain)
+        balances.get_balance("Funding", TokenType.USDG)
+        balances.get_balance("User", TokenType.USDG)
+
+        balances.record("sig-1", [
+            ("Funding", TokenType.USDG, -2_000_000),
+            ("User", TokenType.USDG, 2_000_000),
+        ], confirmed=True)
+        self.assertEqual(balances.get_balance("Funding", TokenType.USDG), 8_000_000)
+        self.assertEqual(balances.get_balance("User", TokenType.USDG), 2_000_000)
+
+        chain.balances = {("Funding", TokenType.USDG): 8_000_000, ("User", TokenType.USDG): 2_000_000}
+        balances.resync()
+
+        self.assertEqual(balances.get_balance("User", TokenType.USDG), 2_000_000)
+        self.assertEqual(balances.stats()["pending_deltas"], 0)
+        self.assertEqual(len(chain.calls), 3)
+
+    def test_pending_send_survives_a_resync_and_failed_send_is_discarded(self):
+        """Test that an unconfirmed send stays counted across a resync and disappears when discarded."""
+        chain = FakeChain({("User", TokenType.SOL): 1_000})
+        balances = ledger(chain)
+        balances.get_balance("User", TokenType.SOL)
+
+        balances.record("sig-1", [("User", TokenType.SOL, 500)])
+        balances.resync()
+        self.assertEqual(balances.get_balance("User", TokenType.SOL), 1_500)
+
+        balances.discard("sig-1")
+        self.assertEqual(balances.get_balance("User", TokenType.SOL), 1_000)
+
+    def test_sends_to_untracked_wallets_are_ignored(self):
+        """Test that deltas for balances not yet seeded are not double counted after the first read."""
+        chain = FakeChain({("User", TokenType.SOL): 1_500})
+        balances = ledger(chain)
+
+        balances.record("sig-1", [("User", TokenType.SOL, 500)], confirmed=True)
+
+        self.assertEqual(balances.get_balance("User", TokenType.SOL), 1_500)
+
+    def test_stale_entries_are_read_again(self):
+        """Test that a balance older than max_staleness is re-read from chain."""
+        chain = FakeChain({("User", TokenType.SOL): 1_000})
+        balances = ledger(chain, max_staleness=0.05)
+        balances.get_balance("User", TokenType.SOL)
+
+        chain.balances[("User", TokenType.SOL)] = 3_000
+        time.sleep(0.1)
+
+        self.assertEqual(balances.get_balance("User", TokenType.SOL), 3_000)
+        self.assertEqual(len(chain.calls), 2)
+
+    def test_get_cached_balance_reads_chain_when_disabled(self):
+        """Test that get_cached_balance falls back to get_balance when the ledger is off."""
+        with patch("dspy_solana_wallet.config.SOLANA_SHADOW_LEDGER_ENABLED", False), \
+                patch("dspy_solana_wallet.primitive_solana_functions.get_balance", return_value=42) as get_balance:
+            self.assertEqual(get_cached_balance("User", TokenType.SOL), 42)
+        get_balance.assert_called_once_with("User", TokenType.SOL)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,202 @@
+import asyncio
+import itertools
+import json
+import unittest
+
+import websockets
+
+from dspy_solana_wallet.subscriptions import SolanaSubscriptionClient
+
+
+class FakePubSubServer:
+    """Local stand-in for a Solana pub/sub WebSocket endpoint."""
+
+    def __init__(self):
+        self.subscription_ids = itertools.count(100)
+        self.connections = []
+        self.subscriptions = {}
+        self.requests = []
+        self.initial_notifications = {}
+        self.server = None
+
+    async def start(self):
+        self.server = await websockets.serve(self.handler, "127.0.0.1", 0)
+        port = self.server.sockets[0].getsockname()[1]
+        return f"ws://127.0.0.1:{port}"
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def handler(self, websocket):
+        self.connections.append(websocket)
+        async for message in websocket:
+            request = json.loads(message)
+            self.requests.append(request["method"])
+            if request["method"].endswith("Unsubscribe"):
+                result = True
+            else:
+                result = next(self.subscription_ids)
+                self.subscriptions[request["params"][0]] = (websocket, request["method"], result)
+            await websocket.send(json.dumps({"jsonrpc": "2.0", "id": request["id"], "result": result}))
+            if request["params"][0] in self.initial_notifications:
+                await self.notify(request["params"][0], self.initial_notifications[request["params"][0]])
+
+    async def notify(self, key, result):
+        websocket, method, subscription_id = self.subscriptions[key]
+        notification = method.replace("Subscribe", "Notification")
+        await websocket.send(json.dumps({
+            "jsonrpc": "2.0",
+            "method": notification,
+            "params": {"subscription": subscription_id, "result": result}
+        }))
+
+    async def wait_for_subscription(self, key, previous=None):
+        for _ in range(200):
+            entry = self.subscriptions.get(key)
+            if entry is not None and entry != previous:
+                return entry
+            await asyncio.sleep(0.01)
+        raise AssertionError(f"{key} was never subscribed")
+
+
+async def _wait_until(condition, timeout=2):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        if asyncio.get_running_loop().time() > deadline:
+            raise AssertionError("condition not met in time")
+        await asyncio.sleep(0.01)
+
+
+class TestSolanaSubscriptionClient(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.server = FakePubSubServer()
+        url = await self.server.start()
+        self.client = SolanaSubscriptionClient(url=url, reconnect_delay=0.05, request_timeout=2)
+        await self.client.connect()
+
+    async def asyncTearDown(self):
+        await self.client.close()
+        await self.server.stop()
+
+    async def test_multiplexes_account_and_signature_subscriptions(self):
+        """Test that several subscriptions share one socket and get their own notifications."""
+        received = []
+        account_sub = await self.client.account_subscribe("Wallet1", callback=received.append)
+        signature_sub = await self.client.signature_subscribe("sig-1")
+
+        await self.server.notify("Wallet1", {"context": {"slot": 5}, "value": {"lamports": 10}})
+        await self.server.notify("sig-1", {"context": {"slot": 6}, "value": {"err": None}})
+
+        self.assertEqual((await signature_sub.next(timeout=2))["value"], {"err": None})
+        await _wait_until(lambda: received)
+        self.assertEqual(received[0]["value"]["lamports"], 10)
+        # Notifications that go to a callback are not also queued for iteration
+        self.assertTrue(account_sub._queue.empty())
+        self.assertEqual(len(self.server.connections), 1)
+
+        # signatureSubscribe is one-shot: iteration ends after the notification
+        self.assertEqual([item async for item in signature_sub], [])
+        self.assertEqual(self.client.active_subscriptions(), 1)
+
+    async def test_callback_can_unsubscribe(self):
+        """Test that a callback awaiting unsubscribe() does not block the socket reader."""
+        unsubscribed = asyncio.Event()
+
+        async def on_notification(result):
+            await subscription.unsubscribe()
+            unsubscribed.set()
+
+        subscription = await self.client.account_subscribe("Wallet3", callback=on_notification)
+        await self.server.notify("Wallet3", {"context": {"slot": 1}, "value": {"lamports": 1}})
+
+        await asyncio.wait_for(unsubscribed.wait(), 2)
+        self.assertTrue(subscription.closed)
+        self.assertEqual(self.client.active_subscriptions(), 0)
+
+    async def test_async_iteration_and_unsubscribe(self):
+        """Test that a subscription can be consumed with 'async for' and ends on unsubscribe."""
+        subscription = await self.client.account_subscribe("Wallet2")
+        for lamports in (1, 2):
+            await self.server.notify("Wallet2", {"context": {"slot": lamports}, "value": {"lamports": lamports}})
+
+        seen = []
+        async for result in subscription:
+            seen.append(result["value"]["lamports"])
+            if len(seen) == 2:
+                await subscription.unsubscribe()
+
+        self.assertEqual(seen, [1, 2])
+        self.assertIn("accountUnsubscribe", self.server.requests)
+
+    async def test_notification_right_behind_the_subscribe_response_is_kept(self):
+        """Test that a notification sent immediately after the subscribe response reaches the subscription."""
+        self.server.initial_notifications["Wallet4"] = {"context": {"slot": 3}, "value": {"lamports": 7}}
+
+        subscription = await self.client.account_subscribe("Wallet4")
+
+        self.assertEqual((await subscription.next(timeout=2))["value"]["lamports"], 7)
+
+    async def test_reconnects_and_resubscribes(self):
+        """Test that a dropped socket is reopened and active subscriptions are restored."""
+        subscription = await self.client.account_subscribe("Wallet3")
+        before = self.server.subscriptions["Wallet3"]
+
+        await self.server.connections[0].close()
+        await self.server.wait_for_subscription("Wallet3", previous=before)
+        await self.server.notify("Wallet3", {"context": {"slot": 9}, "value": {"lamports": 99}})
+
+        self.assertEqual((await subscription.next(timeout=2))["value"]["lamports"], 99)
+        self.assertEqual(self.client.reconnects, 1)
+        self.assertEqual(len(self.server.connections), 2)
+
+    async def test_close_cancels_running_callbacks(self):
+        """Test that callbacks still running or queued when the client closes are cancelled."""
+        started, release = asyncio.Event(), asyncio.Event()
+        finished = []
+
+        async def on_notification(result):
+            started.set()
+            await release.wait()
+            finished.append(result)
+
+        subscription = await self.client.account_subscribe("Wallet5", callback=on_notification)
+        for lamports in (1, 2):
+            await self.server.notify("Wallet5", {"context": {"slot": lamports}, "value": {"lamports": lamports}})
+        await asyncio.wait_for(started.wait(), 2)
+        await _wait_until(lambda: len(subscription._callback_tasks) == 2)
+        tasks = list(subscription._callback_tasks)
+
+        await self.client.close()
+        release.set()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        self.assertTrue(all(task.cancelled() for task in tasks))
+        self.assertEqual(finished, [])
+
+
+class TestSubscriptionClientAcrossEventLoops(unittest.TestCase):
+
+    def test_client_built_outside_a_loop_works_under_successive_event_loops(self):
+        """Test that a client constructed in sync code can connect under asyncio.run() more than once."""
+        client = SolanaSubscriptionClient(url="ws://unused", reconnect_delay=0.05, request_timeout=2)
+
+        async def use_client():
+            server = FakePubSubServer()
+            client.url = await server.start()
+            try:
+                await client.connect()
+                subscription = await client.account_subscribe("Wallet6")
+                await server.notify("Wallet6", {"context": {"slot": 1}, "value": {"lamports": 6}})
+                return (await subscription.next(timeout=2))["value"]["lamports"]
+            finally:
+                await client.close()
+                await server.stop()
+
+        self.assertEqual(asyncio.run(use_client()), 6)
+        self.assertEqual(asyncio.run(use_client()), 6)
+
+
+if __name__ == '__main__':
+    unittest.main()